@@ -0,0 +1,290 @@
+"""CPU ağır POST uçları için kabul denetimi (admission control).
+
+Her uygulamanın `/iou`, `/matrix`, `/converter` gibi hesap uçları
+`admission_control` ile sarılır. Aynı anda en çok `ADMISSION_MAX_INFLIGHT`
+hesap çalışır ve bunların yükleme gövdeleri toplamı `ADMISSION_MAX_UPLOAD_BYTES`
+sınırını aşmaz (tek istek her zaman kabul edilir; büyük yüklemeler sırayla
+işlenir). Sığmayan istek gövdesi okunmadan sıraya girer; sıra
+`ADMISSION_QUEUE_LIMIT` kadardır ve en çok `ADMISSION_WAIT_SECONDS` beklenir.
+Sıra doluysa ya da süre dolarsa gövde okunup atılır (tutulmaz) ve `503` +
+`Retry-After` döner. Böylece yükte iş parçacığı sayısı artsa da paralel
+50 MB yüklemeler belleği doldurmaz ve kuyruk gecikmesi öngörülebilir kalır.
+
+Sınırlar süreç ve uygulama başınadır. Bekleme süreleri ve geri çevirmeler
+`/metrics` ucunda JSON olarak görünür. Arka plan işleri (`jobs`) gönderilirken
+sıraya girmez, gövdeleri diskte bekler; iş kendi iş parçacığında sırasını
+süresiz bekler ve gövde ancak yer alınınca belleğe okunur.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, Optional
+
+from serving import RETRY_AFTER_SECONDS
+
+# Uygulama başına aynı anda çalışan en fazla hesap
+ADMISSION_MAX_INFLIGHT = 2
+# Çalışan hesapların yükleme gövdeleri toplamı için üst sınır (bayt)
+ADMISSION_MAX_UPLOAD_BYTES = 128 * 1024 * 1024
+# Yer bekleyen en fazla istek; aşılırsa hemen 503
+ADMISSION_QUEUE_LIMIT = 8
+# Sırada beklenen en uzun süre (saniye); aşılırsa 503
+ADMISSION_WAIT_SECONDS = 10.0
+# Geri çevrilen isteğin gövdesi bu boyuta kadar okunup atılır (istemci
+# yüklemeyi bitirip 503'ü görebilsin); daha büyükse bağlantı kapatılır
+ADMISSION_DRAIN_BYTES = 64 * 1024 * 1024
+_DRAIN_CHUNK = 64 * 1024
+
+# True => süresiz ve sıra sınırı olmadan bekle (arka plan işleri)
+_PATIENT: ContextVar[bool] = ContextVar("admission_patient", default=False)
+
+HeaderHook = Callable[[BaseHTTPRequestHandler], None]
+
+
+class AdmissionController:
+    """Bir uygulamanın hesap yuvaları ve bekleme sırası (FIFO)."""
+
+    def __init__(self, name: str, max_inflight: Optional[int] = None) -> None:
+        self.name = name
+        # None => ADMISSION_MAX_INFLIGHT
+        self.max_inflight = max_inflight
+        self._cond = threading.Condition()
+        self._queue: Deque[object] = deque()
+        self.inflight = 0
+        self.inflight_bytes = 0
+        self.admitted = 0
+        self.rejected_full = 0
+        self.rejected_timeout = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _fits(self, nbytes: int) -> bool:
+        if self.inflight >= (self.max_inflight or ADMISSION_MAX_INFLIGHT):
+            return False
+        return self.inflight == 0 or self.inflight_bytes + nbytes <= ADMISSION_MAX_UPLOAD_BYTES
+
+    def acquire(self, nbytes: int) -> Optional[float]:
+        """Yer açılınca bekleme süresini döndür; sıra dolu ya da süre bittiyse None."""
+        patient = _PATIENT.get()
+        start = time.monotonic()
+        with self._cond:
+            if not self._queue and self._fits(nbytes):
+                return self._admit(nbytes, 0.0)
+            if not patient and len(self._queue) >= ADMISSION_QUEUE_LIMIT:
+                self.rejected_full += 1
+                return None
+            ticket = object()
+            self._queue.append(ticket)
+            try:
+                while not (self._queue[0] is ticket and self._fits(nbytes)):
+                    remaining = None if patient else start + ADMISSION_WAIT_SECONDS - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self.rejected_timeout += 1
+                        return None
+                    self._cond.wait(remaining)
+            finally:
+                self._queue.remove(ticket)
+                # Sıradaki bekleyen başa geçti
+                self._cond.notify_all()
+            return self._admit(nbytes, time.monotonic() - start)
+
+    def acquire_nowait(self, nbytes: int) -> bool:
+        """Beklemeden yer açıksa al (olay döngüsünden çağrılabilir)."""
+        with self._cond:
+            if self._queue or not self._fits(nbytes):
+                return False
+            self._admit(nbytes, 0.0)
+            return True
+
+    def _admit(self, nbytes: int, waited: float) -> float:
+        self.inflight += 1
+        self.inflight_bytes += nbytes
+        self.admitted += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        return waited
+
+    def release(self, nbytes: int) -> None:
+        with self._cond:
+            self.inflight -= 1
+            self.inflight_bytes -= nbytes
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "inflight": self.inflight,
+                "inflight_bytes": self.inflight_bytes,
+                "waiting": len(self._queue),
+                "admitted": self.admitted,
+                "rejected_full": self.rejected_full,
+                "rejected_timeout": self.rejected_timeout,
+                "wait_ms_total": round(self.wait_seconds_total * 1000, 1),
+                "wait_ms_avg": round(self.wait_seconds_total * 1000 / self.admitted, 1) if self.admitted else 0.0,
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 1),
+            }
+
+
+_controllers: Dict[str, AdmissionController] = {}
+_controllers_lock = threading.Lock()
+
+
+def get_controller(name: str, max_inflight: Optional[int] = None) -> AdmissionController:
+    with _controllers_lock:
+        controller = _controllers.get(name)
+        if controller is None:
+            controller = _controllers[name] = AdmissionController(name)
+        if max_inflight is not None:
+            controller.max_inflight = max(1, int(max_inflight))
+        return controller
+
+
+def configure_admission(
+    max_inflight: Optional[int] = None,
+    max_upload_bytes: Optional[int] = None,
+    queue_limit: Optional[int] = None,
+    wait_seconds: Optional[float] = None,
+) -> None:
+    """Sınırları ayarla (CLI bayraklarından çağrılır)."""
+    global ADMISSION_MAX_INFLIGHT, ADMISSION_MAX_UPLOAD_BYTES, ADMISSION_QUEUE_LIMIT, ADMISSION_WAIT_SECONDS
+    if max_inflight is not None:
+        ADMISSION_MAX_INFLIGHT = max(1, int(max_inflight))
+    if max_upload_bytes is not None:
+        ADMISSION_MAX_UPLOAD_BYTES = max(0, int(max_upload_bytes))
+    if queue_limit is not None:
+        ADMISSION_QUEUE_LIMIT = max(0, int(queue_limit))
+    if wait_seconds is not None:
+        ADMISSION_WAIT_SECONDS = max(0.0, float(wait_seconds))
+
+
+def admission_settings() -> Dict[str, Any]:
+    return {
+        "max_inflight": ADMISSION_MAX_INFLIGHT,
+        "max_upload_bytes": ADMISSION_MAX_UPLOAD_BYTES,
+        "queue_limit": ADMISSION_QUEUE_LIMIT,
+        "wait_seconds": ADMISSION_WAIT_SECONDS,
+    }
+
+
+@contextmanager
+def patient() -> Iterator[None]:
+    """Bu bağlamdaki istekler sırada süresiz bekler, geri çevrilmez."""
+    token = _PATIENT.set(True)
+    try:
+        yield
+    finally:
+        _PATIENT.reset(token)
+
+
+@contextmanager
+def reserve(name: str, nbytes: int, max_inflight: Optional[int] = None) -> Iterator[bool]:
+    """Gövde okunmadan `name` denetleyicisinde yer ayır; sığmadıysa False verir.
+
+    Ham isteği kendisi okuyan katmanlar (süreç havuzu, asyncio ön sunucu,
+    arka plan işleri) gövdeyi belleğe almadan önce bunu kullanır.
+    """
+    controller = get_controller(name, max_inflight)
+    if controller.acquire(nbytes) is None:
+        yield False
+        return
+    try:
+        yield True
+    finally:
+        controller.release(nbytes)
+
+
+def discard_body(rfile: Any, nbytes: int) -> bool:
+    """Gövdeyi belleğe almadan oku ve at; okunamadıysa False."""
+    if nbytes > ADMISSION_DRAIN_BYTES:
+        return False
+    remaining = nbytes
+    try:
+        while remaining > 0:
+            chunk = rfile.read(min(_DRAIN_CHUNK, remaining))
+            if not chunk:
+                return False
+            remaining -= len(chunk)
+    except OSError:
+        return False
+    return True
+
+
+def _send_busy(handler: BaseHTTPRequestHandler, nbytes: int, add_headers: Optional[HeaderHook]) -> None:
+    drained = discard_body(handler.rfile, nbytes)
+    payload = "Sunucu şu anda çok fazla analiz işliyor, lütfen biraz sonra tekrar deneyin.\n".encode("utf-8")
+    handler.send_response(503)
+    handler.send_header("Content-Type", "text/plain; charset=utf-8")
+    handler.send_header("Retry-After", str(RETRY_AFTER_SECONDS))
+    if add_headers is not None:
+        add_headers(handler)
+    if not drained:
+        # Gövde okunamadı: bağlantı yeniden kullanılamaz
+        handler.send_header("Connection", "close")
+        handler.close_connection = True
+    handler.send_header("Content-Length", str(len(payload)))
+    handler.end_headers()
+    handler.wfile.write(payload)
+
+
+def admission_control(
+    name: str,
+    paths: Iterable[str],
+    add_headers: Optional[HeaderHook] = None,
+) -> Callable[[Callable[[BaseHTTPRequestHandler], None]], Callable[[BaseHTTPRequestHandler], None]]:
+    """`do_POST`'u sar: `paths` uçlarına gelen istekler gövde okunmadan yer bekler."""
+    guarded = frozenset(paths)
+
+    def decorate(method: Callable[[BaseHTTPRequestHandler], None]) -> Callable[[BaseHTTPRequestHandler], None]:
+        @functools.wraps(method)
+        def wrapper(self: BaseHTTPRequestHandler) -> None:
+            from jobs import wants_job
+
+            if self.path.partition("?")[0] not in guarded or wants_job(self):
+                method(self)
+                return
+            try:
+                nbytes = max(0, int(self.headers.get("Content-Length", "0") or 0))
+            except ValueError:
+                nbytes = 0
+            controller = get_controller(name)
+            if controller.acquire(nbytes) is None:
+                _send_busy(self, nbytes, add_headers)
+                return
+            try:
+                method(self)
+            finally:
+                controller.release(nbytes)
+
+        return wrapper
+
+    return decorate
+
+
+def serve_metrics(handler: BaseHTTPRequestHandler, add_headers: Optional[HeaderHook] = None) -> bool:
+    """`/metrics`: bu süreçteki kabul denetimi sayaçlarını JSON olarak döndür."""
+    if handler.path.partition("?")[0] != "/metrics":
+        return False
+    with _controllers_lock:
+        controllers = sorted(_controllers.items())
+    payload = json.dumps(
+        {"limits": admission_settings(), "admission": {name: controller.stats() for name, controller in controllers}},
+        ensure_ascii=False,
+    ).encode("utf-8")
+    handler.send_response(200)
+    handler.send_header("Content-Type", "application/json; charset=utf-8")
+    handler.send_header("Cache-Control", "no-store")
+    if add_headers is not None:
+        add_headers(handler)
+    handler.send_header("Content-Length", str(len(payload)))
+    handler.end_headers()
+    if handler.command != "HEAD":
+        handler.wfile.write(payload)
+    return True
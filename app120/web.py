@@ -1,13 +1,15 @@
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import BaseHTTPRequestHandler
 import argparse
 import html
 import io
 import csv
-import base64
-import json
-from typing import List, Optional, Dict, Any, Type, Set, Tuple
+from typing import List, Optional, Dict, Any, Type, Set, Tuple, Iterator
+import itertools
 
-from favicon import render_head_links, try_load_asset
+from admission import admission_control, configure_admission, serve_metrics
+from favicon import render_head_links, try_load_static
+from http_cache import CACHE_PAGE, asset_cache_control, cached_page, send_cached, send_file
+from page_template import BODY_SLOT, TITLE_SLOT, PageTemplate
 
 from .counter import (
     Candle as CounterCandle,
@@ -31,571 +33,29 @@ from .main import (
     convert_60m_to_120m,
     format_price,
 )
-from email.parser import BytesParser
-from email.policy import default as email_default
 from datetime import timedelta
-from zipfile import ZipFile, ZIP_DEFLATED
 from typing import Tuple
 
+from iou_session import configure_sessions, history_link, load_session, serve_history, session_input, store_session
+from jobs import configure_jobs, report_file, report_panel, report_progress, serve_job, submit_job
 from news_loader import find_news_for_timestamp
+from patterns import (
+    CHAIN_STORE,
+    PatternTrie,
+    configure_memo,
+    configure_search,
+    decode_pattern_payload,
+    encode_pattern_payload,
+    render_combined_pattern_panel,
+    render_pattern_panel,
+    resume_chain,
+)
+from serving import configure_server, make_server, make_wsgi_app, serve, url_for
+from streaming import send_chunks, send_stream
+from zipstream import zip_stream
 
 IOU_TOLERANCE = 0.005
 
-# --- Örüntüleme Yardımcıları ---
-
-# Sınırlar kaldırıldı: None => limitsiz (beam ve çıktı sayısı)
-PATTERN_MAX_PATHS: Optional[int] = None
-PATTERN_BEAM_WIDTH: Optional[int] = None
-
-def _fmt_off(v: int) -> str:
-    return f"+{v}" if v > 0 else str(v)
-
-def _sign(v: int) -> int:
-    if v > 0:
-        return 1
-    if v < 0:
-        return -1
-    return 0
-
-def _allowed_values_for_state(state: Dict[str, Any], choices: Set[int], allow_zero_after_start: bool) -> List[int]:
-    prev = state.get("prev")
-    mode = state.get("mode")  # 'free', 'after_zero', 'triple', 'need_zero'
-    sign = state.get("sign")
-    direction = state.get("dir")  # 'asc' | 'desc' | None
-    pos = state.get("pos")  # 1|2|3|None
-    allow_zero_next = bool(state.get("allow_zero_next"))
-
-    allowed: Set[int] = set()
-    if mode == "free":
-        allowed = set(choices)
-    elif mode == "after_zero":
-        for k in (1, 3):
-            for s in (-1, 1):
-                v = s * k
-                if v in choices:
-                    allowed.add(v)
-    elif mode == "triple":
-        if pos == 2 and direction is None:
-            # ±2 ile başlandıysa sonraki değer 1 veya 3 (aynı işaret)
-            for k in (1, 3):
-                v = sign * k
-                if v in choices:
-                    allowed.add(v)
-        else:
-            if direction == "asc":
-                nxt = 2 if pos == 1 else (3 if pos == 2 else None)
-            else:  # desc
-                nxt = 2 if pos == 3 else (1 if pos == 2 else None)
-            if nxt is not None:
-                v = sign * nxt
-                if v in choices:
-                    allowed.add(v)
-    elif mode == "need_zero":
-        if 0 in choices:
-            allowed = {0}
-
-    # Özel kural: ilk adım ±1/±3 ise bir sonraki adımda 0 opsiyonunu da aç
-    if allow_zero_after_start and allow_zero_next and 0 in choices:
-        allowed.add(0)
-
-    # Ard arda aynı değer yasak
-    if prev is not None and prev in allowed:
-        allowed.discard(prev)
-
-    order = { -3:0, -2:1, -1:2, 0:3, 1:4, 2:5, 3:6 }
-    return sorted(list(allowed), key=lambda v: order.get(v, 99))
-
-
-def _advance_state(state: Dict[str, Any], value: int, step_idx: int, allow_zero_after_start: bool) -> Dict[str, Any]:
-    # Kopya oluştur
-    ns = {
-        "mode": state.get("mode"),
-        "sign": state.get("sign"),
-        "dir": state.get("dir"),
-        "pos": state.get("pos"),
-        "allow_zero_next": False,  # varsayılan reset
-        "prev": value,
-        "seq": list(state.get("seq") or []) + [value],
-    }
-
-    mode = state.get("mode")
-    sign = state.get("sign")
-    direction = state.get("dir")
-    pos = state.get("pos")
-
-    if mode == "free":
-        if value == 0:
-            ns.update({"mode": "after_zero", "sign": None, "dir": None, "pos": None})
-        else:
-            s = _sign(value)
-            a = abs(value)
-            if a == 2:
-                ns.update({"mode": "triple", "sign": s, "dir": None, "pos": 2})
-            elif a == 1:
-                ns.update({"mode": "triple", "sign": s, "dir": "asc", "pos": 1})
-            elif a == 3:
-                ns.update({"mode": "triple", "sign": s, "dir": "desc", "pos": 3})
-            # Özel kural (sadece global ilk adım için): sonraki adıma 0 izni
-            if allow_zero_after_start and a in (1, 3) and step_idx == 0:
-                ns["allow_zero_next"] = True
-    elif mode == "after_zero":
-        # Sadece ±1/±3 ile yeni üçlü başlar
-        s = _sign(value)
-        a = abs(value)
-        if a == 1:
-            ns.update({"mode": "triple", "sign": s, "dir": "asc", "pos": 1})
-        elif a == 3:
-            ns.update({"mode": "triple", "sign": s, "dir": "desc", "pos": 3})
-    elif mode == "triple":
-        if value == 0 and state.get("allow_zero_next"):
-            # İlk adım ±1/±3 sonrası 0 istisnası
-            ns.update({"mode": "after_zero", "sign": None, "dir": None, "pos": None})
-        else:
-            s = sign
-            a = abs(value)
-            if pos == 2 and direction is None:
-                # 2'den 1 veya 3'e geçiş tamamlanınca 0 beklenir
-                if a == 1:
-                    ns.update({"mode": "need_zero", "sign": s, "dir": "desc", "pos": 1})
-                elif a == 3:
-                    ns.update({"mode": "need_zero", "sign": s, "dir": "asc", "pos": 3})
-            else:
-                if direction == "asc":
-                    if pos == 1 and a == 2:
-                        ns.update({"mode": "triple", "sign": s, "dir": "asc", "pos": 2})
-                    elif pos == 2 and a == 3:
-                        ns.update({"mode": "need_zero", "sign": s, "dir": "asc", "pos": 3})
-                else:  # desc
-                    if pos == 3 and a == 2:
-                        ns.update({"mode": "triple", "sign": s, "dir": "desc", "pos": 2})
-                    elif pos == 2 and a == 1:
-                        ns.update({"mode": "need_zero", "sign": s, "dir": "desc", "pos": 1})
-    elif mode == "need_zero":
-        if value == 0:
-            ns.update({"mode": "after_zero", "sign": None, "dir": None, "pos": None})
-
-    return ns
-
-
-PATTERN_DOMAIN = {-3, -2, -1, 0, 1, 2, 3}
-
-
-def _initial_pattern_state() -> Dict[str, Any]:
-    return {
-        "mode": "free",
-        "sign": None,
-        "dir": None,
-        "pos": None,
-        "allow_zero_next": False,
-        "prev": None,
-        "seq": [],
-    }
-
-
-def _apply_pattern_sequence(
-    state: Dict[str, Any],
-    pattern: List[int],
-    start_len: int,
-    allow_zero_after_start: bool,
-) -> Optional[Dict[str, Any]]:
-    st = state
-    step_idx = start_len
-    for value in pattern:
-        allowed = _allowed_values_for_state(st, PATTERN_DOMAIN, allow_zero_after_start)
-        if value not in allowed:
-            return None
-        st = _advance_state(st, value, step_idx, allow_zero_after_start)
-        step_idx += 1
-    return st
-
-
-def _continuation_options_for_sequence(seq: List[int], allow_zero_after_start: bool) -> List[int]:
-    state = _initial_pattern_state()
-    for idx, value in enumerate(seq):
-        allowed = _allowed_values_for_state(state, PATTERN_DOMAIN, allow_zero_after_start)
-        if value not in allowed:
-            return []
-        state = _advance_state(state, value, idx, allow_zero_after_start)
-    return _allowed_values_for_state(state, PATTERN_DOMAIN, allow_zero_after_start)
-
-
-def _infer_pattern_group_width(pattern_group: List[List[int]]) -> int:
-    for seq in pattern_group:
-        if seq:
-            return len(seq)
-    return 0
-
-
-def build_chained_pattern_sequences(
-    pattern_groups: List[List[List[int]]],
-    allow_zero_after_start: bool,
-    max_paths: Optional[int] = PATTERN_MAX_PATHS,
-    beam_width: Optional[int] = PATTERN_BEAM_WIDTH,
-) -> Tuple[List[List[int]], int]:
-    if not pattern_groups:
-        return [], 0
-    states: List[Dict[str, Any]] = [_initial_pattern_state()]
-    for group in pattern_groups:
-        next_states: List[Dict[str, Any]] = []
-        for st in states:
-            current_len = len(st.get("seq") or [])
-            for pattern in group:
-                new_state = _apply_pattern_sequence(st, pattern, current_len, allow_zero_after_start)
-                if new_state is None:
-                    continue
-                next_states.append(new_state)
-                if beam_width is not None and len(next_states) >= beam_width:
-                    break
-            if beam_width is not None and len(next_states) >= beam_width:
-                break
-        states = next_states
-        if not states:
-            break
-    seen: Set[Tuple[int, ...]] = set()
-    display: List[List[int]] = []
-    total_unique = 0
-    for st in states:
-        seq = st.get("seq") or []
-        key = tuple(seq)
-        if key in seen:
-            continue
-        seen.add(key)
-        total_unique += 1
-        if max_paths is None or len(display) < max_paths:
-            display.append(seq)
-    return display, total_unique
-
-
-def _find_mirror_chain_highlights(seq: List[int]) -> Set[int]:
-    highlights: Set[int] = set()
-    n = len(seq)
-    if n == 0:
-        return highlights
-    zeros: List[int] = [i for i, v in enumerate(seq) if v == 0]
-    if len(zeros) < 2:
-        return highlights
-    groups: List[Dict[str, Any]] = []
-    for zi in range(len(zeros) - 1):
-        a = zeros[zi]
-        b = zeros[zi + 1]
-        if b - a - 1 != 3:
-            continue
-        s0, s1, s2 = seq[a + 1], seq[a + 2], seq[b - 1]
-        if 0 in (s0, s1, s2):
-            continue
-        sgn = 1 if s0 > 0 else -1
-        if (s1 > 0) != (s0 > 0) or (s2 > 0) != (s0 > 0):
-            continue
-        abs_vals = [abs(s0), abs(s1), abs(s2)]
-        if abs_vals == [1, 2, 3]:
-            direction = "asc"
-        elif abs_vals == [3, 2, 1]:
-            direction = "desc"
-        else:
-            continue
-        groups.append({
-            "z_left": a,
-            "z_right": b,
-            "idxs": [a + 1, a + 2, b - 1],
-            "sign": sgn,
-            "dir": direction,
-        })
-    if not groups:
-        return highlights
-    g = 0
-    while g < len(groups):
-        run_sign = groups[g]["sign"]
-        r = g
-        while r + 1 < len(groups):
-            z_boundary = zeros[r + 1]
-            if not (0 <= z_boundary - 1 < n and 0 <= z_boundary + 1 < n):
-                break
-            if seq[z_boundary - 1] != seq[z_boundary + 1]:
-                break
-            if groups[r + 1]["sign"] != run_sign:
-                break
-            r += 1
-        run_len = r - g + 1
-        if run_len >= 3:
-            for k in range(g, r + 1):
-                highlights.update(groups[k]["idxs"])
-            for k in range(g + 1, r + 1):
-                z_boundary = zeros[k]
-                if 0 <= z_boundary < n:
-                    highlights.add(z_boundary)
-        g = r + 1
-    return highlights
-
-
-def render_combined_pattern_panel(
-    pattern_groups: List[List[List[int]]],
-    meta_groups: List[Dict[str, Any]],
-    allow_zero_after_start: bool,
-) -> str:
-    group_count = len(pattern_groups)
-    if group_count < 2:
-        return ""
-    combined, total_unique = build_chained_pattern_sequences(
-        pattern_groups,
-        allow_zero_after_start=allow_zero_after_start,
-    )
-    summary_label = f"Toplu örüntüler (grup sayısı {group_count})"
-    if total_unique == 0:
-        inner = "<div style='margin-top:12px;'>Uygun birleşik örüntü bulunamadı.</div>"
-    else:
-        limit_note = ""
-        if total_unique > len(combined):
-            limit_note = f" (ilk {len(combined)})"
-        info_line = f"<div><strong>Toplam birleşik örüntü:</strong> {total_unique}{limit_note}</div>"
-        flat_names: List[str] = []
-        flat_joker_indices: Set[int] = set()
-        cursor = 0
-        group_widths = [_infer_pattern_group_width(group) for group in pattern_groups]
-        for idx in range(group_count):
-            width = group_widths[idx] if idx < len(group_widths) else 0
-            meta = meta_groups[idx] if idx < len(meta_groups) else {}
-            raw_names = meta.get("file_names") if isinstance(meta, dict) else None
-            names = [str(n) for n in raw_names] if isinstance(raw_names, list) else []
-            length_for_cursor = width or len(names)
-            if width:
-                if len(names) < width:
-                    names = names + [""] * (width - len(names))
-                elif len(names) > width:
-                    names = names[:width]
-            elif length_for_cursor and not names:
-                names = [""] * length_for_cursor
-            flat_names.extend(names)
-            raw_jokers = meta.get("joker_indices") if isinstance(meta, dict) else None
-            if isinstance(raw_jokers, list):
-                for j in raw_jokers:
-                    try:
-                        j_int = int(j)
-                    except Exception:
-                        continue
-                    flat_joker_indices.add(cursor + j_int)
-            cursor += length_for_cursor
-        grouped: Dict[int, List[List[int]]] = {}
-        group_order: List[int] = []
-        for seq in combined:
-            if not seq:
-                continue
-            start_val = seq[0]
-            if start_val not in grouped:
-                grouped[start_val] = []
-                group_order.append(start_val)
-            grouped[start_val].append(seq)
-
-        def _render_group(patterns: List[List[int]]) -> str:
-            pattern_highlights: List[Set[int]] = [
-                _find_mirror_chain_highlights(seq) for seq in patterns
-            ]
-            return render_pattern_panel(
-                [],
-                allow_zero_after_start=allow_zero_after_start,
-                file_names=flat_names if flat_names else None,
-                joker_indices=flat_joker_indices if flat_joker_indices else None,
-                sequence_name=None,
-                precomputed_patterns=patterns,
-                highlight_positions=pattern_highlights,
-            )
-
-        grouped_lines: List[str] = []
-        for start_val in group_order:
-            patterns = grouped[start_val]
-            panel_html = _render_group(patterns)
-            summary = f"{_fmt_off(start_val)} ile başlayanlar ({len(patterns)})"
-            grouped_lines.append(
-                "<details>"
-                f"<summary>{html.escape(summary)}</summary>"
-                f"{panel_html}"
-                "</details>"
-            )
-        inner = "<div style='margin-top:12px;'>" + info_line + "".join(grouped_lines) + "</div>"
-    return (
-        f"<details class='card' style='margin-top:16px;'>"
-        f"<summary>{html.escape(summary_label)}</summary>"
-        f"{inner}"
-        "</details>"
-    )
-
-
-def build_patterns_from_xyz_lists(
-    xyz_sets: List[Set[int]],
-    allow_zero_after_start: bool,
-    max_paths: Optional[int] = PATTERN_MAX_PATHS,
-    beam_width: Optional[int] = PATTERN_BEAM_WIDTH,
-) -> List[List[int]]:
-    if not xyz_sets:
-        return []
-    # Başlangıç durumu
-    states: List[Dict[str, Any]] = [_initial_pattern_state()]
-    for idx, choices in enumerate(xyz_sets):
-        next_states: List[Dict[str, Any]] = []
-        for st in states:
-            allowed = _allowed_values_for_state(st, choices, allow_zero_after_start)
-            if not allowed:
-                continue
-            for v in allowed:
-                ns = _advance_state(st, v, idx, allow_zero_after_start)
-                next_states.append(ns)
-                if beam_width is not None and len(next_states) >= beam_width:
-                    # Basit beam budaması
-                    break
-            if beam_width is not None and len(next_states) >= beam_width:
-                break
-        states = next_states
-        if not states:
-            break
-
-    results: List[List[int]] = [
-        st["seq"] for st in states if len(st.get("seq", [])) == len(xyz_sets)
-    ]
-    if max_paths is not None:
-        return results[:max_paths]
-    return results
-
-
-def render_pattern_panel(
-    xyz_sets: List[Set[int]],
-    allow_zero_after_start: bool,
-    file_names: Optional[List[str]] = None,
-    joker_indices: Optional[Set[int]] = None,
-    sequence_name: Optional[str] = None,
-    precomputed_patterns: Optional[List[List[int]]] = None,
-    highlight_positions: Optional[List[Set[int]]] = None,
-) -> str:
-    patterns = (
-        precomputed_patterns
-        if precomputed_patterns is not None
-        else build_patterns_from_xyz_lists(xyz_sets, allow_zero_after_start=allow_zero_after_start)
-    )
-    if not patterns:
-        return "<div class='card'><h3>Örüntüleme</h3><div>Örüntü bulunamadı.</div></div>"
-    def _build_state_for_seq(seq: List[int]) -> Dict[str, Any]:
-        st: Dict[str, Any] = {
-            "mode": "free",
-            "sign": None,
-            "dir": None,
-            "pos": None,
-            "allow_zero_next": False,
-            "prev": None,
-            "seq": [],
-        }
-        for i, v in enumerate(seq):
-            st = _advance_state(st, v, i, allow_zero_after_start)
-        return st
-
-    domain = {-3, -2, -1, 0, 1, 2, 3}
-    # 1) Üçlü kümeleri (0'sız) ve dosya uyumunu baz alarak blok rengi ata (başlangıç index'i -> renk)
-    triple_starts: Dict[Tuple[int, int], str] = {}
-    if file_names and len(file_names) >= 3:
-        triples: Dict[Tuple[int, int, int, str, str, str], List[Tuple[int, int]]] = {}
-        for li, seq in enumerate(patterns):
-            for i in range(0, max(0, len(seq) - 2)):
-                a, b, c = seq[i], seq[i+1], seq[i+2]
-                if 0 in (a, b, c):
-                    continue
-                f1 = file_names[i] if i < len(file_names) else None
-                f2 = file_names[i+1] if i+1 < len(file_names) else None
-                f3 = file_names[i+2] if i+2 < len(file_names) else None
-                if not (f1 and f2 and f3):
-                    continue
-                key = (a, b, c, f1, f2, f3)
-                triples.setdefault(key, []).append((li, i))
-        # Renkleri ata (yalnız en az 2 yerde geçen üçlüler)
-        for key, occs in triples.items():
-            if len(occs) < 2:
-                continue
-            s = str(key)
-            try:
-                import hashlib
-                hv = int(hashlib.md5(s.encode('utf-8')).hexdigest()[:6], 16)
-            except Exception:
-                hv = abs(hash(s))
-            hue = hv % 360
-            # Daha saydam bir opaklık: alpha ~ 0.28, biraz daha koyu lightness ile
-            color = f"hsla({hue}, 85%, 60%, 0.28)"
-            for li, i in occs:
-                # Başlangıç konumuna rengi ata (çakışmalarda ilk kazanır)
-                triple_starts.setdefault((li, i), color)
-
-    lines: List[str] = []
-    for idx_line, seq in enumerate(patterns):
-        highlight_set: Optional[Set[int]] = None
-        if highlight_positions and idx_line < len(highlight_positions):
-            highlight_set = highlight_positions[idx_line]
-        parts: List[str] = []
-        i = 0
-        while i < len(seq):
-            name = None
-            if file_names and 0 <= i < len(file_names):
-                name = file_names[i]
-            tip = name or ""
-            if joker_indices and i in joker_indices:
-                tip = (tip + " (Joker)").strip()
-            if tip:
-                def token_html(idx:int) -> str:
-                    nm = file_names[idx] if file_names and 0 <= idx < len(file_names) else ""
-                    tp = nm or ""
-                    if joker_indices and idx in joker_indices:
-                        tp = (tp + " (Joker)").strip()
-                    tk = html.escape(_fmt_off(seq[idx]))
-                    style = ""
-                    if highlight_set is not None and idx in highlight_set:
-                        style = " style='font-weight:700; font-style:italic;'"
-                    if tp:
-                        return (
-                            f"<span class='pat-token' title='{html.escape(tp)}' data-tip='{html.escape(tp)}'{style}>{tk}</span>"
-                        )
-                    return f"<span class='pat-token'{style}>{tk}</span>"
-            else:
-                def token_html(idx:int) -> str:
-                    tk = html.escape(_fmt_off(seq[idx]))
-                    style = ""
-                    if highlight_set is not None and idx in highlight_set:
-                        style = " style='font-weight:700; font-style:italic;'"
-                    return f"<span class='pat-token'{style}>{tk}</span>"
-
-            # Eğer bu pozisyon üçlü başlangıcı ise, üç tokenı ve iki virgülü tek blokta boya
-            color = triple_starts.get((idx_line, i))
-            if color and i + 2 < len(seq):
-                block = (
-                    f"<span style='background-color:{html.escape(color)}; border-radius:4px; padding:0 3px;'>"
-                    f"{token_html(i)}, {token_html(i+1)}, {token_html(i+2)}"
-                    f"</span>"
-                )
-                parts.append(block)
-                i += 3
-                if i < len(seq):
-                    parts.append(", ")
-                continue
-            # aksi halde tek token
-            parts.append(token_html(i))
-            i += 1
-            if i < len(seq):
-                parts.append(", ")
-        label = ", ".join(parts)
-        st = _build_state_for_seq(seq)
-        opts = _allowed_values_for_state(st, domain, allow_zero_after_start)
-        cont = ", ".join(_fmt_off(v) for v in opts) if opts else "-"
-        number_html = f"<span style='display:inline-block; min-width:1.8em; font-weight:bold;'>{idx_line + 1}.</span>"
-        lines.append(f"<div class='pat-line'>{number_html} {label} (devam: {html.escape(cont)})</div>")
-    # Son değerlerin özeti (benzersiz, sıralı)
-    last_vals = [seq[-1] for seq in patterns if seq]
-    order = { -3:0, -2:1, -1:2, 0:3, 1:4, 2:5, 3:6 }
-    unique_last_sorted = []
-    seen = set()
-    for v in sorted(last_vals, key=lambda x: order.get(x, 99)):
-        if v not in seen:
-            seen.add(v)
-            unique_last_sorted.append(v)
-    last_line = "<div><strong>Son değerler:</strong> " + (
-        ", ".join(_fmt_off(v) for v in unique_last_sorted) if unique_last_sorted else "-"
-    ) + "</div>"
-    info = f"<div><strong>Toplam örüntü:</strong> {len(patterns)}</div>"
-    seq_info = f"<div><strong>Sequence:</strong> {html.escape(sequence_name)}</div>" if sequence_name else ""
-    return "<div class='card'><h3>Örüntüleme</h3>" + info + seq_info + last_line + "".join(lines) + "</div>"
-
 def _add_security_headers(handler: BaseHTTPRequestHandler) -> None:
     handler.send_header("X-Content-Type-Options", "nosniff")
     handler.send_header("X-Frame-Options", "DENY")
@@ -677,7 +137,7 @@ def format_pip(delta: Optional[float]) -> str:
     return f"{delta:+.5f}"
 
 
-def page(title: str, body: str, active_tab: str = "analyze") -> bytes:
+def _page_shell(active_tab: str) -> str:
     head_links = render_head_links("    ")
     html_doc = f"""<!doctype html>
 <html>
@@ -685,7 +145,7 @@ def page(title: str, body: str, active_tab: str = "analyze") -> bytes:
     <meta charset='utf-8'>
     <meta name='viewport' content='width=device-width, initial-scale=1'/>
     {head_links}
-    <title>{html.escape(title)}</title>
+    <title>{TITLE_SLOT}</title>
     <style>
       body{{font-family: system-ui, -apple-system, Segoe UI, Roboto, sans-serif; margin:20px;}}
       header{{margin-bottom:16px;}}
@@ -725,23 +185,30 @@ def page(title: str, body: str, active_tab: str = "analyze") -> bytes:
       <h2>app120</h2>
     </header>
     <nav class='tabs'>
-      <a href='/' class='{ 'active' if active_tab=="analyze" else '' }'>Analiz</a>
-      <a href='/dc' class='{ 'active' if active_tab=="dc" else '' }'>DC List</a>
-      <a href='/matrix' class='{ 'active' if active_tab=="matrix" else '' }'>Matrix</a>
-      <a href='/iov' class='{ 'active' if active_tab=="iov" else '' }'>IOV Tarama</a>
-      <a href='/iou' class='{ 'active' if active_tab=="iou" else '' }'>IOU Tarama</a>
-      <a href='/converter' class='{ 'active' if active_tab=="converter" else '' }'>60→120 Converter</a>
+      <a href='{url_for('/')}' class='{ 'active' if active_tab=="analyze" else '' }'>Analiz</a>
+      <a href='{url_for('/dc')}' class='{ 'active' if active_tab=="dc" else '' }'>DC List</a>
+      <a href='{url_for('/matrix')}' class='{ 'active' if active_tab=="matrix" else '' }'>Matrix</a>
+      <a href='{url_for('/iov')}' class='{ 'active' if active_tab=="iov" else '' }'>IOV Tarama</a>
+      <a href='{url_for('/iou')}' class='{ 'active' if active_tab=="iou" else '' }'>IOU Tarama</a>
+      <a href='{url_for('/converter')}' class='{ 'active' if active_tab=="converter" else '' }'>60→120 Converter</a>
     </nav>
-    {body}
+    {BODY_SLOT}
   </body>
 </html>"""
-    return html_doc.encode("utf-8")
+    return html_doc
+
+
+PAGE = PageTemplate(_page_shell)
+
+
+def page(title: str, body: str, active_tab: str = "analyze") -> bytes:
+    return PAGE.render(title, body, active_tab)
 
 
 def render_analyze_index() -> bytes:
-    body = """
+    body = f"""
     <div class='card'>
-      <form method='post' action='/analyze' enctype='multipart/form-data'>
+      <form method='post' action='{url_for('/analyze')}' enctype='multipart/form-data'>
         <div class='row'>
           <div>
             <label>CSV</label>
@@ -794,9 +261,9 @@ def render_analyze_index() -> bytes:
 
 
 def render_dc_index() -> bytes:
-    body = """
+    body = f"""
     <div class='card'>
-      <form method='post' action='/dc' enctype='multipart/form-data'>
+      <form method='post' action='{url_for('/dc')}' enctype='multipart/form-data'>
         <div class='row'>
           <div>
             <label>CSV</label>
@@ -826,9 +293,9 @@ def render_dc_index() -> bytes:
 
 
 def render_matrix_index() -> bytes:
-    body = """
+    body = f"""
     <div class='card'>
-      <form method='post' action='/matrix' enctype='multipart/form-data'>
+      <form method='post' action='{url_for('/matrix')}' enctype='multipart/form-data'>
         <div class='row'>
           <div>
             <label>CSV</label>
@@ -863,9 +330,9 @@ def render_matrix_index() -> bytes:
 
 
 def render_iov_index() -> bytes:
-    body = """
+    body = f"""
     <div class='card'>
-      <form method='post' action='/iov' enctype='multipart/form-data'>
+      <form method='post' action='{url_for('/iov')}' enctype='multipart/form-data'>
         <div class='row'>
           <div>
             <label>CSV</label>
@@ -906,9 +373,9 @@ def render_iov_index() -> bytes:
 
 def render_iou_form() -> str:
     """IOU formunu HTML string olarak döndürür (sonuç sayfasında kullanım için)"""
-    return """
+    return f"""
     <div class='card'>
-      <form method='post' action='/iou' enctype='multipart/form-data'>
+      <form method='post' action='{url_for('/iou')}' enctype='multipart/form-data'>
         <div class='row'>
           <div>
             <label>CSV</label>
@@ -971,13 +438,14 @@ def render_iou_index() -> bytes:
 
 
 def render_converter_index() -> bytes:
-    body = """
+    body = f"""
     <div class='card'>
-      <form method='post' action='/converter' enctype='multipart/form-data'>
+      <form method='post' action='{url_for('/converter')}' enctype='multipart/form-data'>
         <label>CSV (60m, UTC-5)</label>
         <input type='file' name='csv' accept='.csv,text/csv' required multiple />
         <div style='margin-top:12px;'>
           <button type='submit'>120m'e Dönüştür</button>
+          <button type='submit' formaction='{url_for('/converter')}?job=1'>Arka planda dönüştür</button>
         </div>
       </form>
     </div>
@@ -992,6 +460,9 @@ def parse_multipart(handler: BaseHTTPRequestHandler) -> Dict[str, Dict[str, Any]
     if not ctype or "multipart/form-data" not in ctype:
         raise ValueError("multipart/form-data bekleniyor")
     length = int(handler.headers.get("Content-Length", "0") or "0")
+    from email.parser import BytesParser
+    from email.policy import default as email_default
+
     form = BytesParser(policy=email_default).parsebytes(
         b"Content-Type: " + ctype.encode("utf-8") + b"\n\n" + handler.rfile.read(length)
     )
@@ -1028,40 +499,42 @@ def parse_multipart(handler: BaseHTTPRequestHandler) -> Dict[str, Dict[str, Any]
 class App120Handler(BaseHTTPRequestHandler):
     server_version = "Candles120/1.0"
     sys_version = ""
+    protocol_version = "HTTP/1.1"
     def do_GET(self):
-        asset = try_load_asset(self.path)
+        asset = try_load_static(self.path)
         if asset:
-            payload, content_type = asset
-            self.send_response(200)
-            self.send_header("Content-Type", content_type)
-            _add_security_headers(self)
-            self.send_header("Content-Length", str(len(payload)))
-            self.end_headers()
-            self.wfile.write(payload)
+            send_file(self, asset, asset_cache_control(self.path), _add_security_headers)
+            return
+        if serve_job(self, App120Handler, _add_security_headers):
+            return
+        if serve_metrics(self, _add_security_headers):
+            return
+        if serve_history(self, "app120", PAGE, "app120 IOU - Önceki Analizler", _add_security_headers):
             return
         if self.path == "/":
-            body = render_analyze_index()
+            render = render_analyze_index
         elif self.path == "/dc":
-            body = render_dc_index()
+            render = render_dc_index
         elif self.path == "/matrix":
-            body = render_matrix_index()
+            render = render_matrix_index
         elif self.path == "/iov":
-            body = render_iov_index()
+            render = render_iov_index
         elif self.path == "/iou":
-            body = render_iou_index()
+            render = render_iou_index
         elif self.path == "/converter":
-            body = render_converter_index()
+            render = render_converter_index
         else:
+            payload = b"Not Found"
             self.send_response(404)
+            self.send_header("Content-Length", str(len(payload)))
             self.end_headers()
-            self.wfile.write(b"Not Found")
+            self.wfile.write(payload)
             return
-        self.send_response(200)
-        self.send_header("Content-Type", "text/html; charset=utf-8")
-        _add_security_headers(self)
-        self.end_headers()
-        self.wfile.write(body)
+        send_cached(self, cached_page(render), CACHE_PAGE, _add_security_headers)
 
+    do_HEAD = do_GET
+
+    @admission_control("app120", ("/converter", "/iou", "/iov", "/matrix"), _add_security_headers)
     def do_POST(self):
         try:
             # Upload size guard
@@ -1070,10 +543,15 @@ class App120Handler(BaseHTTPRequestHandler):
             except Exception:
                 length_hdr = 0
             if length_hdr > MAX_UPLOAD_BYTES:
+                payload = b"Upload too large (max 50 MB)."
                 self.send_response(413)
                 self.send_header("Content-Type", "text/plain; charset=utf-8")
+                self.send_header("Connection", "close")
+                self.send_header("Content-Length", str(len(payload)))
                 self.end_headers()
-                self.wfile.write(b"Upload too large (max 50 MB).")
+                self.wfile.write(payload)
+                return
+            if submit_job(self, App120Handler, _add_security_headers):
                 return
             form = parse_multipart(self)
             file_field = form.get("csv") or {}
@@ -1081,11 +559,14 @@ class App120Handler(BaseHTTPRequestHandler):
             if not files and self.path != "/iou":
                 raise ValueError("CSV dosyası bulunamadı")
             if len(files) > MAX_FILES:
+                payload = b"Too many files (max 50)."
                 self.send_response(413)
                 self.send_header("Content-Type", "text/plain; charset=utf-8")
                 _add_security_headers(self)
+                self.send_header("Connection", "close")
+                self.send_header("Content-Length", str(len(payload)))
                 self.end_headers()
-                self.wfile.write(b"Too many files (max 50).")
+                self.wfile.write(payload)
                 return
 
             def decode_entry(entry: Dict[str, Any]) -> str:
@@ -1095,53 +576,57 @@ class App120Handler(BaseHTTPRequestHandler):
                 return str(raw)
 
             if self.path == "/converter":
-                outputs: List[Tuple[str, bytes]] = []
                 used_names: set[str] = set()
 
-                for entry in files:
-                    entry_data = entry.get("data")
-                    if isinstance(entry_data, (bytes, bytearray)):
-                        text_entry = entry_data.decode("utf-8", errors="replace")
-                    else:
-                        text_entry = str(entry_data)
-                    try:
-                        candles_entry = load_candles_from_text(text_entry, ConverterCandle)
-                    except ValueError as exc:
-                        name = entry.get("filename") or "dosya"
-                        raise ValueError(f"{name}: {exc}")
-                    if not candles_entry:
-                        name = entry.get("filename") or "dosya"
-                        raise ValueError(f"{name}: Veri boş veya çözümlenemedi")
-                    tf_est = estimate_timeframe_minutes(candles_entry)
-                    if tf_est is None or abs(tf_est - 60) > 1.0:
-                        name = entry.get("filename") or "dosya"
-                        raise ValueError(f"{name}: Girdi 60 dakikalık akış gibi görünmüyor")
-                    shifted, _ = adjust_to_output_tz(candles_entry, "UTC-5")
-                    converted = convert_60m_to_120m(shifted)
-
-                    buffer = io.StringIO()
-                    writer = csv.writer(buffer)
-                    writer.writerow(["Time", "Open", "High", "Low", "Close"])
-                    for c in converted:
-                        writer.writerow([
-                            c.ts.strftime("%Y-%m-%d %H:%M:%S"),
-                            format_price(c.open),
-                            format_price(c.high),
-                            format_price(c.low),
-                            format_price(c.close),
-                        ])
-                    data_bytes = buffer.getvalue().encode("utf-8")
-                    download_name = _sanitize_csv_filename(entry.get("filename") or "converted", "_120m.csv")
-                    counter = 1
-                    while download_name in used_names:
-                        stem, ext = (download_name.rsplit(".", 1) + [""])[:2]
-                        download_name = (stem[:100] or "converted") + f"_{counter}." + (ext or "csv")
-                        counter += 1
-                    used_names.add(download_name)
-                    outputs.append((download_name, data_bytes))
-
-                if len(outputs) == 1:
-                    download_name, data_bytes = outputs[0]
+                def converted_files() -> Iterator[Tuple[str, bytes]]:
+                    for idx_file, entry in enumerate(files):
+                        report_progress("Dönüştürülüyor", idx_file, len(files))
+                        entry_data = entry.get("data")
+                        if isinstance(entry_data, (bytes, bytearray)):
+                            text_entry = entry_data.decode("utf-8", errors="replace")
+                        else:
+                            text_entry = str(entry_data)
+                        try:
+                            candles_entry = load_candles_from_text(text_entry, ConverterCandle)
+                        except ValueError as exc:
+                            name = entry.get("filename") or "dosya"
+                            raise ValueError(f"{name}: {exc}")
+                        if not candles_entry:
+                            name = entry.get("filename") or "dosya"
+                            raise ValueError(f"{name}: Veri boş veya çözümlenemedi")
+                        tf_est = estimate_timeframe_minutes(candles_entry)
+                        if tf_est is None or abs(tf_est - 60) > 1.0:
+                            name = entry.get("filename") or "dosya"
+                            raise ValueError(f"{name}: Girdi 60 dakikalık akış gibi görünmüyor")
+                        shifted, _ = adjust_to_output_tz(candles_entry, "UTC-5")
+                        converted = convert_60m_to_120m(shifted)
+
+                        buffer = io.StringIO()
+                        writer = csv.writer(buffer)
+                        writer.writerow(["Time", "Open", "High", "Low", "Close"])
+                        for c in converted:
+                            writer.writerow([
+                                c.ts.strftime("%Y-%m-%d %H:%M:%S"),
+                                format_price(c.open),
+                                format_price(c.high),
+                                format_price(c.low),
+                                format_price(c.close),
+                            ])
+                        data_bytes = buffer.getvalue().encode("utf-8")
+                        download_name = _sanitize_csv_filename(entry.get("filename") or "converted", "_120m.csv")
+                        counter = 1
+                        while download_name in used_names:
+                            stem, ext = (download_name.rsplit(".", 1) + [""])[:2]
+                            download_name = (stem[:100] or "converted") + f"_{counter}." + (ext or "csv")
+                            counter += 1
+                        used_names.add(download_name)
+                        yield download_name, data_bytes
+
+                outputs = converted_files()
+                # İlk dosyanın hataları her zamanki gibi hata sayfasıyla döner
+                first = next(outputs)
+                if len(files) == 1:
+                    download_name, data_bytes = first
                     self.send_response(200)
                     self.send_header("Content-Type", "text/csv; charset=utf-8")
                     self.send_header("Content-Disposition", f'attachment; filename="{download_name}"')
@@ -1151,20 +636,9 @@ class App120Handler(BaseHTTPRequestHandler):
                     self.wfile.write(data_bytes)
                     return
 
-                bundle = io.BytesIO()
-                with ZipFile(bundle, "w", ZIP_DEFLATED) as zf:
-                    for name, payload in outputs:
-                        zf.writestr(name, payload)
-                zip_bytes = bundle.getvalue()
                 bundle_name = "converted_120m_bundle.zip"
-
-                self.send_response(200)
-                self.send_header("Content-Type", "application/zip")
-                self.send_header("Content-Disposition", f'attachment; filename="{bundle_name}"')
-                self.send_header("Content-Length", str(len(zip_bytes)))
-                _add_security_headers(self)
-                self.end_headers()
-                self.wfile.write(zip_bytes)
+                headers = [("Content-Type", "application/zip"), ("Content-Disposition", f'attachment; filename="{bundle_name}"')]
+                send_chunks(self, zip_stream(itertools.chain([first], outputs)), headers, _add_security_headers)
                 return
 
             sequence = (form.get("sequence", {}).get("value") or "S1").strip() if self.path in ("/analyze", "/matrix", "/iov", "/iou") else "S1"
@@ -1216,78 +690,19 @@ class App120Handler(BaseHTTPRequestHandler):
                 confirm_iou = metric_label == "IOU" and "confirm_iou" in form
                 
                 # Önceki sonuçları al (eğer varsa) - sadece IOU için
-                previous_results_html = ""
+                previous_count = 0
                 pattern_payload_raw = ""
-                pattern_groups_history: List[List[List[int]]] = []
+                pattern_chain_token = ""
+                pattern_groups_history: List[PatternTrie] = []
                 pattern_meta_history: List[Dict[str, Any]] = []
                 pattern_allow_zero_after_start = True
                 if metric_label == "IOU":
-                    previous_results_html = form.get("previous_results_html", {}).get("value", "")
-                    if previous_results_html:
-                        try:
-                            previous_results_html = base64.b64decode(previous_results_html.encode("ascii")).decode("utf-8")
-                        except Exception:
-                            previous_results_html = ""
-                    pattern_payload_raw = form.get("previous_pattern_payload", {}).get("value", "")
-                    if pattern_payload_raw:
-                        try:
-                            decoded_payload = base64.b64decode(pattern_payload_raw.encode("ascii"))
-                            payload_obj = json.loads(decoded_payload.decode("utf-8"))
-                        except Exception:
-                            payload_obj = None
-                        if isinstance(payload_obj, dict):
-                            pattern_allow_zero_after_start = bool(payload_obj.get("allow_zero_after_start", True))
-                            groups_data = payload_obj.get("groups", [])
-                            meta_data = payload_obj.get("meta", [])
-                        elif isinstance(payload_obj, list):
-                            groups_data = payload_obj
-                            meta_data = []
-                        else:
-                            groups_data = []
-                            meta_data = []
-                        if isinstance(groups_data, list):
-                            for group in groups_data:
-                                if not isinstance(group, list):
-                                    continue
-                                normalized: List[List[int]] = []
-                                for seq in group:
-                                    if not isinstance(seq, list):
-                                        continue
-                                    try:
-                                        normalized.append([int(v) for v in seq])
-                                    except Exception:
-                                        continue
-                                pattern_groups_history.append(normalized)
-                        if isinstance(meta_data, list):
-                            for meta in meta_data:
-                                if not isinstance(meta, dict):
-                                    pattern_meta_history.append({})
-                                    continue
-                                names = meta.get("file_names")
-                                if isinstance(names, list):
-                                    names_out = [str(n) for n in names]
-                                else:
-                                    names_out = []
-                                jokers = meta.get("joker_indices")
-                                if isinstance(jokers, list):
-                                    joker_out = []
-                                    for j in jokers:
-                                        try:
-                                            joker_out.append(int(j))
-                                        except Exception:
-                                            continue
-                                else:
-                                    joker_out = []
-                                pattern_meta_history.append(
-                                    {
-                                        "file_names": names_out,
-                                        "joker_indices": joker_out,
-                                    }
-                                )
-                        if len(pattern_meta_history) < len(pattern_groups_history):
-                            pattern_meta_history.extend({} for _ in range(len(pattern_groups_history) - len(pattern_meta_history)))
-                        elif len(pattern_meta_history) > len(pattern_groups_history):
-                            pattern_meta_history = pattern_meta_history[:len(pattern_groups_history)]
+                    # Önceki sonuçlar, yüklenen dosyalar ve örüntü geçmişi sunucudaki oturumda
+                    session = load_session(form, "app120")
+                    previous_count = len(session.results)
+                    pattern_payload_raw = session.pattern_payload
+                    pattern_chain_token = session.chain_token
+                    pattern_groups_history, pattern_allow_zero_after_start, pattern_meta_history = decode_pattern_payload(pattern_payload_raw)
                 
                 tolerance_raw = (form.get("tolerance", {}).get("value") or str(IOU_TOLERANCE)).strip()
                 if metric_label == "IOU":
@@ -1300,37 +715,17 @@ class App120Handler(BaseHTTPRequestHandler):
                     tolerance_val = 0.0
                 limit_margin = limit_val + tolerance_val
 
-                # Alternatif (2. adım) dosya içeriği: csv_b64_{i} + csv_name_{i}
-                b64_entries: List[Dict[str, Any]] = []
-                k = 0
-                while True:
-                    kb = f"csv_b64_{k}"
-                    kn = f"csv_name_{k}"
-                    if kb in form and kn in form:
-                        b64_val = form[kb].get("value") or ""
-                        name_val = form[kn].get("value") or f"uploaded_{k}.csv"
-                        try:
-                            data_bytes = base64.b64decode(b64_val.encode("ascii"), validate=True)
-                        except Exception:
-                            data_bytes = b64_val.encode("utf-8", errors="replace")
-                        b64_entries.append({"filename": name_val, "data": data_bytes})
-                        k += 1
-                        continue
-                    break
-
                 # İlk adım: Joker seçimi ekranı (yalnız IOU için)
                 if metric_label == "IOU" and not confirm_iou and files:
                     idx = 0
-                    hidden_fields: List[str] = []
+                    uploaded: List[Tuple[str, bytes]] = []
                     file_rows: List[str] = []
                     for entry in files:
                         name = entry.get("filename") or f"uploaded_{idx}.csv"
                         raw_bytes = entry.get("data")
                         if isinstance(raw_bytes, str):
                             raw_bytes = raw_bytes.encode("utf-8", errors="replace")
-                        b64 = base64.b64encode(raw_bytes or b"").decode("ascii")
-                        hidden_fields.append(f"<input type='hidden' name='csv_b64_{idx}' value='{html.escape(b64)}'>")
-                        hidden_fields.append(f"<input type='hidden' name='csv_name_{idx}' value='{html.escape(name)}'>")
+                        uploaded.append((name, raw_bytes or b""))
                         file_rows.append(
                             f"<tr><td>{idx+1}</td><td>{html.escape(name)}</td>"
                             f"<td><label style='display:flex;gap:8px;align-items:center;'><input type='checkbox' name='joker_{idx}' /> Joker</label></td></tr>"
@@ -1353,51 +748,36 @@ class App120Handler(BaseHTTPRequestHandler):
                         "<input type='hidden' name='confirm_iou' value='1'>",
                     ]
                     
-                    # Önceki sonuçları da koru (eğer varsa)
-                    if previous_results_html:
-                        # previous_results_html zaten decode edilmiş durumda
-                        encoded = base64.b64encode(previous_results_html.encode("utf-8")).decode("ascii")
-                        preserved.append(f"<input type='hidden' name='previous_results_html' value='{html.escape(encoded)}'>")
-                    preserved.append(
-                        f"<input type='hidden' name='previous_pattern_payload' value='{html.escape(pattern_payload_raw)}'>"
-                    )
+                    # Dosyalar ve önceki sonuçlar oturumda kalır; form yalnız belirteci taşır
+                    joker_token = store_session(session.evolve(files=tuple(uploaded)))
+                    preserved.append(session_input(joker_token))
 
                     table = (
                         "<table><thead><tr><th>#</th><th>Dosya</th><th>Joker</th></tr></thead>"
                         f"<tbody>{''.join(file_rows)}</tbody></table>"
                     )
                     
-                    # Önceki sonuçları da göster (eğer varsa)
-                    previous_section = ""
-                    if previous_results_html:
-                        # previous_results_html zaten body_without_form'dan geliyor, formlar yok
-                        previous_section = (
-                            "<div style='margin-bottom:32px; padding-bottom:24px; border-bottom:2px solid #ddd;'>"
-                            "<h3 style='color:#888; margin-bottom:16px;'>Önceki Analizler</h3>"
-                            f"{previous_results_html}"
-                            "</div>"
-                        )
+                    # Önceki analizler gömülmez; oturumdan açan bağlantı yeterli
+                    previous_section = history_link(joker_token, previous_count)
                     
                     body = (
                         previous_section +
                         "<div class='card'>"
                         "<h3>Joker Seçimi</h3>"
                         "<div>Analize başlamadan önce 'Joker' dosyaları seç. Joker dosyalar XYZ kümesinde tüm offsetleri (-3..+3) içerir.</div>"
-                        f"<form method='post' action='/iou' enctype='multipart/form-data'>"
+                        # Analiz arka plan işi olarak başlar: dosya kartları bittikçe ilerleme sayfasına akar
+                        f"<form method='post' action='{url_for('/iou')}?job=1' enctype='multipart/form-data'>"
                         + table
-                        + "".join(hidden_fields + preserved)
-                        + "<div style='margin-top:12px;'><button type='submit'>Analizi Başlat</button></div>"
+                        + "".join(preserved)
+                        + "<div style='margin-top:12px;'><button type='submit'>Analizi Başlat</button> "
+                        + f"<button type='submit' formaction='{url_for('/iou')}'>Tek sayfada bekle</button></div>"
                         + "</form>"
                         + "</div>"
                     )
-                    self.send_response(200)
-                    self.send_header("Content-Type", "text/html; charset=utf-8")
-                    _add_security_headers(self)
-                    self.end_headers()
-                    self.wfile.write(page("app120 IOU - Joker Seçimi", body, active_tab="iou"))
+                    PAGE.send(self, "app120 IOU - Joker Seçimi", body, active_tab="iou", add_headers=_add_security_headers)
                     return
 
-                effective_entries = b64_entries if b64_entries and metric_label == "IOU" else files
+                effective_entries = session.file_entries() if confirm_iou and session.files else files
                 if not effective_entries:
                     raise ValueError("CSV dosyası bulunamadı")
                 joker_indices: Set[int] = set()
@@ -1420,7 +800,8 @@ class App120Handler(BaseHTTPRequestHandler):
                 summary_entries: List[Dict[str, Any]] = []
                 all_xyz_sets: List[Set[int]] = []
                 all_file_names: List[str] = []
-                for entry in effective_entries:
+                for idx_entry, entry in enumerate(effective_entries):
+                    report_progress("Dosyalar taranıyor", idx_entry, len(effective_entries))
                     candles = load_counter_candles(entry)
                     if metric_label == "IOU":
                         report = detector(candles, sequence, limit_val, tolerance=tolerance_val)
@@ -1468,17 +849,17 @@ class App120Handler(BaseHTTPRequestHandler):
                                     has_effective_news = False
                                     categories_present: Set[str] = set()
                                     for ev in news_hits:
-                                        title = ev.get("title", "")
+                                        title = ev.title
                                         title_html = html.escape(title)
-                                        is_all_day = bool(ev.get("all_day"))
+                                        is_all_day = ev.all_day
                                         if is_all_day:
                                             time_part = "All Day"
                                         else:
-                                            time_part = html.escape(ev.get("time") or "-")
+                                            time_part = html.escape(ev.time or "-")
                                         line = f"{time_part} {title_html}"
-                                        if ev.get("window") == "recent-null":
+                                        if ev.window == "recent-null":
                                             line += " (null)"
-                                        category = ev.get("category") or "normal"
+                                        category = ev.category or "normal"
                                         categories_present.add(category)
                                         if category == "holiday":
                                             line += " (holiday)"
@@ -1576,11 +957,14 @@ class App120Handler(BaseHTTPRequestHandler):
                             table = f"<p>{metric_label} mum bulunamadı.</p>"
 
                         sections.append(info + table)
+                    report_file(filename, total_hits, xyz_offsets if metric_label == "IOU" else (), "" if summary_mode else sections[-1])
+                file_cards = len(sections)
+                report_progress("Sonuçlar hazırlanıyor", len(effective_entries))
 
                 pattern_panel_html = ""
                 combined_panel_html = ""
                 if pattern_enabled:
-                    current_patterns = build_patterns_from_xyz_lists(
+                    current_patterns = PatternTrie.from_xyz_sets(
                         all_xyz_sets,
                         allow_zero_after_start=pattern_allow_zero_after_start,
                     )
@@ -1589,22 +973,23 @@ class App120Handler(BaseHTTPRequestHandler):
                         "joker_indices": sorted(joker_indices) if joker_indices else [],
                     }
                     pattern_panel_html = render_pattern_panel(
-                        all_xyz_sets,
-                        allow_zero_after_start=pattern_allow_zero_after_start,
+                        current_patterns,
                         file_names=all_file_names,
                         joker_indices=joker_indices,
                         sequence_name=sequence,
-                        precomputed_patterns=current_patterns,
                     )
                     updated_history = pattern_groups_history[:] if pattern_groups_history else []
                     updated_history.append(current_patterns)
                     updated_meta_history = pattern_meta_history[:] if pattern_meta_history else []
                     updated_meta_history.append(current_meta)
-                    combined_panel_html = render_combined_pattern_panel(
-                        updated_history,
-                        updated_meta_history,
+                    # Önceki grupların frontier'ı sunucuda tutulur; yalnız yeni grup eklenir
+                    chain = resume_chain(
+                        pattern_chain_token,
+                        pattern_groups_history,
                         allow_zero_after_start=pattern_allow_zero_after_start,
-                    )
+                    ).extend(current_patterns)
+                    pattern_chain_token = CHAIN_STORE.put(chain)
+                    combined_panel_html = render_combined_pattern_panel(chain, updated_meta_history)
                     pattern_groups_history = updated_history
                     pattern_meta_history = updated_meta_history
 
@@ -1633,6 +1018,9 @@ class App120Handler(BaseHTTPRequestHandler):
                         sections.append(combined_panel_html)
                     current_result = "\n".join(sections)
                 
+                # Dosya kartları olay akışıyla gitti; kalanlar (özet tablo, örüntü panelleri) eklenir
+                report_panel(current_result if summary_mode else "\n".join(sections[file_cards:]))
+
                 # Yeni analiz sonucunu bir bölüm içine al (yalnız IOU için)
                 if metric_label == "IOU":
                     from datetime import datetime
@@ -1644,43 +1032,38 @@ class App120Handler(BaseHTTPRequestHandler):
                         f"</div>"
                     )
                     
-                    # Önceki sonuçları ve yeni sonucu birleştir (ilk analiz üstte kalsın)
-                    if previous_results_html:
-                        body_without_form = previous_results_html + result_section
-                    else:
-                        body_without_form = result_section
-                    
-                    # Sonuçların altına tekrar IOU formunu ekle (önceki sonuçları da hidden field olarak taşı)
-                    # Önce body_without_form'u encode edip sakla (form eklenmeden önceki hali)
-                    body_encoded = base64.b64encode(body_without_form.encode("utf-8")).decode("ascii")
-                    pattern_payload_encoded = base64.b64encode(
-                        json.dumps(
-                            {
-                                "groups": pattern_groups_history,
-                                "allow_zero_after_start": pattern_allow_zero_after_start,
-                                "meta": pattern_meta_history,
-                            },
-                            separators=(",", ":"),
-                        ).encode("utf-8")
-                    ).decode("ascii")
+                    # Sonuçların altına tekrar IOU formunu ekle (önceki sonuçlar oturumda kalır)
+                    pattern_payload_encoded = encode_pattern_payload(
+                        pattern_groups_history,
+                        pattern_allow_zero_after_start,
+                        pattern_meta_history,
+                    )
                     
+                    next_token = store_session(session.evolve(
+                        files=(),
+                        results=session.results + (result_section,),
+                        pattern_payload=pattern_payload_encoded,
+                        chain_token=pattern_chain_token,
+                    ))
+                    next_session_field = session_input(next_token)
+                    # Önceki analizler yerine bağlantı: yanıt boyutu geçmişle büyümez
+                    body_without_form = history_link(next_token, previous_count) + result_section
                     form_html = render_iou_form()
                     # Form içindeki form tag'ini kaldırıp sadece içeriği al
-                    form_content = form_html.replace("<form method='post' action='/iou' enctype='multipart/form-data'>", "").replace("</form>", "").strip()
+                    form_content = form_html.replace(f"<form method='post' action='{url_for('/iou')}' enctype='multipart/form-data'>", "").replace("</form>", "").strip()
                     
                     form_section = (
                         "<hr style='margin:32px 0; border:none; border-top:2px solid #ddd;'>"
                         "<h2 style='margin-top:24px;'>Yeni Analiz</h2>"
                         "<div class='card'>"
-                        "<form method='post' action='/iou' enctype='multipart/form-data'>"
-                        f"<input type='hidden' name='previous_results_html' value='{body_encoded}'>"
-                        f"<input type='hidden' name='previous_pattern_payload' value='{html.escape(pattern_payload_encoded)}'>"
+                        f"<form method='post' action='{url_for('/iou')}' enctype='multipart/form-data'>"
+                        f"{next_session_field}"
                         + form_content +
                         "</form>"
                         "</div>"
                     )
                     
-                    # Final body: önceki sonuçlar + yeni sonuç + form
+                    # Final body: önceki analiz bağlantısı + yeni sonuç + form
                     body = body_without_form + form_section
                 else:
                     # IOV için normal davranış
@@ -1688,11 +1071,7 @@ class App120Handler(BaseHTTPRequestHandler):
                 
                 tab_key = "iov" if self.path == "/iov" else "iou"
                 title = f"app120 {metric_label}"
-                self.send_response(200)
-                self.send_header("Content-Type", "text/html; charset=utf-8")
-                _add_security_headers(self)
-                self.end_headers()
-                self.wfile.write(page(title, body, active_tab=tab_key))
+                PAGE.send(self, title, body, active_tab=tab_key, add_headers=_add_security_headers)
                 return
 
             if self.path == "/analyze":
@@ -1785,29 +1164,23 @@ class App120Handler(BaseHTTPRequestHandler):
                 header += "</tr>"
                 table = f"<table><thead>{header}</thead><tbody>{''.join(rows_html)}</tbody></table>"
                 body = "<div class='card'>" + "".join(info_lines) + "</div>" + table
-                self.send_response(200)
-                self.send_header("Content-Type", "text/html; charset=utf-8")
-                _add_security_headers(self)
-                self.end_headers()
-                self.wfile.write(page("app120 sonuçlar", body, active_tab="analyze"))
+                PAGE.send(self, "app120 sonuçlar", body, active_tab="analyze", add_headers=_add_security_headers)
                 return
 
             entry = files[0]
             candles = load_counter_candles(entry)
             dc_flags = compute_dc_flags(candles)
             if self.path == "/dc":
-                rows_html = []
-                count = 0
-                for i, c in enumerate(candles):
-                    if not dc_flags[i]:
-                        continue
-                    ts = c.ts.strftime("%Y-%m-%d %H:%M:%S")
-                    rows_html.append(
-                        f"<tr><td>{i}</td><td>{html.escape(ts)}</td><td>{c.open}</td><td>{c.high}</td><td>{c.low}</td><td>{c.close}</td></tr>"
-                    )
-                    count += 1
+                count = sum(1 for flag in dc_flags if flag)
+
+                def dc_rows() -> Iterator[str]:
+                    for i, c in enumerate(candles):
+                        if not dc_flags[i]:
+                            continue
+                        ts = c.ts.strftime("%Y-%m-%d %H:%M:%S")
+                        yield f"<tr><td>{i}</td><td>{html.escape(ts)}</td><td>{c.open}</td><td>{c.high}</td><td>{c.low}</td><td>{c.close}</td></tr>"
+
                 header = "<tr><th>Index</th><th>Timestamp</th><th>Open</th><th>High</th><th>Low</th><th>Close</th></tr>"
-                table = f"<table><thead>{header}</thead><tbody>{''.join(rows_html)}</tbody></table>"
                 info = (
                     f"<div class='card'>"
                     f"<div><strong>Data:</strong> {len(candles)} candles</div>"
@@ -1817,12 +1190,9 @@ class App120Handler(BaseHTTPRequestHandler):
                     f"<div><strong>DC count:</strong> {count}</div>"
                     f"</div>"
                 )
-                body = info + table
-                self.send_response(200)
-                self.send_header("Content-Type", "text/html; charset=utf-8")
-                _add_security_headers(self)
-                self.end_headers()
-                self.wfile.write(page("app120 DC List", body, active_tab="dc"))
+                head, foot = PAGE.parts("app120 DC List", active_tab="dc")
+                table_open = f"<table><thead>{header}</thead><tbody>"
+                send_stream(self, itertools.chain([head, info, table_open], dc_rows(), ["</tbody></table>", foot]), _add_security_headers)
                 return
 
             if self.path == "/matrix":
@@ -1904,37 +1274,63 @@ class App120Handler(BaseHTTPRequestHandler):
                 )
 
                 body = info + table
-                self.send_response(200)
-                self.send_header("Content-Type", "text/html; charset=utf-8")
-                _add_security_headers(self)
-                self.end_headers()
-                self.wfile.write(page("app120 Matrix", body, active_tab="matrix"))
+                PAGE.send(self, "app120 Matrix", body, active_tab="matrix", add_headers=_add_security_headers)
                 return
 
             raise ValueError("Bilinmeyen istek")
         except Exception as e:
             msg = html.escape(str(e) or "Bilinmeyen hata")
+            payload = page("Hata", f"<p>Hata: {msg}</p><p><a href='{url_for('/')}'>&larr; Geri</a></p>")
             self.send_response(400)
             self.send_header("Content-Type", "text/html; charset=utf-8")
             _add_security_headers(self)
+            self.send_header("Connection", "close")
+            self.send_header("Content-Length", str(len(payload)))
             self.end_headers()
-            self.wfile.write(page("Hata", f"<p>Hata: {msg}</p><p><a href='/'>&larr; Geri</a></p>"))
+            self.wfile.write(payload)
 
     def log_message(self, format, *args):
         pass
 
 
+wsgi_app = make_wsgi_app(App120Handler)
+
+
 def run(host: str, port: int) -> None:
-    httpd = HTTPServer((host, port), App120Handler)
+    httpd = make_server(host, port, App120Handler)
     print(f"app120 web: http://{host}:{port}/")
-    httpd.serve_forever()
+    serve(httpd)
 
 
 def main(argv=None) -> int:
     parser = argparse.ArgumentParser(prog="app120.web", description="app120 için birleşik web arayüzü")
     parser.add_argument("--host", default="127.0.0.1", help="Sunucu adresi (vars: 127.0.0.1)")
     parser.add_argument("--port", type=int, default=2120, help="Port (vars: 2120)")
+    parser.add_argument("--pattern-workers", type=int, default=0, help="Örüntü bölümleri için işçi süreç sayısı (vars: 0 = istek içinde)")
+    parser.add_argument("--pattern-budget", type=float, default=None, help="Örüntü üretimi için saniye sınırı; aşılırsa kısmi sonuç döner")
+    parser.add_argument("--pattern-max-lines", type=int, default=None, help="Her ilk değer için yazılacak en fazla örüntü satırı (vars: 0 = sınırsız)")
+    parser.add_argument("--pattern-memo-mb", type=float, default=None, help="Örüntü önbelleği için bellek bütçesi (MB, vars: 64; 0 = kapalı)")
+    parser.add_argument("--session-ttl", type=float, default=None, help="IOU oturumlarının geçerlilik süresi (saniye, vars: 21600)")
+    parser.add_argument("--session-dir", default=None, help="IOU oturumlarını diskte de sakla (dizin yolu)")
+    parser.add_argument("--job-workers", type=int, default=None, help="Arka plan işlerini çalıştıran iş parçacığı sayısı (vars: 2)")
+    parser.add_argument("--job-ttl", type=float, default=None, help="Biten arka plan işlerinin sonuçlarının saklanma süresi (saniye, vars: 3600)")
+    parser.add_argument("--job-dir", default=None, help="Arka plan işlerini diskte de sakla (dizin yolu)")
+    parser.add_argument("--max-inflight", type=int, default=None, help="Aynı anda çalışan en fazla IOU/matrix/converter hesabı (vars: 2)")
+    parser.add_argument("--max-upload-mb", type=float, default=None, help="Çalışan hesapların yüklemeleri için toplam bellek sınırı (MB, vars: 128)")
+    parser.add_argument("--admission-queue", type=int, default=None, help="Hesap için sırada bekleyen en fazla istek; aşılırsa 503 (vars: 8)")
+    parser.add_argument("--admission-wait", type=float, default=None, help="Sırada beklenen en uzun süre; aşılırsa 503 (saniye, vars: 10)")
+    parser.add_argument("--workers", type=int, default=None, help="İstek işleyen iş parçacığı sayısı (vars: 8)")
+    parser.add_argument("--queue-limit", type=int, default=None, help="İşlenen + bekleyen en fazla istek; aşılırsa 503 (vars: 32)")
+    parser.add_argument("--cpu-workers", type=int, default=None, help="POST isteklerini işleyen süreç sayısı (vars: 0 = iş parçacığında)")
     args = parser.parse_args(argv)
+    configure_search(args.pattern_workers, args.pattern_budget, args.pattern_max_lines)
+    if args.pattern_memo_mb is not None:
+        configure_memo(max_bytes=int(args.pattern_memo_mb * 1024 * 1024))
+    configure_sessions(args.session_ttl, args.session_dir)
+    configure_jobs(args.job_workers, args.job_ttl, args.job_dir)
+    max_upload_bytes = int(args.max_upload_mb * 1024 * 1024) if args.max_upload_mb is not None else None
+    configure_admission(args.max_inflight, max_upload_bytes, args.admission_queue, args.admission_wait)
+    configure_server(args.workers, args.queue_limit, args.cpu_workers)
     run(args.host, args.port)
     return 0
 
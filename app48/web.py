@@ -1,11 +1,14 @@
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import BaseHTTPRequestHandler
 import argparse
 import html
 import io
-import base64
-from typing import List, Optional, Dict, Any, Set, Tuple
+from typing import List, Optional, Dict, Any, Set, Tuple, Iterator
+import itertools
 
-from favicon import render_head_links, try_load_asset
+from admission import admission_control, configure_admission, serve_metrics
+from favicon import render_head_links, try_load_static
+from http_cache import CACHE_PAGE, asset_cache_control, cached_page, send_cached, send_file
+from page_template import BODY_SLOT, TITLE_SLOT, PageTemplate
 
 from .main import (
     Candle,
@@ -24,12 +27,21 @@ from .main import (
     detect_iou_candles,
 )
 import csv
-from email.parser import BytesParser
-from email.policy import default as email_default
-from zipfile import ZipFile, ZIP_DEFLATED
 from typing import Tuple
 
+from iou_session import configure_sessions, history_link, load_session, serve_history, session_input, store_session
+from jobs import configure_jobs, report_file, report_panel, report_progress, serve_job, submit_job
 from news_loader import find_news_for_timestamp
+from patterns import (
+    PATTERN_MEMO,
+    build_patterns_from_xyz_lists,
+    configure_memo,
+    continuation_options_for_sequence,
+    fmt_off,
+)
+from serving import configure_server, make_server, make_wsgi_app, serve, url_for
+from streaming import send_chunks, send_stream
+from zipstream import zip_stream
 
 MINUTES_PER_STEP = 48
 IOU_TOLERANCE = 0.005
@@ -39,171 +51,6 @@ IOU_TOLERANCE = 0.005
 PATTERN_MAX_PATHS = 1000
 PATTERN_BEAM_WIDTH = 512
 
-def _fmt_off(v: int) -> str:
-    return f"+{v}" if v > 0 else str(v)
-
-def _sign(v: int) -> int:
-    if v > 0:
-        return 1
-    if v < 0:
-        return -1
-    return 0
-
-def _allowed_values_for_state(state: Dict[str, Any], choices: Set[int], allow_zero_after_start: bool) -> List[int]:
-    prev = state.get("prev")
-    mode = state.get("mode")  # 'free', 'after_zero', 'triple', 'need_zero'
-    sign = state.get("sign")
-    direction = state.get("dir")  # 'asc' | 'desc' | None
-    pos = state.get("pos")  # 1|2|3|None
-    allow_zero_next = bool(state.get("allow_zero_next"))
-
-    allowed: Set[int] = set()
-    if mode == "free":
-        allowed = set(choices)
-    elif mode == "after_zero":
-        for k in (1, 3):
-            for s in (-1, 1):
-                v = s * k
-                if v in choices:
-                    allowed.add(v)
-    elif mode == "triple":
-        if pos == 2 and direction is None:
-            # ±2 ile başlandıysa sonraki değer 1 veya 3 (aynı işaret)
-            for k in (1, 3):
-                v = sign * k
-                if v in choices:
-                    allowed.add(v)
-        else:
-            if direction == "asc":
-                nxt = 2 if pos == 1 else (3 if pos == 2 else None)
-            else:  # desc
-                nxt = 2 if pos == 3 else (1 if pos == 2 else None)
-            if nxt is not None:
-                v = sign * nxt
-                if v in choices:
-                    allowed.add(v)
-    elif mode == "need_zero":
-        if 0 in choices:
-            allowed = {0}
-
-    # Özel kural: ilk adım ±1/±3 ise bir sonraki adımda 0 opsiyonunu da aç
-    if allow_zero_after_start and allow_zero_next and 0 in choices:
-        allowed.add(0)
-
-    # Ard arda aynı değer yasak
-    if prev is not None and prev in allowed:
-        allowed.discard(prev)
-
-    order = { -3:0, -2:1, -1:2, 0:3, 1:4, 2:5, 3:6 }
-    return sorted(list(allowed), key=lambda v: order.get(v, 99))
-
-
-def _advance_state(state: Dict[str, Any], value: int, step_idx: int, allow_zero_after_start: bool) -> Dict[str, Any]:
-    # Kopya oluştur
-    ns = {
-        "mode": state.get("mode"),
-        "sign": state.get("sign"),
-        "dir": state.get("dir"),
-        "pos": state.get("pos"),
-        "allow_zero_next": False,  # varsayılan reset
-        "prev": value,
-        "seq": list(state.get("seq") or []) + [value],
-    }
-
-    mode = state.get("mode")
-    sign = state.get("sign")
-    direction = state.get("dir")
-    pos = state.get("pos")
-
-    if mode == "free":
-        if value == 0:
-            ns.update({"mode": "after_zero", "sign": None, "dir": None, "pos": None})
-        else:
-            s = _sign(value)
-            a = abs(value)
-            if a == 2:
-                ns.update({"mode": "triple", "sign": s, "dir": None, "pos": 2})
-            elif a == 1:
-                ns.update({"mode": "triple", "sign": s, "dir": "asc", "pos": 1})
-            elif a == 3:
-                ns.update({"mode": "triple", "sign": s, "dir": "desc", "pos": 3})
-            # Özel kural (sadece global ilk adım için): sonraki adıma 0 izni
-            if allow_zero_after_start and a in (1, 3) and step_idx == 0:
-                ns["allow_zero_next"] = True
-    elif mode == "after_zero":
-        # Sadece ±1/±3 ile yeni üçlü başlar
-        s = _sign(value)
-        a = abs(value)
-        if a == 1:
-            ns.update({"mode": "triple", "sign": s, "dir": "asc", "pos": 1})
-        elif a == 3:
-            ns.update({"mode": "triple", "sign": s, "dir": "desc", "pos": 3})
-    elif mode == "triple":
-        if value == 0 and state.get("allow_zero_next"):
-            # İlk adım ±1/±3 sonrası 0 istisnası
-            ns.update({"mode": "after_zero", "sign": None, "dir": None, "pos": None})
-        else:
-            s = sign
-            a = abs(value)
-            if pos == 2 and direction is None:
-                # 2'den 1 veya 3'e geçiş tamamlanınca 0 beklenir
-                if a == 1:
-                    ns.update({"mode": "need_zero", "sign": s, "dir": "desc", "pos": 1})
-                elif a == 3:
-                    ns.update({"mode": "need_zero", "sign": s, "dir": "asc", "pos": 3})
-            else:
-                if direction == "asc":
-                    if pos == 1 and a == 2:
-                        ns.update({"mode": "triple", "sign": s, "dir": "asc", "pos": 2})
-                    elif pos == 2 and a == 3:
-                        ns.update({"mode": "need_zero", "sign": s, "dir": "asc", "pos": 3})
-                else:  # desc
-                    if pos == 3 and a == 2:
-                        ns.update({"mode": "triple", "sign": s, "dir": "desc", "pos": 2})
-                    elif pos == 2 and a == 1:
-                        ns.update({"mode": "need_zero", "sign": s, "dir": "desc", "pos": 1})
-    elif mode == "need_zero":
-        if value == 0:
-            ns.update({"mode": "after_zero", "sign": None, "dir": None, "pos": None})
-
-    return ns
-
-
-def build_patterns_from_xyz_lists(xyz_sets: List[Set[int]], allow_zero_after_start: bool, max_paths: int = PATTERN_MAX_PATHS, beam_width: int = PATTERN_BEAM_WIDTH) -> List[List[int]]:
-    if not xyz_sets:
-        return []
-    # Başlangıç durumu
-    states: List[Dict[str, Any]] = [{
-        "mode": "free",
-        "sign": None,
-        "dir": None,
-        "pos": None,
-        "allow_zero_next": False,
-        "prev": None,
-        "seq": [],
-    }]
-
-    for idx, choices in enumerate(xyz_sets):
-        next_states: List[Dict[str, Any]] = []
-        for st in states:
-            allowed = _allowed_values_for_state(st, choices, allow_zero_after_start)
-            if not allowed:
-                continue
-            for v in allowed:
-                ns = _advance_state(st, v, idx, allow_zero_after_start)
-                next_states.append(ns)
-                if len(next_states) >= beam_width:
-                    # Basit beam budaması
-                    break
-            if len(next_states) >= beam_width:
-                break
-        states = next_states
-        if not states:
-            break
-
-    results: List[List[int]] = [st["seq"] for st in states if len(st.get("seq", [])) == len(xyz_sets)]
-    return results[:max_paths]
-
 
 def render_pattern_panel(
     xyz_sets: List[Set[int]],
@@ -212,24 +59,35 @@ def render_pattern_panel(
     joker_indices: Optional[Set[int]] = None,
     sequence_name: Optional[str] = None,
 ) -> str:
-    patterns = build_patterns_from_xyz_lists(xyz_sets, allow_zero_after_start=allow_zero_after_start)
+    key = (
+        __name__,
+        tuple(tuple(sorted(choices)) for choices in xyz_sets),
+        allow_zero_after_start,
+        tuple(file_names) if file_names else None,
+        frozenset(joker_indices) if joker_indices else None,
+        sequence_name,
+    )
+    return PATTERN_MEMO.get_or_build(
+        key,
+        lambda: _render_pattern_panel(xyz_sets, allow_zero_after_start, file_names, joker_indices, sequence_name),
+    )
+
+
+def _render_pattern_panel(
+    xyz_sets: List[Set[int]],
+    allow_zero_after_start: bool,
+    file_names: Optional[List[str]],
+    joker_indices: Optional[Set[int]],
+    sequence_name: Optional[str],
+) -> str:
+    patterns = build_patterns_from_xyz_lists(
+        xyz_sets,
+        allow_zero_after_start=allow_zero_after_start,
+        max_paths=PATTERN_MAX_PATHS,
+        beam_width=PATTERN_BEAM_WIDTH,
+    )
     if not patterns:
         return "<div class='card'><h3>Örüntüleme</h3><div>Örüntü bulunamadı.</div></div>"
-    def _build_state_for_seq(seq: List[int]) -> Dict[str, Any]:
-        st: Dict[str, Any] = {
-            "mode": "free",
-            "sign": None,
-            "dir": None,
-            "pos": None,
-            "allow_zero_next": False,
-            "prev": None,
-            "seq": [],
-        }
-        for i, v in enumerate(seq):
-            st = _advance_state(st, v, i, allow_zero_after_start)
-        return st
-
-    domain = {-3, -2, -1, 0, 1, 2, 3}
     # 1) Üçlü kümeleri (0'sız) ve dosya uyumunu baz alarak blok rengi ata (başlangıç index'i -> renk)
     triple_starts: Dict[Tuple[int, int], str] = {}
     if file_names and len(file_names) >= 3:
@@ -275,14 +133,14 @@ def render_pattern_panel(
             if joker_indices and i in joker_indices:
                 tip = (tip + " (Joker)").strip()
             v = seq[i]
-            token = html.escape(_fmt_off(v))
+            token = html.escape(fmt_off(v))
             if tip:
                 def token_html(idx:int) -> str:
                     nm = file_names[idx] if file_names and 0 <= idx < len(file_names) else ""
                     tp = nm or ""
                     if joker_indices and idx in joker_indices:
                         tp = (tp + " (Joker)").strip()
-                    tk = html.escape(_fmt_off(seq[idx]))
+                    tk = html.escape(fmt_off(seq[idx]))
                     if tp:
                         return (
                             f"<span class='pat-token' title='{html.escape(tp)}' data-tip='{html.escape(tp)}'>{tk}</span>"
@@ -290,7 +148,7 @@ def render_pattern_panel(
                     return f"<span class='pat-token'>{tk}</span>"
             else:
                 def token_html(idx:int) -> str:
-                    tk = html.escape(_fmt_off(seq[idx]))
+                    tk = html.escape(fmt_off(seq[idx]))
                     return f"<span class='pat-token'>{tk}</span>"
 
             # Eğer bu pozisyon üçlü başlangıcı ise, üç tokenı ve iki virgülü tek blokta boya
@@ -312,9 +170,8 @@ def render_pattern_panel(
             if i < len(seq):
                 parts.append(", ")
         label = ", ".join(parts)
-        st = _build_state_for_seq(seq)
-        opts = _allowed_values_for_state(st, domain, allow_zero_after_start)
-        cont = ", ".join(_fmt_off(v) for v in opts) if opts else "-"
+        opts = continuation_options_for_sequence(seq, allow_zero_after_start)
+        cont = ", ".join(fmt_off(v) for v in opts) if opts else "-"
         lines.append(f"<div class='pat-line'>{label} (devam: {html.escape(cont)})</div>")
     # Son değerlerin özeti (benzersiz, sıralı)
     last_vals = [seq[-1] for seq in patterns if seq]
@@ -326,7 +183,7 @@ def render_pattern_panel(
             seen.add(v)
             unique_last_sorted.append(v)
     last_line = "<div><strong>Son değerler:</strong> " + (
-        ", ".join(_fmt_off(v) for v in unique_last_sorted) if unique_last_sorted else "-"
+        ", ".join(fmt_off(v) for v in unique_last_sorted) if unique_last_sorted else "-"
     ) + "</div>"
     info = f"<div><strong>Toplam örüntü:</strong> {len(patterns)} (ilk {min(len(patterns), PATTERN_MAX_PATHS)})</div>"
     seq_info = f"<div><strong>Sequence:</strong> {html.escape(sequence_name)}</div>" if sequence_name else ""
@@ -421,7 +278,7 @@ def format_pip(delta: Optional[float]) -> str:
     return f"{delta:+.5f}"
 
 
-def page(title: str, body: str, active_tab: str = "analyze") -> bytes:
+def _page_shell(active_tab: str) -> str:
     head_links = render_head_links("    ")
     html_doc = f"""<!doctype html>
 <html>
@@ -429,7 +286,7 @@ def page(title: str, body: str, active_tab: str = "analyze") -> bytes:
     <meta charset='utf-8'>
     <meta name='viewport' content='width=device-width, initial-scale=1'/>
     {head_links}
-    <title>{html.escape(title)}</title>
+    <title>{TITLE_SLOT}</title>
     <style>
       body{{font-family: system-ui, -apple-system, Segoe UI, Roboto, sans-serif; margin:20px;}}
       header{{margin-bottom:16px;}}
@@ -469,22 +326,29 @@ def page(title: str, body: str, active_tab: str = "analyze") -> bytes:
       <h2>app48</h2>
     </header>
     <nav class='tabs'>
-      <a href='/' class='{ 'active' if active_tab=="analyze" else '' }'>Analiz</a>
-      <a href='/convert' class='{ 'active' if active_tab=="convert" else '' }'>12-48</a>
-      <a href='/dc' class='{ 'active' if active_tab=="dc" else '' }'>DC List</a>
-      <a href='/matrix' class='{ 'active' if active_tab=="matrix" else '' }'>Matrix</a>
-      <a href='/iou' class='{ 'active' if active_tab=="iou" else '' }'>IOU Tarama</a>
+      <a href='{url_for('/')}' class='{ 'active' if active_tab=="analyze" else '' }'>Analiz</a>
+      <a href='{url_for('/convert')}' class='{ 'active' if active_tab=="convert" else '' }'>12-48</a>
+      <a href='{url_for('/dc')}' class='{ 'active' if active_tab=="dc" else '' }'>DC List</a>
+      <a href='{url_for('/matrix')}' class='{ 'active' if active_tab=="matrix" else '' }'>Matrix</a>
+      <a href='{url_for('/iou')}' class='{ 'active' if active_tab=="iou" else '' }'>IOU Tarama</a>
     </nav>
-    {body}
+    {BODY_SLOT}
   </body>
 </html>"""
-    return html_doc.encode("utf-8")
+    return html_doc
+
+
+PAGE = PageTemplate(_page_shell)
+
+
+def page(title: str, body: str, active_tab: str = "analyze") -> bytes:
+    return PAGE.render(title, body, active_tab)
 
 
 def render_index() -> bytes:
-    body = """
+    body = f"""
     <div class='card'>
-      <form method='post' action='/analyze' enctype='multipart/form-data'>
+      <form method='post' action='{url_for('/analyze')}' enctype='multipart/form-data'>
         <div class='row'>
           <div>
             <label>CSV</label>
@@ -536,9 +400,9 @@ def render_index() -> bytes:
 
 
 def render_convert_index() -> bytes:
-    body = """
+    body = f"""
     <div class='card'>
-      <form method='post' action='/convert' enctype='multipart/form-data'>
+      <form method='post' action='{url_for('/convert')}' enctype='multipart/form-data'>
         <div class='row'>
           <div>
             <label>CSV (12m, UTC-5)</label>
@@ -547,6 +411,7 @@ def render_convert_index() -> bytes:
         </div>
         <div style='margin-top:12px;'>
           <button type='submit'>48m'e Dönüştür</button>
+          <button type='submit' formaction='{url_for('/convert')}?job=1'>Arka planda dönüştür</button>
         </div>
       </form>
     </div>
@@ -557,9 +422,9 @@ def render_convert_index() -> bytes:
 
 
 def render_dc_index() -> bytes:
-    body = """
+    body = f"""
     <div class='card'>
-      <form method='post' action='/dc' enctype='multipart/form-data'>
+      <form method='post' action='{url_for('/dc')}' enctype='multipart/form-data'>
         <div class='row'>
           <div>
             <label>CSV</label>
@@ -595,9 +460,9 @@ def render_dc_index() -> bytes:
 
 
 def render_matrix_index() -> bytes:
-    body = """
+    body = f"""
     <div class='card'>
-      <form method='post' action='/matrix' enctype='multipart/form-data'>
+      <form method='post' action='{url_for('/matrix')}' enctype='multipart/form-data'>
         <div class='row'>
           <div>
             <label>CSV</label>
@@ -634,9 +499,9 @@ def render_matrix_index() -> bytes:
 
 def render_iou_form() -> str:
     """IOU formunu HTML string olarak döndürür (sonuç sayfasında kullanım için)"""
-    return """
+    return f"""
     <div class='card'>
-      <form method='post' action='/iou' enctype='multipart/form-data'>
+      <form method='post' action='{url_for('/iou')}' enctype='multipart/form-data'>
         <div class='row'>
           <div>
             <label>CSV</label>
@@ -700,6 +565,7 @@ def render_iou_index() -> bytes:
 class AppHandler(BaseHTTPRequestHandler):
     server_version = "Candles48/1.0"
     sys_version = ""
+    protocol_version = "HTTP/1.1"
     def _parse_multipart(self) -> Dict[str, Any]:
         ct = self.headers.get("Content-Type", "")
         try:
@@ -710,6 +576,9 @@ class AppHandler(BaseHTTPRequestHandler):
         if not ct.lower().startswith("multipart/form-data"):
             raise ValueError("Yalnızca multipart/form-data desteklenir")
         header_bytes = b"Content-Type: " + ct.encode("utf-8") + b"\r\nMIME-Version: 1.0\r\n\r\n"
+        from email.parser import BytesParser
+        from email.policy import default as email_default
+
         msg = BytesParser(policy=email_default).parsebytes(header_bytes + body)
         fields: Dict[str, Any] = {}
         for part in msg.iter_parts():
@@ -744,34 +613,33 @@ class AppHandler(BaseHTTPRequestHandler):
         return fields
 
     def do_GET(self):
-        asset = try_load_asset(self.path)
+        asset = try_load_static(self.path)
         if asset:
-            payload, content_type = asset
-            self.send_response(200)
-            self.send_header("Content-Type", content_type)
-            _add_security_headers(self)
-            self.send_header("Content-Length", str(len(payload)))
-            self.end_headers()
-            self.wfile.write(payload)
+            send_file(self, asset, asset_cache_control(self.path), _add_security_headers)
+            return
+        if serve_job(self, AppHandler, _add_security_headers):
+            return
+        if serve_metrics(self, _add_security_headers):
+            return
+        if serve_history(self, "app48", PAGE, "app48 IOU - Önceki Analizler", _add_security_headers):
             return
         if self.path.startswith("/dc"):
-            body = render_dc_index()
+            render = render_dc_index
         elif self.path.startswith("/convert"):
-            body = render_convert_index()
+            render = render_convert_index
         elif self.path.startswith("/matrix"):
-            body = render_matrix_index()
+            render = render_matrix_index
         elif self.path.startswith("/iou"):
-            body = render_iou_index()
+            render = render_iou_index
         else:
-            body = render_index()
-        self.send_response(200)
-        self.send_header("Content-Type", "text/html; charset=utf-8")
-        _add_security_headers(self)
-        self.end_headers()
-        self.wfile.write(body)
+            render = render_index
+        send_cached(self, cached_page(render), CACHE_PAGE, _add_security_headers)
+
+    do_HEAD = do_GET
 
+    @admission_control("app48", ("/convert", "/iou", "/matrix"), _add_security_headers)
     def do_POST(self):
-        if self.path not in ("/analyze", "/dc", "/matrix", "/convert", "/iou"):
+        if self.path.partition("?")[0] not in ("/analyze", "/dc", "/matrix", "/convert", "/iou"):
             self.send_error(404)
             return
         try:
@@ -781,10 +649,15 @@ class AppHandler(BaseHTTPRequestHandler):
             except Exception:
                 length_hdr = 0
             if length_hdr > MAX_UPLOAD_BYTES:
+                payload = b"Upload too large (max 50 MB)."
                 self.send_response(413)
                 self.send_header("Content-Type", "text/plain; charset=utf-8")
+                self.send_header("Connection", "close")
+                self.send_header("Content-Length", str(len(payload)))
                 self.end_headers()
-                self.wfile.write(b"Upload too large (max 50 MB).")
+                self.wfile.write(payload)
+                return
+            if submit_job(self, AppHandler, _add_security_headers):
                 return
             form = self._parse_multipart()
 
@@ -797,11 +670,14 @@ class AppHandler(BaseHTTPRequestHandler):
 
             files_list = file_item.get("files") or [{"filename": file_item.get("filename"), "data": file_item.get("data")}]  # type: ignore[arg-type]
             if len(files_list) > MAX_FILES:
+                payload = b"Too many files (max 50)."
                 self.send_response(413)
                 self.send_header("Content-Type", "text/plain; charset=utf-8")
                 _add_security_headers(self)
+                self.send_header("Connection", "close")
+                self.send_header("Content-Length", str(len(payload)))
                 self.end_headers()
-                self.wfile.write(b"Too many files (max 50).")
+                self.wfile.write(payload)
                 return
 
             sequence = (form.get("sequence", {}).get("value") or "S1").strip()
@@ -816,53 +692,57 @@ class AppHandler(BaseHTTPRequestHandler):
                 raise ValueError("Veri boş veya çözümlenemedi")
 
             if self.path == "/convert":
-                outputs: List[Tuple[str, bytes]] = []
                 used_names: set[str] = set()
 
-                for entry in files_list:
-                    entry_data = entry.get("data")
-                    if isinstance(entry_data, (bytes, bytearray)):
-                        text_entry = entry_data.decode("utf-8", errors="replace")
-                    else:
-                        text_entry = str(entry_data)
-                    try:
-                        candles_entry = load_candles_from_text(text_entry)
-                    except ValueError as exc:
-                        name = entry.get("filename") or "dosya"
-                        raise ValueError(f"{name}: {exc}")
-                    if not candles_entry:
-                        name = entry.get("filename") or "dosya"
-                        raise ValueError(f"{name}: Veri boş veya çözümlenemedi")
-                    tf_est = estimate_timeframe_minutes(candles_entry)
-                    if tf_est is None or abs(tf_est - 12) > 0.6:
-                        name = entry.get("filename") or "dosya"
-                        raise ValueError(f"{name}: Girdi 12 dakikalık akış gibi görünmüyor")
-                    shifted, _ = adjust_to_output_tz(candles_entry, "UTC-5")
-                    converted = convert_12m_to_48m(shifted)
-
-                    buffer = io.StringIO()
-                    writer = csv.writer(buffer)
-                    writer.writerow(["Time", "Open", "High", "Low", "Close"])
-                    for c in converted:
-                        writer.writerow([
-                            c.ts.strftime("%Y-%m-%d %H:%M:%S"),
-                            format_price(c.open),
-                            format_price(c.high),
-                            format_price(c.low),
-                            format_price(c.close),
-                        ])
-                    data_bytes = buffer.getvalue().encode("utf-8")
-                    download_name = _sanitize_csv_filename(entry.get("filename") or "converted", "_48m.csv")
-                    counter = 1
-                    while download_name in used_names:
-                        stem, ext = (download_name.rsplit(".", 1) + [""])[:2]
-                        download_name = (stem[:100] or "converted") + f"_{counter}." + (ext or "csv")
-                        counter += 1
-                    used_names.add(download_name)
-                    outputs.append((download_name, data_bytes))
-
-                if len(outputs) == 1:
-                    download_name, data_bytes = outputs[0]
+                def converted_files() -> Iterator[Tuple[str, bytes]]:
+                    for idx_file, entry in enumerate(files_list):
+                        report_progress("Dönüştürülüyor", idx_file, len(files_list))
+                        entry_data = entry.get("data")
+                        if isinstance(entry_data, (bytes, bytearray)):
+                            text_entry = entry_data.decode("utf-8", errors="replace")
+                        else:
+                            text_entry = str(entry_data)
+                        try:
+                            candles_entry = load_candles_from_text(text_entry)
+                        except ValueError as exc:
+                            name = entry.get("filename") or "dosya"
+                            raise ValueError(f"{name}: {exc}")
+                        if not candles_entry:
+                            name = entry.get("filename") or "dosya"
+                            raise ValueError(f"{name}: Veri boş veya çözümlenemedi")
+                        tf_est = estimate_timeframe_minutes(candles_entry)
+                        if tf_est is None or abs(tf_est - 12) > 0.6:
+                            name = entry.get("filename") or "dosya"
+                            raise ValueError(f"{name}: Girdi 12 dakikalık akış gibi görünmüyor")
+                        shifted, _ = adjust_to_output_tz(candles_entry, "UTC-5")
+                        converted = convert_12m_to_48m(shifted)
+
+                        buffer = io.StringIO()
+                        writer = csv.writer(buffer)
+                        writer.writerow(["Time", "Open", "High", "Low", "Close"])
+                        for c in converted:
+                            writer.writerow([
+                                c.ts.strftime("%Y-%m-%d %H:%M:%S"),
+                                format_price(c.open),
+                                format_price(c.high),
+                                format_price(c.low),
+                                format_price(c.close),
+                            ])
+                        data_bytes = buffer.getvalue().encode("utf-8")
+                        download_name = _sanitize_csv_filename(entry.get("filename") or "converted", "_48m.csv")
+                        counter = 1
+                        while download_name in used_names:
+                            stem, ext = (download_name.rsplit(".", 1) + [""])[:2]
+                            download_name = (stem[:100] or "converted") + f"_{counter}." + (ext or "csv")
+                            counter += 1
+                        used_names.add(download_name)
+                        yield download_name, data_bytes
+
+                outputs = converted_files()
+                # İlk dosyanın hataları her zamanki gibi hata sayfasıyla döner
+                first = next(outputs)
+                if len(files_list) == 1:
+                    download_name, data_bytes = first
                     self.send_response(200)
                     self.send_header("Content-Type", "text/csv; charset=utf-8")
                     self.send_header("Content-Disposition", f'attachment; filename="{download_name}"')
@@ -872,20 +752,9 @@ class AppHandler(BaseHTTPRequestHandler):
                     self.wfile.write(data_bytes)
                     return
 
-                bundle = io.BytesIO()
-                with ZipFile(bundle, "w", ZIP_DEFLATED) as zf:
-                    for name, payload in outputs:
-                        zf.writestr(name, payload)
-                zip_bytes = bundle.getvalue()
                 bundle_name = "converted_48m_bundle.zip"
-
-                self.send_response(200)
-                self.send_header("Content-Type", "application/zip")
-                self.send_header("Content-Disposition", f'attachment; filename="{bundle_name}"')
-                self.send_header("Content-Length", str(len(zip_bytes)))
-                _add_security_headers(self)
-                self.end_headers()
-                self.wfile.write(zip_bytes)
+                headers = [("Content-Type", "application/zip"), ("Content-Disposition", f'attachment; filename="{bundle_name}"')]
+                send_chunks(self, zip_stream(itertools.chain([first], outputs)), headers, _add_security_headers)
                 return
 
             if self.path == "/iou":
@@ -896,13 +765,9 @@ class AppHandler(BaseHTTPRequestHandler):
                 pattern_enabled = "pattern_mode" in form
                 confirm_iou = "confirm_iou" in form
                 
-                # Önceki sonuçları al (eğer varsa)
-                previous_results_html = form.get("previous_results_html", {}).get("value", "")
-                if previous_results_html:
-                    try:
-                        previous_results_html = base64.b64decode(previous_results_html.encode("ascii")).decode("utf-8")
-                    except Exception:
-                        previous_results_html = ""
+                # Önceki sonuçlar ve yüklenen dosyalar sunucudaki oturumda
+                session = load_session(form, "app48")
+                previous_count = len(session.results)
                 
                 try:
                     limit_val = float(limit_raw)
@@ -919,37 +784,17 @@ class AppHandler(BaseHTTPRequestHandler):
                 sequence = (form.get("sequence", {}).get("value") or "S1").strip() or "S1"
                 tz_value = tz_s or "UTC-5"
 
-                # Alternatif (2. adım) dosya içeriği: csv_b64_{i} + csv_name_{i}
-                b64_entries: List[Dict[str, Any]] = []
-                k = 0
-                while True:
-                    kb = f"csv_b64_{k}"
-                    kn = f"csv_name_{k}"
-                    if kb in form and kn in form:
-                        b64_val = form[kb].get("value") or ""
-                        name_val = form[kn].get("value") or f"uploaded_{k}.csv"
-                        try:
-                            data_bytes = base64.b64decode(b64_val.encode("ascii"), validate=True)
-                        except Exception:
-                            data_bytes = b64_val.encode("utf-8", errors="replace")
-                        b64_entries.append({"filename": name_val, "data": data_bytes})
-                        k += 1
-                        continue
-                    break
-
                 # İlk adım: Joker seçimi ekranı
                 if not confirm_iou and files_list:
                     idx = 0
-                    hidden_fields: List[str] = []
+                    uploaded: List[Tuple[str, bytes]] = []
                     file_rows: List[str] = []
                     for entry in files_list:
                         name = entry.get("filename") or f"uploaded_{idx}.csv"
                         raw_bytes = entry.get("data")
                         if isinstance(raw_bytes, str):
                             raw_bytes = raw_bytes.encode("utf-8", errors="replace")
-                        b64 = base64.b64encode(raw_bytes or b"").decode("ascii")
-                        hidden_fields.append(f"<input type='hidden' name='csv_b64_{idx}' value='{html.escape(b64)}'>")
-                        hidden_fields.append(f"<input type='hidden' name='csv_name_{idx}' value='{html.escape(name)}'>")
+                        uploaded.append((name, raw_bytes or b""))
                         file_rows.append(
                             f"<tr><td>{idx+1}</td><td>{html.escape(name)}</td>"
                             f"<td><label style='display:flex;gap:8px;align-items:center;'><input type='checkbox' name='joker_{idx}' /> Joker</label></td></tr>"
@@ -970,48 +815,36 @@ class AppHandler(BaseHTTPRequestHandler):
                         "<input type='hidden' name='confirm_iou' value='1'>",
                     ]
                     
-                    # Önceki sonuçları da koru (eğer varsa)
-                    if previous_results_html:
-                        # previous_results_html zaten decode edilmiş durumda
-                        encoded = base64.b64encode(previous_results_html.encode("utf-8")).decode("ascii")
-                        preserved.append(f"<input type='hidden' name='previous_results_html' value='{html.escape(encoded)}'>")
+                    # Dosyalar ve önceki sonuçlar oturumda kalır; form yalnız belirteci taşır
+                    joker_token = store_session(session.evolve(files=tuple(uploaded)))
+                    preserved.append(session_input(joker_token))
 
                     table = (
                         "<table><thead><tr><th>#</th><th>Dosya</th><th>Joker</th></tr></thead>"
                         f"<tbody>{''.join(file_rows)}</tbody></table>"
                     )
                     
-                    # Önceki sonuçları da göster (eğer varsa)
-                    previous_section = ""
-                    if previous_results_html:
-                        # previous_results_html zaten body_without_form'dan geliyor, formlar yok
-                        previous_section = (
-                            "<div style='margin-bottom:32px; padding-bottom:24px; border-bottom:2px solid #ddd;'>"
-                            "<h3 style='color:#888; margin-bottom:16px;'>Önceki Analizler</h3>"
-                            f"{previous_results_html}"
-                            "</div>"
-                        )
+                    # Önceki analizler gömülmez; oturumdan açan bağlantı yeterli
+                    previous_section = history_link(joker_token, previous_count)
                     
                     body = (
                         previous_section +
                         "<div class='card'>"
                         "<h3>Joker Seçimi</h3>"
                         "<div>Analize başlamadan önce 'Joker' dosyaları seç. Joker dosyalar XYZ kümesinde tüm offsetleri (-3..+3) içerir.</div>"
-                        f"<form method='post' action='/iou' enctype='multipart/form-data'>"
+                        # Analiz arka plan işi olarak başlar: dosya kartları bittikçe ilerleme sayfasına akar
+                        f"<form method='post' action='{url_for('/iou')}?job=1' enctype='multipart/form-data'>"
                         + table
-                        + "".join(hidden_fields + preserved)
-                        + "<div style='margin-top:12px;'><button type='submit'>Analizi Başlat</button></div>"
+                        + "".join(preserved)
+                        + "<div style='margin-top:12px;'><button type='submit'>Analizi Başlat</button> "
+                        + f"<button type='submit' formaction='{url_for('/iou')}'>Tek sayfada bekle</button></div>"
                         + "</form>"
                         + "</div>"
                     )
-                    self.send_response(200)
-                    self.send_header("Content-Type", "text/html; charset=utf-8")
-                    _add_security_headers(self)
-                    self.end_headers()
-                    self.wfile.write(page("app48 IOU - Joker Seçimi", body, active_tab="iou"))
+                    PAGE.send(self, "app48 IOU - Joker Seçimi", body, active_tab="iou", add_headers=_add_security_headers)
                     return
 
-                effective_entries = b64_entries if b64_entries else files_list
+                effective_entries = session.file_entries() if confirm_iou and session.files else files_list
                 joker_indices: Set[int] = set()
                 j = 0
                 # varsa joker_* işaretlerini topla
@@ -1034,6 +867,7 @@ class AppHandler(BaseHTTPRequestHandler):
                 start_tod = parse_tod("18:00")
 
                 for idx_entry, entry in enumerate(effective_entries):
+                    report_progress("Dosyalar taranıyor", idx_entry, len(effective_entries))
                     entry_data = entry.get("data")
                     if isinstance(entry_data, (bytes, bytearray)):
                         text_entry = entry_data.decode("utf-8", errors="replace")
@@ -1082,17 +916,17 @@ class AppHandler(BaseHTTPRequestHandler):
                             has_effective_news = False
                             categories_present: Set[str] = set()
                             for ev in news_hits:
-                                title = ev.get("title", "")
+                                title = ev.title
                                 title_html = html.escape(title)
-                                is_all_day = bool(ev.get("all_day"))
+                                is_all_day = ev.all_day
                                 if is_all_day:
                                     time_part = "All Day"
                                 else:
-                                    time_part = html.escape(ev.get("time") or "-")
+                                    time_part = html.escape(ev.time or "-")
                                 line = f"{time_part} {title_html}"
-                                if ev.get("window") == "recent-null":
+                                if ev.window == "recent-null":
                                     line += " (null)"
-                                category = ev.get("category") or "normal"
+                                category = ev.category or "normal"
                                 categories_present.add(category)
                                 if category == "holiday":
                                     line += " (holiday)"
@@ -1182,6 +1016,9 @@ class AppHandler(BaseHTTPRequestHandler):
                             table = "<p>IOU mum bulunamadı.</p>"
 
                         sections.append(info + table)
+                    report_file(name, total_hits, xyz_offsets, "" if summary_mode else sections[-1])
+                file_cards = len(sections)
+                report_progress("Sonuçlar hazırlanıyor", len(effective_entries))
 
                 if summary_mode:
                     header = "<tr><th>Dosya</th><th>XYZ Kümesi</th><th>Elenen Offsetler</th></tr>"
@@ -1218,6 +1055,9 @@ class AppHandler(BaseHTTPRequestHandler):
                         )
                     current_result = "\n".join(sections)
                 
+                # Dosya kartları olay akışıyla gitti; kalanlar (özet tablo, örüntü panelleri) eklenir
+                report_panel(current_result if summary_mode else "\n".join(sections[file_cards:]))
+
                 # Yeni analiz sonucunu bir bölüm içine al
                 from datetime import datetime
                 result_id = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -1228,39 +1068,33 @@ class AppHandler(BaseHTTPRequestHandler):
                     f"</div>"
                 )
                 
-                # Önceki sonuçları ve yeni sonucu birleştir (ilk analiz üstte kalsın)
-                if previous_results_html:
-                    body_without_form = previous_results_html + result_section
-                else:
-                    body_without_form = result_section
-                
-                # Sonuçların altına tekrar IOU formunu ekle (önceki sonuçları da hidden field olarak taşı)
-                # Önce body_without_form'u encode edip sakla (form eklenmeden önceki hali)
-                body_encoded = base64.b64encode(body_without_form.encode("utf-8")).decode("ascii")
-                
+                # Sonuçların altına tekrar IOU formunu ekle (önceki sonuçlar oturumda kalır)
+                next_token = store_session(session.evolve(
+                    files=(),
+                    results=session.results + (result_section,),
+                ))
+                next_session_field = session_input(next_token)
+                # Önceki analizler yerine bağlantı: yanıt boyutu geçmişle büyümez
+                body_without_form = history_link(next_token, previous_count) + result_section
                 form_html = render_iou_form()
                 # Form içindeki form tag'ini kaldırıp sadece içeriği al
-                form_content = form_html.replace("<form method='post' action='/iou' enctype='multipart/form-data'>", "").replace("</form>", "").strip()
+                form_content = form_html.replace(f"<form method='post' action='{url_for('/iou')}' enctype='multipart/form-data'>", "").replace("</form>", "").strip()
                 
                 form_section = (
                     "<hr style='margin:32px 0; border:none; border-top:2px solid #ddd;'>"
                     "<h2 style='margin-top:24px;'>Yeni Analiz</h2>"
                     "<div class='card'>"
-                    "<form method='post' action='/iou' enctype='multipart/form-data'>"
-                    f"<input type='hidden' name='previous_results_html' value='{body_encoded}'>"
+                    f"<form method='post' action='{url_for('/iou')}' enctype='multipart/form-data'>"
+                    f"{next_session_field}"
                     + form_content +
                     "</form>"
                     "</div>"
                 )
                 
-                # Final body: önceki sonuçlar + yeni sonuç + form
+                # Final body: önceki analiz bağlantısı + yeni sonuç + form
                 body = body_without_form + form_section
                 
-                self.send_response(200)
-                self.send_header("Content-Type", "text/html; charset=utf-8")
-                _add_security_headers(self)
-                self.end_headers()
-                self.wfile.write(page("app48 IOU", body, active_tab="iou"))
+                PAGE.send(self, "app48 IOU", body, active_tab="iou", add_headers=_add_security_headers)
                 return
 
             # Normalize to UTC-4 if needed
@@ -1368,30 +1202,29 @@ class AppHandler(BaseHTTPRequestHandler):
 
                 table = f"<table><thead>{header}</thead><tbody>{''.join(rows_html)}</tbody></table>"
                 body = "<div class='card'>" + "".join(info_lines) + "</div>" + table
-                self.send_response(200)
-                self.send_header("Content-Type", "text/html; charset=utf-8")
-                _add_security_headers(self)
-                self.end_headers()
-                self.wfile.write(page("app48 sonuçlar", body, active_tab="analyze"))
+                PAGE.send(self, "app48 sonuçlar", body, active_tab="analyze", add_headers=_add_security_headers)
             elif self.path == "/dc":
                 # DC list branch
                 flags = compute_dc_flags(candles)
-                rows_html = []
-                count = 0
-                for i, c in enumerate(candles):
-                    if not flags[i]:
-                        continue
-                    if only_syn and not getattr(c, "synthetic", False):
-                        continue
-                    if only_real and getattr(c, "synthetic", False):
-                        continue
-                    tag = "syn" if getattr(c, "synthetic", False) else "real"
-                    ts = c.ts.strftime("%Y-%m-%d %H:%M:%S")
-                    rows_html.append(f"<tr><td>{i}</td><td>{html.escape(ts)}</td><td>{tag}</td><td>{c.open}</td><td>{c.high}</td><td>{c.low}</td><td>{c.close}</td></tr>")
-                    count += 1
 
+                def dc_candles() -> Iterator[Tuple[int, Candle]]:
+                    for i, c in enumerate(candles):
+                        if not flags[i]:
+                            continue
+                        if only_syn and not getattr(c, "synthetic", False):
+                            continue
+                        if only_real and getattr(c, "synthetic", False):
+                            continue
+                        yield i, c
+
+                def dc_rows() -> Iterator[str]:
+                    for i, c in dc_candles():
+                        tag = "syn" if getattr(c, "synthetic", False) else "real"
+                        ts = c.ts.strftime("%Y-%m-%d %H:%M:%S")
+                        yield f"<tr><td>{i}</td><td>{html.escape(ts)}</td><td>{tag}</td><td>{c.open}</td><td>{c.high}</td><td>{c.low}</td><td>{c.close}</td></tr>"
+
+                count = sum(1 for _ in dc_candles())
                 header = "<tr><th>Index</th><th>Timestamp</th><th>Tag</th><th>Open</th><th>High</th><th>Low</th><th>Close</th></tr>"
-                table = f"<table><thead>{header}</thead><tbody>{''.join(rows_html)}</tbody></table>"
                 info = (
                     f"<div class='card'>"
                     f"<div><strong>Data:</strong> {len(candles)} candles</div>"
@@ -1400,12 +1233,9 @@ class AppHandler(BaseHTTPRequestHandler):
                     f"<div><strong>DC count:</strong> {count}</div>"
                     f"</div>"
                 )
-                body = info + table
-                self.send_response(200)
-                self.send_header("Content-Type", "text/html; charset=utf-8")
-                _add_security_headers(self)
-                self.end_headers()
-                self.wfile.write(page("app48 DC List", body, active_tab="dc"))
+                head, foot = PAGE.parts("app48 DC List", active_tab="dc")
+                table_open = f"<table><thead>{header}</thead><tbody>"
+                send_stream(self, itertools.chain([head, info, table_open], dc_rows(), ["</tbody></table>", foot]), _add_security_headers)
             elif self.path == "/matrix":
                 # Matrix branch
                 seq_values = SEQUENCES.get(sequence or "S2", SEQUENCES["S2"])[:]
@@ -1466,37 +1296,59 @@ class AppHandler(BaseHTTPRequestHandler):
                 )
 
                 body = info + table
-                self.send_response(200)
-                self.send_header("Content-Type", "text/html; charset=utf-8")
-                _add_security_headers(self)
-                self.end_headers()
-                self.wfile.write(page("app48 - Matrix", body, active_tab="matrix"))
+                PAGE.send(self, "app48 - Matrix", body, active_tab="matrix", add_headers=_add_security_headers)
             else:
                 self.send_error(400)
                 return
         except Exception as e:
             msg = html.escape(str(e) or "Bilinmeyen hata")
+            payload = page("Hata", f"<p>Hata: {msg}</p><p><a href='{url_for('/')}'>&larr; Geri</a></p>")
             self.send_response(400)
             self.send_header("Content-Type", "text/html; charset=utf-8")
             _add_security_headers(self)
+            self.send_header("Connection", "close")
+            self.send_header("Content-Length", str(len(payload)))
             self.end_headers()
-            self.wfile.write(page("Hata", f"<p>Hata: {msg}</p><p><a href='/'>&larr; Geri</a></p>"))
+            self.wfile.write(payload)
 
     def log_message(self, format, *args):
         pass
 
 
+wsgi_app = make_wsgi_app(AppHandler)
+
+
 def run(host: str, port: int):
-    httpd = HTTPServer((host, port), AppHandler)
+    httpd = make_server(host, port, AppHandler)
     print(f"app48 web: http://{host}:{port}/")
-    httpd.serve_forever()
+    serve(httpd)
 
 
 def main(argv=None) -> int:
     parser = argparse.ArgumentParser(prog="app48.web", description="app48 için basit web arayüzü")
     parser.add_argument("--host", default="127.0.0.1", help="Sunucu adresi (vars: 127.0.0.1)")
     parser.add_argument("--port", type=int, default=2020, help="Port (vars: 2020)")
+    parser.add_argument("--pattern-memo-mb", type=float, default=None, help="Örüntü önbelleği için bellek bütçesi (MB, vars: 64; 0 = kapalı)")
+    parser.add_argument("--session-ttl", type=float, default=None, help="IOU oturumlarının geçerlilik süresi (saniye, vars: 21600)")
+    parser.add_argument("--session-dir", default=None, help="IOU oturumlarını diskte de sakla (dizin yolu)")
+    parser.add_argument("--job-workers", type=int, default=None, help="Arka plan işlerini çalıştıran iş parçacığı sayısı (vars: 2)")
+    parser.add_argument("--job-ttl", type=float, default=None, help="Biten arka plan işlerinin sonuçlarının saklanma süresi (saniye, vars: 3600)")
+    parser.add_argument("--job-dir", default=None, help="Arka plan işlerini diskte de sakla (dizin yolu)")
+    parser.add_argument("--max-inflight", type=int, default=None, help="Aynı anda çalışan en fazla IOU/matrix/converter hesabı (vars: 2)")
+    parser.add_argument("--max-upload-mb", type=float, default=None, help="Çalışan hesapların yüklemeleri için toplam bellek sınırı (MB, vars: 128)")
+    parser.add_argument("--admission-queue", type=int, default=None, help="Hesap için sırada bekleyen en fazla istek; aşılırsa 503 (vars: 8)")
+    parser.add_argument("--admission-wait", type=float, default=None, help="Sırada beklenen en uzun süre; aşılırsa 503 (saniye, vars: 10)")
+    parser.add_argument("--workers", type=int, default=None, help="İstek işleyen iş parçacığı sayısı (vars: 8)")
+    parser.add_argument("--queue-limit", type=int, default=None, help="İşlenen + bekleyen en fazla istek; aşılırsa 503 (vars: 32)")
+    parser.add_argument("--cpu-workers", type=int, default=None, help="POST isteklerini işleyen süreç sayısı (vars: 0 = iş parçacığında)")
     args = parser.parse_args(argv)
+    if args.pattern_memo_mb is not None:
+        configure_memo(max_bytes=int(args.pattern_memo_mb * 1024 * 1024))
+    configure_sessions(args.session_ttl, args.session_dir)
+    configure_jobs(args.job_workers, args.job_ttl, args.job_dir)
+    max_upload_bytes = int(args.max_upload_mb * 1024 * 1024) if args.max_upload_mb is not None else None
+    configure_admission(args.max_inflight, max_upload_bytes, args.admission_queue, args.admission_wait)
+    configure_server(args.workers, args.queue_limit, args.cpu_workers)
     run(args.host, args.port)
     return 0
 
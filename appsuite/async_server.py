@@ -0,0 +1,529 @@
+"""appsuite için isteğe bağlı asyncio ön sunucusu (`--server asyncio`).
+
+Bağlantılar olay döngüsünde tutulur; yavaş ya da boşta bekleyen binlerce
+istemci iş parçacığı harcamaz. İstek satırı ve başlıklar küçük bir HTTP/1.1
+ayrıştırıcısıyla okunur, gövde tamamen geldikten sonra istek işlenir. Gövde
+okunmadan önce kabul denetiminde (`front`) yer ayrılır: aynı anda bellekte
+duran gövdelerin toplamı `ADMISSION_MAX_UPLOAD_BYTES`'ı aşmaz, sığmayan
+istek gövdesi okunup atılarak `503` alır.
+
+- giriş sayfası, favicon varlıkları ve `/health` döngü içinde yanıtlanır
+  (görseller `loop.sendfile` ile diskten doğrudan sokete);
+- mount kipinde uygulama istekleri iş parçacığı havuzunda çalışır (POST'lar
+  `--cpu-workers` ile süreç havuzuna aktarılır); yanıt tamponlanmaz,
+  işleyici yazdıkça (geri basınçla) sokete gider;
+- proxy kipinde arka uçlara engellemeyen, havuzlanmış bağlantılarla gidilir;
+  metin yanıtları burada, iş parçacığı havuzunda gzip'lenir. Küçükleri
+  bir kerede, `PROXY_BUFFER_BYTES`'ı aşanlar ya da uzunluğu bilinmeyenler
+  tamponlanmadan, geldikçe yeniden yazılıp sıkıştırılarak aktarılır.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Type
+
+import admission
+import serving
+from compression import GzipStream, accepts_gzip, compress_response, compressible_type, gzip_head_lines, is_compressible
+from http_cache import StaticFile, open_static
+from serving import BUSY_RESPONSE, run_buffered, run_streaming
+
+from .web import (
+    MAX_UPLOAD_BYTES,
+    PROXY_BUFFER_BYTES,
+    PROXY_CHUNK_SIZE,
+    PROXY_IDLE_SECONDS,
+    PROXY_POOL_SIZE,
+    PROXY_TIMEOUT,
+    SECURITY_HEADERS,
+    Backend,
+    HtmlPathRewriter,
+    front_static,
+    rewrite_html_paths,
+    rewrite_location,
+    strip_hop_headers,
+)
+
+# İstek satırı + başlıklar için üst sınır
+HEADER_LIMIT = 64 * 1024
+# Gövdenin tamamının gelmesi için beklenen en uzun süre (yavaş yüklemeler)
+BODY_TIMEOUT = 120.0
+
+Headers = List[Tuple[str, str]]
+
+_TOO_LARGE_BODY = b"Upload too large (max 50 MB)."
+
+
+def parse_head(head: bytes) -> Tuple[str, str, str, Headers]:
+    """`İSTEK SATIRI\\r\\nBaşlık: değer...` bloğunu ayrıştır."""
+    lines = head.decode("latin-1").split("\r\n")
+    parts = lines[0].split()
+    if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+        raise ValueError("Geçersiz istek satırı")
+    headers: Headers = []
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, sep, value = line.partition(":")
+        if not sep:
+            raise ValueError("Geçersiz başlık")
+        headers.append((name.strip(), value.strip()))
+    return parts[0], parts[1], parts[2], headers
+
+
+def header_value(headers: Headers, name: str, default: str = "") -> str:
+    lowered = name.lower()
+    return next((v for k, v in headers if k.lower() == lowered), default)
+
+
+def simple_response(status: int, reason: str, body: bytes, extra: Headers = ()) -> bytes:
+    lines = [f"HTTP/1.1 {status} {reason}", "Content-Type: text/plain; charset=utf-8"]
+    lines += [f"{k}: {v}" for k, v in extra]
+    lines += [f"Content-Length: {len(body)}", "Connection: close", "", ""]
+    return "\r\n".join(lines).encode("latin-1") + body
+
+
+class AsyncBackendPool:
+    """Tek arka uca açılan, yeniden kullanılabilir asyncio bağlantıları."""
+
+    def __init__(self, backend: Backend, max_idle: int = PROXY_POOL_SIZE) -> None:
+        self.backend = backend
+        self.max_idle = max_idle
+        self._idle: List[Tuple[float, asyncio.StreamReader, asyncio.StreamWriter]] = []
+
+    async def acquire(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]:
+        now = time.monotonic()
+        while self._idle:
+            stamp, reader, writer = self._idle.pop()
+            if now - stamp <= PROXY_IDLE_SECONDS and not reader.at_eof() and not writer.is_closing():
+                return reader, writer, True
+            writer.close()
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.backend.host, self.backend.port), PROXY_TIMEOUT
+        )
+        return reader, writer, False
+
+    def release(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if len(self._idle) < self.max_idle and not writer.is_closing():
+            self._idle.append((time.monotonic(), reader, writer))
+        else:
+            writer.close()
+
+
+class AsyncFrontServer:
+    """Birleşik işleyiciyi asyncio bağlantı döngüsünün arkasında çalıştırır."""
+
+    def __init__(self, handler_cls: Type[BaseHTTPRequestHandler], backends: List[Backend], mount: bool) -> None:
+        # Kalıcı bağlantı için yanıtlar HTTP/1.1 ile yazılır (hepsinde Content-Length var)
+        self.handler_cls = type(handler_cls.__name__, (handler_cls,), {"protocol_version": "HTTP/1.1"})
+        self.backends = backends
+        self.mount = mount
+        self.pools: Dict[str, AsyncBackendPool] = {backend.name: AsyncBackendPool(backend) for backend in backends}
+        self.executor = ThreadPoolExecutor(max_workers=serving.SERVER_WORKERS, thread_name_prefix="aio-app")
+        # Okunmayı bekleyen gövdeler; sırada beklemek döngüyü ve uygulama havuzunu tutmaz
+        self.admission = admission.get_controller("front", serving.SERVER_QUEUE_LIMIT)
+        self.admission_executor = ThreadPoolExecutor(
+            max_workers=max(1, admission.ADMISSION_QUEUE_LIMIT), thread_name_prefix="aio-admission"
+        )
+        self.in_flight = 0
+        self.connections = 0
+        # SIGTERM sonrası: yanıtı biten bağlantı açık tutulmaz
+        self.draining = False
+
+    def _match(self, target: str) -> Tuple[Optional[Backend], str]:
+        for backend in self.backends:
+            matched, sub_path = backend.match(target)
+            if matched:
+                return backend, sub_path
+        return None, ""
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = writer.get_extra_info("peername") or ("", 0)
+        client_address = (peer[0], peer[1])
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), serving.KEEPALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+                    return
+                try:
+                    method, target, version, headers = parse_head(head[:-4])
+                    length = int(header_value(headers, "Content-Length", "0") or 0)
+                except ValueError:
+                    writer.write(simple_response(400, "Bad Request", b"Bad Request"))
+                    return
+                if header_value(headers, "Transfer-Encoding"):
+                    writer.write(simple_response(411, "Length Required", b"Length Required"))
+                    return
+                if length > MAX_UPLOAD_BYTES:
+                    writer.write(simple_response(413, "Payload Too Large", _TOO_LARGE_BODY, SECURITY_HEADERS))
+                    return
+                if length > 0 and not await self._reserve(length):
+                    await self._discard(reader, length)
+                    writer.write(BUSY_RESPONSE)
+                    return
+                try:
+                    body = await asyncio.wait_for(reader.readexactly(length), BODY_TIMEOUT) if length > 0 else b""
+
+                    connection = header_value(headers, "Connection").lower()
+                    keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                    backend, sub_path = self._match(target)
+                    static = front_static(target) if method in ("GET", "HEAD") else None
+                    if static is not None:
+                        keep = await self._send_static(*static, method, headers, writer)
+                    elif backend is not None and not self.mount:
+                        keep = await self._proxy(backend, method, sub_path, headers, body, writer, version)
+                    else:
+                        keep = await self._run_handler(head + body, client_address, offload=backend is not None, writer=writer)
+                    await writer.drain()
+                finally:
+                    if length > 0:
+                        self.admission.release(length)
+                if not (keep and keep_alive) or self.draining:
+                    return
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def _reserve(self, length: int) -> bool:
+        """Gövde için kabul denetiminde yer bekle (döngü dışında); sığmadıysa False."""
+        if self.admission.acquire_nowait(length):
+            return True
+        waited = await asyncio.get_running_loop().run_in_executor(self.admission_executor, self.admission.acquire, length)
+        return waited is not None
+
+    @staticmethod
+    async def _discard(reader: asyncio.StreamReader, length: int) -> None:
+        # İstemci yüklemeyi bitirip 503'ü görebilsin; çok büyükse bağlantı kapanır
+        if length > admission.ADMISSION_DRAIN_BYTES:
+            return
+        try:
+            while length > 0:
+                chunk = await asyncio.wait_for(reader.read(min(PROXY_CHUNK_SIZE, length)), BODY_TIMEOUT)
+                if not chunk:
+                    return
+                length -= len(chunk)
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+
+    async def accept_pending(self, listener: socket.socket) -> None:
+        """Kapatılan dinleme soketinin kuyruğunda bekleyen bağlantıları da işle."""
+        listener.setblocking(False)
+        with listener:
+            while True:
+                try:
+                    conn, _ = listener.accept()
+                except OSError:
+                    return
+                reader, writer = await asyncio.open_connection(sock=conn, limit=HEADER_LIMIT)
+                asyncio.create_task(self.handle_client(reader, writer))
+
+    async def _send_static(
+        self,
+        static: StaticFile,
+        cache_control: str,
+        method: str,
+        headers: Headers,
+        writer: asyncio.StreamWriter,
+    ) -> bool:
+        try:
+            response = open_static(static, lambda name: header_value(headers, name) or None, cache_control)
+        except OSError:
+            writer.write(simple_response(404, "Not Found", b"Not Found"))
+            return False
+        try:
+            status = HTTPStatus(response.status)
+            lines = [f"HTTP/1.1 {status.value} {status.phrase}", "Server: CandlesUnified/1.0", f"Date: {formatdate(usegmt=True)}"]
+            lines += [f"{k}: {v}" for k, v in response.headers]
+            lines += [f"{k}: {v}" for k, v in SECURITY_HEADERS]
+            if response.length is not None:
+                lines.append(f"Content-Length: {response.length}")
+            writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+            if response.file is not None and response.length and method != "HEAD":
+                await asyncio.get_running_loop().sendfile(writer.transport, response.file, response.offset, response.length)
+        finally:
+            if response.file is not None:
+                response.file.close()
+        return True
+
+    async def _run_handler(
+        self,
+        raw: bytes,
+        client_address: Tuple[str, int],
+        offload: bool,
+        writer: asyncio.StreamWriter,
+    ) -> bool:
+        if not offload:
+            # Giriş sayfası, favicon, /health ve 404: bellekten, döngü içinde
+            response, keep = run_buffered(self.handler_cls, raw, client_address)
+            writer.write(response)
+            return keep
+        if self.in_flight >= serving.SERVER_QUEUE_LIMIT:
+            writer.write(BUSY_RESPONSE)
+            return False
+        self.in_flight += 1
+        loop = asyncio.get_running_loop()
+
+        async def send(data: bytes) -> None:
+            writer.write(data)
+            await writer.drain()
+
+        def sendall(data: bytes) -> None:
+            # İşleyici iş parçacığından: istemci yavaşsa burada bekler
+            asyncio.run_coroutine_threadsafe(send(data), loop).result()
+
+        try:
+            return await loop.run_in_executor(self.executor, run_streaming, self.handler_cls, raw, client_address, sendall)
+        finally:
+            self.in_flight -= 1
+
+    async def _proxy(
+        self,
+        backend: Backend,
+        method: str,
+        sub_path: str,
+        headers: Headers,
+        body: bytes,
+        writer: asyncio.StreamWriter,
+        version: str = "HTTP/1.1",
+    ) -> bool:
+        skip = {"host", "accept-encoding", "content-length"}
+        forwarded = [(k, v) for k, v in strip_hop_headers(headers) if k.lower() not in skip]
+        forwarded.append(("Host", f"{backend.host}:{backend.port}"))
+        if body:
+            forwarded.append(("Content-Length", str(len(body))))
+        request = f"{method} {sub_path} HTTP/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in forwarded) + "\r\n"
+        payload = request.encode("latin-1") + body
+
+        loader = self.handler_cls.backend_loader
+        if not loader.is_ready(backend):
+            # İç sunucu ilk istekte başlatılır; beklerken döngü serbest kalsın
+            try:
+                await asyncio.get_running_loop().run_in_executor(self.executor, loader.ensure, backend)
+            except Exception:
+                writer.write(simple_response(503, "Service Unavailable", b"Service Unavailable"))
+                return False
+
+        pool = self.pools[backend.name]
+        try:
+            while True:
+                b_reader, b_writer, reused = await pool.acquire()
+                try:
+                    b_writer.write(payload)
+                    await b_writer.drain()
+                    head = await asyncio.wait_for(b_reader.readuntil(b"\r\n\r\n"), PROXY_TIMEOUT)
+                    break
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    b_writer.close()
+                    if not reused:
+                        raise
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            writer.write(simple_response(502, "Bad Gateway", b"Bad Gateway"))
+            return False
+
+        try:
+            status_line, *header_lines = head[:-4].decode("latin-1").split("\r\n")
+            _, status, reason = (status_line.split(" ", 2) + [""])[:3]
+            resp_headers: Headers = [(k.strip(), v.strip()) for k, _, v in (line.partition(":") for line in header_lines)]
+            length_value = header_value(resp_headers, "Content-Length")
+            length = int(length_value) if length_value else None
+            chunked = "chunked" in header_value(resp_headers, "Transfer-Encoding").lower()
+            backend_close = header_value(resp_headers, "Connection").lower() == "close"
+            stream_close = False
+            relayed = [(k, v) for k, v in strip_hop_headers(resp_headers) if k.lower() not in ("content-length", "date", "server")]
+            relayed = rewrite_location(relayed, backend.normalize_prefix())
+            content_type = header_value(resp_headers, "Content-Type")
+
+            def response_head(body_length: Optional[int], bodyless: bool = False) -> bytes:
+                lines = [f"HTTP/1.1 {status} {reason}", "Server: CandlesUnified/1.0", f"Date: {formatdate(usegmt=True)}"]
+                lines += [f"{k}: {v}" for k, v in relayed]
+                lines += [f"{k}: {v}" for k, v in SECURITY_HEADERS]
+                if bodyless:
+                    pass
+                elif body_length is None:
+                    lines.append("Connection: close")
+                else:
+                    lines.append(f"Content-Length: {body_length}")
+                return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+            textual = "text/html" in content_type or compressible_type(content_type)
+            if status in ("204", "304") or method == "HEAD":
+                # Gövdesiz yanıt (ör. ETag eşleşti): arka uç bağlantısı havuza döner
+                writer.write(response_head(None, bodyless=True))
+            elif content_type.startswith("text/event-stream"):
+                # Olay akışı tamponlanmaz; gövde bağlantı kapanınca biter
+                writer.write(response_head(None))
+                async for chunk in self._iter_body(b_reader, chunked):
+                    writer.write(chunk)
+                    await writer.drain()
+                backend_close = stream_close = True
+            elif textual and not chunked and length is not None and length <= PROXY_BUFFER_BYTES:
+                resp_body = await asyncio.wait_for(b_reader.readexactly(length), PROXY_TIMEOUT)
+                if "text/html" in content_type:
+                    resp_body = rewrite_html_paths(resp_body, backend.normalize_prefix())
+                response = response_head(len(resp_body)) + resp_body
+                if is_compressible(content_type, len(resp_body)):
+                    response = await self._compress(response, header_value(headers, "Accept-Encoding"), method == "HEAD")
+                writer.write(response)
+            elif textual or chunked or length is None:
+                # Büyük ya da uzunluğu bilinmeyen gövde: tamponlanmadan geldikçe aktarılır
+                lines = response_head(None, bodyless=True)[:-4].split(b"\r\n")
+                gzip = None
+                if textual:
+                    if not header_value(relayed, "Vary"):
+                        lines.append(b"Vary: Accept-Encoding")
+                    if accepts_gzip(header_value(headers, "Accept-Encoding")) and not header_value(relayed, "Content-Encoding"):
+                        lines = gzip_head_lines(lines)
+                        gzip = GzipStream(version == "HTTP/1.1")
+                if version == "HTTP/1.1":
+                    lines.append(b"Transfer-Encoding: chunked")
+                else:
+                    lines.append(b"Connection: close")
+                    stream_close = True
+                writer.write(b"\r\n".join(lines) + b"\r\n\r\n")
+                rewriter = HtmlPathRewriter(backend.normalize_prefix()) if "text/html" in content_type else None
+                await self._relay(writer, self._iter_body(b_reader, chunked, length), rewriter, gzip, version == "HTTP/1.1")
+                if length is None and not chunked:
+                    backend_close = True
+            else:
+                # Sıkıştırılmayan tür (ZIP, görsel): bilinen uzunlukla parça parça aktar
+                writer.write(response_head(length))
+                remaining = length
+                while remaining > 0:
+                    chunk = await asyncio.wait_for(b_reader.read(min(PROXY_CHUNK_SIZE, remaining)), PROXY_TIMEOUT)
+                    if not chunk:
+                        raise asyncio.IncompleteReadError(b"", remaining)
+                    remaining -= len(chunk)
+                    writer.write(chunk)
+                    await writer.drain()
+        except Exception:
+            b_writer.close()
+            raise
+        if backend_close:
+            b_writer.close()
+        else:
+            pool.release(b_reader, b_writer)
+        return not stream_close
+
+    async def _compress(self, response: bytes, accept_encoding: str, head_only: bool) -> bytes:
+        if not accepts_gzip(accept_encoding) or head_only:
+            # Yalnız `Vary` eklenir; sıkıştırma yok
+            return compress_response(response, accept_encoding, head_only)
+        # Büyük sayfaların sıkıştırılması olay döngüsünü bekletmesin
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, compress_response, response, accept_encoding, head_only
+        )
+
+    async def _relay(
+        self,
+        writer: asyncio.StreamWriter,
+        chunks: AsyncIterator[bytes],
+        rewriter: Optional[HtmlPathRewriter],
+        gzip: Optional[GzipStream],
+        framed: bool,
+    ) -> None:
+        """Gövde parçalarını (gerekirse önek yazıp gzip'leyerek) istemciye aktar."""
+        loop = asyncio.get_running_loop()
+
+        def emit(data: bytes) -> None:
+            if data:
+                writer.write(b"%x\r\n%s\r\n" % (len(data), data) if framed else data)
+
+        async for chunk in chunks:
+            if rewriter is not None:
+                chunk = rewriter.feed(chunk)
+            if gzip is not None:
+                writer.write(await loop.run_in_executor(self.executor, gzip.compress, chunk, True))
+            else:
+                emit(chunk)
+            await writer.drain()
+        tail = rewriter.close() if rewriter is not None else b""
+        if gzip is not None:
+            writer.write(gzip.compress(tail) + gzip.finish())
+        else:
+            emit(tail)
+            if framed:
+                writer.write(b"0\r\n\r\n")
+
+    @staticmethod
+    async def _iter_body(reader: asyncio.StreamReader, chunked: bool, length: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Arka uç gövdesini geldikçe ver (chunked çerçeve çözülür).
+
+        Uzunluk verilmemiş düz gövde bağlantı kapanınca biter.
+        """
+        while True:
+            if chunked:
+                size_line = await asyncio.wait_for(reader.readuntil(b"\r\n"), PROXY_TIMEOUT)
+                size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+                if size == 0:
+                    # Son parça + (varsa) trailer başlıkları
+                    while (await asyncio.wait_for(reader.readuntil(b"\r\n"), PROXY_TIMEOUT)) != b"\r\n":
+                        pass
+                    return
+                chunk = await reader.readexactly(size)
+                await reader.readexactly(2)
+            elif length is not None:
+                if length <= 0:
+                    return
+                chunk = await asyncio.wait_for(reader.read(min(PROXY_CHUNK_SIZE, length)), PROXY_TIMEOUT)
+                if not chunk:
+                    raise asyncio.IncompleteReadError(b"", length)
+                length -= len(chunk)
+            else:
+                chunk = await asyncio.wait_for(reader.read(PROXY_CHUNK_SIZE), PROXY_TIMEOUT)
+                if not chunk:
+                    return
+            yield chunk
+
+
+
+def run_async(
+    host: str,
+    port: int,
+    handler_cls: Type[BaseHTTPRequestHandler],
+    backends: List[Backend],
+    mount: bool,
+) -> None:
+    front = AsyncFrontServer(handler_cls, backends, mount)
+
+    async def serve() -> None:
+        server = await asyncio.start_server(
+            front.handle_client,
+            host,
+            port,
+            limit=HEADER_LIMIT,
+            backlog=1024,
+            reuse_port=serving.REUSE_PORT or None,
+        )
+        stop = asyncio.Event()
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+        serving.notify_ready()
+        async with server:
+            await stop.wait()
+            # Dinlemeyi bırak; kuyrukta kalanları da al, açık bağlantıların işini bitirmesini bekle
+            listeners = [socket.socket(fileno=os.dup(sock.fileno())) for sock in server.sockets]
+            server.close()
+            front.draining = True
+            for listener in listeners:
+                await front.accept_pending(listener)
+            deadline = time.monotonic() + serving.KEEPALIVE_TIMEOUT + BODY_TIMEOUT
+            while front.connections and time.monotonic() < deadline:
+                await asyncio.sleep(0.1)
+
+    try:
+        asyncio.run(serve())
+    finally:
+        front.executor.shutdown(wait=False, cancel_futures=True)
+        front.admission_executor.shutdown(wait=False, cancel_futures=True)
@@ -1,28 +1,51 @@
 from __future__ import annotations
 
 import argparse
+import importlib
+import json
+import select
 import socket
 import threading
 import time
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from http import client
-from http.server import BaseHTTPRequestHandler, HTTPServer
-from typing import Iterable, List, Tuple
+from http.server import BaseHTTPRequestHandler
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union
 from urllib.parse import urlsplit
 
 from landing.web import build_html, try_load_local_asset
-from app48.web import run as run_app48
-from app72.web import run as run_app72
-from app80.web import run as run_app80
-from app90.web import run as run_app90
-from app96.web import run as run_app96
-from app120.web import run as run_app120
-from app321.web import run as run_app321
-from calendar_md.web import run as run_calendar
-from favicon import try_load_asset
+from admission import configure_admission, serve_metrics
+from compression import GzipStream, accepts_gzip, compressible_type, weak_etag
+from favicon import try_load_static
+from http_cache import CACHE_ASSET, CACHE_PAGE, CachedBody, StaticFile, asset_cache_control, send_cached, send_file
+from iou_session import configure_sessions
+from jobs import configure_jobs
+from patterns import configure_memo, configure_search
+from serving import configure_server, dispatch_mounted, hand_off, make_server, make_wsgi_app, serve
 
 MAX_UPLOAD_BYTES = 50 * 1024 * 1024  # 50 MB
+# Arka uç başına boşta tutulan en fazla kalıcı bağlantı
+PROXY_POOL_SIZE = 8
+# Boştaki bağlantının yeniden kullanılabileceği süre; arka ucun kapatma
+# süresinden (serving.KEEPALIVE_TIMEOUT) kısa olmalı
+PROXY_IDLE_SECONDS = 4.0
+PROXY_TIMEOUT = 15
+# Bu boyuta kadar istek gövdeleri bellekte okunur (bayat bağlantıda tekrar
+# denenebilir); daha büyükleri arka uca parça parça aktarılır
+PROXY_BUFFER_BYTES = 64 * 1024
+PROXY_CHUNK_SIZE = 64 * 1024
+# İlk istekte başlatılan iç sunucunun portu açması için beklenen en uzun süre
+BACKEND_START_TIMEOUT = 30.0
+
+RequestBody = Union[bytes, Iterator[bytes], None]
+
+SECURITY_HEADERS = (
+    ("X-Content-Type-Options", "nosniff"),
+    ("X-Frame-Options", "DENY"),
+    ("Referrer-Policy", "no-referrer"),
+    ("Content-Security-Policy", "default-src 'self'; style-src 'self' 'unsafe-inline'"),
+)
 
 
 @dataclass(frozen=True)
@@ -33,6 +56,12 @@ class Backend:
     port: int
     prefix: str
     description: str
+    # Uygulamanın web modülü ve işleyici sınıfı; ilk istekte içe aktarılır
+    module: str = field(default="", compare=False)
+    handler_name: str = field(default="", compare=False)
+
+    def load_handler(self) -> Type[BaseHTTPRequestHandler]:
+        return getattr(importlib.import_module(self.module), self.handler_name)
 
     def normalize_prefix(self) -> str:
         prefix = self.prefix
@@ -62,6 +91,94 @@ class Backend:
         return True, sub_path
 
 
+class ConnectionPool:
+    """Tek arka uca açılan, yeniden kullanılabilir HTTP/1.1 bağlantıları."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        max_idle: int = PROXY_POOL_SIZE,
+        idle_seconds: float = PROXY_IDLE_SECONDS,
+        timeout: float = PROXY_TIMEOUT,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.max_idle = max_idle
+        self.idle_seconds = idle_seconds
+        self.timeout = timeout
+        self._idle: List[Tuple[float, client.HTTPConnection]] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _is_stale(conn: client.HTTPConnection) -> bool:
+        sock = conn.sock
+        if sock is None:
+            return True
+        try:
+            # Boştaki bağlantı okunabilir görünüyorsa karşı taraf kapatmıştır
+            readable, _, _ = select.select([sock], [], [], 0)
+        except (OSError, ValueError):
+            return True
+        return bool(readable)
+
+    def acquire(self) -> Tuple[client.HTTPConnection, bool]:
+        """Boştaki sağlam bir bağlantıyı ya da yenisini döndür (bağlantı, yeniden_mi)."""
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                stamp, conn = self._idle.pop()
+            if now - stamp <= self.idle_seconds and not self._is_stale(conn):
+                return conn, True
+            conn.close()
+        return client.HTTPConnection(self.host, self.port, timeout=self.timeout), False
+
+    def release(self, conn: client.HTTPConnection, resp: client.HTTPResponse) -> None:
+        """Yanıtı tamamen okunmuş bağlantıyı havuza geri koy."""
+        if resp.will_close or not resp.isclosed():
+            conn.close()
+            return
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append((time.monotonic(), conn))
+                return
+        conn.close()
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: RequestBody,
+        headers: Dict[str, str],
+    ) -> Tuple[client.HTTPConnection, client.HTTPResponse]:
+        """İsteği gönder; yeniden kullanılan bağlantı bayatsa bir kez yenisiyle dene.
+
+        Akış halindeki gövde bir kez okunabildiği için yalnız bellekteki
+        gövdeler tekrar denenir.
+        """
+        replayable = body is None or isinstance(body, bytes)
+        while True:
+            conn, reused = self.acquire()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                return conn, conn.getresponse()
+            except (ConnectionError, client.BadStatusLine):
+                conn.close()
+                if not reused or not replayable:
+                    raise
+            except Exception:
+                conn.close()
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for _, conn in idle:
+            conn.close()
+
+
 def wait_for_port(host: str, port: int, timeout: float = 5.0) -> None:
     deadline = time.time() + timeout
     while time.time() < deadline:
@@ -69,34 +186,145 @@ def wait_for_port(host: str, port: int, timeout: float = 5.0) -> None:
             with socket.create_connection((host, port), timeout=0.5):
                 return
         except OSError:
-            time.sleep(0.1)
+            time.sleep(0.05)
     raise RuntimeError(f"Backend {host}:{port} başlatılamadı")
 
 
+def run_backend(backend: Backend) -> None:
+    """Uygulamanın kendi sunucusunu iç portunda çalıştır (iş parçacığı ya da süreç)."""
+    importlib.import_module(backend.module).run(backend.host, backend.port)
+
+
+class BackendLoader:
+    """Arka uçları ilk istekte hazırlar.
+
+    mount kipinde uygulama modülü içe aktarılır, proxy kipinde iç sunucu bir
+    iş parçacığında başlatılır. `managed=False` ise iç sunucular başka
+    süreçlerdedir (denetleyici); yalnız erişilebilirlikleri yoklanır.
+    """
+
+    def __init__(self, backends: List[Backend], mount: bool, managed: bool = True) -> None:
+        self.backends = backends
+        self.mount = mount
+        self.managed = managed
+        self._handlers: Dict[str, Type[BaseHTTPRequestHandler]] = {}
+        self._states = {backend.name: "idle" for backend in backends}
+        self._locks = {backend.name: threading.Lock() for backend in backends}
+
+    def is_ready(self, backend: Backend) -> bool:
+        return self._states[backend.name] == "ready" or not (self.mount or self.managed)
+
+    def ensure(self, backend: Backend) -> Optional[Type[BaseHTTPRequestHandler]]:
+        """Arka ucu hazırla; mount kipinde işleyici sınıfını döndür."""
+        if self.is_ready(backend):
+            return self._handlers.get(backend.name)
+        with self._locks[backend.name]:
+            if self._states[backend.name] != "ready":
+                self._states[backend.name] = "starting"
+                try:
+                    if self.mount:
+                        self._handlers[backend.name] = backend.load_handler()
+                    else:
+                        threading.Thread(target=run_backend, args=(backend,), name=f"{backend.name}-server", daemon=True).start()
+                        wait_for_port(backend.host, backend.port, BACKEND_START_TIMEOUT)
+                except Exception:
+                    self._states[backend.name] = "failed"
+                    raise
+                self._states[backend.name] = "ready"
+        return self._handlers.get(backend.name)
+
+    def warm_up(self) -> None:
+        """Tüm arka uçları arka planda, birbirini beklemeden hazırla."""
+        for backend in self.backends:
+            threading.Thread(target=self._warm, args=(backend,), name=f"{backend.name}-warmup", daemon=True).start()
+
+    def _warm(self, backend: Backend) -> None:
+        try:
+            self.ensure(backend)
+        except Exception:
+            pass
+
+    def status(self) -> Dict[str, str]:
+        if self.mount or self.managed:
+            return dict(self._states)
+        states = {}
+        for backend in self.backends:
+            try:
+                with socket.create_connection((backend.host, backend.port), timeout=0.2):
+                    states[backend.name] = "ready"
+            except OSError:
+                states[backend.name] = "down"
+        return states
+
+
+_HTML_PATH = re.compile(rb"(href|action|src)=(['\"])(/[^'\"]*)\2")
+
+
+_HTML_ATTRS = (b"href=", b"action=", b"src=")
+
+
+def _pending_start(data: bytes) -> int:
+    """Sonu henüz gelmemiş olası eşleşmenin başı (yoksa `len(data)`)."""
+    quote = max(data.rfind(b"'"), data.rfind(b'"'))
+    # Kapanmamış son tırnak bir yolun açılışıysa eşleşme sonraki parçada biter
+    if quote >= 0 and data[quote + 1 : quote + 2] in (b"", b"/"):
+        for attr in _HTML_ATTRS:
+            if data.endswith(attr, 0, quote):
+                return quote - len(attr)
+    for size in range(min(len(data), 7), 0, -1):
+        if any(attr.startswith(data[-size:]) for attr in _HTML_ATTRS):
+            return len(data) - size
+    return len(data)
+
+
+class HtmlPathRewriter:
+    """Kök göreli `href`/`action`/`src` yollarına önek ekler; parça parça çalışır.
+
+    Parça sonunda yarım kalmış olabilecek bir eşleşme (`href='/...` ya da
+    `hre`) bir sonraki parçayla birlikte işlenir; gerisi hemen döner.
+    """
+
+    def __init__(self, prefix: str) -> None:
+        self._prefix = prefix.rstrip("/").encode("utf-8")
+        self._tail = b""
+
+    def _repl(self, match: re.Match[bytes]) -> bytes:
+        # path always starts with /
+        new_path = re.sub(rb"//+", b"/", self._prefix + match.group(3))
+        if not new_path.startswith(b"/"):
+            new_path = b"/" + new_path
+        quote = match.group(2)
+        return match.group(1) + b"=" + quote + new_path + quote
+
+    def feed(self, data: bytes) -> bytes:
+        if not self._prefix:
+            return data
+        data = self._tail + data
+        cut = _pending_start(data)
+        data, self._tail = data[:cut], data[cut:]
+        return _HTML_PATH.sub(self._repl, data)
+
+    def close(self) -> bytes:
+        tail, self._tail = self._tail, b""
+        return _HTML_PATH.sub(self._repl, tail) if self._prefix else tail
+
+
 def rewrite_html_paths(body: bytes, prefix: str) -> bytes:
     try:
-        text = body.decode("utf-8")
+        body.decode("utf-8")
     except UnicodeDecodeError:
         return body
+    rewriter = HtmlPathRewriter(prefix)
+    return rewriter.feed(body) + rewriter.close()
 
-    normalized_prefix = prefix.rstrip("/")
-    if not normalized_prefix:
-        return body
 
-    def repl(match: re.Match[str]) -> str:
-        attr = match.group(1)
-        quote = match.group(2)
-        path = match.group(3)
-        # path always starts with /
-        new_path = normalized_prefix + path
-        new_path = re.sub(r"//+", "/", new_path)
-        if not new_path.startswith("/"):
-            new_path = "/" + new_path
-        return f"{attr}={quote}{new_path}{quote}"
-
-    pattern = r"(href|action)=(['\"])(/[^'\"]*)\2"
-    rewritten = re.sub(pattern, repl, text)
-    return rewritten.encode("utf-8")
+def rewrite_location(headers: Iterable[Tuple[str, str]], prefix: str) -> List[Tuple[str, str]]:
+    """Arka ucun kök göreli `Location` başlığına önek ekle (ör. `202` iş adresi)."""
+    normalized_prefix = prefix.rstrip("/")
+    return [
+        (k, normalized_prefix + v if k.lower() == "location" and v.startswith("/") and not v.startswith("//") else v)
+        for k, v in headers
+    ]
 
 
 def strip_hop_headers(headers: Iterable[Tuple[str, str]]) -> List[Tuple[str, str]]:
@@ -104,24 +332,59 @@ def strip_hop_headers(headers: Iterable[Tuple[str, str]]) -> List[Tuple[str, str
     return [(k, v) for k, v in headers if k.lower() not in hop_by_hop]
 
 
-def make_handler(backends: List[Backend], landing_bytes: bytes):
+def iter_body(rfile: BinaryIO, length: int, chunk_size: int = PROXY_CHUNK_SIZE) -> Iterator[bytes]:
+    """İstemci gövdesini `length` bayta kadar parça parça oku."""
+    remaining = length
+    while remaining > 0:
+        chunk = rfile.read(min(chunk_size, remaining))
+        if not chunk:
+            raise ConnectionError("İstemci gövdesi eksik geldi")
+        remaining -= len(chunk)
+        yield chunk
+
+
+def relay_events(pool: ConnectionPool, conn: client.HTTPConnection, resp: client.HTTPResponse) -> Iterator[bytes]:
+    """Arka ucun olay akışını (SSE) geldikçe ilet; bitince bağlantıyı havuza bırak."""
+    try:
+        while True:
+            chunk = resp.read1(PROXY_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        pool.release(conn, resp)
+
+
+def front_static(path: str) -> Optional[Tuple[StaticFile, str]]:
+    """Ön sunucunun kendisi verdiği statik dosya (giriş görselleri, favicon) ve Cache-Control."""
+    local_asset = try_load_local_asset(path)
+    if local_asset:
+        return local_asset, CACHE_ASSET
+    asset = try_load_static(path)
+    if asset:
+        return asset, asset_cache_control(path)
+    return None
+
+
+def make_handler(backends: List[Backend], landing_bytes: bytes, mount: bool = False, managed: bool = True):
+    pools = {backend.name: ConnectionPool(backend.host, backend.port) for backend in backends}
+    loader = BackendLoader(backends, mount, managed)
+    landing_page = CachedBody(landing_bytes, "text/html; charset=utf-8")
+
     class UnifiedHandler(BaseHTTPRequestHandler):
         server_version = "CandlesUnified/1.0"
         sys_version = ""
+        # Kalıcı bağlantı ve chunked akış (`/dc`, SSE) için; her yanıt ya
+        # Content-Length ya da chunked çerçeve taşır
+        protocol_version = "HTTP/1.1"
+        backend_loader = loader
 
         def _add_security_headers(self) -> None:
-            self.send_header("X-Content-Type-Options", "nosniff")
-            self.send_header("X-Frame-Options", "DENY")
-            self.send_header("Referrer-Policy", "no-referrer")
-            self.send_header("Content-Security-Policy", "default-src 'self'; style-src 'self' 'unsafe-inline'")
+            for header, value in SECURITY_HEADERS:
+                self.send_header(header, value)
 
         def _serve_landing(self) -> None:
-            self.send_response(200)
-            self.send_header("Content-Type", "text/html; charset=utf-8")
-            self._add_security_headers()
-            self.send_header("Content-Length", str(len(landing_bytes)))
-            self.end_headers()
-            self.wfile.write(landing_bytes)
+            send_cached(self, landing_page, CACHE_PAGE, UnifiedHandler._add_security_headers)
 
         def _serve_health(self) -> None:
             payload = b"ok"
@@ -130,28 +393,26 @@ def make_handler(backends: List[Backend], landing_bytes: bytes):
             self._add_security_headers()
             self.send_header("Content-Length", str(len(payload)))
             self.end_headers()
-            self.wfile.write(payload)
-
-        def do_GET(self) -> None:  # noqa: N802
-            local_asset = try_load_local_asset(self.path)
-            if local_asset:
-                payload, content_type = local_asset
-                self.send_response(200)
-                self.send_header("Content-Type", content_type)
-                self._add_security_headers()
-                self.send_header("Content-Length", str(len(payload)))
-                self.end_headers()
+            if self.command != "HEAD":
                 self.wfile.write(payload)
-                return
 
-            asset = try_load_asset(self.path)
-            if asset:
-                payload, content_type = asset
-                self.send_response(200)
-                self.send_header("Content-Type", content_type)
-                self.send_header("Content-Length", str(len(payload)))
-                self.end_headers()
+        def _serve_ready(self) -> None:
+            """Arka uç başına hazır olma durumu; hepsi hazır değilse 503."""
+            states = loader.status()
+            ready = all(state == "ready" for state in states.values())
+            payload = json.dumps({"live": True, "ready": ready, "backends": states}).encode("utf-8")
+            self.send_response(200 if ready else 503)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self._add_security_headers()
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            if self.command != "HEAD":
                 self.wfile.write(payload)
+
+        def do_GET(self) -> None:  # noqa: N802
+            static = front_static(self.path)
+            if static:
+                send_file(self, *static, UnifiedHandler._add_security_headers)
                 return
             if self.path in {"/", "/index", "/index.html"}:
                 self._serve_landing()
@@ -159,19 +420,34 @@ def make_handler(backends: List[Backend], landing_bytes: bytes):
             if self.path == "/health":
                 self._serve_health()
                 return
-            for backend in backends:
-                matched, sub_path = backend.match(self.path)
-                if matched:
-                    self._proxy(backend, sub_path)
-                    return
-            self.send_error(404, "Not Found")
+            if self.path == "/health/ready":
+                self._serve_ready()
+                return
+            # Bağlı kipte tüm uygulamaların sayaçları bu süreçtedir
+            if serve_metrics(self, UnifiedHandler._add_security_headers):
+                return
+            self._route()
+
+        do_HEAD = do_GET
 
         def do_POST(self) -> None:  # noqa: N802
+            self._route()
+
+        def _route(self) -> None:
             for backend in backends:
                 matched, sub_path = backend.match(self.path)
-                if matched:
-                    self._proxy(backend, sub_path)
+                if not matched:
+                    continue
+                try:
+                    handler_cls = loader.ensure(backend)
+                except Exception:
+                    self.send_error(503, "Service Unavailable")
                     return
+                if handler_cls is not None:
+                    dispatch_mounted(self, handler_cls, backend.normalize_prefix(), sub_path)
+                else:
+                    self._proxy(backend, sub_path)
+                return
             self.send_error(404, "Not Found")
 
         def _proxy(self, backend: Backend, sub_path: str) -> None:
@@ -182,44 +458,142 @@ def make_handler(backends: List[Backend], landing_bytes: bytes):
                 self.send_header("Content-Type", "text/plain; charset=utf-8")
                 self._add_security_headers()
                 self.send_header("Content-Length", str(len(msg)))
+                # Gövde okunmadı: bağlantı sonraki istek için kullanılamaz
+                self.send_header("Connection", "close")
+                self.close_connection = True
                 self.end_headers()
                 self.wfile.write(msg)
                 return
-            body = self.rfile.read(content_length) if content_length > 0 else None
-
-            headers = {k: v for k, v in self.headers.items()}
+            body: RequestBody = None
+            if 0 < content_length <= PROXY_BUFFER_BYTES:
+                body = self.rfile.read(content_length)
+            elif content_length > 0:
+                body = iter_body(self.rfile, content_length)
+
+            headers = dict(strip_hop_headers(self.headers.items()))
+            # Arka uç düz yanıt versin: HTML önek için yeniden yazılır,
+            # sıkıştırma ön sunucuda yapılır
             headers.pop("Accept-Encoding", None)
             headers["Host"] = f"{backend.host}:{backend.port}"
-            headers["Connection"] = "close"
             if body is None:
                 headers.pop("Content-Length", None)
             else:
-                headers["Content-Length"] = str(len(body))
+                headers["Content-Length"] = str(content_length)
 
-            conn = client.HTTPConnection(backend.host, backend.port, timeout=15)
+            pool = pools[backend.name]
             try:
-                conn.request(self.command, sub_path, body=body, headers=headers)
-                resp = conn.getresponse()
-                status = resp.status
-                reason = resp.reason
-                resp_body = resp.read()
-                resp_headers = strip_hop_headers(resp.getheaders())
+                conn, resp = pool.request(self.command, sub_path, body, headers)
+            except (OSError, client.HTTPException):
+                self.send_error(502, "Bad Gateway")
+                return
+            try:
+                resp_headers = rewrite_location(strip_hop_headers(resp.getheaders()), backend.normalize_prefix())
                 content_type = next((v for k, v in resp_headers if k.lower() == "content-type"), "")
-                proxied_body = resp_body
-                if "text/html" in content_type:
-                    proxied_body = rewrite_html_paths(resp_body, backend.normalize_prefix())
-                self.send_response(status, reason)
-                for header, value in resp_headers:
-                    if header.lower() == "content-length":
-                        continue
-                    self.send_header(header, value)
-                # add our security headers on top of proxied response
-                self._add_security_headers()
-                self.send_header("Content-Length", str(len(proxied_body)))
-                self.end_headers()
-                self.wfile.write(proxied_body)
-            finally:
+                html = "text/html" in content_type and self.command != "HEAD"
+                if (
+                    content_type.startswith("text/event-stream")
+                    and resp.status == 200
+                    and resp.length is None
+                    and hand_off(self, relay_events(pool, conn, resp), resp_headers, UnifiedHandler._add_security_headers)
+                ):
+                    # Açık uçlu akış ön sunucunun istek havuzunu tutmaz; bağlantı
+                    # akış bitince havuza döner
+                    return
+                if html and resp.length is not None and resp.length <= PROXY_BUFFER_BYTES:
+                    # Küçük HTML tamponlanır: bağlantılar önek ile yeniden yazılmalı
+                    proxied_body = rewrite_html_paths(resp.read(), backend.normalize_prefix())
+                    self._send_proxied_headers(resp, resp_headers, len(proxied_body))
+                    self.wfile.write(proxied_body)
+                else:
+                    rewriter = HtmlPathRewriter(backend.normalize_prefix()) if html else None
+                    self._stream_response(resp, resp_headers, content_type, rewriter)
+            except Exception:
                 conn.close()
+                raise
+            pool.release(conn, resp)
+
+        def _send_proxied_headers(
+            self,
+            resp: client.HTTPResponse,
+            resp_headers: List[Tuple[str, str]],
+            length: int | None,
+            extra: Iterable[Tuple[str, str]] = (),
+        ) -> None:
+            self.send_response(resp.status, resp.reason)
+            for header, value in resp_headers:
+                if header.lower() == "content-length":
+                    continue
+                self.send_header(header, value)
+            # add our security headers on top of proxied response
+            self._add_security_headers()
+            for header, value in extra:
+                self.send_header(header, value)
+            if length is not None:
+                self.send_header("Content-Length", str(length))
+            self.end_headers()
+
+        def _stream_response(
+            self,
+            resp: client.HTTPResponse,
+            resp_headers: List[Tuple[str, str]],
+            content_type: str,
+            rewriter: Optional[HtmlPathRewriter] = None,
+        ) -> None:
+            """Yanıtı geldikçe parça parça aktar (CSV, ZIP, büyük HTML, `/dc`, SSE).
+
+            Uzunluğu bilinmeyen ya da yeniden yazılan gövde HTTP/1.1 istemcisine
+            chunked, HTTP/1.0'a bağlantı kapanışıyla biten gövde olarak gider;
+            metinse burada akış halinde gzip'lenir.
+            """
+            length = resp.length
+            if resp.status in (204, 304) or self.command == "HEAD":
+                # Gövdesiz yanıt: Content-Length eklenmez, bağlantı açık kalır
+                self._send_proxied_headers(resp, resp_headers, None)
+                return
+            extra: List[Tuple[str, str]] = []
+            gzip = None
+            chunked = False
+            if rewriter is not None or length is None:
+                length = None
+                chunked = self.request_version != "HTTP/1.0"
+                if (
+                    compressible_type(content_type)
+                    and not content_type.startswith("text/event-stream")
+                    and not resp.getheader("Content-Encoding")
+                    and accepts_gzip(self.headers.get("Accept-Encoding"))
+                ):
+                    resp_headers = [(k, weak_etag(v) if k.lower() == "etag" else v) for k, v in resp_headers]
+                    extra.append(("Content-Encoding", "gzip"))
+                    gzip = GzipStream(chunked)
+                if chunked:
+                    extra.append(("Transfer-Encoding", "chunked"))
+                else:
+                    extra.append(("Connection", "close"))
+                    self.close_connection = True
+            self._send_proxied_headers(resp, resp_headers, length, extra)
+
+            def emit(data: bytes) -> None:
+                if data:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data) if chunked else data)
+
+            while True:
+                # Gelen kadarını hemen ilet (olay akışı parçaları beklemesin)
+                chunk = resp.read1(PROXY_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if rewriter is not None:
+                    chunk = rewriter.feed(chunk)
+                if gzip is not None:
+                    self.wfile.write(gzip.compress(chunk, flush=True))
+                else:
+                    emit(chunk)
+            tail = rewriter.close() if rewriter is not None else b""
+            if gzip is not None:
+                self.wfile.write(gzip.compress(tail) + gzip.finish())
+            else:
+                emit(tail)
+                if chunked:
+                    self.wfile.write(b"0\r\n\r\n")
 
         def log_message(self, format: str, *args) -> None:  # noqa: A003
             pass
@@ -227,11 +601,39 @@ def make_handler(backends: List[Backend], landing_bytes: bytes):
     return UnifiedHandler
 
 
-def start_backend_thread(name: str, target, host: str, port: int) -> threading.Thread:
-    thread = threading.Thread(target=target, args=(host, port), name=f"{name}-server", daemon=True)
-    thread.start()
-    wait_for_port(host, port)
-    return thread
+def build_backends(
+    backend_host: str = "127.0.0.1",
+    app48_port: int = 9200,
+    app72_port: int = 9201,
+    app80_port: int = 9202,
+    app90_port: int = 9207,
+    app96_port: int = 9206,
+    app120_port: int = 9203,
+    app321_port: int = 9204,
+    calendar_port: int = 9205,
+) -> List[Backend]:
+    return [
+        Backend(name="app48", title="app48", host=backend_host, port=app48_port, prefix="/app48", description="48 dakikalık mum sayımı ve dönüştürücü", module="app48.web", handler_name="AppHandler"),
+        Backend(name="app72", title="app72", host=backend_host, port=app72_port, prefix="/app72", description="72 dakikalık sayım ve 12→72 dönüştürücü (7x12m)", module="app72.web", handler_name="App72Handler"),
+        Backend(name="app80", title="app80", host=backend_host, port=app80_port, prefix="/app80", description="80 dakikalık sayım ve 20→80 dönüştürücü (4x20m)", module="app80.web", handler_name="App80Handler"),
+        Backend(name="app90", title="app90", host=backend_host, port=app90_port, prefix="/app90", description="90 dakikalık sayım ve 30→90 dönüştürücü (3x30m)", module="app90.web", handler_name="App90Handler"),
+        Backend(name="app96", title="app96", host=backend_host, port=app96_port, prefix="/app96", description="96 dakikalık sayım ve 12→96 dönüştürücü (8x12m)", module="app96.web", handler_name="App96Handler"),
+        Backend(name="app120", title="app120", host=backend_host, port=app120_port, prefix="/app120", description="120 dakikalık analiz ve dönüştürücü", module="app120.web", handler_name="App120Handler"),
+        Backend(name="app321", title="app321", host=backend_host, port=app321_port, prefix="/app321", description="60 dakikalık sayım araçları", module="app321.web", handler_name="AppHandler"),
+        Backend(name="calendar_md", title="Takvim Dönüştürücü", host=backend_host, port=calendar_port, prefix="/calendar", description="Takvim markdown → JSON dönüştürücü", module="calendar_md.web", handler_name="CalendarHandler"),
+    ]
+
+
+def build_landing(backends: List[Backend]) -> bytes:
+    app_links = {
+        backend.name: {
+            "title": backend.title,
+            "url": backend.normalize_prefix() + "/",
+            "description": backend.description,
+        }
+        for backend in backends
+    }
+    return build_html(app_links)
 
 
 def run(
@@ -246,47 +648,100 @@ def run(
     app120_port: int,
     app321_port: int,
     calendar_port: int,
+    mode: str = "mount",
+    server: str = "threaded",
+    processes: int = 1,
+    warmup: bool = False,
 ) -> None:
-    backends = [
-        Backend(name="app48", title="app48", host=backend_host, port=app48_port, prefix="/app48", description="48 dakikalık mum sayımı ve dönüştürücü"),
-        Backend(name="app72", title="app72", host=backend_host, port=app72_port, prefix="/app72", description="72 dakikalık sayım ve 12→72 dönüştürücü (7x12m)"),
-        Backend(name="app80", title="app80", host=backend_host, port=app80_port, prefix="/app80", description="80 dakikalık sayım ve 20→80 dönüştürücü (4x20m)"),
-        Backend(name="app90", title="app90", host=backend_host, port=app90_port, prefix="/app90", description="90 dakikalık sayım ve 30→90 dönüştürücü (3x30m)"),
-        Backend(name="app96", title="app96", host=backend_host, port=app96_port, prefix="/app96", description="96 dakikalık sayım ve 12→96 dönüştürücü (8x12m)"),
-        Backend(name="app120", title="app120", host=backend_host, port=app120_port, prefix="/app120", description="120 dakikalık analiz ve dönüştürücü"),
-        Backend(name="app321", title="app321", host=backend_host, port=app321_port, prefix="/app321", description="60 dakikalık sayım araçları"),
-        Backend(name="calendar_md", title="Takvim Dönüştürücü", host=backend_host, port=calendar_port, prefix="/calendar", description="Takvim markdown → JSON dönüştürücü"),
-    ]
+    backends = build_backends(
+        backend_host,
+        app48_port,
+        app72_port,
+        app80_port,
+        app90_port,
+        app96_port,
+        app120_port,
+        app321_port,
+        calendar_port,
+    )
 
-    start_backend_thread("app48", run_app48, backend_host, app48_port)
-    start_backend_thread("app72", run_app72, backend_host, app72_port)
-    start_backend_thread("app80", run_app80, backend_host, app80_port)
-    start_backend_thread("app90", run_app90, backend_host, app90_port)
-    start_backend_thread("app96", run_app96, backend_host, app96_port)
-    start_backend_thread("app120", run_app120, backend_host, app120_port)
-    start_backend_thread("app321", run_app321, backend_host, app321_port)
-    start_backend_thread("calendar", run_calendar, backend_host, calendar_port)
+    if processes > 1:
+        specs = []
+        managed = mode != "proxy"
+        if not managed:
+            # Her uygulama kendi sürecinde (ve çekirdeğinde) çalışır
+            specs += [(backend.name, run_backend, (backend,)) for backend in backends]
+        specs += [(f"web-{index + 1}", serve_front, (host, port, backends, mode, server, warmup, managed)) for index in range(processes)]
+        print(f"appsuite web ({mode}, {server}, {processes} süreç): http://{host}:{port}/")
+        from supervisor import Supervisor
 
-    app_links = {
-        backend.name: {
-            "title": backend.title,
-            "url": backend.normalize_prefix() + "/",
-            "description": backend.description,
-        }
-        for backend in backends
-    }
-    landing_bytes = build_html(app_links)
+        Supervisor(specs).run()
+        return
 
-    handler_cls = make_handler(backends, landing_bytes)
-    server = HTTPServer((host, port), handler_cls)
-    print(f"appsuite web: http://{host}:{port}/")
-    server.serve_forever()
+    print(f"appsuite web ({mode}, {server}): http://{host}:{port}/")
+    serve_front(host, port, backends, mode, server, warmup)
+
+
+def serve_front(
+    host: str,
+    port: int,
+    backends: List[Backend],
+    mode: str,
+    server: str,
+    warmup: bool = False,
+    managed: bool = True,
+) -> None:
+    """Birleşik ön sunucuyu çalıştır (tek süreçte ya da denetlenen işçide).
+
+    Port hemen açılır; uygulamalar ilk isteklerinde yüklenir, `warmup` ise
+    hepsi arka planda paralel hazırlanır.
+    """
+    handler_cls = make_handler(backends, build_landing(backends), mount=mode == "mount", managed=managed)
+    if server == "asyncio":
+        from .async_server import run_async
+
+        if warmup:
+            handler_cls.backend_loader.warm_up()
+        run_async(host, port, handler_cls, backends, mount=mode == "mount")
+        return
+    httpd = make_server(host, port, handler_cls)
+    if warmup:
+        handler_cls.backend_loader.warm_up()
+    serve(httpd)
+
+
+def _build_wsgi_app():
+    backends = build_backends()
+    return make_wsgi_app(make_handler(backends, build_landing(backends), mount=True))
+
+
+# gunicorn appsuite.web:wsgi_app — birleşik sunucunun mount kipiyle aynı yanıtlar
+wsgi_app = _build_wsgi_app()
 
 
 def main(argv: List[str] | None = None) -> int:
     parser = argparse.ArgumentParser(prog="appsuite.web", description="Tüm uygulamalar için birleşik web sunucusu")
     parser.add_argument("--host", default="0.0.0.0", help="Genel sunucu adresi (vars: 0.0.0.0)")
     parser.add_argument("--port", type=int, default=2000, help="Genel port (vars: 2000)")
+    parser.add_argument(
+        "--mode",
+        choices=("mount", "proxy"),
+        default="mount",
+        help="mount: uygulamalar aynı süreçte öneklerle doğrudan çalışır; proxy: iç portlarda ayrı sunucular + reverse proxy (vars: mount)",
+    )
+    parser.add_argument(
+        "--server",
+        choices=("threaded", "asyncio"),
+        default="threaded",
+        help="threaded: iş parçacığı havuzlu sunucu; asyncio: bağlantıları olay döngüsünde tutan ön sunucu (vars: threaded)",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="Aynı portu SO_REUSEPORT ile paylaşan işçi süreç sayısı; proxy kipinde her uygulama da ayrı süreçte çalışır. SIGHUP kesintisiz yeniden başlatır (vars: 1)",
+    )
+    parser.add_argument("--warmup", action="store_true", help="Uygulamaları ilk isteği beklemeden arka planda paralel yükle/başlat")
     parser.add_argument("--backend-host", default="127.0.0.1", help="İç servislerin dinleyeceği adres (vars: 127.0.0.1)")
     parser.add_argument("--app48-port", type=int, default=9200, help="app48 iç portu")
     parser.add_argument("--app72-port", type=int, default=9201, help="app72 iç portu")
@@ -296,7 +751,31 @@ def main(argv: List[str] | None = None) -> int:
     parser.add_argument("--app120-port", type=int, default=9203, help="app120 iç portu")
     parser.add_argument("--app321-port", type=int, default=9204, help="app321 iç portu")
     parser.add_argument("--calendar-port", type=int, default=9205, help="Takvim dönüştürücü iç portu")
+    parser.add_argument("--pattern-workers", type=int, default=0, help="Örüntü bölümleri için işçi süreç sayısı (vars: 0 = istek içinde)")
+    parser.add_argument("--pattern-budget", type=float, default=None, help="Örüntü üretimi için saniye sınırı; aşılırsa kısmi sonuç döner")
+    parser.add_argument("--pattern-max-lines", type=int, default=None, help="Her ilk değer için yazılacak en fazla örüntü satırı (vars: 0 = sınırsız)")
+    parser.add_argument("--pattern-memo-mb", type=float, default=None, help="Örüntü önbelleği için bellek bütçesi (MB, vars: 64; 0 = kapalı)")
+    parser.add_argument("--session-ttl", type=float, default=None, help="IOU oturumlarının geçerlilik süresi (saniye, vars: 21600)")
+    parser.add_argument("--session-dir", default=None, help="IOU oturumlarını diskte de sakla (dizin yolu)")
+    parser.add_argument("--job-workers", type=int, default=None, help="Arka plan işlerini çalıştıran iş parçacığı sayısı (vars: 2)")
+    parser.add_argument("--job-ttl", type=float, default=None, help="Biten arka plan işlerinin sonuçlarının saklanma süresi (saniye, vars: 3600)")
+    parser.add_argument("--job-dir", default=None, help="Arka plan işlerini diskte de sakla (dizin yolu)")
+    parser.add_argument("--max-inflight", type=int, default=None, help="Uygulama başına aynı anda çalışan en fazla IOU/matrix/converter hesabı (vars: 2)")
+    parser.add_argument("--max-upload-mb", type=float, default=None, help="Uygulama başına çalışan hesapların yüklemeleri için toplam bellek sınırı (MB, vars: 128)")
+    parser.add_argument("--admission-queue", type=int, default=None, help="Uygulama başına hesap için sırada bekleyen en fazla istek; aşılırsa 503 (vars: 8)")
+    parser.add_argument("--admission-wait", type=float, default=None, help="Sırada beklenen en uzun süre; aşılırsa 503 (saniye, vars: 10)")
+    parser.add_argument("--workers", type=int, default=None, help="Her sunucu için istek işleyen iş parçacığı sayısı (vars: 8)")
+    parser.add_argument("--queue-limit", type=int, default=None, help="Her sunucu için işlenen + bekleyen en fazla istek; aşılırsa 503 (vars: 32)")
+    parser.add_argument("--cpu-workers", type=int, default=None, help="Uygulama POST isteklerini işleyen süreç sayısı (vars: 0 = iş parçacığında)")
     args = parser.parse_args(argv)
+    configure_search(args.pattern_workers, args.pattern_budget, args.pattern_max_lines)
+    if args.pattern_memo_mb is not None:
+        configure_memo(max_bytes=int(args.pattern_memo_mb * 1024 * 1024))
+    configure_sessions(args.session_ttl, args.session_dir)
+    configure_jobs(args.job_workers, args.job_ttl, args.job_dir)
+    max_upload_bytes = int(args.max_upload_mb * 1024 * 1024) if args.max_upload_mb is not None else None
+    configure_admission(args.max_inflight, max_upload_bytes, args.admission_queue, args.admission_wait)
+    configure_server(args.workers, args.queue_limit, args.cpu_workers)
 
     run(
         args.host,
@@ -310,6 +789,10 @@ def main(argv: List[str] | None = None) -> int:
         args.app120_port,
         args.app321_port,
         args.calendar_port,
+        args.mode,
+        args.server,
+        args.processes,
+        args.warmup,
     )
     return 0
 
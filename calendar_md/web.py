@@ -4,15 +4,14 @@ import argparse
 import html
 import io
 import json
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from http.server import BaseHTTPRequestHandler
 from dataclasses import dataclass
-from email.parser import BytesParser
-from email.policy import default as email_default
 from typing import Dict, List, Optional, Tuple
 from urllib.parse import parse_qs
-from zipfile import ZipFile, ZIP_DEFLATED
 
-from favicon import render_head_links, try_load_asset
+from favicon import render_head_links, try_load_static
+from http_cache import CACHE_PAGE, asset_cache_control, cached_page, send_cached, send_file
+from serving import configure_server, make_server, make_wsgi_app, serve
 
 from .parser import parse_calendar_markdown, to_json_document
 
@@ -167,6 +166,9 @@ def parse_form(body: bytes, content_type: str, headers) -> Tuple[Dict[str, str],
         return {}, {}
     lower_ctype = content_type.lower()
     if "multipart/form-data" in lower_ctype:
+        from email.parser import BytesParser
+        from email.policy import default as email_default
+
         parser = BytesParser(policy=email_default)
         message = parser.parsebytes(b"Content-Type: " + content_type.encode("utf-8") + b"\n\n" + body)
         fields_multi: Dict[str, List[str]] = {}
@@ -215,6 +217,7 @@ def _sanitize_filename(name: str) -> str:
 class CalendarHandler(BaseHTTPRequestHandler):
     server_version = "CalendarMD/1.0"
     sys_version = ""
+    protocol_version = "HTTP/1.1"
     form_defaults = {
         "markdown": "",
         "year": "2025",
@@ -224,39 +227,37 @@ class CalendarHandler(BaseHTTPRequestHandler):
     }
 
     def do_GET(self) -> None:  # noqa: N802
-        asset = try_load_asset(self.path)
+        asset = try_load_static(self.path)
         if asset:
-            payload, content_type = asset
-            self.send_response(200)
-            self.send_header("Content-Type", content_type)
-            self.send_header("Content-Length", str(len(payload)))
-            self.end_headers()
-            self.wfile.write(payload)
+            send_file(self, asset, asset_cache_control(self.path))
             return
 
         if self.path in {"/", "/index", "/index.html"}:
-            self.send_response(200)
-            self.send_header("Content-Type", "text/html; charset=utf-8")
-            _add_security_headers(self)
-            self.end_headers()
-            self.wfile.write(render_form())
+            send_cached(self, cached_page(render_form), CACHE_PAGE, _add_security_headers)
         elif self.path == "/health":
+            payload = b"ok"
             self.send_response(200)
             self.send_header("Content-Type", "text/plain; charset=utf-8")
             _add_security_headers(self)
+            self.send_header("Content-Length", str(len(payload)))
             self.end_headers()
-            self.wfile.write(b"ok")
+            self.wfile.write(payload)
         else:
             self.send_error(404, "Not Found")
 
+    do_HEAD = do_GET
+
     def do_POST(self) -> None:  # noqa: N802
         length = int(self.headers.get("Content-Length", "0"))
         if length > MAX_UPLOAD_BYTES:
+            body = b"Upload too large (max 50 MB)."
             self.send_response(413)
             self.send_header("Content-Type", "text/plain; charset=utf-8")
             _add_security_headers(self)
+            self.send_header("Connection", "close")
+            self.send_header("Content-Length", str(len(body)))
             self.end_headers()
-            self.wfile.write(b"Upload too large (max 50 MB).")
+            self.wfile.write(body)
             return
         content_type = self.headers.get("Content-Type", "")
         payload = self.rfile.read(length) if length > 0 else b""
@@ -266,11 +267,14 @@ class CalendarHandler(BaseHTTPRequestHandler):
 
         file_items = file_data.get("markdown_file") or []
         if len(file_items) > MAX_FILES:
+            body = b"Too many files (max 25)."
             self.send_response(413)
             self.send_header("Content-Type", "text/plain; charset=utf-8")
             _add_security_headers(self)
+            self.send_header("Connection", "close")
+            self.send_header("Content-Length", str(len(body)))
             self.end_headers()
-            self.wfile.write(b"Too many files (max 25).")
+            self.wfile.write(body)
             return
         outputs: List[Tuple[str, bytes]] = []
 
@@ -309,6 +313,8 @@ class CalendarHandler(BaseHTTPRequestHandler):
                     self.wfile.write(result_bytes)
                     return
 
+                from zipfile import ZIP_DEFLATED, ZipFile
+
                 buffer = io.BytesIO()
                 with ZipFile(buffer, "w", ZIP_DEFLATED) as zf:
                     for name, data in outputs:
@@ -347,29 +353,32 @@ class CalendarHandler(BaseHTTPRequestHandler):
             self.end_headers()
             self.wfile.write(result_bytes)
         except Exception as exc:  # noqa: BLE001
+            body = render_form(
+                markdown,
+                error=str(exc),
+                year=year,
+                timezone=timezone,
+                source=source,
+                filename=filename,
+            )
             self.send_response(200)
             self.send_header("Content-Type", "text/html; charset=utf-8")
             _add_security_headers(self)
+            self.send_header("Content-Length", str(len(body)))
             self.end_headers()
-            self.wfile.write(
-                render_form(
-                    markdown,
-                    error=str(exc),
-                    year=year,
-                    timezone=timezone,
-                    source=source,
-                    filename=filename,
-                )
-            )
+            self.wfile.write(body)
 
     def log_message(self, format, *args):  # noqa: A003
         pass
 
 
+wsgi_app = make_wsgi_app(CalendarHandler)
+
+
 def run(host: str, port: int) -> None:
-    server = HTTPServer((host, port), CalendarHandler)
+    server = make_server(host, port, CalendarHandler)
     print(f"calendar_md web: http://{host}:{port}/")
-    server.serve_forever()
+    serve(server)
 
 
 def main(argv: Optional[list[str]] = None) -> int:
@@ -379,7 +388,11 @@ def main(argv: Optional[list[str]] = None) -> int:
     )
     parser.add_argument("--host", default="127.0.0.1", help="Sunucu adresi")
     parser.add_argument("--port", type=int, default=2300, help="Port (varsayılan 2300)")
+    parser.add_argument("--workers", type=int, default=None, help="İstek işleyen iş parçacığı sayısı (vars: 8)")
+    parser.add_argument("--queue-limit", type=int, default=None, help="İşlenen + bekleyen en fazla istek; aşılırsa 503 (vars: 32)")
+    parser.add_argument("--cpu-workers", type=int, default=None, help="POST isteklerini işleyen süreç sayısı (vars: 0 = iş parçacığında)")
     args = parser.parse_args(argv)
+    configure_server(args.workers, args.queue_limit, args.cpu_workers)
 
     run(args.host, args.port)
     return 0
@@ -0,0 +1,283 @@
+"""Yanıt gövdeleri için `Accept-Encoding` ile anlaşmalı gzip sıkıştırma.
+
+Sonuç sayfaları (IOU, DC tabloları, birikmiş önceki sonuçlar), CSV
+çıktıları ve JSON düz metindir ve birkaç kat küçülür. Sıkıştırma tek yerde
+yapılır: `serving` işleyici sınıflarının `wfile`'ını `ResponseCompressor`
+ile sarar, böylece uygulamalar yanıtlarını eskisi gibi yazar. ZIP ve
+görseller zaten sıkıştırılmış olduğundan türüne bakılarak atlanır; çok
+küçük gövdeler (`COMPRESS_MIN_BYTES`) de olduğu gibi gider.
+
+`COMPRESS_BUFFER_BYTES`'a kadar olan gövdeler bir kerede sıkıştırılıp
+`Content-Length` ile gönderilir; daha büyükleri bellekte biriktirilmeden
+`GzipStream` ile yazıldıkça sıkıştırılır (HTTP/1.1'de chunked, aksi halde
+bağlantı kapanışıyla biten gövde).
+"""
+
+from __future__ import annotations
+
+import io
+import zlib
+from typing import Callable, List, Optional
+
+# Bu boyutun altındaki gövdeler sıkıştırılmaz (başlık maliyeti kazancı aşar)
+COMPRESS_MIN_BYTES = 1024
+# Bu boyuta kadar gövdeler tamponlanıp tek seferde sıkıştırılır (uzunluk
+# bilinir); büyükleri akış halinde sıkıştırılır
+COMPRESS_BUFFER_BYTES = 64 * 1024
+# zlib düzeyi (1 hızlı … 9 küçük)
+COMPRESS_LEVEL = 6
+
+# Sıkıştırılan içerik türleri (önek eşleşmesi)
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/manifest+json",
+    "image/svg+xml",
+)
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """İstemci gzip kabul ediyor mu (`q=0` reddetmek demektir)."""
+    if not accept_encoding:
+        return False
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        if coding.strip().lower() not in ("gzip", "x-gzip", "*"):
+            continue
+        q = params.strip()
+        if q.lower().startswith("q="):
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def compressible_type(content_type: str) -> bool:
+    content_type = content_type.lower()
+    return any(content_type.startswith(prefix) for prefix in COMPRESSIBLE_TYPES)
+
+
+def is_compressible(content_type: str, length: Optional[int]) -> bool:
+    """Bu tür ve uzunluktaki gövde sıkıştırılmaya değer mi."""
+    if length is None or length < COMPRESS_MIN_BYTES:
+        return False
+    return compressible_type(content_type)
+
+
+def gzip_bytes(data: bytes) -> bytes:
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def weak_etag(etag: str) -> str:
+    """Sıkıştırılmış gösterim baytça farklıdır; güçlü ETag zayıflatılır."""
+    return etag if etag.startswith("W/") else "W/" + etag
+
+
+def gzip_head_lines(lines: List[bytes]) -> List[bytes]:
+    """Düz yanıtın başlık satırlarını gzip gösterimine uyarla.
+
+    `Content-Length` çıkarılır (çağıran yenisini ya da çerçeveyi ekler),
+    ETag zayıflatılır, `Content-Encoding: gzip` eklenir.
+    """
+    out = []
+    for line in lines:
+        name, _, value = line.partition(b":")
+        lowered = name.strip().lower()
+        if lowered == b"content-length":
+            continue
+        if lowered == b"etag":
+            line = b"ETag: " + weak_etag(value.strip().decode("latin-1")).encode("latin-1")
+        out.append(line)
+    out.append(b"Content-Encoding: gzip")
+    return out
+
+
+class GzipStream:
+    """Gövdeyi parça parça gzip'ler; `chunked` ise çıktıyı chunked çerçeveler."""
+
+    def __init__(self, chunked: bool) -> None:
+        self._compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 31)
+        self._chunked = chunked
+
+    def _frame(self, data: bytes) -> bytes:
+        if not data or not self._chunked:
+            return data
+        return b"%x\r\n%s\r\n" % (len(data), data)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        """`flush` ise o ana kadarki veri hemen çıkar (akış parçaları beklemesin)."""
+        out = self._compressor.compress(data)
+        if flush:
+            out += self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        return self._frame(out)
+
+    def finish(self) -> bytes:
+        return self._frame(self._compressor.flush()) + (b"0\r\n\r\n" if self._chunked else b"")
+
+
+class ResponseCompressor:
+    """Tek bir isteğin yanıt baytlarını süzen yazıcı.
+
+    Başlık bloğu tamamlanınca karar verilir: türü uygun, uzunluğu bilinen ve
+    henüz kodlanmamış gövde gzip'lenir; diğer her şey olduğu gibi geçer.
+    Küçük gövde tamponlanır, büyüğü geldikçe sıkıştırılır: `chunked` verilmişse
+    (iki uç da HTTP/1.1) chunked çerçeveyle, verilmemişse bağlantı kapanışıyla
+    biten gövdeyle; bu durumda `close_delimited` olur ve çağıran bağlantıyı
+    kapatır. Ara `1xx` yanıtları araya girmeden iletilir. `HEAD` isteğinde
+    başlıklardan sonra yazılan gövde atılır.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[bytes], object],
+        accept_encoding: Optional[str],
+        head_only: bool = False,
+        chunked: bool = False,
+    ) -> None:
+        self._write = write
+        self._gzip = accepts_gzip(accept_encoding)
+        self._head_only = head_only
+        self._chunked = chunked
+        self._head = bytearray()
+        self._lines: List[bytes] = []
+        self._body: Optional[bytearray] = None
+        self._stream: Optional[GzipStream] = None
+        self._length = 0
+        self._passthrough = False
+        self._discard = False
+        self.close_delimited = False
+        self.closed = False
+
+    @property
+    def buffering(self) -> bool:
+        """Gövde sıkıştırıcıdan geçiyor mu (doğrudan sokete yazılmamalı)."""
+        return self._body is not None or self._stream is not None
+
+    def write(self, data: bytes) -> int:
+        if self._discard:
+            pass
+        elif self._passthrough:
+            self._write(data)
+        elif self._stream is not None:
+            self._feed(data)
+        elif self._body is not None:
+            self._body += data
+            if len(self._body) >= self._length:
+                self._finish()
+        else:
+            self._head += data
+            while not self._passthrough and self._body is None:
+                end = self._head.find(b"\r\n\r\n")
+                if end < 0:
+                    break
+                head, rest = bytes(self._head[: end + 4]), bytes(self._head[end + 4 :])
+                self._head = bytearray()
+                if head[9:10] == b"1":
+                    # 100 Continue vb.: asıl yanıt arkadan gelir
+                    self._write(head)
+                    self._head += rest
+                    continue
+                self._start(head, rest)
+        return len(data)
+
+    def _start(self, head: bytes, rest: bytes) -> None:
+        lines = head[:-4].split(b"\r\n")
+        status = lines[0][9:12]
+        fields = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(b":")
+            fields[name.strip().lower().decode("latin-1")] = value.strip().decode("latin-1")
+        try:
+            length: Optional[int] = int(fields["content-length"])
+        except (KeyError, ValueError):
+            length = None
+        content_type = fields.get("content-type", "")
+        candidate = (
+            status not in (b"204", b"206", b"304")
+            and "content-encoding" not in fields
+            and is_compressible(content_type, length)
+        )
+        if candidate and "vary" not in fields:
+            # Önbellekler sıkıştırılmış ve düz gösterimi ayrı tutsun
+            lines.append(b"Vary: Accept-Encoding")
+        if self._head_only:
+            self._discard = True
+            self._write(b"\r\n".join(lines) + b"\r\n\r\n")
+            return
+        if not candidate or not self._gzip:
+            self._passthrough = True
+            self._write(b"\r\n".join(lines) + b"\r\n\r\n" + rest)
+            return
+        self._lines = lines
+        self._length = length or 0
+        if self._length > COMPRESS_BUFFER_BYTES:
+            lines = gzip_head_lines(lines)
+            if self._chunked:
+                lines.append(b"Transfer-Encoding: chunked")
+            else:
+                lines = [line for line in lines if not line.lower().startswith(b"connection:")]
+                lines.append(b"Connection: close")
+                self.close_delimited = True
+            self._stream = GzipStream(self._chunked)
+            self._write(b"\r\n".join(lines) + b"\r\n\r\n")
+            self._feed(rest)
+            return
+        self._body = bytearray(rest)
+        if len(self._body) >= self._length:
+            self._finish()
+
+    def _feed(self, data: bytes) -> None:
+        stream = self._stream
+        assert stream is not None
+        part, extra = data[: self._length], data[self._length :]
+        self._length -= len(part)
+        out = stream.compress(part)
+        if not self._length:
+            out += stream.finish()
+            self._stream = None
+            self._passthrough = True
+            out += extra
+        if out:
+            self._write(out)
+
+    def _finish(self) -> None:
+        body = bytes(self._body or b"")
+        data, extra = gzip_bytes(body[: self._length]), body[self._length :]
+        lines = gzip_head_lines(self._lines)
+        lines.append(b"Content-Length: " + str(len(data)).encode("ascii"))
+        self._body = None
+        self._passthrough = True
+        self._write(b"\r\n".join(lines) + b"\r\n\r\n" + data + extra)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        """Yarım kalan yanıtı (işleyici hatası) olduğu gibi gönder."""
+        if self.closed:
+            return
+        self.closed = True
+        if self._stream is not None:
+            # Akış eksik kaldı: sonlandırılmaz, istemci yarım gövde görür
+            self._stream = None
+            self.close_delimited = True
+        elif self._body is not None:
+            self._passthrough = True
+            self._write(b"\r\n".join(self._lines) + b"\r\n\r\n" + bytes(self._body))
+            self._body = None
+        elif self._head:
+            self._write(bytes(self._head))
+            self._head = bytearray()
+
+
+def compress_response(raw: bytes, accept_encoding: Optional[str], head_only: bool = False) -> bytes:
+    """Tam bir ham HTTP yanıtını `ResponseCompressor`'dan geçir."""
+    out = io.BytesIO()
+    compressor = ResponseCompressor(out.write, accept_encoding, head_only)
+    compressor.write(raw)
+    compressor.close()
+    return out.getvalue()
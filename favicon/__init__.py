@@ -4,7 +4,9 @@ from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Tuple
 
-__all__ = ("FAVICON_PATHS", "render_head_links", "load_asset", "try_load_asset")
+from http_cache import StaticFile
+
+__all__ = ("FAVICON_PATHS", "render_head_links", "load_asset", "try_load_asset", "try_load_static")
 
 _PACKAGE_DIR = Path(__file__).resolve().parent
 
@@ -43,7 +45,6 @@ def _normalize_path(path: str) -> str:
     return root
 
 
-@lru_cache(maxsize=None)
 def load_asset(path: str) -> Tuple[bytes, str]:
     normalized = _normalize_path(path)
     try:
@@ -59,3 +60,17 @@ def try_load_asset(path: str) -> Optional[Tuple[bytes, str]]:
     if normalized not in _ASSET_META:
         return None
     return load_asset(normalized)
+
+
+@lru_cache(maxsize=None)
+def _static_asset(normalized: str) -> StaticFile:
+    filename, content_type = _ASSET_META[normalized]
+    return StaticFile(_PACKAGE_DIR / filename, content_type)
+
+
+def try_load_static(path: str) -> Optional[StaticFile]:
+    """Favicon yolunu diske bağla; içerik okunmaz (`http_cache.send_file` ile gönderilir)."""
+    normalized = _normalize_path(path)
+    if normalized not in _ASSET_META:
+        return None
+    return _static_asset(normalized)
@@ -0,0 +1,254 @@
+"""Statik yanıtlar için HTTP önbellek doğrulayıcıları.
+
+Favicon varlıkları, giriş sayfası görselleri ve formlu GET sayfaları
+değişmeyen baytlardır: içerik özetinden bir kez `ETag` üretilir, istemci
+aynı `If-None-Match` ile gelirse gövde gönderilmeden `304` döner.
+Sürümlü (`?v=1`) favicon adresleri bir yıl, diğer varlıklar bir gün
+önbellekte kalır; sayfalar her seferinde doğrulanır (`no-cache`). Metin
+türündeki gövdelerin gzip'li hali ilk istendiğinde bir kez üretilip
+saklanır.
+
+Görseller ve favicon dosyaları (`StaticFile`) bellekte tutulmaz: her
+istekte diskten açılır, gövde `sendfile` ile doğrudan sokete gider. Tek
+`Range` aralığı (`206`) ve `HEAD` desteklenir.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import socket
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from compression import accepts_gzip, gzip_bytes, is_compressible, weak_etag
+from serving import url_for
+
+# Sürümlü adresler: içerik değişirse adres (`?v=`) de değişir
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+# Sürümsüz statik varlıklar
+CACHE_ASSET = "public, max-age=86400"
+# Sayfalar: önbellekte tutulabilir ama her kullanımda ETag ile doğrulanır
+CACHE_PAGE = "no-cache"
+
+HeaderHook = Callable[[BaseHTTPRequestHandler], None]
+# İstek başlığı okuyucu (ör. `handler.headers.get`)
+HeaderGetter = Callable[[str], Optional[str]]
+
+# sendfile kullanılamadığında dosyanın parça parça kopyalanma boyutu
+FILE_CHUNK_SIZE = 64 * 1024
+
+
+class CachedBody:
+    """Baytlar, içerik türü ve bir kez hesaplanan güçlü ETag."""
+
+    __slots__ = ("data", "content_type", "etag", "compressible", "_gzipped")
+
+    def __init__(self, data: bytes, content_type: str) -> None:
+        self.data = data
+        self.content_type = content_type
+        self.etag = '"' + hashlib.blake2b(data, digest_size=12).hexdigest() + '"'
+        self.compressible = is_compressible(content_type, len(data))
+        self._gzipped: Optional[bytes] = None
+
+    @property
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            self._gzipped = gzip_bytes(self.data)
+        return self._gzipped
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """`If-None-Match` başlığı verilen ETag'i kapsıyor mu (zayıf karşılaştırma)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def asset_cache_control(path: str) -> str:
+    """Sorguda sürüm (`v=`) taşıyan varlık adresleri değişmez kabul edilir."""
+    query = path.partition("?")[2]
+    versioned = any(part.startswith("v=") for part in query.split("&"))
+    return CACHE_IMMUTABLE if versioned else CACHE_ASSET
+
+
+def send_cached(
+    handler: BaseHTTPRequestHandler,
+    body: CachedBody,
+    cache_control: str,
+    add_headers: Optional[HeaderHook] = None,
+) -> None:
+    """Gövdeyi ETag ile gönder; istemcideki kopya güncelse yalnız `304`."""
+    use_gzip = body.compressible and accepts_gzip(handler.headers.get("Accept-Encoding"))
+    etag = weak_etag(body.etag) if use_gzip else body.etag
+    if etag_matches(handler.headers.get("If-None-Match"), body.etag):
+        handler.send_response(304)
+        handler.send_header("ETag", etag)
+        handler.send_header("Cache-Control", cache_control)
+        if add_headers is not None:
+            add_headers(handler)
+        handler.end_headers()
+        return
+    payload = body.gzipped if use_gzip else body.data
+    handler.send_response(200)
+    handler.send_header("Content-Type", body.content_type)
+    handler.send_header("ETag", etag)
+    handler.send_header("Cache-Control", cache_control)
+    if body.compressible:
+        handler.send_header("Vary", "Accept-Encoding")
+    if use_gzip:
+        handler.send_header("Content-Encoding", "gzip")
+    if add_headers is not None:
+        add_headers(handler)
+    handler.send_header("Content-Length", str(len(payload)))
+    handler.end_headers()
+    if handler.command != "HEAD":
+        handler.wfile.write(payload)
+
+
+_PAGES: Dict[Tuple[Callable[[], bytes], str], CachedBody] = {}
+
+
+def cached_page(render: Callable[[], bytes]) -> CachedBody:
+    """Parametresiz bir GET sayfasını bağlı önek başına yalnız bir kez üret."""
+    key = (render, url_for(""))
+    page = _PAGES.get(key)
+    if page is None:
+        page = _PAGES[key] = CachedBody(render(), "text/html; charset=utf-8")
+    return page
+
+
+class StaticFile:
+    """Diskteki statik dosya; bellekte yalnız yolu ve içerik türü durur."""
+
+    __slots__ = ("path", "content_type")
+
+    def __init__(self, path: Path, content_type: str) -> None:
+        self.path = path
+        self.content_type = content_type
+
+
+@dataclass
+class FileResponse:
+    """Koşullu/aralıklı isteğe göre gönderilecek durum, başlıklar ve dosya dilimi."""
+
+    status: int
+    headers: List[Tuple[str, str]]
+    # Content-Length (304'te None)
+    length: Optional[int]
+    file: Optional[BinaryIO] = None
+    offset: int = 0
+
+
+def _byte_range(value: str, size: int) -> Optional[Tuple[int, int]]:
+    """Tek `bytes=a-b` aralığını (başlangıç, bitiş dahil) çöz.
+
+    Anlaşılmayan ya da çoklu aralıklar None döner (tam dosya gönderilir);
+    karşılanamayan aralık için başlangıç `size` olur.
+    """
+    unit, _, spec = value.strip().partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first.strip():
+            suffix = int(last)
+            return (max(0, size - suffix), size - 1) if suffix > 0 else (size, size - 1)
+        start = int(first)
+        end = int(last) if last.strip() else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        return size, size - 1
+    if start < 0 or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def open_static(static: StaticFile, header: HeaderGetter, cache_control: str) -> FileResponse:
+    """Dosyayı aç ve isteğe göre `200`, `206`, `304` ya da `416` yanıtını hazırla.
+
+    ETag boyut ve değişiklik zamanından üretilir; içerik okunmaz. Dönen
+    `file` açıksa çağıran kapatır. Dosya yoksa `OSError` yükselir.
+    """
+    file = open(static.path, "rb")
+    try:
+        info = os.fstat(file.fileno())
+        size = info.st_size
+        etag = f'"{info.st_mtime_ns:x}-{size:x}"'
+        headers = [("Content-Type", static.content_type), ("ETag", etag), ("Cache-Control", cache_control)]
+        if etag_matches(header("If-None-Match"), etag):
+            file.close()
+            return FileResponse(304, headers[1:], None)
+        headers.append(("Accept-Ranges", "bytes"))
+        requested = header("Range")
+        if_range = header("If-Range")
+        if requested and (not if_range or if_range.strip() == etag):
+            span = _byte_range(requested, size)
+            if span is not None and span[0] >= size:
+                file.close()
+                return FileResponse(416, headers[1:] + [("Content-Range", f"bytes */{size}")], 0)
+            if span is not None:
+                start, end = span
+                headers.append(("Content-Range", f"bytes {start}-{end}/{size}"))
+                return FileResponse(206, headers, end - start + 1, file, start)
+        return FileResponse(200, headers, size, file)
+    except BaseException:
+        file.close()
+        raise
+
+
+def copy_file(handler: BaseHTTPRequestHandler, file: BinaryIO, offset: int, count: int) -> None:
+    """Dosya dilimini yanıt gövdesi olarak yaz; gerçek sokette `sendfile` ile."""
+    wfile = handler.wfile
+    sock = getattr(handler, "connection", None)
+    if isinstance(sock, socket.socket) and not getattr(wfile, "buffering", False):
+        # Başlıklar sokete ulaşmış olmalı; gövde kullanıcı alanına kopyalanmaz
+        wfile.flush()
+        sock.sendfile(file, offset, count)
+        return
+    file.seek(offset)
+    while count > 0:
+        chunk = file.read(min(FILE_CHUNK_SIZE, count))
+        if not chunk:
+            break
+        wfile.write(chunk)
+        count -= len(chunk)
+
+
+def send_file(
+    handler: BaseHTTPRequestHandler,
+    static: StaticFile,
+    cache_control: str,
+    add_headers: Optional[HeaderHook] = None,
+) -> None:
+    """Statik dosyayı koşullu GET, `Range` ve `HEAD` kurallarıyla gönder."""
+    try:
+        response = open_static(static, handler.headers.get, cache_control)
+    except OSError:
+        handler.send_error(404, "Not Found")
+        return
+    try:
+        handler.send_response(response.status)
+        for name, value in response.headers:
+            handler.send_header(name, value)
+        if add_headers is not None:
+            add_headers(handler)
+        if response.length is not None:
+            handler.send_header("Content-Length", str(response.length))
+        handler.end_headers()
+        if response.file is not None and handler.command != "HEAD":
+            copy_file(handler, response.file, response.offset, response.length or 0)
+    finally:
+        if response.file is not None:
+            response.file.close()
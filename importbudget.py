@@ -0,0 +1,95 @@
+"""İçe aktarma süresi bütçesi: `python -m importbudget`.
+
+Her modül temiz bir yorumlayıcıda `-X importtime` ile içe aktarılır ve
+kümülatif süresi bütçeyle karşılaştırılır (en iyi ölçüm). Ayrıca modül
+düzeyinde yüklenmemesi gereken ağır modüller (uygulama modülleri, süreç
+havuzu, zip/e-posta ayrıştırıcıları) içe aktarılmış mı diye bakılır; bunlar
+yalnız ihtiyaç duyulan kod yolunda yüklenmelidir. Bütçe aşılırsa çıkış
+kodu 1'dir.
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+_ROOT = Path(__file__).resolve().parent
+
+_APPS = ("app48", "app72", "app80", "app90", "app96", "app120", "app321")
+# Yalnız istek anında gereken standart kütüphane modülleri
+_LAZY_STDLIB = ("multiprocessing", "concurrent.futures.process", "zipfile", "email.policy", "tempfile")
+
+# Modül -> kümülatif içe aktarma süresi bütçesi (milisaniye)
+BUDGETS: Dict[str, float] = {
+    "appsuite.web": 150.0,
+    "landing.web": 130.0,
+    "calendar_md.web": 130.0,
+    **{f"{app}.web": 180.0 for app in _APPS},
+    **{f"{app}.main": 40.0 for app in _APPS},
+    **{f"{app}.counter": 40.0 for app in ("app72", "app80", "app90", "app96", "app120")},
+}
+
+# Modül -> içe aktarıldığında yüklenmemesi gereken modüller
+FORBIDDEN: Dict[str, Tuple[str, ...]] = {
+    "appsuite.web": tuple(f"{app}.web" for app in _APPS) + ("calendar_md.web", "supervisor") + _LAZY_STDLIB,
+    "landing.web": _LAZY_STDLIB,
+    "calendar_md.web": _LAZY_STDLIB,
+    **{f"{app}.web": _LAZY_STDLIB for app in _APPS},
+}
+
+_PROBE = "import sys; before = set(sys.modules); import {module}; print('\\n'.join(sorted(set(sys.modules) - before)))"
+
+
+def measure(module: str, runs: int = 3) -> Tuple[float, List[str]]:
+    """En iyi kümülatif süreyi (ms) ve içe aktarmanın yüklediği modülleri döndür."""
+    best: Optional[float] = None
+    loaded: List[str] = []
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module)],
+            cwd=_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        for line in proc.stderr.splitlines():
+            # Üst düzey satır: "import time:  self |  cumulative | module"
+            parts = line.split("|")
+            if len(parts) == 3 and parts[2].strip() == module and not parts[2].startswith("  "):
+                cumulative = int(parts[1]) / 1000
+                best = cumulative if best is None else min(best, cumulative)
+        loaded = proc.stdout.split()
+    return best or 0.0, loaded
+
+
+def check(modules: List[str], scale: float = 1.0, runs: int = 3) -> int:
+    failures = 0
+    for module in modules:
+        elapsed, loaded = measure(module, runs)
+        budget = BUDGETS.get(module, 0.0) * scale
+        eager = [name for name in FORBIDDEN.get(module, ()) if name in loaded]
+        ok = (not budget or elapsed <= budget) and not eager
+        failures += not ok
+        line = f"{'OK  ' if ok else 'FAIL'} {module:<18} {elapsed:7.1f} ms"
+        if budget:
+            line += f" / {budget:.0f} ms"
+        if eager:
+            line += f"  modül düzeyinde yüklenmiş: {', '.join(eager)}"
+        print(line)
+    return 1 if failures else 0
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="importbudget", description="Modül içe aktarma süresi ve tembel yükleme denetimi")
+    parser.add_argument("modules", nargs="*", help="Denetlenecek modüller (vars: bütçesi tanımlı hepsi)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Bütçe çarpanı; yavaş makinelerde büyütün (vars: 1.0)")
+    parser.add_argument("--runs", type=int, default=3, help="Modül başına ölçüm sayısı; en iyisi alınır (vars: 3)")
+    args = parser.parse_args(argv)
+    return check(args.modules or list(BUDGETS), args.scale, max(1, args.runs))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
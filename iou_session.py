@@ -0,0 +1,510 @@
+"""Çok adımlı IOU akışı için sunucu tarafı oturum deposu.
+
+Joker adımında yüklenen CSV'ler, önceki analizlerin HTML parçaları ve
+örüntü geçmişi formda taşınmak yerine burada saklanır; form yalnız opak
+`iou_session` belirtecini ve yeni seçimleri gönderir. Her adım yeni bir
+belirteç üretir (oturumlar değiştirilmez); yerini aldığı belirteç kısa bir
+paydan sonra düşer, böylece depo akış başına tek güncel adım tutar.
+
+Önceki analizler yanıtlara gömülmez: sayfada yalnız yeni sonuç ve
+`/iou/history` bağlantısı bulunur, eski sonuçlar istenince oturumdan
+okunur. Böylece her adımın yanıt boyutu geçmişle büyümez.
+"""
+
+import base64
+import hashlib
+import html
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from serving import url_for
+
+SESSION_FIELD = "iou_session"
+# Önceki analizleri oturumdan gösteren sayfa
+HISTORY_PATH = "/iou/history"
+# Son erişimden sonra oturumun geçerli kaldığı süre (saniye)
+SESSION_TTL_SECONDS = 6 * 3600
+# Bellekte tutulan en fazla oturum; taşanlar (disk yoksa) kaybolur
+SESSION_MAX_ENTRIES = 256
+# Bellekteki oturumların toplam bayt bütçesi (her dosya ve sonuç bir kez sayılır)
+SESSION_MAX_BYTES = 256 * 1024 * 1024
+# Disk yedeğinin bayt bütçesi; aşılınca en eski oturumlar silinir
+SESSION_DISK_MAX_BYTES = 2 * 1024 * 1024 * 1024
+# Yeni adım saklandıktan sonra eski belirtecin geçerli kaldığı süre (saniye)
+SESSION_SUPERSEDED_SECONDS = 120
+
+_TOKEN_RE = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+FileEntry = Tuple[str, bytes]
+
+
+class IouSession:
+    """Bir IOU akışının anlık durumu; `evolve` ile yeni kopya üretilir.
+
+    `token`, oturumun depodaki belirtecidir; `evolve` onu taşır, böylece
+    depo yeni adımı saklarken yerini aldığı belirteci bilir.
+    """
+
+    __slots__ = ("scope", "files", "results", "pattern_payload", "chain_token", "token")
+
+    def __init__(
+        self,
+        scope: str,
+        files: Tuple[FileEntry, ...] = (),
+        results: Tuple[str, ...] = (),
+        pattern_payload: str = "",
+        chain_token: str = "",
+        token: str = "",
+    ) -> None:
+        self.scope = scope
+        self.files = files
+        self.results = results
+        self.pattern_payload = pattern_payload
+        self.chain_token = chain_token
+        self.token = token
+
+    def evolve(self, **changes: Any) -> "IouSession":
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return IouSession(**values)
+
+    @property
+    def results_html(self) -> str:
+        return "".join(self.results)
+
+    def file_entries(self) -> List[Dict[str, Any]]:
+        """Yükleme listesiyle aynı biçimde dosyalar (`filename`, `data`)."""
+        return [{"filename": name, "data": data} for name, data in self.files]
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "scope": self.scope,
+            "files": [[name, base64.b64encode(data).decode("ascii")] for name, data in self.files],
+            "results": list(self.results),
+            "pattern_payload": self.pattern_payload,
+            "chain_token": self.chain_token,
+        }
+
+    @classmethod
+    def from_json(cls, obj: Dict[str, Any]) -> "IouSession":
+        return cls(
+            scope=str(obj.get("scope") or ""),
+            files=tuple((str(name), base64.b64decode(data)) for name, data in obj.get("files") or []),
+            results=tuple(str(part) for part in obj.get("results") or []),
+            pattern_payload=str(obj.get("pattern_payload") or ""),
+            chain_token=str(obj.get("chain_token") or ""),
+        )
+
+
+def _blob_digest(kind: bytes, data: bytes) -> str:
+    return hashlib.sha256(kind + data).hexdigest()
+
+
+class SessionStore:
+    """Belirteçle erişilen, TTL'li ve bayt bütçeli oturum deposu (isteğe bağlı disk).
+
+    Yüklenen dosyalar ve analiz sonuçları içerik özetiyle adlanan bloblar
+    olarak bir kez tutulur; oturumlar yalnız bu özetlere başvurur. Böylece
+    her adımın yeni belirteci dosyaları ve önceki sonuçları yeniden
+    kopyalamaz, diske yalnız yeni sonuç ve küçük bir başvuru dosyası yazılır.
+    Yeni adım saklanınca yerini aldığı belirteç `superseded_seconds` sonra
+    düşer (çift tıklama ve geri tuşu için kısa bir pay).
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = SESSION_TTL_SECONDS,
+        max_entries: int = SESSION_MAX_ENTRIES,
+        directory: Optional[str] = None,
+        max_bytes: int = SESSION_MAX_BYTES,
+        disk_max_bytes: int = SESSION_DISK_MAX_BYTES,
+        superseded_seconds: float = SESSION_SUPERSEDED_SECONDS,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.directory: Optional[Path] = Path(directory) if directory else None
+        self.max_bytes = max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.superseded_seconds = superseded_seconds
+        # belirteç -> (erişim zamanı, oturum, blob özetleri)
+        self._items: "OrderedDict[str, Tuple[float, IouSession, Tuple[str, ...]]]" = OrderedDict()
+        # özet -> [dosya baytları ya da sonuç HTML'i, başvuru sayısı]
+        self._blobs: Dict[str, List[Any]] = {}
+        # Saklanan nesnenin kimliği -> özeti: aynı nesne yeniden özetlenmez
+        self._blob_ids: Dict[int, str] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+        self._disk_bytes = 0
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._bytes
+
+    def put(self, session: IouSession) -> str:
+        token = secrets.token_urlsafe(24)
+        now = time.time()
+        previous = session.token
+        # Özetler kilit dışında: büyük dosyalar diğer istekleri bekletmez
+        files = [(name, data, self._digest(b"f", data)) for name, data in session.files]
+        results = [(part, self._digest(b"r", part)) for part in session.results]
+        with self._lock:
+            files = [(name, self._intern(digest, data), digest) for name, data, digest in files]
+            results = [(self._intern(digest, part), digest) for part, digest in results]
+            stored = session.evolve(
+                files=tuple((name, data) for name, data, _ in files),
+                results=tuple(part for part, _ in results),
+                token=token,
+            )
+            refs = tuple(digest for _, _, digest in files) + tuple(digest for _, digest in results)
+            self._bytes += self._own_size(stored)
+            self._items[token] = (now, stored, refs)
+            if previous:
+                self._supersede(previous, now)
+            self._evict(now)
+        if self.directory is not None:
+            self._write(token, stored, files, results, previous, now)
+        return token
+
+    def get(self, token: str, scope: str) -> Optional[IouSession]:
+        if not token or not _TOKEN_RE.match(token):
+            return None
+        now = time.time()
+        with self._lock:
+            item = self._items.get(token)
+            if item is not None:
+                stamp, session, refs = item
+                if now - stamp > self.ttl_seconds:
+                    self._drop(token)
+                    item = None
+                else:
+                    self._items[token] = (now, session, refs)
+                    self._items.move_to_end(token)
+        if item is None:
+            loaded = self._read(token, now)
+            if loaded is None:
+                return None
+            session, refs = loaded
+            with self._lock:
+                if token not in self._items:
+                    session = session.evolve(
+                        files=tuple((name, self._intern(digest, data)) for (name, data), digest in zip(session.files, refs)),
+                        results=tuple(self._intern(digest, part) for part, digest in zip(session.results, refs[len(session.files):])),
+                    )
+                    self._bytes += self._own_size(session)
+                    self._items[token] = (now, session, refs)
+                    self._evict(now)
+        return session if session.scope == scope else None
+
+    def _digest(self, kind: bytes, value: Any) -> str:
+        digest = self._blob_ids.get(id(value))
+        blob = self._blobs.get(digest) if digest is not None else None
+        if blob is not None and blob[0] is value:
+            return digest
+        return _blob_digest(kind, value if isinstance(value, bytes) else value.encode("utf-8"))
+
+    def _intern(self, digest: str, value: Any) -> Any:
+        blob = self._blobs.get(digest)
+        if blob is None:
+            blob = self._blobs[digest] = [value, 0]
+            self._blob_ids[id(value)] = digest
+            self._bytes += len(value)
+        blob[1] += 1
+        return blob[0]
+
+    @staticmethod
+    def _own_size(session: IouSession) -> int:
+        # Bloblar dışında oturuma özgü veriler
+        return len(session.pattern_payload) + 256
+
+    def _drop(self, token: str) -> None:
+        _, session, refs = self._items.pop(token)
+        self._bytes -= self._own_size(session)
+        for digest in refs:
+            blob = self._blobs[digest]
+            blob[1] -= 1
+            if blob[1] <= 0:
+                del self._blobs[digest]
+                self._blob_ids.pop(id(blob[0]), None)
+                self._bytes -= len(blob[0])
+
+    def _supersede(self, token: str, now: float) -> None:
+        item = self._items.get(token)
+        if item is None:
+            return
+        # Erişim zamanını geri al: TTL kısa pay sonra dolar, LRU'da öne geçer
+        stamp = min(item[0], now - self.ttl_seconds + self.superseded_seconds)
+        self._items[token] = (stamp, item[1], item[2])
+        self._items.move_to_end(token, last=False)
+
+    def _evict(self, now: float) -> None:
+        # En yeni oturum bütçeyi tek başına aşsa da bellekte kalır
+        while len(self._items) > 1:
+            token, (stamp, _, _) = next(iter(self._items.items()))
+            if len(self._items) > self.max_entries or self._bytes > self.max_bytes or now - stamp > self.ttl_seconds:
+                self._drop(token)
+                continue
+            break
+
+    def _path(self, token: str) -> Path:
+        assert self.directory is not None
+        return self.directory / f"{token}.json"
+
+    def _blob_path(self, digest: str) -> Path:
+        assert self.directory is not None
+        return self.directory / "blobs" / digest
+
+    def _write(
+        self,
+        token: str,
+        session: IouSession,
+        files: List[Tuple[str, bytes, str]],
+        results: List[Tuple[str, str]],
+        previous: str,
+        now: float,
+    ) -> None:
+        head = {
+            "scope": session.scope,
+            "file_refs": [[name, digest] for name, _, digest in files],
+            "result_refs": [digest for _, digest in results],
+            "pattern_payload": session.pattern_payload,
+            "chain_token": session.chain_token,
+        }
+        written = 0
+        try:
+            (self.directory / "blobs").mkdir(parents=True, exist_ok=True)
+            blobs = [(digest, data) for _, data, digest in files]
+            blobs += [(digest, part.encode("utf-8")) for part, digest in results]
+            for digest, data in blobs:
+                path = self._blob_path(digest)
+                if path.exists():
+                    # Paylaşılan blob: yalnız erişim zamanını tazele
+                    os.utime(path, (now, now))
+                    continue
+                _write_atomic(path, data)
+                written += len(data)
+            payload = json.dumps(head, separators=(",", ":")).encode("utf-8")
+            _write_atomic(self._path(token), payload)
+            written += len(payload)
+            if previous and _TOKEN_RE.match(previous):
+                stamp = now - self.ttl_seconds + self.superseded_seconds
+                try:
+                    if self._path(previous).stat().st_mtime > stamp:
+                        os.utime(self._path(previous), (stamp, stamp))
+                except OSError:
+                    pass
+        except OSError:
+            # Disk yazılamazsa oturum yalnız bellekte kalır
+            pass
+        self._disk_bytes += written
+        self._purge_disk(now)
+
+    def _read(self, token: str, now: float) -> Optional[Tuple[IouSession, Tuple[str, ...]]]:
+        if self.directory is None:
+            return None
+        path = self._path(token)
+        try:
+            if now - path.stat().st_mtime > self.ttl_seconds:
+                path.unlink()
+                return None
+            # Erişim TTL'i diskte de uzasın
+            os.utime(path, (now, now))
+            obj = json.loads(path.read_text(encoding="utf-8"))
+            if "file_refs" not in obj:
+                # Eski biçim: dosyalar ve sonuçlar oturum dosyasının içinde
+                session = IouSession.from_json(obj)
+                refs = tuple(_blob_digest(b"f", data) for _, data in session.files)
+                refs += tuple(_blob_digest(b"r", part.encode("utf-8")) for part in session.results)
+                return session, refs
+            files = tuple((str(name), self._read_blob(digest, now)) for name, digest in obj["file_refs"])
+            results = tuple(self._read_blob(digest, now).decode("utf-8") for digest in obj["result_refs"])
+            session = IouSession(
+                scope=str(obj.get("scope") or ""),
+                files=files,
+                results=results,
+                pattern_payload=str(obj.get("pattern_payload") or ""),
+                chain_token=str(obj.get("chain_token") or ""),
+                token=token,
+            )
+            refs = tuple(digest for _, digest in obj["file_refs"]) + tuple(obj["result_refs"])
+            return session, refs
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+    def _read_blob(self, digest: str, now: float) -> bytes:
+        if not _DIGEST_RE.match(digest):
+            raise ValueError(digest)
+        path = self._blob_path(digest)
+        os.utime(path, (now, now))
+        return path.read_bytes()
+
+    def _purge_disk(self, now: float) -> None:
+        # Süresi dolanları en çok dakikada bir tara; bütçe aşıldıysa hemen
+        since = now - self._last_purge
+        if since < 1 or (since < 60 and self._disk_bytes <= self.disk_max_bytes):
+            return
+        self._last_purge = now
+        sessions: List[Tuple[float, Path, int, List[str]]] = []
+        blob_sizes: Dict[str, Tuple[float, int]] = {}
+        try:
+            for path in self.directory.glob("*.json"):
+                try:
+                    stat = path.stat()
+                    if now - stat.st_mtime > self.ttl_seconds:
+                        path.unlink()
+                        continue
+                    obj = json.loads(path.read_text(encoding="utf-8"))
+                    refs = [digest for _, digest in obj.get("file_refs") or []] + list(obj.get("result_refs") or [])
+                    sessions.append((stat.st_mtime, path, stat.st_size, refs))
+                except (OSError, ValueError, TypeError):
+                    continue
+            blob_dir = self.directory / "blobs"
+            if blob_dir.is_dir():
+                for path in blob_dir.iterdir():
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    blob_sizes[path.name] = (stat.st_mtime, stat.st_size)
+        except OSError:
+            return
+        counts: Dict[str, int] = {}
+        for _, _, _, refs in sessions:
+            for digest in refs:
+                counts[digest] = counts.get(digest, 0) + 1
+        total = sum(size for _, _, size, _ in sessions)
+        total += sum(size for digest, (_, size) in blob_sizes.items() if digest in counts)
+        # Bütçe aşıldıysa en eski oturumları ve yalnız onların bloblarını sil
+        sessions.sort(key=lambda item: item[0])
+        for _, path, size, refs in sessions[:-1]:
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            for digest in refs:
+                counts[digest] -= 1
+                if not counts[digest]:
+                    del counts[digest]
+                    total -= blob_sizes.pop(digest, (0.0, 0))[1]
+                    try:
+                        (blob_dir / digest).unlink()
+                    except OSError:
+                        pass
+        for digest, (stamp, _) in blob_sizes.items():
+            # Yeni yazılmış blobun oturum dosyası henüz gelmemiş olabilir
+            if digest not in counts and now - stamp > 60:
+                try:
+                    (blob_dir / digest).unlink()
+                except OSError:
+                    continue
+        self._disk_bytes = total
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f"{path.name}.{secrets.token_hex(4)}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+SESSION_STORE = SessionStore()
+
+
+def configure_sessions(ttl_seconds: Optional[float] = None, directory: Optional[str] = None) -> None:
+    """Oturum TTL'ini ve disk dizinini ayarla (CLI bayraklarından çağrılır).
+
+    Oturumun işaret ettiği örüntü zincirleri aynı dizinin `chains` klasörüne
+    yazılır; böylece zincir, oturumu okuyan her süreçte bulunur.
+    """
+    from patterns import configure_chains
+
+    with SESSION_STORE._lock:
+        if ttl_seconds is not None and ttl_seconds > 0:
+            SESSION_STORE.ttl_seconds = ttl_seconds
+        if directory:
+            SESSION_STORE.directory = Path(directory)
+    configure_chains(ttl_seconds, os.path.join(directory, "chains") if directory else None)
+
+
+def load_session(form: Dict[str, Dict[str, Any]], scope: str) -> IouSession:
+    """Formdaki belirtecin oturumunu getir; yoksa ya da süresi dolduysa boş oturum.
+
+    Dönen oturumdan `evolve` ile türetilen adım saklanınca bu belirteç düşer.
+    """
+    token = (form.get(SESSION_FIELD, {}).get("value") or "").strip()
+    session = SESSION_STORE.get(token, scope) if token else None
+    return session if session is not None else IouSession(scope)
+
+
+def store_session(session: IouSession) -> str:
+    """Oturumu sakla, yeni belirteci döndür."""
+    return SESSION_STORE.put(session)
+
+
+def session_input(token: str) -> str:
+    """Belirteci taşıyan gizli form alanı."""
+    return f"<input type='hidden' name='{SESSION_FIELD}' value='{token}'>"
+
+
+def session_field(session: IouSession) -> str:
+    """Oturumu saklayıp forma eklenecek gizli alanı döndür."""
+    return session_input(store_session(session))
+
+
+def history_link(token: str, count: int) -> str:
+    """Önceki `count` analizin yerine sayfaya konan sabit boyutlu bağlantı."""
+    if count <= 0:
+        return ""
+    href = f"{url_for(HISTORY_PATH)}?{SESSION_FIELD}={token}&n={count}"
+    return (
+        "<div style='margin-bottom:32px; padding-bottom:24px; border-bottom:2px solid #ddd;'>"
+        "<h3 style='color:#888; margin-bottom:16px;'>Önceki Analizler</h3>"
+        f"<div>Bu oturumda {count} önceki analiz var. "
+        f"<a href='{html.escape(href)}' target='_blank' rel='noopener'>Önceki analizleri aç</a></div>"
+        "</div>"
+    )
+
+
+def serve_history(
+    handler: BaseHTTPRequestHandler,
+    scope: str,
+    page: Any,
+    title: str,
+    add_headers: Optional[Callable[[BaseHTTPRequestHandler], None]] = None,
+) -> bool:
+    """`/iou/history`: oturumdaki ilk `n` analizi `page` şablonuyla gönder."""
+    path, _, query = handler.path.partition("?")
+    if path != HISTORY_PATH:
+        return False
+    params = parse_qs(query)
+    session = SESSION_STORE.get((params.get(SESSION_FIELD) or [""])[0], scope)
+    if session is None:
+        payload = "Oturum bulunamadı ya da süresi doldu.\n".encode("utf-8")
+        handler.send_response(404)
+        handler.send_header("Content-Type", "text/plain; charset=utf-8")
+        if add_headers is not None:
+            add_headers(handler)
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        if handler.command != "HEAD":
+            handler.wfile.write(payload)
+        return True
+    try:
+        count = int((params.get("n") or [""])[0])
+    except ValueError:
+        count = len(session.results)
+    body = "".join(session.results[: max(0, count)]) or "<div class='card'>Önceki analiz yok.</div>"
+    page.send(handler, title, body, active_tab="iou", add_headers=add_headers)
+    return True
@@ -0,0 +1,674 @@
+"""Uzun analizler için arka plan işleri.
+
+POST isteği `?job=1` ile (ya da `Prefer: respond-async` başlığıyla)
+gelirse gövdesi adsız bir geçici dosyaya (dizin verildiyse iş dizinine)
+yazılıp istek kuyruğa alınır ve hemen `202` ile `/jobs/<id>` adresi döner;
+sırada bekleyen işlerin gövdeleri bellekte durmaz. İş `JOB_WORKERS` iş
+parçacıklı havuzda uygulama işleyicisinde aynen çalışır
+(`serving.run_buffered`); gövde dosyadan ancak işleyici okurken, yani
+uygulamanın kabul denetiminde yer (bayt bütçesi) alındıktan sonra belleğe
+gelir. İstemci bağlantıyı kapatsa da iş sürer, vekilin zaman aşımı analiz
+süresini sınırlamaz.
+`/jobs/<id>` iş bitene kadar ilerleme sayfası (aşama, biten dosya sayısı),
+bitince işleyicinin yanıtını verir; `/jobs/<id>/status` durumu JSON olarak
+döndürür. Biten sonuçlar `JOB_TTL_SECONDS` boyunca saklanır.
+
+`/jobs/<id>/events` aynı ilerlemeyi Server-Sent Events olarak akıtır: her
+dosyanın analizi bitince adı, IOU sayısı, XYZ kümesi, süresi ve sonuç kartı
+(`file`), ardından örüntü panelleri (`panel`) ve en sonda `done` gelir.
+Akış istek havuzunu tutmaz (`serving.hand_off`); bu yapılamıyorsa yanıt o
+ana kadarki olaylarla hemen biter ve tarayıcı `retry` sonra kaldığı yerden
+yeniden bağlanır.
+İlerleme sayfası bunları `progress.js` ile sırayla sayfaya ekler; böylece ilk
+kart ilk dosya bitince görünür, iş bitince tam sonuç sayfası açılır.
+Uygulamaların joker formu analizi varsayılan olarak bu yoldan başlatır
+(`/iou?job=1`); tek sayfalık yanıt ikinci düğmeyle hâlâ istenebilir.
+
+Dizin verilirse (`configure_jobs`) durum ve sonuç diske de yazılır; aynı
+portu paylaşan işçi süreçler ya da WSGI işçileri birbirinin işini sorgular.
+"""
+
+from __future__ import annotations
+
+import html
+import json
+import os
+import re
+import secrets
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+from urllib.parse import parse_qsl, urlencode
+
+from admission import patient
+from serving import RETRY_AFTER_SECONDS, hand_off, run_buffered, url_for
+
+# İşleri çalıştıran iş parçacığı sayısı (süreç başına)
+JOB_WORKERS = 2
+# Biten işin sonucunun saklandığı süre (saniye)
+JOB_TTL_SECONDS = 3600
+# Bellekte tutulan en fazla iş; taşan biten işler (disk yoksa) kaybolur
+JOB_MAX_ENTRIES = 64
+# Kuyrukta + çalışan en fazla iş; aşılırsa 503
+JOB_MAX_PENDING = 16
+# İlerleme sayfasının kendini yenileme aralığı (saniye)
+JOB_REFRESH_SECONDS = 2
+# İşi isteyen sorgu parametresi (`/iou?job=1`)
+JOB_QUERY = "job"
+# Olay akışında yeni olay yoksa bu aralıkla yorum satırı gönderilir
+# (vekilin `PROXY_TIMEOUT` süresinden kısa olmalı)
+JOB_EVENT_KEEPALIVE_SECONDS = 10
+# İş başka süreçteyse olay dosyasının yoklanma aralığı (saniye)
+JOB_EVENT_POLL_SECONDS = 0.5
+
+# Gövde geçici dosyaya bu boyutta parçalarla yazılır
+_SPOOL_CHUNK = 64 * 1024
+
+_ID_RE = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+# Sonuç yeniden gönderilirken yeniden yazılan ya da atılan başlıklar
+_SKIP_HEADERS = frozenset({"connection", "keep-alive", "transfer-encoding", "content-length", "date", "server"})
+# İş isteğine taşınmayan istek başlıkları (sonuç düz saklanır, sıkıştırma sorguda yapılır)
+_DROP_REQUEST_HEADERS = frozenset({"accept-encoding", "prefer", "connection", "keep-alive", "content-length"})
+
+HeaderHook = Callable[[BaseHTTPRequestHandler], None]
+
+
+class Job:
+    """Bir arka plan işinin durumu; bitince işleyicinin yanıtı da burada durur."""
+
+    __slots__ = (
+        "id", "scope", "state", "stage", "done", "total", "created", "updated", "mark",
+        "status", "reason", "headers", "body", "events",
+    )
+
+    def __init__(self, job_id: str, scope: str) -> None:
+        self.id = job_id
+        self.scope = scope
+        # queued | running | done
+        self.state = "queued"
+        self.stage = "Sırada"
+        self.done = 0
+        self.total = 0
+        self.created = time.time()
+        self.updated = self.created
+        # Son dosya olayının zamanı (dosya başına süre için)
+        self.mark = self.created
+        self.status = 0
+        self.reason = ""
+        self.headers: List[Tuple[str, str]] = []
+        self.body = b""
+        # Olay akışı için sırayla eklenen olaylar (`file`, `panel`, `progress`)
+        self.events: List[Dict[str, Any]] = []
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "scope": self.scope,
+            "state": self.state,
+            "stage": self.stage,
+            "done": self.done,
+            "total": self.total,
+            "created": self.created,
+            "updated": self.updated,
+            "status": self.status,
+        }
+
+    @classmethod
+    def from_json(cls, obj: Dict[str, Any]) -> "Job":
+        job = cls(str(obj["id"]), str(obj.get("scope") or ""))
+        job.state = str(obj.get("state") or "queued")
+        job.stage = str(obj.get("stage") or "")
+        job.done = int(obj.get("done") or 0)
+        job.total = int(obj.get("total") or 0)
+        job.created = float(obj.get("created") or 0)
+        job.updated = float(obj.get("updated") or 0)
+        job.status = int(obj.get("status") or 0)
+        return job
+
+    def finish(self, response: bytes) -> None:
+        """Ham HTTP yanıtını durum, başlıklar ve gövdeye ayır."""
+        head, _, body = response.partition(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        parts = lines[0].split(" ", 2)
+        try:
+            self.status = int(parts[1])
+        except (IndexError, ValueError):
+            self.status = 500
+        self.reason = parts[2] if len(parts) > 2 else ""
+        self.headers = []
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            if name.strip().lower() not in _SKIP_HEADERS:
+                self.headers.append((name.strip(), value.strip()))
+        self.body = body
+        self.done = max(self.done, self.total)
+        self.state = "done"
+        self.stage = "Tamamlandı"
+        self.updated = time.time()
+
+    def response_bytes(self) -> bytes:
+        head = f"HTTP/1.0 {self.status} {self.reason}\r\n" + "".join(f"{name}: {value}\r\n" for name, value in self.headers)
+        return head.encode("latin-1") + b"\r\n" + self.body
+
+
+class JobStore:
+    """Kimlikle erişilen, TTL'li bellek içi iş deposu (isteğe bağlı disk)."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = JOB_TTL_SECONDS,
+        max_entries: int = JOB_MAX_ENTRIES,
+        directory: Optional[str] = None,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.directory: Optional[Path] = Path(directory) if directory else None
+        self._items: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        # Yeni olay ya da biten iş bekleyen olay akışlarını uyandırır
+        self._changed = threading.Condition(self._lock)
+        self._last_purge = 0.0
+
+    def create(self, scope: str) -> Optional[Job]:
+        """Yeni iş kaydı; kuyruk doluysa None."""
+        job = Job(secrets.token_urlsafe(18), scope)
+        with self._lock:
+            self._evict(time.time())
+            if sum(1 for item in self._items.values() if item.state != "done") >= JOB_MAX_PENDING:
+                return None
+            self._items[job.id] = job
+        self.save(job)
+        return job
+
+    def get(self, job_id: str, scope: str) -> Optional[Job]:
+        if not _ID_RE.match(job_id):
+            return None
+        with self._lock:
+            job = self._items.get(job_id)
+        if job is None:
+            job = self._read(job_id)
+        if job is None or job.scope != scope:
+            return None
+        if job.state == "done" and time.time() - job.updated > self.ttl_seconds:
+            return None
+        return job
+
+    def save(self, job: Job, with_result: bool = False) -> None:
+        """Durumu (bitince sonucu da) diske yaz; dizin yoksa bir şey yapmaz."""
+        if self.directory is None:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if with_result:
+                self._replace(self._path(job.id, ".bin"), job.response_bytes())
+            self._replace(self._path(job.id, ".json"), json.dumps(job.to_json(), separators=(",", ":")).encode("utf-8"))
+        except OSError:
+            # Disk yazılamazsa iş yalnız bu süreçte sorgulanabilir
+            pass
+        if with_result:
+            self._purge_disk()
+
+    def add_event(self, job: Job, event: Dict[str, Any]) -> None:
+        with self._changed:
+            job.events.append(event)
+            self._changed.notify_all()
+        if self.directory is not None:
+            try:
+                with open(self._path(job.id, ".events"), "a", encoding="utf-8") as fh:
+                    fh.write(json.dumps(event, separators=(",", ":")) + "\n")
+            except OSError:
+                pass
+
+    def notify(self) -> None:
+        with self._changed:
+            self._changed.notify_all()
+
+    def events(self, job_id: str, scope: str, start: int, timeout: float) -> Tuple[Optional[Job], List[Dict[str, Any]], bool]:
+        """`start` sırasından sonraki olaylar ve iş o an bitmiş mi.
+
+        Yeni olay yoksa en çok `timeout` saniye bekler. Bitti bilgisi olaylarla
+        aynı anda okunur; böylece son olaylar `done`'dan önce kaçırılmaz.
+        """
+        with self._changed:
+            job = self._items.get(job_id)
+            if job is not None:
+                if job.state != "done" and len(job.events) <= start:
+                    self._changed.wait(timeout)
+                return job, job.events[start:], job.state == "done"
+        # İş başka bir süreçte çalışıyor: diskteki olay dosyasını yokla
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id, scope)
+            if job is None:
+                return None, [], False
+            finished = job.state == "done"
+            events = self._read_events(job_id)[start:]
+            if events or finished or time.monotonic() >= deadline:
+                return job, events, finished
+            time.sleep(JOB_EVENT_POLL_SECONDS)
+
+    def _read_events(self, job_id: str) -> List[Dict[str, Any]]:
+        if self.directory is None:
+            return []
+        try:
+            lines = self._path(job_id, ".events").read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return []
+        events = []
+        for line in lines:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                # Yazılmakta olan son satır
+                break
+        return events
+
+    def _evict(self, now: float) -> None:
+        finished = sorted((job.updated, job.id) for job in self._items.values() if job.state == "done")
+        for stamp, job_id in finished:
+            if len(self._items) > self.max_entries or now - stamp > self.ttl_seconds:
+                del self._items[job_id]
+
+    def _path(self, job_id: str, suffix: str) -> Path:
+        assert self.directory is not None
+        return self.directory / f"{job_id}{suffix}"
+
+    @staticmethod
+    def _replace(path: Path, data: bytes) -> None:
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _read(self, job_id: str) -> Optional[Job]:
+        if self.directory is None:
+            return None
+        try:
+            job = Job.from_json(json.loads(self._path(job_id, ".json").read_text(encoding="utf-8")))
+            if job.state == "done":
+                updated = job.updated
+                job.finish(self._path(job_id, ".bin").read_bytes())
+                job.updated = updated
+            return job
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+    def _purge_disk(self) -> None:
+        now = time.time()
+        if now - self._last_purge < 60:
+            return
+        self._last_purge = now
+        try:
+            for path in self.directory.iterdir():
+                try:
+                    if now - path.stat().st_mtime > self.ttl_seconds:
+                        path.unlink()
+                except OSError:
+                    continue
+        except OSError:
+            pass
+
+
+JOB_STORE = JobStore()
+
+_CURRENT_JOB: ContextVar[Optional[Job]] = ContextVar("current_job", default=None)
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def configure_jobs(
+    workers: Optional[int] = None,
+    ttl_seconds: Optional[float] = None,
+    directory: Optional[str] = None,
+) -> None:
+    """İş parçacığı sayısını, TTL'i ve disk dizinini ayarla (CLI bayraklarından)."""
+    global JOB_WORKERS, _executor
+    with _executor_lock:
+        if workers is not None and workers > 0 and workers != JOB_WORKERS:
+            JOB_WORKERS = int(workers)
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+                _executor = None
+    if ttl_seconds is not None and ttl_seconds > 0:
+        JOB_STORE.ttl_seconds = ttl_seconds
+    if directory:
+        JOB_STORE.directory = Path(directory)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+        return _executor
+
+
+def report_progress(stage: str, done: Optional[int] = None, total: Optional[int] = None) -> None:
+    """Çalışan işin aşamasını ve biten dosya sayısını güncelle (iş dışında etkisiz)."""
+    job = _CURRENT_JOB.get()
+    if job is None:
+        return
+    job.stage = stage
+    if done is not None:
+        job.done = done
+    if total is not None:
+        job.total = total
+    job.updated = time.time()
+    JOB_STORE.save(job)
+    JOB_STORE.add_event(job, {"type": "progress", "stage": job.stage, "done": job.done, "total": job.total})
+
+
+def report_file(name: str, hits: int, xyz: Iterable[int], section_html: str = "") -> None:
+    """Bir dosyanın analizi bitti: olay akışına adını, IOU sayısını, XYZ kümesini ve kartını ekle."""
+    job = _CURRENT_JOB.get()
+    if job is None:
+        return
+    now = time.time()
+    elapsed_ms = int((now - job.mark) * 1000)
+    job.mark = now
+    JOB_STORE.add_event(
+        job,
+        {"type": "file", "name": name, "hits": hits, "xyz": sorted(xyz), "elapsed_ms": elapsed_ms, "html": section_html},
+    )
+
+
+def report_panel(panel_html: str) -> None:
+    """Dosyalardan sonra hazırlanan paneli (örüntü, birleşik örüntü) olay akışına ekle."""
+    job = _CURRENT_JOB.get()
+    if job is None or not panel_html:
+        return
+    JOB_STORE.add_event(job, {"type": "panel", "html": panel_html})
+
+
+def _scope(handler_cls: Type[BaseHTTPRequestHandler]) -> str:
+    return f"{url_for('')}|{handler_cls.__module__}.{handler_cls.__qualname__}"
+
+
+def _run(
+    job: Job,
+    handler_cls: Type[BaseHTTPRequestHandler],
+    head: bytes,
+    body: BinaryIO,
+    client_address: Tuple[str, int],
+    prefix: str,
+) -> None:
+    token = _CURRENT_JOB.set(job)
+    try:
+        job.state = "running"
+        job.stage = "Çalışıyor"
+        job.updated = job.mark = time.time()
+        JOB_STORE.save(job)
+        body.seek(0)
+        # İş zaten `JOB_WORKERS` ile sınırlı: kabul sırasında geri çevrilmez, bekler
+        with patient():
+            response, _ = run_buffered(handler_cls, head, client_address, prefix, body=body)
+    finally:
+        body.close()
+        _CURRENT_JOB.reset(token)
+    job.finish(response)
+    JOB_STORE.save(job, with_result=True)
+    JOB_STORE.notify()
+
+
+def _spool_body(rfile: Any, length: int) -> Optional[BinaryIO]:
+    """Gövdeyi belleğe almadan geçici dosyaya kopyala; eksik geldiyse None."""
+    directory = JOB_STORE.directory
+    try:
+        if directory is not None:
+            directory.mkdir(parents=True, exist_ok=True)
+        spool = tempfile.TemporaryFile(dir=directory)
+    except OSError:
+        spool = tempfile.TemporaryFile()
+    remaining = length
+    try:
+        while remaining > 0:
+            chunk = rfile.read(min(_SPOOL_CHUNK, remaining))
+            if not chunk:
+                spool.close()
+                return None
+            spool.write(chunk)
+            remaining -= len(chunk)
+    except OSError:
+        spool.close()
+        return None
+    return spool
+
+
+def wants_job(handler: BaseHTTPRequestHandler) -> bool:
+    query = handler.path.partition("?")[2]
+    if (JOB_QUERY, "1") in parse_qsl(query):
+        return True
+    return "respond-async" in (handler.headers.get("Prefer") or "").lower()
+
+
+def submit_job(
+    handler: BaseHTTPRequestHandler,
+    handler_cls: Type[BaseHTTPRequestHandler],
+    add_headers: Optional[HeaderHook] = None,
+) -> bool:
+    """İstek arka plan işi olarak istendiyse kuyruğa al ve `202` gönder."""
+    if not wants_job(handler):
+        return False
+    path, _, query = handler.path.partition("?")
+    rest = [(name, value) for name, value in parse_qsl(query, keep_blank_values=True) if name != JOB_QUERY]
+    if rest:
+        path += "?" + urlencode(rest)
+    try:
+        length = max(0, int(handler.headers.get("Content-Length", "0") or 0))
+    except ValueError:
+        length = 0
+    body = _spool_body(handler.rfile, length)
+    if body is None:
+        # İstemci gövdeyi bitirmeden gitti
+        handler.close_connection = True
+        return True
+    # HTTP/1.0: işleyici gövdeyi chunked yazmaz, yanıt bağlantı kapanışıyla biter
+    head = f"{handler.command} {path} HTTP/1.0\r\n"
+    head += "".join(f"{name}: {value}\r\n" for name, value in handler.headers.items() if name.lower() not in _DROP_REQUEST_HEADERS)
+    head += f"Content-Length: {length}\r\n\r\n"
+
+    job = JOB_STORE.create(_scope(handler_cls))
+    if job is None:
+        body.close()
+        payload = "Çok fazla bekleyen iş var, lütfen biraz sonra tekrar deneyin.\n".encode("utf-8")
+        handler.send_response(503)
+        handler.send_header("Content-Type", "text/plain; charset=utf-8")
+        handler.send_header("Retry-After", str(RETRY_AFTER_SECONDS))
+        if add_headers is not None:
+            add_headers(handler)
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+        return True
+    _get_executor().submit(_run, job, handler_cls, head.encode("latin-1"), body, handler.client_address, url_for(""))
+    _send_progress(handler, job, 202, add_headers)
+    return True
+
+
+# İlerleme sayfasının olay akışı istemcisi (CSP satır içi betiğe izin vermez)
+_PROGRESS_JS = """(function () {
+  var link = document.getElementById("job-link");
+  var box = document.getElementById("job-results");
+  if (!link || !box || !window.EventSource) return;
+  var stage = document.getElementById("job-stage");
+  var count = document.getElementById("job-count");
+  var source = new EventSource(link.href + "/events");
+  function append(markup) {
+    var holder = document.createElement("div");
+    holder.innerHTML = markup;
+    box.appendChild(holder);
+  }
+  source.addEventListener("progress", function (e) {
+    var d = JSON.parse(e.data);
+    stage.textContent = d.stage;
+    count.textContent = d.total ? d.done + "/" + d.total + " dosya" : "";
+  });
+  source.addEventListener("file", function (e) {
+    var d = JSON.parse(e.data);
+    var note = document.createElement("div");
+    note.className = "job-note";
+    note.textContent = d.name + ": " + d.hits + " IOU, XYZ " + (d.xyz.length ? d.xyz.join(", ") : "-") + ", " + d.elapsed_ms + " ms";
+    box.appendChild(note);
+    if (d.html) append(d.html);
+  });
+  source.addEventListener("panel", function (e) {
+    append(JSON.parse(e.data).html);
+  });
+  source.addEventListener("done", function () {
+    source.close();
+    stage.textContent = "Tamamlandı";
+    // Tam sonuç sayfası (sonraki adımın formu dahil) kartların yerini alır
+    window.location.replace(link.href);
+  });
+})();
+""".encode("utf-8")
+
+_PROGRESS_STYLE = (
+    "body{font-family:system-ui,sans-serif;margin:20px;}"
+    ".card{border:1px solid #ddd;border-radius:8px;padding:12px;margin:12px 0;}"
+    "table{border-collapse:collapse;width:100%;}th,td{border:1px solid #ddd;padding:4px 6px;text-align:left;}"
+    ".job-note{color:#666;font-size:13px;margin-top:16px;}"
+)
+
+
+def _send_progress(
+    handler: BaseHTTPRequestHandler,
+    job: Job,
+    status: int = 200,
+    add_headers: Optional[HeaderHook] = None,
+) -> None:
+    location = url_for(f"/jobs/{job.id}")
+    total = max(job.total, job.done)
+    counter = f"{job.done}/{total} dosya" if total else ""
+    payload = (
+        "<!doctype html>\n<html>\n  <head>\n"
+        "    <meta charset='utf-8'>\n"
+        # Betik çalışıyorsa sayfa yenilenmez, kartlar olay akışıyla eklenir
+        f"    <noscript><meta http-equiv='refresh' content='{JOB_REFRESH_SECONDS}'></noscript>\n"
+        f"    <title>İş {html.escape(job.id[:8])}</title>\n"
+        f"    <style>{_PROGRESS_STYLE}</style>\n"
+        f"    <script src='{html.escape(url_for('/jobs/progress.js'))}' defer></script>\n"
+        "  </head>\n  <body>\n"
+        "    <h3>Analiz arka planda çalışıyor</h3>\n"
+        f"    <p><strong>Aşama:</strong> <span id='job-stage'>{html.escape(job.stage)}</span> "
+        f"<span id='job-count'>{html.escape(counter)}</span></p>\n"
+        "    <p>Dosya sonuçları hazır oldukça aşağıya eklenir; analiz bitince sonuç sayfası bu adreste açılır. "
+        f"Bu sayfayı kapatsanız da iş sürer: <a id='job-link' href='{html.escape(location)}'>{html.escape(location)}</a></p>\n"
+        "    <div id='job-results'></div>\n"
+        "  </body>\n</html>"
+    ).encode("utf-8")
+    handler.send_response(status)
+    handler.send_header("Content-Type", "text/html; charset=utf-8")
+    handler.send_header("Cache-Control", "no-store")
+    if status == 202:
+        handler.send_header("Location", location)
+    if add_headers is not None:
+        add_headers(handler)
+    handler.send_header("Content-Length", str(len(payload)))
+    handler.end_headers()
+    if handler.command != "HEAD":
+        handler.wfile.write(payload)
+
+
+def _sse(event: str, event_id: int, data: Dict[str, Any]) -> bytes:
+    return f"event: {event}\nid: {event_id}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode("utf-8")
+
+
+def _event_stream(job_id: str, scope: str, start: int, follow: bool = True) -> Iterator[bytes]:
+    """Olayları SSE olarak üret; `follow` False ise beklemeden o ana kadarkilerle biter."""
+    sent = start
+    # Bağlantı koparsa ya da yanıt biterse tarayıcı `Last-Event-ID` ile kaldığı yerden ister
+    yield f"retry: {JOB_REFRESH_SECONDS * 1000}\n\n".encode("ascii")
+    while True:
+        job, events, finished = JOB_STORE.events(job_id, scope, sent, JOB_EVENT_KEEPALIVE_SECONDS if follow else 0)
+        if job is None:
+            return
+        for event in events:
+            sent += 1
+            yield _sse(event["type"], sent, event)
+        if finished:
+            yield _sse("done", sent + 1, {"status": job.status})
+            return
+        if not follow:
+            return
+        if not events:
+            yield b": bekleniyor\n\n"
+
+
+def serve_job(
+    handler: BaseHTTPRequestHandler,
+    handler_cls: Type[BaseHTTPRequestHandler],
+    add_headers: Optional[HeaderHook] = None,
+) -> bool:
+    """`/jobs/<id>`, `/jobs/<id>/status` ve `/jobs/<id>/events` isteklerini yanıtla; başka yolsa False."""
+    path = handler.path.partition("?")[0]
+    if not path.startswith("/jobs/"):
+        return False
+    if path == "/jobs/progress.js":
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/javascript; charset=utf-8")
+        handler.send_header("Cache-Control", "public, max-age=3600")
+        if add_headers is not None:
+            add_headers(handler)
+        handler.send_header("Content-Length", str(len(_PROGRESS_JS)))
+        handler.end_headers()
+        if handler.command != "HEAD":
+            handler.wfile.write(_PROGRESS_JS)
+        return True
+    job_id, _, tail = path[len("/jobs/"):].partition("/")
+    scope = _scope(handler_cls)
+    job = JOB_STORE.get(job_id, scope) if tail in ("", "status", "events") else None
+    if job is None:
+        handler.send_error(404, "Not Found")
+        return True
+    if tail == "events":
+        try:
+            start = max(0, int(handler.headers.get("Last-Event-ID") or 0))
+        except ValueError:
+            start = 0
+        headers = [("Content-Type", "text/event-stream; charset=utf-8"), ("Cache-Control", "no-store")]
+        if hand_off(handler, _event_stream(job_id, scope, start), headers, add_headers):
+            return True
+        # Akış havuzu yok ya da dolu (WSGI, asyncio bağlı kipi): istek işleyicisi
+        # iş boyunca tutulmaz, tarayıcı `retry` sonra yeniden sorar
+        payload = b"".join(_event_stream(job_id, scope, start, follow=False))
+        handler.send_response(200)
+        for name, value in headers:
+            handler.send_header(name, value)
+        if add_headers is not None:
+            add_headers(handler)
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        if handler.command != "HEAD":
+            handler.wfile.write(payload)
+        return True
+    if tail == "status":
+        status = job.to_json()
+        del status["scope"]
+        payload = json.dumps(status).encode("utf-8")
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/json; charset=utf-8")
+        handler.send_header("Cache-Control", "no-store")
+        if add_headers is not None:
+            add_headers(handler)
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        if handler.command != "HEAD":
+            handler.wfile.write(payload)
+        return True
+    if job.state != "done":
+        _send_progress(handler, job, 200, add_headers)
+        return True
+    # İşleyicinin kendi yanıtı (güvenlik başlıkları dahil) olduğu gibi
+    handler.send_response(job.status, job.reason or None)
+    for name, value in job.headers:
+        handler.send_header(name, value)
+    handler.send_header("Content-Length", str(len(job.body)))
+    handler.end_headers()
+    if handler.command != "HEAD":
+        handler.wfile.write(job.body)
+    return True
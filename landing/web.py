@@ -2,34 +2,31 @@ from __future__ import annotations
 
 import argparse
 import html
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from http.server import BaseHTTPRequestHandler
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, Optional
 
-from favicon import render_head_links, try_load_asset
+from favicon import render_head_links, try_load_static
+from http_cache import CACHE_ASSET, CACHE_PAGE, CachedBody, StaticFile, asset_cache_control, send_cached, send_file
+from serving import configure_server, make_server, serve
 
 _BASE_DIR = Path(__file__).resolve().parent
 _PHOTO_DIR = _BASE_DIR.parent / "photos"
 
-_LOCAL_ASSET_META = {
-    "/assets/bg_stars.gif": (_BASE_DIR / "bg_stars.gif", "image/gif"),
-    "/assets/lobotomy.jpg": (_PHOTO_DIR / "lobotomy.jpg", "image/jpeg"),
-    "/assets/kan.jpeg": (_PHOTO_DIR / "kan.jpeg", "image/jpeg"),
-    "/assets/ICT.jpg": (_PHOTO_DIR / "ICT.jpg", "image/jpeg"),
-    "/assets/chud.jpeg": (_PHOTO_DIR / "chud.jpeg", "image/jpeg"),
-    "/assets/pussy.png": (_PHOTO_DIR / "pussy.png", "image/png"),
-    "/assets/penguins.jpg": (_PHOTO_DIR / "penguins.jpg", "image/jpeg"),
-    "/assets/umt.jpg": (_PHOTO_DIR / "umt.jpg", "image/jpeg"),
-    "/assets/silkroad.jpg": (_PHOTO_DIR / "silkroad.jpg", "image/jpeg"),
-    "/assets/suicide.png": (_PHOTO_DIR / "suicide.png", "image/png"),
+# Görseller bellekte tutulmaz; her istekte diskten gönderilir
+_LOCAL_ASSETS: Dict[str, StaticFile] = {
+    "/assets/bg_stars.gif": StaticFile(_BASE_DIR / "bg_stars.gif", "image/gif"),
+    "/assets/lobotomy.jpg": StaticFile(_PHOTO_DIR / "lobotomy.jpg", "image/jpeg"),
+    "/assets/kan.jpeg": StaticFile(_PHOTO_DIR / "kan.jpeg", "image/jpeg"),
+    "/assets/ICT.jpg": StaticFile(_PHOTO_DIR / "ICT.jpg", "image/jpeg"),
+    "/assets/chud.jpeg": StaticFile(_PHOTO_DIR / "chud.jpeg", "image/jpeg"),
+    "/assets/pussy.png": StaticFile(_PHOTO_DIR / "pussy.png", "image/png"),
+    "/assets/penguins.jpg": StaticFile(_PHOTO_DIR / "penguins.jpg", "image/jpeg"),
+    "/assets/umt.jpg": StaticFile(_PHOTO_DIR / "umt.jpg", "image/jpeg"),
+    "/assets/silkroad.jpg": StaticFile(_PHOTO_DIR / "silkroad.jpg", "image/jpeg"),
+    "/assets/suicide.png": StaticFile(_PHOTO_DIR / "suicide.png", "image/png"),
 }
 
-_LOCAL_ASSETS: Dict[str, Tuple[bytes, str]] = {}
-for route, (fs_path, content_type) in _LOCAL_ASSET_META.items():
-    if not fs_path.is_file():  # pragma: no cover - defensive guard
-        raise FileNotFoundError(f"Yerel asset bulunamadı: {fs_path}")
-    _LOCAL_ASSETS[route] = (fs_path.read_bytes(), content_type)
-
 _IMAGE_SOURCES = {
     "logo": "/assets/lobotomy.jpg",
     "app48": "/assets/kan.jpeg",
@@ -61,7 +58,7 @@ def _normalize_path(path: str) -> str:
     return root
 
 
-def try_load_local_asset(path: str) -> Optional[Tuple[bytes, str]]:
+def try_load_local_asset(path: str) -> Optional[StaticFile]:
     return _LOCAL_ASSETS.get(_normalize_path(path))
 
 
@@ -178,35 +175,23 @@ def build_html(app_links: Dict[str, Dict[str, str]]) -> bytes:
 
 
 def make_handler(html_bytes: bytes):
+    landing_page = CachedBody(html_bytes, "text/html; charset=utf-8")
+
     class LandingHandler(BaseHTTPRequestHandler):
         def do_GET(self) -> None:  # noqa: N802
             normalized = _normalize_path(self.path)
             local_asset = try_load_local_asset(normalized)
             if local_asset:
-                payload, content_type = local_asset
-                self.send_response(200)
-                self.send_header("Content-Type", content_type)
-                self.send_header("Content-Length", str(len(payload)))
-                self.end_headers()
-                self.wfile.write(payload)
+                send_file(self, local_asset, CACHE_ASSET)
                 return
 
-            asset = try_load_asset(self.path)
+            asset = try_load_static(self.path)
             if asset:
-                payload, content_type = asset
-                self.send_response(200)
-                self.send_header("Content-Type", content_type)
-                self.send_header("Content-Length", str(len(payload)))
-                self.end_headers()
-                self.wfile.write(payload)
+                send_file(self, asset, asset_cache_control(self.path))
                 return
 
             if normalized in {"/", "/index", "/index.html"}:
-                self.send_response(200)
-                self.send_header("Content-Type", "text/html; charset=utf-8")
-                self.send_header("Content-Length", str(len(html_bytes)))
-                self.end_headers()
-                self.wfile.write(html_bytes)
+                send_cached(self, landing_page, CACHE_PAGE)
             elif normalized == "/health":
                 payload = b"ok"
                 self.send_response(200)
@@ -217,6 +202,8 @@ def make_handler(html_bytes: bytes):
             else:
                 self.send_error(404, "Not Found")
 
+        do_HEAD = do_GET
+
         def log_message(self, format, *args):  # noqa: A003
             pass
 
@@ -226,9 +213,9 @@ def make_handler(html_bytes: bytes):
 def run(host: str, port: int, app_links: Dict[str, Dict[str, str]]) -> None:
     html_bytes = build_html(app_links)
     handler_cls = make_handler(html_bytes)
-    server = HTTPServer((host, port), handler_cls)
+    server = make_server(host, port, handler_cls)
     print(f"landing page: http://{host}:{port}/")
-    server.serve_forever()
+    serve(server)
 
 
 def main(argv: list[str] | None = None) -> int:
@@ -275,7 +262,11 @@ def main(argv: list[str] | None = None) -> int:
         default="http://127.0.0.1:2300/",
         help="Takvim dönüştürücü arayüzü için URL",
     )
+    parser.add_argument("--workers", type=int, default=None, help="İstek işleyen iş parçacığı sayısı (vars: 8)")
+    parser.add_argument("--queue-limit", type=int, default=None, help="İşlenen + bekleyen en fazla istek; aşılırsa 503 (vars: 32)")
+    parser.add_argument("--cpu-workers", type=int, default=None, help="POST isteklerini işleyen süreç sayısı (vars: 0 = iş parçacığında)")
     args = parser.parse_args(argv)
+    configure_server(args.workers, args.queue_limit, args.cpu_workers)
 
     app_links = {
         "app48": {"title": "app48", "url": args.app48_url},
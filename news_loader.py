@@ -1,12 +1,46 @@
 import json
-from datetime import datetime, timedelta
+import time
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
 NEWS_FILE_PATTERN = "*.json"
 NEWS_DIR_NAME = "economic_calendar"
-_NEWS_CACHE: List[Dict[str, Any]] = []
+# Seconds between checks of the news files for changes (glob + stat per check)
+NEWS_RECHECK_SECONDS = 2.0
+
+
+class NewsEvent(NamedTuple):
+    """Immutable news record; `window` is set on records returned by lookups."""
+
+    timestamp: datetime
+    date: date
+    time: str
+    title: str
+    has_null_value: bool
+    all_day: bool
+    category: str
+    window: str = ""
+
+
+class _NewsIndex(NamedTuple):
+    # Timed events sorted by timestamp, pre-tagged for the forward window
+    timed_ts: List[datetime]
+    timed: List[NewsEvent]
+    timed_pos: List[int]
+    # Timed events without an actual value, pre-tagged as recent-null
+    null_ts: List[datetime]
+    null: List[NewsEvent]
+    null_pos: List[int]
+    # All-day events by calendar date
+    all_day: Dict[date, List[Tuple[int, NewsEvent]]]
+
+
+_NEWS_CACHE: List[NewsEvent] = []
+_NEWS_INDEX = _NewsIndex([], [], [], [], [], [], {})
 _NEWS_CACHE_KEY: Optional[Tuple[Tuple[str, int, int], ...]] = None
+_NEWS_CHECKED_AT: Optional[float] = None
 
 
 def _gather_news_files(base_dir: Path) -> List[Path]:
@@ -41,22 +75,44 @@ def _build_news_cache_key(files: List[Path]) -> Tuple[Tuple[str, int, int], ...]
     return tuple(key_parts)
 
 
-def load_news_events() -> List[Dict[str, Any]]:
+def _build_news_index(events: List[NewsEvent]) -> _NewsIndex:
+    index = _NewsIndex([], [], [], [], [], [], {})
+    # Positions in the sorted event list keep ties in load order when windows are merged
+    for pos, event in enumerate(events):
+        if event.all_day:
+            index.all_day.setdefault(event.date, []).append((pos, event._replace(window="all-day")))
+            continue
+        index.timed_ts.append(event.timestamp)
+        index.timed.append(event._replace(window="forward"))
+        index.timed_pos.append(pos)
+        if event.has_null_value:
+            index.null_ts.append(event.timestamp)
+            index.null.append(event._replace(window="recent-null"))
+            index.null_pos.append(pos)
+    return index
+
+
+def load_news_events() -> List[NewsEvent]:
     """
     Load ForexFactory-style news events from JSON files. Each file must provide a
     top-level `days` list whose entries expose `date` and an `events` list. Every
     event should include `time_24h` (HH:MM) and `title`. The loader caches results
-    and refreshes automatically when files change.
+    and refreshes automatically when files change (checked at most every
+    `NEWS_RECHECK_SECONDS`).
     """
+    global _NEWS_CACHE, _NEWS_INDEX, _NEWS_CACHE_KEY, _NEWS_CHECKED_AT
+    now = time.monotonic()
+    if _NEWS_CHECKED_AT is not None and now - _NEWS_CHECKED_AT < NEWS_RECHECK_SECONDS:
+        return _NEWS_CACHE
+
     base_dir = Path(__file__).resolve().parent
     files = _gather_news_files(base_dir)
     cache_key = _build_news_cache_key(files)
-
-    global _NEWS_CACHE, _NEWS_CACHE_KEY
     if cache_key == _NEWS_CACHE_KEY:
+        _NEWS_CHECKED_AT = now
         return _NEWS_CACHE
 
-    events: List[Dict[str, Any]] = []
+    events: List[NewsEvent] = []
     for path in files:
         try:
             payload = json.loads(path.read_text(encoding="utf-8"))
@@ -136,20 +192,23 @@ def load_news_events() -> List[Dict[str, Any]]:
                     category = "normal"
 
                 events.append(
-                    {
-                        "timestamp": event_ts,
-                        "date": event_ts.date(),
-                        "time": display_time,
-                        "title": title,
-                        "has_null_value": has_null_value,
-                        "all_day": is_all_day,
-                        "category": category,
-                    }
+                    NewsEvent(
+                        timestamp=event_ts,
+                        date=event_ts.date(),
+                        time=display_time,
+                        title=title,
+                        has_null_value=has_null_value,
+                        all_day=is_all_day,
+                        category=category,
+                    )
                 )
 
-    events.sort(key=lambda item: item["timestamp"])
+    events.sort(key=lambda item: item.timestamp)
+    # Index first: a concurrent reader that sees the new cache also sees its index
+    _NEWS_INDEX = _build_news_index(events)
     _NEWS_CACHE = events
     _NEWS_CACHE_KEY = cache_key
+    _NEWS_CHECKED_AT = now
     return events
 
 
@@ -157,36 +216,35 @@ def find_news_for_timestamp(
     ts: datetime,
     duration_minutes: int,
     null_back_minutes: int = 0,
-) -> List[Dict[str, Any]]:
+) -> List[NewsEvent]:
     """
     Return news events that fall within the inclusive start / exclusive end window
     of the candle that begins at `ts`. If `null_back_minutes` is provided, recent
     news entries whose actual values are missing/NULL are also returned when they
-    occurred within the previous `null_back_minutes`.
+    occurred within the previous `null_back_minutes`. Records are shared between
+    calls (window already set), so lookups cost O(log n + k) without copying.
     """
-    events = load_news_events()
-    if not events:
+    if not load_news_events():
         return []
+    index = _NEWS_INDEX
 
     window_end = ts + timedelta(minutes=duration_minutes)
-    null_window_start = ts - timedelta(minutes=max(0, null_back_minutes))
-
-    matches: List[Dict[str, Any]] = []
-    for event in events:
-        event_ts = event["timestamp"]
-        if event.get("all_day"):
-            if event_ts.date() == ts.date():
-                matches.append({**event, "window": "all-day"})
-            continue
-        if ts <= event_ts < window_end:
-            matches.append({**event, "window": "forward"})
-            continue
-        if (
-            null_back_minutes > 0
-            and event.get("has_null_value")
-            and null_window_start <= event_ts < ts
-        ):
-            matches.append({**event, "window": "recent-null"})
-
-    matches.sort(key=lambda item: item["timestamp"])
-    return matches
+    lo = bisect_left(index.timed_ts, ts)
+    hi = bisect_left(index.timed_ts, window_end, lo)
+    forward = index.timed[lo:hi]
+
+    day_events = index.all_day.get(ts.date(), ())
+
+    null_lo = null_hi = 0
+    if null_back_minutes > 0:
+        null_hi = bisect_left(index.null_ts, ts)
+        null_lo = bisect_left(index.null_ts, ts - timedelta(minutes=null_back_minutes), 0, null_hi)
+
+    if not day_events and null_lo == null_hi:
+        return forward
+    # Several windows matched: order by load position (timestamp, then file order)
+    picked = list(day_events)
+    picked.extend(zip(index.null_pos[null_lo:null_hi], index.null[null_lo:null_hi]))
+    picked.extend(zip(index.timed_pos[lo:hi], forward))
+    picked.sort(key=lambda item: item[0])
+    return [event for _, event in picked]
@@ -0,0 +1,94 @@
+"""Uygulama sayfalarının ortak kabuğu (başlık, stiller, sekmeler).
+
+Her uygulama kabuğunu bir kez, başlık ve gövde yerine `TITLE_SLOT` ve
+`BODY_SLOT` işaretleri koyarak üretir; `PageTemplate` bunu etkin sekme ve
+bağlı önek başına bayta çevirip işaretlerden böler. İstek başına yalnız
+başlık kaçışlanır ve gövde kodlanır; parçalar birleştirilmeden yazılır
+(gerçek sokette tek `sendmsg`, yani writev).
+"""
+
+from __future__ import annotations
+
+import html
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from serving import url_for
+
+TITLE_SLOT = "\x00title\x00"
+BODY_SLOT = "\x00body\x00"
+
+HeaderHook = Callable[[BaseHTTPRequestHandler], None]
+
+
+def write_parts(handler: BaseHTTPRequestHandler, parts: Sequence[bytes]) -> None:
+    """Gövde parçalarını birleştirmeden yaz; gerçek sokette `sendmsg` ile."""
+    sock = getattr(handler, "connection", None)
+    wfile = handler.wfile
+    if isinstance(sock, socket.socket) and hasattr(sock, "sendmsg") and not getattr(wfile, "buffering", False):
+        # Başlıklar sokete ulaşmış olmalı
+        wfile.flush()
+        views = [memoryview(part) for part in parts if part]
+        while views:
+            sent = sock.sendmsg(views)
+            while views and sent >= len(views[0]):
+                sent -= len(views.pop(0))
+            if sent:
+                views[0] = views[0][sent:]
+        return
+    for part in parts:
+        wfile.write(part)
+
+
+class PageTemplate:
+    """Bir uygulamanın sayfa kabuğu; statik kısımlar bayt olarak bir kez derlenir."""
+
+    def __init__(self, shell: Callable[[str], str]) -> None:
+        # shell(active_tab) -> TITLE_SLOT ve BODY_SLOT içeren tam HTML
+        self._shell = shell
+        self._compiled: Dict[Tuple[str, str], Tuple[bytes, bytes, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def _segments(self, active_tab: str) -> Tuple[bytes, bytes, bytes]:
+        key = (active_tab, url_for(""))
+        segments = self._compiled.get(key)
+        if segments is None:
+            before, _, rest = self._shell(active_tab).partition(TITLE_SLOT)
+            middle, _, after = rest.partition(BODY_SLOT)
+            segments = (before.encode("utf-8"), middle.encode("utf-8"), after.encode("utf-8"))
+            with self._lock:
+                self._compiled.setdefault(key, segments)
+        return segments
+
+    def chunks(self, title: str, body: str, active_tab: str = "analyze") -> List[bytes]:
+        before, middle, after = self._segments(active_tab)
+        return [before, html.escape(title).encode("utf-8"), middle, body.encode("utf-8"), after]
+
+    def parts(self, title: str, active_tab: str = "analyze") -> Tuple[bytes, bytes]:
+        """Gövdeden önceki ve sonraki baytlar (akışlı yanıtlar için)."""
+        before, middle, after = self._segments(active_tab)
+        return before + html.escape(title).encode("utf-8") + middle, after
+
+    def render(self, title: str, body: str, active_tab: str = "analyze") -> bytes:
+        return b"".join(self.chunks(title, body, active_tab))
+
+    def send(
+        self,
+        handler: BaseHTTPRequestHandler,
+        title: str,
+        body: str,
+        active_tab: str = "analyze",
+        add_headers: Optional[HeaderHook] = None,
+    ) -> None:
+        """Sayfayı `200` olarak gönder; gövde tek parça halinde kurulmaz."""
+        chunks = self.chunks(title, body, active_tab)
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/html; charset=utf-8")
+        if add_headers is not None:
+            add_headers(handler)
+        handler.send_header("Content-Length", str(sum(len(chunk) for chunk in chunks)))
+        handler.end_headers()
+        if handler.command != "HEAD":
+            write_parts(handler, chunks)
@@ -0,0 +1,55 @@
+"""IOU örüntüleme motoru: üçlü otomatı, örüntü DAG'ı, artımlı zincirleme ve paneller."""
+
+from .automaton import (
+    PATTERN_DOMAIN,
+    advance_state,
+    allowed_values_for_state,
+    continuation_options_for_sequence,
+    fmt_off,
+    infer_pattern_group_width,
+    initial_pattern_state,
+)
+from .builder import build_patterns_from_xyz_lists
+from .chain import (
+    CHAIN_STORE,
+    ChainStore,
+    PatternChain,
+    build_chained_pattern_sequences,
+    configure_chains,
+    resume_chain,
+)
+from .memo import PATTERN_MEMO, PatternMemo, configure_memo
+from .mirror import find_mirror_chain_highlights, iter_paths_with_mirrors
+from .panel import render_combined_pattern_panel, render_pattern_panel
+from .payload import decode_pattern_payload, encode_pattern_payload
+from .search import configure_search
+from .trie import PatternTrie, iter_paths
+
+__all__ = [
+    "PATTERN_DOMAIN",
+    "advance_state",
+    "allowed_values_for_state",
+    "continuation_options_for_sequence",
+    "fmt_off",
+    "infer_pattern_group_width",
+    "initial_pattern_state",
+    "build_patterns_from_xyz_lists",
+    "CHAIN_STORE",
+    "ChainStore",
+    "PatternChain",
+    "build_chained_pattern_sequences",
+    "configure_chains",
+    "resume_chain",
+    "PATTERN_MEMO",
+    "PatternMemo",
+    "configure_memo",
+    "find_mirror_chain_highlights",
+    "iter_paths_with_mirrors",
+    "render_combined_pattern_panel",
+    "render_pattern_panel",
+    "decode_pattern_payload",
+    "encode_pattern_payload",
+    "configure_search",
+    "PatternTrie",
+    "iter_paths",
+]
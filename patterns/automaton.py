@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+__all__ = (
+    "PATTERN_DOMAIN",
+    "StateKey",
+    "INITIAL_STATE_KEY",
+    "fmt_off",
+    "initial_pattern_state",
+    "state_key",
+    "allowed_values_for_key",
+    "advance_key",
+    "allowed_values_for_state",
+    "advance_state",
+    "apply_pattern_sequence",
+    "continuation_options_for_sequence",
+    "infer_pattern_group_width",
+)
+
+PATTERN_DOMAIN = {-3, -2, -1, 0, 1, 2, 3}
+_DOMAIN_KEY: FrozenSet[int] = frozenset(PATTERN_DOMAIN)
+_VALUE_ORDER = {-3: 0, -2: 1, -1: 2, 0: 3, 1: 4, 2: 5, 3: 6}
+
+# (mode, sign, dir, pos, allow_zero_next, prev) — "seq" hariç otomat durumu.
+# mode: 'free' | 'after_zero' | 'triple' | 'need_zero'
+StateKey = Tuple[str, Optional[int], Optional[str], Optional[int], bool, Optional[int]]
+INITIAL_STATE_KEY: StateKey = ("free", None, None, None, False, None)
+
+
+def fmt_off(v: int) -> str:
+    return f"+{v}" if v > 0 else str(v)
+
+
+def _sign(v: int) -> int:
+    if v > 0:
+        return 1
+    if v < 0:
+        return -1
+    return 0
+
+
+def initial_pattern_state() -> Dict[str, Any]:
+    return {
+        "mode": "free",
+        "sign": None,
+        "dir": None,
+        "pos": None,
+        "allow_zero_next": False,
+        "prev": None,
+        "seq": [],
+    }
+
+
+def state_key(state: Dict[str, Any]) -> StateKey:
+    return (
+        state.get("mode"),
+        state.get("sign"),
+        state.get("dir"),
+        state.get("pos"),
+        bool(state.get("allow_zero_next")),
+        state.get("prev"),
+    )
+
+
+def _state_from_key(key: StateKey) -> Dict[str, Any]:
+    mode, sign, direction, pos, allow_zero_next, prev = key
+    return {
+        "mode": mode,
+        "sign": sign,
+        "dir": direction,
+        "pos": pos,
+        "allow_zero_next": allow_zero_next,
+        "prev": prev,
+    }
+
+
+@lru_cache(maxsize=None)
+def allowed_values_for_key(key: StateKey, choices: FrozenSet[int], allow_zero_after_start: bool) -> Tuple[int, ...]:
+    mode, sign, direction, pos, allow_zero_next, prev = key
+
+    allowed: Set[int] = set()
+    if mode == "free":
+        allowed = set(choices)
+    elif mode == "after_zero":
+        for k in (1, 3):
+            for s in (-1, 1):
+                v = s * k
+                if v in choices:
+                    allowed.add(v)
+    elif mode == "triple":
+        if pos == 2 and direction is None:
+            # ±2 ile başlandıysa sonraki değer 1 veya 3 (aynı işaret)
+            for k in (1, 3):
+                v = sign * k
+                if v in choices:
+                    allowed.add(v)
+        else:
+            if direction == "asc":
+                nxt = 2 if pos == 1 else (3 if pos == 2 else None)
+            else:  # desc
+                nxt = 2 if pos == 3 else (1 if pos == 2 else None)
+            if nxt is not None:
+                v = sign * nxt
+                if v in choices:
+                    allowed.add(v)
+    elif mode == "need_zero":
+        if 0 in choices:
+            allowed = {0}
+
+    # Özel kural: ilk adım ±1/±3 ise bir sonraki adımda 0 opsiyonunu da aç
+    if allow_zero_after_start and allow_zero_next and 0 in choices:
+        allowed.add(0)
+
+    # Ard arda aynı değer yasak
+    if prev is not None and prev in allowed:
+        allowed.discard(prev)
+
+    return tuple(sorted(allowed, key=lambda v: _VALUE_ORDER.get(v, 99)))
+
+
+@lru_cache(maxsize=None)
+def advance_key(key: StateKey, value: int, at_start: bool, allow_zero_after_start: bool) -> StateKey:
+    mode, sign, direction, pos, allow_zero_next, _prev = key
+    # Varsayılan: mod/işaret/yön korunur, allow_zero_next sıfırlanır
+    n_mode, n_sign, n_dir, n_pos, n_allow_zero = mode, sign, direction, pos, False
+
+    if mode == "free":
+        if value == 0:
+            n_mode, n_sign, n_dir, n_pos = "after_zero", None, None, None
+        else:
+            s = _sign(value)
+            a = abs(value)
+            if a == 2:
+                n_mode, n_sign, n_dir, n_pos = "triple", s, None, 2
+            elif a == 1:
+                n_mode, n_sign, n_dir, n_pos = "triple", s, "asc", 1
+            elif a == 3:
+                n_mode, n_sign, n_dir, n_pos = "triple", s, "desc", 3
+            # Özel kural (sadece global ilk adım için): sonraki adıma 0 izni
+            if allow_zero_after_start and a in (1, 3) and at_start:
+                n_allow_zero = True
+    elif mode == "after_zero":
+        # Sadece ±1/±3 ile yeni üçlü başlar
+        s = _sign(value)
+        a = abs(value)
+        if a == 1:
+            n_mode, n_sign, n_dir, n_pos = "triple", s, "asc", 1
+        elif a == 3:
+            n_mode, n_sign, n_dir, n_pos = "triple", s, "desc", 3
+    elif mode == "triple":
+        if value == 0 and allow_zero_next:
+            # İlk adım ±1/±3 sonrası 0 istisnası
+            n_mode, n_sign, n_dir, n_pos = "after_zero", None, None, None
+        else:
+            s = sign
+            a = abs(value)
+            if pos == 2 and direction is None:
+                # 2'den 1 veya 3'e geçiş tamamlanınca 0 beklenir
+                if a == 1:
+                    n_mode, n_sign, n_dir, n_pos = "need_zero", s, "desc", 1
+                elif a == 3:
+                    n_mode, n_sign, n_dir, n_pos = "need_zero", s, "asc", 3
+            else:
+                if direction == "asc":
+                    if pos == 1 and a == 2:
+                        n_mode, n_sign, n_dir, n_pos = "triple", s, "asc", 2
+                    elif pos == 2 and a == 3:
+                        n_mode, n_sign, n_dir, n_pos = "need_zero", s, "asc", 3
+                else:  # desc
+                    if pos == 3 and a == 2:
+                        n_mode, n_sign, n_dir, n_pos = "triple", s, "desc", 2
+                    elif pos == 2 and a == 1:
+                        n_mode, n_sign, n_dir, n_pos = "need_zero", s, "desc", 1
+    elif mode == "need_zero":
+        if value == 0:
+            n_mode, n_sign, n_dir, n_pos = "after_zero", None, None, None
+
+    return (n_mode, n_sign, n_dir, n_pos, n_allow_zero, value)
+
+
+def allowed_values_for_state(state: Dict[str, Any], choices: Iterable[int], allow_zero_after_start: bool) -> List[int]:
+    return list(allowed_values_for_key(state_key(state), frozenset(choices), allow_zero_after_start))
+
+
+def advance_state(state: Dict[str, Any], value: int, step_idx: int, allow_zero_after_start: bool) -> Dict[str, Any]:
+    ns = _state_from_key(advance_key(state_key(state), value, step_idx == 0, allow_zero_after_start))
+    ns["seq"] = list(state.get("seq") or []) + [value]
+    return ns
+
+
+def apply_pattern_sequence(
+    key: StateKey,
+    pattern: Iterable[int],
+    start_len: int,
+    allow_zero_after_start: bool,
+) -> Optional[StateKey]:
+    """`key` durumundan `pattern` değerlerini sırayla uygula; kural dışıysa None."""
+    step_idx = start_len
+    for value in pattern:
+        if value not in allowed_values_for_key(key, _DOMAIN_KEY, allow_zero_after_start):
+            return None
+        key = advance_key(key, value, step_idx == 0, allow_zero_after_start)
+        step_idx += 1
+    return key
+
+
+def continuation_options_for_sequence(seq: List[int], allow_zero_after_start: bool) -> List[int]:
+    key = apply_pattern_sequence(INITIAL_STATE_KEY, seq, 0, allow_zero_after_start)
+    if key is None:
+        return []
+    return list(allowed_values_for_key(key, _DOMAIN_KEY, allow_zero_after_start))
+
+
+def infer_pattern_group_width(pattern_group: List[List[int]]) -> int:
+    for seq in pattern_group:
+        if seq:
+            return len(seq)
+    return 0
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from typing import FrozenSet, List, Optional, Set, Tuple
+
+from .automaton import INITIAL_STATE_KEY, StateKey, advance_key, allowed_values_for_key
+from .memo import PATTERN_MEMO
+
+__all__ = ("build_patterns_from_xyz_lists",)
+
+
+def build_patterns_from_xyz_lists(
+    xyz_sets: List[Set[int]],
+    allow_zero_after_start: bool,
+    max_paths: Optional[int] = None,
+    beam_width: Optional[int] = None,
+) -> List[List[int]]:
+    if not xyz_sets:
+        return []
+    frozen = tuple(frozenset(int(v) for v in choices) for choices in xyz_sets)
+    results = PATTERN_MEMO.get_or_build(
+        ("paths", tuple(tuple(sorted(c)) for c in frozen), allow_zero_after_start, max_paths, beam_width),
+        lambda: _build_paths(frozen, allow_zero_after_start, max_paths, beam_width),
+    )
+    # Önbellekteki demetler paylaşılır; çağırana değiştirilebilir kopya ver
+    return [list(seq) for seq in results]
+
+
+def _build_paths(
+    xyz_sets: Tuple[FrozenSet[int], ...],
+    allow_zero_after_start: bool,
+    max_paths: Optional[int],
+    beam_width: Optional[int],
+) -> Tuple[Tuple[int, ...], ...]:
+    # Başlangıç durumu
+    states: List[Tuple[StateKey, Tuple[int, ...]]] = [(INITIAL_STATE_KEY, ())]
+    for idx, choice_key in enumerate(xyz_sets):
+        next_states: List[Tuple[StateKey, Tuple[int, ...]]] = []
+        for key, seq in states:
+            allowed = allowed_values_for_key(key, choice_key, allow_zero_after_start)
+            if not allowed:
+                continue
+            for v in allowed:
+                next_states.append((advance_key(key, v, idx == 0, allow_zero_after_start), seq + (v,)))
+                if beam_width is not None and len(next_states) >= beam_width:
+                    # Basit beam budaması
+                    break
+            if beam_width is not None and len(next_states) >= beam_width:
+                break
+        states = next_states
+        if not states:
+            break
+    results = tuple(seq for _, seq in states if len(seq) == len(xyz_sets))
+    if max_paths is not None:
+        return results[:max_paths]
+    return results
@@ -0,0 +1,520 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .automaton import _DOMAIN_KEY, INITIAL_STATE_KEY, StateKey, advance_key, allowed_values_for_key
+from .memo import PATTERN_MEMO, estimate_size
+from .trie import PatternTrie, iter_paths
+
+__all__ = (
+    "PatternChain",
+    "ChainStore",
+    "CHAIN_STORE",
+    "configure_chains",
+    "build_chained_pattern_sequences",
+    "resume_chain",
+)
+
+GroupLike = Union[PatternTrie, Iterable[Sequence[int]]]
+ChainNode = Tuple[int, int]  # (katman, katman içi düğüm)
+
+_TOKEN_RE = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+
+
+class _ChainLayer:
+    """Bir grubun zincire eklenmesiyle oluşan katman.
+
+    Düğümler (grup trie düğümü, birleşik otomat durumu, başlangıçta mı)
+    üçlüsüdür. i. düğüm önceki katmanın i. frontier girdisine karşılık gelir.
+    `exits[n]`, trie'de biten düğümün bu katmandaki frontier indeksidir;
+    `order` düğümlerin topolojik sırasıdır.
+    """
+
+    __slots__ = (
+        "trie",
+        "keys",
+        "edges",
+        "exits",
+        "frontier_keys",
+        "frontier_starts",
+        "frontier_ways",
+        "order",
+    )
+
+    def __init__(self, trie: PatternTrie) -> None:
+        self.trie = trie
+        self.keys: List[StateKey] = []
+        self.edges: List[Tuple[Tuple[int, int], ...]] = []
+        self.exits: Dict[int, int] = {}
+        self.frontier_keys: List[StateKey] = []
+        self.frontier_starts: List[bool] = []
+        self.frontier_ways: List[int] = []
+        self.order: List[int] = []
+
+
+def _root_layer() -> _ChainLayer:
+    layer = _ChainLayer(PatternTrie.from_sequences([[]], True))
+    layer.frontier_keys = [INITIAL_STATE_KEY]
+    layer.frontier_starts = [True]
+    layer.frontier_ways = [1]
+    return layer
+
+
+_ROOT_LAYER = _root_layer()
+
+
+def _as_trie(group: GroupLike, allow_zero_after_start: bool) -> PatternTrie:
+    if isinstance(group, PatternTrie):
+        return group
+    return PatternTrie.from_sequences(group, allow_zero_after_start)
+
+
+class PatternChain:
+    """Ardışık IOU örüntü gruplarının artımlı zinciri.
+
+    Zincir, grup trie'leri ile otomatın çarpımı olan katmanlı bir DAG'dır;
+    birleşik diziler hiç açılmadan saklanır. `extend` yalnız son katmanın
+    frontier'ından yürür ve yeni bir zincir döndürür; önceki katmanlar
+    paylaşılır ve değiştirilmez.
+    """
+
+    __slots__ = ("allow_zero_after_start", "_layers", "_suffix", "_graph")
+
+    def __init__(self, allow_zero_after_start: bool = True, _layers: Tuple[_ChainLayer, ...] = (_ROOT_LAYER,)) -> None:
+        self.allow_zero_after_start = allow_zero_after_start
+        self._layers = _layers
+        self._suffix: Optional[List[List[int]]] = None
+        self._graph: Optional[Union["_ChainGraph", PatternTrie]] = None
+
+    @classmethod
+    def from_groups(cls, pattern_groups: Iterable[GroupLike], allow_zero_after_start: bool) -> "PatternChain":
+        chain = cls(allow_zero_after_start)
+        for group in pattern_groups:
+            chain = chain.extend(group)
+        return chain
+
+    @property
+    def group_count(self) -> int:
+        return len(self._layers) - 1
+
+    @property
+    def frontier_size(self) -> int:
+        return len(self._layers[-1].frontier_keys)
+
+    @property
+    def groups(self) -> List[PatternTrie]:
+        return [layer.trie for layer in self._layers[1:]]
+
+    @property
+    def uniform(self) -> bool:
+        return all(layer.trie.uniform for layer in self._layers[1:])
+
+    @property
+    def fingerprint(self) -> Hashable:
+        """Önbellek anahtarı: 0 izni ve grup geçmişinin parmak izleri."""
+        return (self.allow_zero_after_start, tuple(layer.trie.fingerprint for layer in self._layers[1:]))
+
+    def memo_size(self) -> int:
+        # Önceki katmanlar önek zincirleriyle paylaşılır; yalnız son katman sayılır
+        layer = self._layers[-1]
+        return 200 * len(layer.keys) + 72 * sum(len(e) for e in layer.edges) + 120 * len(layer.frontier_keys)
+
+    def extend(self, group: GroupLike) -> "PatternChain":
+        """Yeni grubu yalnız mevcut frontier üzerinden zincire ekle (önbellekli)."""
+        trie = _as_trie(group, self.allow_zero_after_start)
+        allow, history = self.fingerprint
+        return PATTERN_MEMO.get_or_build(
+            ("chain", allow, history + (trie.fingerprint,)),
+            lambda: self._extend(trie),
+        )
+
+    def _extend(self, trie: PatternTrie) -> "PatternChain":
+        allow = self.allow_zero_after_start
+        prev = self._layers[-1]
+        layer = _ChainLayer(trie)
+        index: Dict[Tuple[int, StateKey, bool], int] = {}
+        starts: List[bool] = []
+        ways: List[int] = []
+        buckets: List[List[int]] = [[] for _ in range(trie.node_count)]
+
+        def node_for(t_node: int, key: StateKey, at_start: bool) -> int:
+            ident = (t_node, key, at_start)
+            idx = index.get(ident)
+            if idx is None:
+                idx = len(layer.keys)
+                index[ident] = idx
+                layer.keys.append(key)
+                layer.edges.append(())
+                starts.append(at_start)
+                ways.append(0)
+                buckets[t_node].append(idx)
+            return idx
+
+        for key, at_start, count in zip(prev.frontier_keys, prev.frontier_starts, prev.frontier_ways):
+            ways[node_for(trie.root, key, at_start)] += count
+        frontier: Dict[Tuple[StateKey, bool], int] = {}
+        # Trie kimlikleri topolojik: kovaları sırayla işlemek yeterli
+        for t_node in range(trie.node_count):
+            for idx in buckets[t_node]:
+                layer.order.append(idx)
+                key = layer.keys[idx]
+                at_start = starts[idx]
+                if trie.is_terminal(t_node):
+                    f_ident = (key, at_start)
+                    f_idx = frontier.get(f_ident)
+                    if f_idx is None:
+                        f_idx = len(layer.frontier_keys)
+                        frontier[f_ident] = f_idx
+                        layer.frontier_keys.append(key)
+                        layer.frontier_starts.append(at_start)
+                        layer.frontier_ways.append(0)
+                    layer.frontier_ways[f_idx] += ways[idx]
+                    layer.exits[idx] = f_idx
+                out: List[Tuple[int, int]] = []
+                allowed = allowed_values_for_key(key, _DOMAIN_KEY, allow)
+                for v, t_child in trie.children(t_node):
+                    if v not in allowed:
+                        continue
+                    child = node_for(t_child, advance_key(key, v, at_start, allow), False)
+                    ways[child] += ways[idx]
+                    out.append((v, child))
+                layer.edges[idx] = tuple(out)
+        return PatternChain(allow, self._layers + (layer,))
+
+    def _suffix_counts(self) -> List[List[int]]:
+        """Her katman düğümünden zincir sonuna kadar tam dizi sayısı."""
+        if self._suffix is None:
+            layers = self._layers
+            depth = len(layers) - 1
+            suffix: List[List[int]] = [[] for _ in layers]
+            for level in range(depth, 0, -1):
+                layer = layers[level]
+                counts = [0] * len(layer.keys)
+                below = suffix[level + 1] if level < depth else None
+                for idx in reversed(layer.order):
+                    total = sum(counts[child] for _, child in layer.edges[idx])
+                    f_idx = layer.exits.get(idx)
+                    if f_idx is not None:
+                        if below is None:
+                            total += 1
+                        elif f_idx < len(below):
+                            total += below[f_idx]
+                    counts[idx] = total
+                suffix[level] = counts
+            self._suffix = suffix
+        return self._suffix
+
+    def graph(self) -> Union["_ChainGraph", PatternTrie]:
+        """Birleşik diziler için `iter_paths` ile yürünebilir DAG görünümü.
+
+        Grup genişlikleri eşit değilse aynı dizi farklı yollardan çıkabilir;
+        bu durumda diziler trie'ye dökülür ve tekilleştirme yapısal olur.
+        """
+        if self._graph is None:
+            if self.uniform:
+                self._graph = _ChainGraph(self)
+            else:
+                self._graph = PatternTrie.from_sequences(self._iter_raw(), self.allow_zero_after_start)
+        return self._graph
+
+    def _iter_raw(self) -> Iterator[List[int]]:
+        layers = self._layers
+        depth = len(layers) - 1
+        if depth == 0:
+            return
+        seq: List[int] = []
+        # [katman, düğüm, kenar yineleyicisi, çıkış denendi mi, dizi uzunluğu]
+        stack: List[list] = [[1, 0, iter(layers[1].edges[0]), False, 0]]
+        while stack:
+            frame = stack[-1]
+            level, idx, edges, exited, base = frame
+            layer = layers[level]
+            if not exited:
+                frame[3] = True
+                f_idx = layer.exits.get(idx)
+                if f_idx is not None:
+                    if level == depth:
+                        yield seq[:]
+                    else:
+                        stack.append([level + 1, f_idx, iter(layers[level + 1].edges[f_idx]), False, len(seq)])
+                        continue
+            edge = next(edges, None)
+            if edge is None:
+                stack.pop()
+                del seq[base:]
+                continue
+            v, child = edge
+            stack.append([level, child, iter(layer.edges[child]), False, len(seq)])
+            seq.append(v)
+
+    def iter_sequences(self) -> Iterator[List[int]]:
+        """Birleşik dizileri eski sırayla (grup içi örüntü sırası) üret."""
+        if self.group_count == 0:
+            return
+        graph = self.graph()
+        for seq, _ in iter_paths(graph, graph.root):
+            yield seq
+
+    def total_sequences(self) -> int:
+        if self.group_count == 0:
+            return 0
+        if self.uniform:
+            return sum(self._layers[-1].frontier_ways)
+        return len(self.graph())
+
+
+class _ChainGraph:
+    """Eş genişlikli zincirin katmanları birleştirilmiş DAG görünümü."""
+
+    __slots__ = ("_layers", "_suffix", "_depth")
+
+    root: ChainNode = (1, 0)
+
+    def __init__(self, chain: PatternChain) -> None:
+        self._layers = chain._layers
+        self._suffix = chain._suffix_counts()
+        self._depth = len(self._layers) - 1
+
+    def _resolve(self, node: ChainNode) -> ChainNode:
+        # Ara katmanda biten düğüm, bir sonraki katmanın giriş düğümüdür
+        level, idx = node
+        while level < self._depth:
+            f_idx = self._layers[level].exits.get(idx)
+            if f_idx is None:
+                break
+            level, idx = level + 1, f_idx
+        return level, idx
+
+    def children(self, node: ChainNode) -> Tuple[Tuple[int, ChainNode], ...]:
+        level, idx = self._resolve(node)
+        return tuple((v, (level, child)) for v, child in self._layers[level].edges[idx])
+
+    def is_terminal(self, node: ChainNode) -> bool:
+        level, idx = self._resolve(node)
+        return level == self._depth and idx in self._layers[level].exits
+
+    def count(self, node: ChainNode) -> int:
+        level, idx = node
+        if level > self._depth or idx >= len(self._suffix[level]):
+            return 0
+        return self._suffix[level][idx]
+
+    def end_key(self, node: ChainNode) -> StateKey:
+        level, idx = self._resolve(node)
+        return self._layers[level].keys[idx]
+
+
+def build_chained_pattern_sequences(
+    pattern_groups: List[GroupLike],
+    allow_zero_after_start: bool,
+    max_paths: Optional[int] = None,
+    chain: Optional[PatternChain] = None,
+) -> Tuple[List[List[int]], int]:
+    if chain is None:
+        if not pattern_groups:
+            return [], 0
+        chain = PatternChain.from_groups(pattern_groups, allow_zero_after_start)
+
+    def _build() -> Tuple[Tuple[Tuple[int, ...], ...], int]:
+        display: List[Tuple[int, ...]] = []
+        for seq in chain.iter_sequences():
+            if max_paths is not None and len(display) >= max_paths:
+                break
+            display.append(tuple(seq))
+        return tuple(display), chain.total_sequences()
+
+    shown, total = PATTERN_MEMO.get_or_build(
+        ("chained", chain.fingerprint, max_paths),
+        _build,
+        lambda value: estimate_size(value[0]),
+    )
+    return [list(seq) for seq in shown], total
+
+
+def _layer_to_json(layer: _ChainLayer) -> Dict[str, object]:
+    return {
+        "trie": layer.trie.to_json(),
+        "keys": [list(key) for key in layer.keys],
+        "edges": [[list(edge) for edge in node_edges] for node_edges in layer.edges],
+        "exits": [[idx, f_idx] for idx, f_idx in layer.exits.items()],
+        "frontier_keys": [list(key) for key in layer.frontier_keys],
+        "frontier_starts": layer.frontier_starts,
+        "frontier_ways": layer.frontier_ways,
+        "order": layer.order,
+    }
+
+
+def _layer_from_json(obj: Dict[str, object]) -> _ChainLayer:
+    layer = _ChainLayer(PatternTrie.from_json(obj["trie"]))
+    layer.keys = [tuple(key) for key in obj["keys"]]
+    layer.edges = [tuple((int(v), int(child)) for v, child in node_edges) for node_edges in obj["edges"]]
+    layer.exits = {int(idx): int(f_idx) for idx, f_idx in obj["exits"]}
+    layer.frontier_keys = [tuple(key) for key in obj["frontier_keys"]]
+    layer.frontier_starts = [bool(flag) for flag in obj["frontier_starts"]]
+    layer.frontier_ways = [int(count) for count in obj["frontier_ways"]]
+    layer.order = [int(idx) for idx in obj["order"]]
+    return layer
+
+
+class ChainStore:
+    """Token ile erişilen, TTL'li ve boyut sınırlı zincir deposu (isteğe bağlı disk).
+
+    Dizin verilirse zincir süreçler arasında da bulunur: her katman, o ana
+    kadarki grup geçmişinin özetiyle adlanan tek bir dosyaya yazılır (önek
+    zincirleri katmanları paylaşır), token dosyası yalnız katman adlarını
+    tutar.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 6 * 3600,
+        directory: Optional[str] = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.directory: Optional[Path] = Path(directory) if directory else None
+        self._items: "OrderedDict[str, Tuple[float, PatternChain]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+    def put(self, chain: PatternChain) -> str:
+        token = secrets.token_urlsafe(16)
+        now = time.time()
+        with self._lock:
+            self._items[token] = (now, chain)
+            self._evict(now)
+        if self.directory is not None:
+            self._write(token, chain, now)
+        return token
+
+    def get(self, token: str) -> Optional[PatternChain]:
+        if not _TOKEN_RE.match(token):
+            return None
+        now = time.time()
+        with self._lock:
+            item = self._items.get(token)
+            if item is not None:
+                stamp, chain = item
+                if now - stamp <= self.ttl_seconds:
+                    self._items[token] = (now, chain)
+                    self._items.move_to_end(token)
+                    return chain
+                del self._items[token]
+        chain = self._read(token, now)
+        if chain is not None:
+            with self._lock:
+                self._items[token] = (now, chain)
+                self._evict(now)
+        return chain
+
+    def _evict(self, now: float) -> None:
+        while self._items:
+            token, (stamp, _) = next(iter(self._items.items()))
+            if len(self._items) > self.max_entries or now - stamp > self.ttl_seconds:
+                del self._items[token]
+                continue
+            break
+
+    def _write(self, token: str, chain: PatternChain, now: float) -> None:
+        assert self.directory is not None
+        allow = chain.allow_zero_after_start
+        names: List[str] = []
+        try:
+            layer_dir = self.directory / "layers"
+            layer_dir.mkdir(parents=True, exist_ok=True)
+            for depth, layer in enumerate(chain._layers[1:], 1):
+                history = tuple(prev.trie.fingerprint for prev in chain._layers[1 : depth + 1])
+                name = hashlib.sha1(repr((allow, history)).encode("utf-8")).hexdigest()
+                names.append(name)
+                path = layer_dir / f"{name}.json"
+                if path.exists():
+                    # Paylaşılan katman: yalnız erişim zamanını tazele
+                    os.utime(path, (now, now))
+                    continue
+                _write_json(path, _layer_to_json(layer))
+            _write_json(self.directory / f"{token}.json", {"allow": allow, "layers": names})
+        except OSError:
+            # Disk yazılamazsa zincir yalnız bu süreçte kalır
+            pass
+        self._purge_disk(now)
+
+    def _read(self, token: str, now: float) -> Optional[PatternChain]:
+        if self.directory is None:
+            return None
+        path = self.directory / f"{token}.json"
+        try:
+            if now - path.stat().st_mtime > self.ttl_seconds:
+                path.unlink()
+                return None
+            head = json.loads(path.read_text(encoding="utf-8"))
+            layers = [_ROOT_LAYER]
+            for name in head["layers"]:
+                layer_path = self.directory / "layers" / f"{name}.json"
+                layers.append(_layer_from_json(json.loads(layer_path.read_text(encoding="utf-8"))))
+                os.utime(layer_path, (now, now))
+            os.utime(path, (now, now))
+            return PatternChain(bool(head["allow"]), tuple(layers))
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+    def _purge_disk(self, now: float) -> None:
+        # Süresi dolan dosyaları en çok dakikada bir tara
+        if now - self._last_purge < 60:
+            return
+        self._last_purge = now
+        for pattern in ("*.json", "layers/*.json"):
+            try:
+                paths = list(self.directory.glob(pattern))
+            except OSError:
+                continue
+            for path in paths:
+                try:
+                    if now - path.stat().st_mtime > self.ttl_seconds:
+                        path.unlink()
+                except OSError:
+                    continue
+
+
+def _write_json(path: Path, obj: object) -> None:
+    tmp = path.with_name(f"{path.stem}.{secrets.token_hex(4)}.tmp")
+    tmp.write_text(json.dumps(obj, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+CHAIN_STORE = ChainStore()
+
+
+def configure_chains(ttl_seconds: Optional[float] = None, directory: Optional[str] = None) -> None:
+    """Zincir deposunun TTL'ini ve disk dizinini ayarla (oturum ayarlarıyla birlikte)."""
+    with CHAIN_STORE._lock:
+        if ttl_seconds is not None and ttl_seconds > 0:
+            CHAIN_STORE.ttl_seconds = ttl_seconds
+        if directory:
+            CHAIN_STORE.directory = Path(directory)
+
+
+def resume_chain(
+    token: str,
+    pattern_groups: List[GroupLike],
+    allow_zero_after_start: bool,
+    store: ChainStore = CHAIN_STORE,
+) -> PatternChain:
+    """Sunucu tarafında saklanan frontier'ı getir; yoksa geçmişten yeniden kur."""
+    chain = store.get(token) if token else None
+    if (
+        chain is None
+        or chain.group_count != len(pattern_groups)
+        or chain.allow_zero_after_start != allow_zero_after_start
+    ):
+        chain = PatternChain.from_groups(pattern_groups, allow_zero_after_start)
+    return chain
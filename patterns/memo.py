@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+__all__ = (
+    "PATTERN_MEMO_MAX_ENTRIES",
+    "PATTERN_MEMO_MAX_BYTES",
+    "PatternMemo",
+    "PATTERN_MEMO",
+    "configure_memo",
+    "estimate_size",
+)
+
+# Bellekte tutulacak en fazla derlenmiş sonuç
+PATTERN_MEMO_MAX_ENTRIES = 512
+# Yaklaşık bellek bütçesi (bayt); aşılınca en eski girdiler atılır
+PATTERN_MEMO_MAX_BYTES = 64 * 1024 * 1024
+
+
+def estimate_size(value: Any) -> int:
+    """Önbellek bütçesi için kaba boyut tahmini (derin gezinmeden)."""
+    if isinstance(value, str):
+        return sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        # Dizi listeleri: dış kap + her iç dizi için sabit + eleman başına işaretçi
+        total = sys.getsizeof(value)
+        for item in value:
+            total += sys.getsizeof(item) if isinstance(item, (list, tuple)) else 8
+        return total
+    sizer = getattr(value, "memo_size", None)
+    if callable(sizer):
+        return int(sizer())
+    return sys.getsizeof(value)
+
+
+class PatternMemo:
+    """Girdi sayısı ve bayt bütçesiyle sınırlı, isabet/ıskalama sayaçlı LRU.
+
+    Anahtarlar normalize edilmiş XYZ kümeleri ya da grup geçmişi parmak izi
+    ile `allow_zero_after_start` değerini içerir; değerler derlenmiş örüntü
+    sonuçlarıdır (DAG, zincir, hazır panel HTML'i). Derleme kilit dışında
+    yapılır; aynı anahtarı iki iş parçacığı aynı anda kurarsa ikisi de aynı
+    sonucu üretir ve sonuncusu saklanır.
+    """
+
+    def __init__(self, max_entries: int = PATTERN_MEMO_MAX_ENTRIES, max_bytes: int = PATTERN_MEMO_MAX_BYTES) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return False, None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return True, item[0]
+
+    def put(self, key: Hashable, value: Any, size: Optional[int] = None) -> None:
+        if size is None:
+            size = estimate_size(value)
+        with self._lock:
+            if self.max_entries <= 0 or size > self.max_bytes:
+                return
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._items[key] = (value, size)
+            self._bytes += size
+            self._shrink()
+
+    def _shrink(self) -> None:
+        while self._items and (len(self._items) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, old_size) = self._items.popitem(last=False)
+            self._bytes -= old_size
+            self.evictions += 1
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Any], size: Optional[Callable[[Any], int]] = None) -> Any:
+        found, value = self.get(key)
+        if found:
+            return value
+        value = build()
+        self.put(key, value, size(value) if size is not None else None)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._items),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+
+PATTERN_MEMO = PatternMemo()
+
+
+def configure_memo(max_bytes: Optional[int] = None, max_entries: Optional[int] = None) -> None:
+    """Önbellek bütçesini ayarla (CLI bayraklarından çağrılır); 0 önbelleği kapatır."""
+    with PATTERN_MEMO._lock:
+        if max_bytes is not None:
+            PATTERN_MEMO.max_bytes = max(0, int(max_bytes))
+        if max_entries is not None:
+            PATTERN_MEMO.max_entries = max(0, int(max_entries))
+        PATTERN_MEMO._shrink()
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+__all__ = (
+    "MirrorKey",
+    "INITIAL_MIRROR_KEY",
+    "advance_mirror_key",
+    "find_mirror_chain_highlights",
+    "iter_paths_with_mirrors",
+)
+
+# (son 0'dan sonraki değer sayısı | None, o değerler (en çok 3),
+#  son 0'ın kapattığı grup (işaret, son değer) | None, zincir uzunluğu (en çok 3))
+MirrorKey = Tuple[Optional[int], Tuple[int, ...], Optional[Tuple[int, int]], int]
+INITIAL_MIRROR_KEY: MirrorKey = (None, (), None, 0)
+
+# Üçüncü grup zinciri tamamladığında vurgulanan konumlar (kapanış 0'ına göre):
+# üç grubun değerleri ve aradaki iki 0
+_RUN_OPEN_OFFSETS = (-11, -10, -9, -8, -7, -6, -5, -4, -3, -2, -1)
+# Zincir uzadıkça: yeni grubun değerleri ve önündeki ara 0
+_RUN_GROW_OFFSETS = (-4, -3, -2, -1)
+
+
+@lru_cache(maxsize=None)
+def advance_mirror_key(key: MirrorKey, value: int) -> Tuple[MirrorKey, Tuple[int, ...]]:
+    """Ayna zinciri durumunu bir değer ilerlet.
+
+    Dönen ikinci öğe, bu adımla vurgulanan konumların şimdiki konuma göre
+    ofsetleridir. Otomata uyan dizilerde `find_mirror_chain_highlights` ile
+    aynı sonucu verir: vurgular yalnız eklenir, sonradan geri alınmaz.
+    """
+    since, vals, prev, run = key
+    if value != 0:
+        if since is None:
+            return key, ()
+        return (min(since + 1, 4), vals + (value,) if len(vals) < 3 else vals, prev, run), ()
+    group: Optional[Tuple[int, int, int]] = None
+    if since == 3:
+        s0, s1, s2 = vals
+        if (s1 > 0) == (s0 > 0) and (s2 > 0) == (s0 > 0):
+            abs_vals = [abs(s0), abs(s1), abs(s2)]
+            if abs_vals == [1, 2, 3] or abs_vals == [3, 2, 1]:
+                group = (1 if s0 > 0 else -1, s0, s2)
+    if group is None:
+        return (0, (), None, 0), ()
+    sign, first, last = group
+    emitted: Tuple[int, ...] = ()
+    # Ayna kuralı: ara 0'ın solu ve sağı eşit, işaret aynı
+    if prev is not None and prev[0] == sign and prev[1] == first:
+        if run >= 3:
+            emitted = _RUN_GROW_OFFSETS
+        elif run == 2:
+            emitted = _RUN_OPEN_OFFSETS
+        run = min(run + 1, 3)
+    else:
+        run = 1
+    return (0, (), (sign, last), run), emitted
+
+
+def find_mirror_chain_highlights(seq: List[int]) -> Set[int]:
+    """Chained panel için 3+ ardışık ayna üçlü zinciri token indekslerini döndür."""
+    highlights: Set[int] = set()
+    n = len(seq)
+    if n == 0:
+        return highlights
+    zeros: List[int] = [i for i, v in enumerate(seq) if v == 0]
+    if len(zeros) < 2:
+        return highlights
+    groups: List[Dict[str, Any]] = []
+    for zi in range(len(zeros) - 1):
+        a = zeros[zi]
+        b = zeros[zi + 1]
+        if b - a - 1 != 3:
+            continue
+        s0, s1, s2 = seq[a + 1], seq[a + 2], seq[b - 1]
+        if 0 in (s0, s1, s2):
+            continue
+        sgn = 1 if s0 > 0 else -1
+        if (s1 > 0) != (s0 > 0) or (s2 > 0) != (s0 > 0):
+            continue
+        abs_vals = [abs(s0), abs(s1), abs(s2)]
+        if abs_vals == [1, 2, 3]:
+            direction = "asc"
+        elif abs_vals == [3, 2, 1]:
+            direction = "desc"
+        else:
+            continue
+        groups.append({
+            "z_left": a,
+            "z_right": b,
+            "idxs": [a + 1, a + 2, b - 1],
+            "sign": sgn,
+            "dir": direction,
+        })
+    if not groups:
+        return highlights
+    g = 0
+    while g < len(groups):
+        run_sign = groups[g]["sign"]
+        r = g
+        while r + 1 < len(groups):
+            z_boundary = zeros[r + 1]
+            if not (0 <= z_boundary - 1 < n and 0 <= z_boundary + 1 < n):
+                break
+            if seq[z_boundary - 1] != seq[z_boundary + 1]:
+                break
+            if groups[r + 1]["sign"] != run_sign:
+                break
+            r += 1
+        run_len = r - g + 1
+        if run_len >= 3:
+            for k in range(g, r + 1):
+                highlights.update(groups[k]["idxs"])
+            for k in range(g + 1, r + 1):
+                z_boundary = zeros[k]
+                if 0 <= z_boundary < n:
+                    highlights.add(z_boundary)
+        g = r + 1
+    return highlights
+
+
+def iter_paths_with_mirrors(graph, node, first_value: Optional[int] = None) -> Iterator[Tuple[List[int], Any, Set[int]]]:
+    """`iter_paths` gibi yürü; ayna zinciri vurgularını yol boyunca taşı.
+
+    Ortak önekteki vurgular bir kez hesaplanır; her dizi `(dizi, bitiş
+    düğümü, vurgulu konumlar)` olarak üretilir.
+    """
+    seq: List[int] = []
+    lit: List[int] = []
+    keys: List[MirrorKey] = [INITIAL_MIRROR_KEY]
+    lit_marks: List[int] = []
+    if graph.is_terminal(node) and first_value is None:
+        yield [], node, set()
+    stack = [iter(graph.children(node))]
+    while stack:
+        nxt = next(stack[-1], None)
+        if nxt is None:
+            stack.pop()
+            if seq:
+                seq.pop()
+                keys.pop()
+                del lit[lit_marks.pop():]
+            continue
+        v, child = nxt
+        if first_value is not None and len(stack) == 1 and v != first_value:
+            continue
+        if not graph.count(child):
+            continue
+        pos = len(seq)
+        key, offsets = advance_mirror_key(keys[-1], v)
+        seq.append(v)
+        keys.append(key)
+        lit_marks.append(len(lit))
+        lit.extend(pos + off for off in offsets)
+        if graph.is_terminal(child):
+            yield seq[:], child, set(lit)
+        stack.append(iter(graph.children(child)))
@@ -0,0 +1,394 @@
+from __future__ import annotations
+
+import hashlib
+import html
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from . import search
+from .automaton import _DOMAIN_KEY, _VALUE_ORDER, allowed_values_for_key, fmt_off
+from .chain import PatternChain
+from .memo import PATTERN_MEMO
+from .mirror import iter_paths_with_mirrors
+from .trie import PatternTrie, iter_paths
+
+__all__ = (
+    "render_pattern_panel",
+    "render_combined_pattern_panel",
+)
+
+TripleKey = Tuple[int, int, int, str, str, str]
+
+
+def _file_triple(file_names: List[str], i: int) -> Optional[Tuple[str, str, str]]:
+    f1 = file_names[i] if i < len(file_names) else None
+    f2 = file_names[i + 1] if i + 1 < len(file_names) else None
+    f3 = file_names[i + 2] if i + 2 < len(file_names) else None
+    if not (f1 and f2 and f3):
+        return None
+    return f1, f2, f3
+
+
+def _triple_colors(graph, node, first_value: Optional[int], file_names: List[str]) -> Dict[TripleKey, str]:
+    """En az 2 yerde geçen (0'sız üçlü + dosya) anahtarlarına renk ata.
+
+    Geçiş sayıları diziler açılmadan DAG üzerinde sayılır: derinlik d'deki
+    düğüme varan yol sayısı x üçlüden sonraki tamamlanma sayısı.
+    """
+    occurrences: Dict[TripleKey, int] = {}
+    level: Dict[Any, int] = {node: 1}
+    depth = 0
+    while level:
+        names = _file_triple(file_names, depth)
+        next_level: Dict[Any, int] = {}
+        for n, ways in level.items():
+            for a, n1 in graph.children(n):
+                if depth == 0 and first_value is not None and a != first_value:
+                    continue
+                if not graph.count(n1):
+                    continue
+                next_level[n1] = next_level.get(n1, 0) + ways
+                if names is None or a == 0:
+                    continue
+                for b, n2 in graph.children(n1):
+                    if b == 0 or not graph.count(n2):
+                        continue
+                    for c, n3 in graph.children(n2):
+                        if c == 0 or not graph.count(n3):
+                            continue
+                        key = (a, b, c) + names
+                        occurrences[key] = occurrences.get(key, 0) + ways * graph.count(n3)
+        level = next_level
+        depth += 1
+    colors: Dict[TripleKey, str] = {}
+    for key, occ in occurrences.items():
+        if occ < 2:
+            continue
+        hv = int(hashlib.md5(str(key).encode("utf-8")).hexdigest()[:6], 16)
+        hue = hv % 360
+        # Daha saydam bir opaklık: alpha ~ 0.28, biraz daha koyu lightness ile
+        colors[key] = f"hsla({hue}, 85%, 60%, 0.28)"
+    return colors
+
+
+def _token_html(
+    seq: List[int],
+    idx: int,
+    file_names: Optional[List[str]],
+    joker_indices: Optional[Set[int]],
+    highlight_set: Optional[Set[int]],
+) -> str:
+    name = file_names[idx] if file_names and 0 <= idx < len(file_names) else ""
+    tip = name or ""
+    if joker_indices and idx in joker_indices:
+        tip = (tip + " (Joker)").strip()
+    token = html.escape(fmt_off(seq[idx]))
+    style = ""
+    if highlight_set is not None and idx in highlight_set:
+        style = " style='font-weight:700; font-style:italic;'"
+    if tip:
+        return f"<span class='pat-token' title='{html.escape(tip)}' data-tip='{html.escape(tip)}'{style}>{token}</span>"
+    return f"<span class='pat-token'{style}>{token}</span>"
+
+
+def _last_values(graph, node, first_value: Optional[int]) -> Set[int]:
+    """Tam dizilerin son değerleri: bitiş düğümüne giren kenarlardan toplanır."""
+    out: Set[int] = set()
+    seen = {node}
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        for v, child in graph.children(n):
+            if n == node and first_value is not None and v != first_value:
+                continue
+            if not graph.count(child):
+                continue
+            if graph.is_terminal(child):
+                out.add(v)
+            if child not in seen:
+                seen.add(child)
+                stack.append(child)
+    return out
+
+
+def _render_lines(
+    graph,
+    allow_zero_after_start: bool,
+    first_value: Optional[int],
+    start_index: int,
+    file_names: Optional[List[str]],
+    joker_indices: Optional[Set[int]],
+    colors: Dict[TripleKey, str],
+    highlight_mirrors: bool,
+    deadline: Optional[float],
+    max_lines: int = 0,
+) -> Tuple[List[str], bool]:
+    """Bir bölümün (ilk değer) satırlarını üret; süre dolarsa (satırlar, False).
+
+    `max_lines` (0 => sınırsız) aşılınca yürüyüş durur; bu kesinti süreye
+    bağlı olmadığından sonuç tamamlanmış sayılır.
+    """
+    lines: List[str] = []
+    # Chained panel: 3+ ardışık ayna üçlü zincirleri yürüyüş sırasında izlenir (bold+italic)
+    if highlight_mirrors:
+        paths = iter_paths_with_mirrors(graph, graph.root, first_value)
+    else:
+        paths = ((seq, end, None) for seq, end in iter_paths(graph, graph.root, first_value))
+    for offset, (seq, end, highlight_set) in enumerate(paths):
+        if max_lines and offset >= max_lines:
+            break
+        if deadline is not None and offset % 256 == 0 and time.time() > deadline:
+            return lines, False
+        parts: List[str] = []
+        i = 0
+        while i < len(seq):
+            color = None
+            if colors and i + 2 < len(seq) and 0 not in seq[i:i + 3]:
+                names = _file_triple(file_names, i)
+                if names is not None:
+                    color = colors.get((seq[i], seq[i + 1], seq[i + 2]) + names)
+            if color:
+                # Üç tokenı ve iki virgülü tek blokta boya
+                block = (
+                    f"<span style='background-color:{html.escape(color)}; border-radius:4px; padding:0 3px;'>"
+                    f"{_token_html(seq, i, file_names, joker_indices, highlight_set)}, "
+                    f"{_token_html(seq, i + 1, file_names, joker_indices, highlight_set)}, "
+                    f"{_token_html(seq, i + 2, file_names, joker_indices, highlight_set)}"
+                    f"</span>"
+                )
+                parts.append(block)
+                i += 3
+            else:
+                parts.append(_token_html(seq, i, file_names, joker_indices, highlight_set))
+                i += 1
+            if i < len(seq):
+                parts.append(", ")
+        label = ", ".join(parts)
+        opts = allowed_values_for_key(graph.end_key(end), _DOMAIN_KEY, allow_zero_after_start)
+        cont = ", ".join(fmt_off(v) for v in opts) if opts else "-"
+        number_html = f"<span style='display:inline-block; min-width:1.8em; font-weight:bold;'>{start_index + offset + 1}.</span>"
+        lines.append(f"<div class='pat-line'>{number_html} {label} (devam: {html.escape(cont)})</div>")
+    return lines, True
+
+
+def _partial_note(shown: int, total: int) -> str:
+    return (
+        "<div style='color:#b00;'><strong>Kısmi sonuç:</strong> "
+        f"süre sınırı aşıldı, {shown} / {total} örüntü gösteriliyor.</div>"
+    )
+
+
+def _capped_note(shown: int, total: int, max_lines: int) -> str:
+    return (
+        "<div style='color:#555;'><strong>Satır sınırı:</strong> "
+        f"her ilk değer için en çok {max_lines} örüntü yazılır, {shown} / {total} gösteriliyor.</div>"
+    )
+
+
+def _partition_task(task: Tuple[Any, ...]) -> Tuple[Any, ...]:
+    """İşçiye giden görevde tüm grafik yerine yalnız ilk değerin alt grafiği."""
+    graph, allow_zero_after_start, first_value = task[:3]
+    if first_value is None:
+        return task
+    return (PatternTrie.from_graph(graph, first_value, allow_zero_after_start),) + task[1:]
+
+
+def _render_pattern_card(
+    graph,
+    allow_zero_after_start: bool,
+    first_value: Optional[int] = None,
+    file_names: Optional[List[str]] = None,
+    joker_indices: Optional[Set[int]] = None,
+    sequence_name: Optional[str] = None,
+    highlight_mirrors: bool = False,
+    lines: Optional[Tuple[List[str], bool]] = None,
+) -> Tuple[str, bool]:
+    """Kart HTML'i ve tüm satırların yazılıp yazılmadığı.
+
+    Süre bütçesine ya da satır sınırına takılan kart tam sayılmaz; çağıran
+    bunu önbelleğe almaz.
+    """
+    root = graph.root
+    if first_value is None:
+        total = graph.count(root)
+    else:
+        total = sum(graph.count(child) for v, child in graph.children(root) if v == first_value)
+    if not total:
+        return "<div class='card'><h3>Örüntüleme</h3><div>Örüntü bulunamadı.</div></div>", True
+    if lines is None:
+        # 1) Üçlü kümeleri (0'sız) ve dosya uyumunu baz alarak blok rengi ata
+        colors: Dict[TripleKey, str] = {}
+        if file_names and len(file_names) >= 3:
+            colors = _triple_colors(graph, root, first_value, file_names)
+        deadline = search.search_deadline()
+        max_lines = search.PATTERN_MAX_LINES
+        if first_value is None and not graph.is_terminal(root):
+            # İlk değere göre bölümle; satır numaraları DAG sayılarından gelir
+            tasks = []
+            start = 0
+            for v, child in graph.children(root):
+                count = graph.count(child)
+                if not count:
+                    continue
+                tasks.append((graph, allow_zero_after_start, v, start, file_names, joker_indices, colors, highlight_mirrors, deadline, max_lines))
+                start += count
+        else:
+            tasks = [(graph, allow_zero_after_start, first_value, 0, file_names, joker_indices, colors, highlight_mirrors, deadline, max_lines)]
+        merged: List[str] = []
+        complete = True
+        for result in search.run_partitions(_render_lines, tasks, total, deadline, _partition_task):
+            part_lines, part_complete = result if result is not None else ([], False)
+            if not complete:
+                break
+            merged.extend(part_lines)
+            complete = part_complete
+        lines = (merged, complete)
+    body_lines, complete = lines
+    # Son değerlerin özeti (benzersiz, sıralı)
+    unique_last_sorted = sorted(_last_values(graph, root, first_value), key=lambda x: _VALUE_ORDER.get(x, 99))
+    last_line = "<div><strong>Son değerler:</strong> " + (
+        ", ".join(fmt_off(v) for v in unique_last_sorted) if unique_last_sorted else "-"
+    ) + "</div>"
+    info = f"<div><strong>Toplam örüntü:</strong> {total}</div>"
+    if not complete:
+        info += _partial_note(len(body_lines), total)
+    elif len(body_lines) < total:
+        info += _capped_note(len(body_lines), total, search.PATTERN_MAX_LINES)
+        complete = False
+    seq_info = f"<div><strong>Sequence:</strong> {html.escape(sequence_name)}</div>" if sequence_name else ""
+    return "<div class='card'><h3>Örüntüleme</h3>" + info + seq_info + last_line + "".join(body_lines) + "</div>", complete
+
+
+def _memoized_panel(key: Tuple, render) -> str:
+    """Paneli önbellekten ver; kısmi (bütçe ya da satır sınırı) sonuçlar saklanmaz."""
+    found, cached = PATTERN_MEMO.get(key)
+    if found:
+        return cached
+    panel_html, complete = render()
+    if complete:
+        PATTERN_MEMO.put(key, panel_html)
+    return panel_html
+
+
+def render_pattern_panel(
+    trie: PatternTrie,
+    file_names: Optional[List[str]] = None,
+    joker_indices: Optional[Set[int]] = None,
+    sequence_name: Optional[str] = None,
+) -> str:
+    key = (
+        "panel",
+        trie.fingerprint,
+        tuple(file_names) if file_names else None,
+        frozenset(joker_indices) if joker_indices else None,
+        sequence_name,
+    )
+    return _memoized_panel(key, lambda: _render_pattern_card(
+        trie,
+        trie.allow_zero_after_start,
+        file_names=file_names,
+        joker_indices=joker_indices,
+        sequence_name=sequence_name,
+    ))
+
+
+def _meta_key(meta_groups: List[Dict[str, Any]]) -> Tuple:
+    out = []
+    for meta in meta_groups:
+        if not isinstance(meta, dict):
+            out.append(None)
+            continue
+        out.append((repr(meta.get("file_names")), repr(meta.get("joker_indices"))))
+    return tuple(out)
+
+
+def render_combined_pattern_panel(chain: PatternChain, meta_groups: List[Dict[str, Any]]) -> str:
+    group_count = chain.group_count
+    if group_count < 2:
+        return ""
+    key = ("combined", chain.fingerprint, _meta_key(meta_groups[:group_count]))
+    return _memoized_panel(key, lambda: _render_combined(chain, meta_groups))
+
+
+def _render_combined(chain: PatternChain, meta_groups: List[Dict[str, Any]]) -> Tuple[str, bool]:
+    group_count = chain.group_count
+    complete = True
+    total_unique = chain.total_sequences()
+    summary_label = f"Toplu örüntüler (grup sayısı {group_count})"
+    if total_unique == 0:
+        inner = "<div style='margin-top:12px;'>Uygun birleşik örüntü bulunamadı.</div>"
+    else:
+        info_line = f"<div><strong>Toplam birleşik örüntü:</strong> {total_unique}</div>"
+        flat_names: List[str] = []
+        flat_joker_indices: Set[int] = set()
+        cursor = 0
+        group_widths = [group.width for group in chain.groups]
+        for idx in range(group_count):
+            width = group_widths[idx] if idx < len(group_widths) else 0
+            meta = meta_groups[idx] if idx < len(meta_groups) else {}
+            raw_names = meta.get("file_names") if isinstance(meta, dict) else None
+            names = [str(n) for n in raw_names] if isinstance(raw_names, list) else []
+            length_for_cursor = width or len(names)
+            if width:
+                if len(names) < width:
+                    names = names + [""] * (width - len(names))
+                elif len(names) > width:
+                    names = names[:width]
+            elif length_for_cursor and not names:
+                names = [""] * length_for_cursor
+            flat_names.extend(names)
+            raw_jokers = meta.get("joker_indices") if isinstance(meta, dict) else None
+            if isinstance(raw_jokers, list):
+                for j in raw_jokers:
+                    try:
+                        j_int = int(j)
+                    except Exception:
+                        continue
+                    flat_joker_indices.add(cursor + j_int)
+            cursor += length_for_cursor
+        # İlk değere göre gruplama: kökün kenarları, sayılar DAG'dan; her grup bir bölüm
+        graph = chain.graph()
+        names_arg = flat_names if flat_names else None
+        jokers_arg = flat_joker_indices if flat_joker_indices else None
+        deadline = search.search_deadline()
+        max_lines = search.PATTERN_MAX_LINES
+        starts: List[Tuple[int, int]] = []
+        tasks = []
+        for start_val, child in graph.children(graph.root):
+            count = graph.count(child)
+            if not count:
+                continue
+            colors: Dict[TripleKey, str] = {}
+            if names_arg and len(names_arg) >= 3:
+                colors = _triple_colors(graph, graph.root, start_val, names_arg)
+            starts.append((start_val, count))
+            tasks.append((graph, chain.allow_zero_after_start, start_val, 0, names_arg, jokers_arg, colors, True, deadline, max_lines))
+        results = search.run_partitions(_render_lines, tasks, total_unique, deadline, _partition_task)
+        grouped_lines: List[str] = []
+        for (start_val, count), result in zip(starts, results):
+            panel_html, card_complete = _render_pattern_card(
+                graph,
+                chain.allow_zero_after_start,
+                first_value=start_val,
+                file_names=names_arg,
+                joker_indices=jokers_arg,
+                highlight_mirrors=True,
+                lines=result if result is not None else ([], False),
+            )
+            summary = f"{fmt_off(start_val)} ile başlayanlar ({count})"
+            if result is None or not result[1]:
+                summary += " — kısmi"
+            complete = complete and card_complete
+            grouped_lines.append(
+                "<details>"
+                f"<summary>{html.escape(summary)}</summary>"
+                f"{panel_html}"
+                "</details>"
+            )
+        inner = "<div style='margin-top:12px;'>" + info_line + "".join(grouped_lines) + "</div>"
+    return (
+        f"<details class='card' style='margin-top:16px;'>"
+        f"<summary>{html.escape(summary_label)}</summary>"
+        f"{inner}"
+        "</details>"
+    ), complete
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import base64
+import json
+from typing import Any, Dict, List, Tuple
+
+from .trie import PatternTrie
+
+__all__ = ("decode_pattern_payload", "encode_pattern_payload")
+
+
+def _decode_group(group: Any, allow_zero_after_start: bool):
+    # Yeni biçim: {"xyz": [[...], ...]} — örüntüler kümelerden yeniden kurulur
+    if isinstance(group, dict):
+        xyz = group.get("xyz")
+        if not isinstance(xyz, list):
+            return None
+        sets: List[List[int]] = []
+        for choices in xyz:
+            if not isinstance(choices, list):
+                return None
+            try:
+                sets.append([int(v) for v in choices])
+            except Exception:
+                return None
+        return PatternTrie.from_xyz_sets(sets, allow_zero_after_start)
+    # Eski biçim: açık örüntü listesi
+    if not isinstance(group, list):
+        return None
+    normalized: List[List[int]] = []
+    for seq in group:
+        if not isinstance(seq, list):
+            continue
+        try:
+            normalized.append([int(v) for v in seq])
+        except Exception:
+            continue
+    return PatternTrie.from_sequences(normalized, allow_zero_after_start)
+
+
+def decode_pattern_payload(raw: str) -> Tuple[List[PatternTrie], bool, List[Dict[str, Any]]]:
+    """Gizli alandaki örüntü geçmişini (gruplar, 0 izni, meta) çöz."""
+    groups: List[PatternTrie] = []
+    allow_zero_after_start = True
+    meta_history: List[Dict[str, Any]] = []
+    if not raw:
+        return groups, allow_zero_after_start, meta_history
+    try:
+        payload_obj = json.loads(base64.b64decode(raw.encode("ascii")).decode("utf-8"))
+    except Exception:
+        payload_obj = None
+    if isinstance(payload_obj, dict):
+        allow_zero_after_start = bool(payload_obj.get("allow_zero_after_start", True))
+        groups_data = payload_obj.get("groups", [])
+        meta_data = payload_obj.get("meta", [])
+    elif isinstance(payload_obj, list):
+        groups_data = payload_obj
+        meta_data = []
+    else:
+        groups_data = []
+        meta_data = []
+    if isinstance(groups_data, list):
+        for group in groups_data:
+            trie = _decode_group(group, allow_zero_after_start)
+            if trie is not None:
+                groups.append(trie)
+    if isinstance(meta_data, list):
+        for meta in meta_data:
+            if not isinstance(meta, dict):
+                meta_history.append({})
+                continue
+            names = meta.get("file_names")
+            names_out = [str(n) for n in names] if isinstance(names, list) else []
+            jokers = meta.get("joker_indices")
+            joker_out: List[int] = []
+            if isinstance(jokers, list):
+                for j in jokers:
+                    try:
+                        joker_out.append(int(j))
+                    except Exception:
+                        continue
+            meta_history.append({
+                "file_names": names_out,
+                "joker_indices": joker_out,
+            })
+    if len(meta_history) < len(groups):
+        meta_history.extend({} for _ in range(len(groups) - len(meta_history)))
+    elif len(meta_history) > len(groups):
+        meta_history = meta_history[:len(groups)]
+    return groups, allow_zero_after_start, meta_history
+
+
+def encode_pattern_payload(
+    groups: List[PatternTrie],
+    allow_zero_after_start: bool,
+    meta_history: List[Dict[str, Any]],
+) -> str:
+    """Geçmişi gizli alana yaz; XYZ'den kurulan gruplar yalnız kümeleriyle saklanır."""
+    groups_out: List[Any] = []
+    for trie in groups:
+        if trie.xyz_sets is not None:
+            groups_out.append({"xyz": [list(choices) for choices in trie.xyz_sets]})
+        else:
+            groups_out.append(list(trie))
+    return base64.b64encode(
+        json.dumps(
+            {
+                "groups": groups_out,
+                "allow_zero_after_start": allow_zero_after_start,
+                "meta": meta_history,
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+    ).decode("ascii")
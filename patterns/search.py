@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Deque, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ProcessPoolExecutor
+
+__all__ = (
+    "PATTERN_WORKERS",
+    "PATTERN_BUDGET_SECONDS",
+    "PATTERN_PARALLEL_MIN",
+    "PATTERN_MAX_LINES",
+    "configure_search",
+    "search_deadline",
+    "run_partitions",
+)
+
+# 0 => örüntü bölümleri istek içinde sırayla işlenir
+PATTERN_WORKERS = 0
+# None => süre sınırı yok; aksi halde bu kadar saniye sonra kısmi sonuç döner
+PATTERN_BUDGET_SECONDS: Optional[float] = None
+# Bu sayıdan az dizi için süreç havuzuna gitmeye değmez
+PATTERN_PARALLEL_MIN = 5000
+# Bir bölümün (ilk değer) ürettiği en fazla satır; 0 => sınırsız (varsayılan:
+# çıktı kesilmez, sınır yalnız açıkça istenirse uygulanır)
+PATTERN_MAX_LINES = 0
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def configure_search(
+    workers: Optional[int] = None,
+    budget_seconds: Optional[float] = None,
+    max_lines: Optional[int] = None,
+) -> None:
+    """İşçi sayısı, süre bütçesi ve bölüm satır sınırını ayarla (CLI bayraklarından)."""
+    global PATTERN_WORKERS, PATTERN_BUDGET_SECONDS, PATTERN_MAX_LINES, _pool
+    with _pool_lock:
+        if workers is not None and workers != PATTERN_WORKERS:
+            PATTERN_WORKERS = max(0, int(workers))
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+                _pool = None
+        if budget_seconds is not None:
+            PATTERN_BUDGET_SECONDS = budget_seconds if budget_seconds > 0 else None
+        if max_lines is not None:
+            PATTERN_MAX_LINES = max(0, int(max_lines))
+
+
+def search_deadline() -> Optional[float]:
+    """Bütçe tanımlıysa duvar saatine göre bitiş anı (süreçler arası geçerli)."""
+    if PATTERN_BUDGET_SECONDS is None:
+        return None
+    return time.time() + PATTERN_BUDGET_SECONDS
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Süreç havuzu yalnız gerektiğinde içe aktarılır (multiprocessing pahalı)
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # spawn: iş parçacıklı sunucudan fork etmekten kaçın
+            _pool = ProcessPoolExecutor(
+                max_workers=PATTERN_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def run_partitions(
+    func: Callable[..., Any],
+    tasks: Sequence[Tuple[Any, ...]],
+    weight: int,
+    deadline: Optional[float],
+    prepare: Optional[Callable[[Tuple[Any, ...]], Tuple[Any, ...]]] = None,
+) -> List[Optional[Any]]:
+    """`func(*task)` çağrılarını sırayla ya da süreç havuzunda çalıştır.
+
+    Sonuçlar görev sırasıyla döner. Süre bütçesi içinde bitmeyen ya da
+    işçisi çöken görevler için None döner; çağıran bunu kısmi sonuç olarak
+    işaretler. `func` kendi içinde de `deadline`'a uymalıdır.
+
+    Havuzda aynı anda en çok işçi sayısı kadar görev bekler; `prepare`
+    verilirse görev gönderilmeden hemen önce küçültülür (ör. tüm grafik
+    yerine yalnız bölümün alt grafiği), böylece ana süreçte ve işçilerde
+    aynı anda yalnız birkaç bölüm bellekte durur.
+    """
+    if PATTERN_WORKERS <= 0 or len(tasks) < 2 or weight < PATTERN_PARALLEL_MIN:
+        return [func(*task) for task in tasks]
+    try:
+        pool = _get_pool()
+    except Exception:
+        return [func(*task) for task in tasks]
+
+    def submit(task: Tuple[Any, ...]) -> Optional[Future]:
+        if deadline is not None and time.time() > deadline:
+            return None
+        try:
+            return pool.submit(func, *(prepare(task) if prepare is not None else task))
+        except Exception:
+            # Havuz kullanılamıyor: bu bölümü istek içinde üret
+            from concurrent.futures import Future
+
+            done: Future = Future()
+            done.set_result(func(*task))
+            return done
+
+    results: List[Optional[Any]] = []
+    pending: Deque[Optional[Future]] = deque()
+    upcoming = iter(tasks)
+    for task in upcoming:
+        pending.append(submit(task))
+        if len(pending) >= PATTERN_WORKERS:
+            break
+    while pending:
+        future = pending.popleft()
+        if future is None:
+            results.append(None)
+        else:
+            timeout = None
+            if deadline is not None:
+                # Görevler bütçeyi kendileri de izler; kısa bir pay yeterli
+                timeout = max(0.0, deadline - time.time()) + 1.0
+            try:
+                results.append(future.result(timeout=timeout))
+            except Exception:
+                future.cancel()
+                results.append(None)
+        task = next(upcoming, None)
+        if task is not None:
+            pending.append(submit(task))
+    return results
@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .automaton import INITIAL_STATE_KEY, StateKey, advance_key, allowed_values_for_key
+from .memo import PATTERN_MEMO
+
+__all__ = ("PatternTrie", "iter_paths")
+
+Edge = Tuple[int, int]  # (değer, çocuk düğüm)
+
+
+class PatternTrie:
+    """Örüntü kümesinin önek/sonek paylaşan DAG gösterimi.
+
+    Her düğüm bir otomat durumu taşır; aynı durum ve derinliğe varan önekler
+    tek düğümde birleşir, böylece ortak önek ve sonekler bir kez saklanır.
+    Düğüm kimlikleri topolojik sıralıdır (çocuk > ebeveyn), kök 0'dır.
+    Aynı dizi iki kez eklenemez: tekilleştirme yapının kendisidir.
+    """
+
+    __slots__ = (
+        "allow_zero_after_start",
+        "xyz_sets",
+        "_edges",
+        "_terminal",
+        "_keys",
+        "_counts",
+        "_uniform",
+        "_width",
+        "_fingerprint",
+    )
+
+    root = 0
+
+    def __init__(
+        self,
+        allow_zero_after_start: bool,
+        edges: List[Tuple[Edge, ...]],
+        terminal: List[bool],
+        keys: List[StateKey],
+        xyz_sets: Optional[Tuple[Tuple[int, ...], ...]] = None,
+    ) -> None:
+        self.allow_zero_after_start = allow_zero_after_start
+        self.xyz_sets = xyz_sets
+        self._edges = edges
+        self._terminal = terminal
+        self._keys = keys
+        counts = [0] * len(edges)
+        for node in range(len(edges) - 1, -1, -1):
+            counts[node] = int(terminal[node]) + sum(counts[child] for _, child in edges[node])
+        self._counts = counts
+        self._uniform = self._check_uniform()
+        self._width = self._first_width()
+        self._fingerprint: Optional[Hashable] = None
+
+    @classmethod
+    def from_xyz_sets(cls, xyz_sets: Sequence[Iterable[int]], allow_zero_after_start: bool) -> "PatternTrie":
+        """XYZ kümelerinden, durumları birleştirerek doğrudan DAG kur (önbellekli)."""
+        frozen = tuple(tuple(sorted(set(int(v) for v in choices))) for choices in xyz_sets)
+        return PATTERN_MEMO.get_or_build(
+            ("trie", frozen, allow_zero_after_start),
+            lambda: cls._compile_xyz_sets(frozen, allow_zero_after_start),
+        )
+
+    @classmethod
+    def _compile_xyz_sets(cls, frozen: Tuple[Tuple[int, ...], ...], allow_zero_after_start: bool) -> "PatternTrie":
+        if not frozen:
+            return cls(allow_zero_after_start, [()], [False], [INITIAL_STATE_KEY], xyz_sets=frozen)
+        keys: List[StateKey] = [INITIAL_STATE_KEY]
+        edges: List[List[Edge]] = [[]]
+        level: List[int] = [0]
+        for depth, choices in enumerate(frozen):
+            choice_key = frozenset(choices)
+            index: Dict[StateKey, int] = {}
+            next_level: List[int] = []
+            for node in level:
+                key = keys[node]
+                for v in allowed_values_for_key(key, choice_key, allow_zero_after_start):
+                    child_key = advance_key(key, v, depth == 0, allow_zero_after_start)
+                    child = index.get(child_key)
+                    if child is None:
+                        child = len(keys)
+                        index[child_key] = child
+                        keys.append(child_key)
+                        edges.append([])
+                        next_level.append(child)
+                    edges[node].append((v, child))
+            level = next_level
+            if not level:
+                break
+        last = set(level) if level else set()
+        # Sona ulaşamayan dalları buda, kimlikleri sırayı koruyarak yeniden ver
+        alive = [False] * len(keys)
+        for node in range(len(keys) - 1, -1, -1):
+            alive[node] = node in last or any(alive[child] for _, child in edges[node])
+        remap: Dict[int, int] = {}
+        for node in range(len(keys)):
+            if alive[node] or node == 0:
+                remap[node] = len(remap)
+        out_edges: List[Tuple[Edge, ...]] = []
+        out_terminal: List[bool] = []
+        out_keys: List[StateKey] = []
+        for node in remap:
+            out_edges.append(tuple((v, remap[child]) for v, child in edges[node] if alive[child]))
+            out_terminal.append(node in last)
+            out_keys.append(keys[node])
+        return cls(allow_zero_after_start, out_edges, out_terminal, out_keys, xyz_sets=frozen)
+
+    @classmethod
+    def from_sequences(cls, sequences: Iterable[Sequence[int]], allow_zero_after_start: bool) -> "PatternTrie":
+        """Hazır dizilerden önek ağacı kur, eş alt ağaçları birleştir."""
+        children: List[Dict[int, int]] = [{}]
+        terminal: List[bool] = [False]
+        keys: List[StateKey] = [INITIAL_STATE_KEY]
+        for seq in sequences:
+            node = 0
+            for depth, raw in enumerate(seq):
+                v = int(raw)
+                nxt = children[node].get(v)
+                if nxt is None:
+                    nxt = len(keys)
+                    children[node][v] = nxt
+                    children.append({})
+                    terminal.append(False)
+                    keys.append(advance_key(keys[node], v, depth == 0, allow_zero_after_start))
+                node = nxt
+            terminal[node] = True
+        # Sonek birleştirme: (bitiş, durum, kenarlar) imzası aynı olan düğümler tekildir
+        canon: Dict[Tuple, int] = {}
+        new_of: List[int] = [-1] * len(keys)
+        post_edges: List[Tuple[Edge, ...]] = []
+        post_terminal: List[bool] = []
+        post_keys: List[StateKey] = []
+        stack: List[Tuple[int, bool]] = [(0, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if not expanded:
+                stack.append((node, True))
+                for child in reversed(list(children[node].values())):
+                    stack.append((child, False))
+                continue
+            node_edges = tuple((v, new_of[child]) for v, child in children[node].items())
+            sig = (terminal[node], keys[node], node_edges)
+            idx = canon.get(sig)
+            if idx is None:
+                idx = len(post_keys)
+                canon[sig] = idx
+                post_edges.append(node_edges)
+                post_terminal.append(terminal[node])
+                post_keys.append(keys[node])
+            new_of[node] = idx
+        # Post-order kimlikleri ters çevir: kök 0 olur, çocuklar ebeveynden büyük
+        last = len(post_keys) - 1
+        edges = [tuple((v, last - child) for v, child in post_edges[idx]) for idx in range(last, -1, -1)]
+        return cls(
+            allow_zero_after_start,
+            edges,
+            post_terminal[::-1],
+            post_keys[::-1],
+        )
+
+    @classmethod
+    def from_graph(cls, graph, first_value: int, allow_zero_after_start: bool) -> "PatternTrie":
+        """`graph` kökünün `first_value` kenarından ulaşılan alt DAG'ı kopyala.
+
+        İşçi sürece tüm grafik yerine yalnız bu bölüm gönderilir; sayısı 0
+        olan dallar atlanır, kimlikler topolojik sırayla yeniden verilir.
+        """
+        start = None
+        for v, child in graph.children(graph.root):
+            if v == first_value and graph.count(child):
+                start = child
+                break
+        if start is None:
+            return cls(allow_zero_after_start, [()], [False], [graph.end_key(graph.root)])
+        # Ters post-order: her düğüm çocuklarından önce gelir
+        order: List[Hashable] = []
+        seen = {start}
+        stack: List[Tuple[Hashable, Iterator]] = [(start, iter(graph.children(start)))]
+        while stack:
+            node, it = stack[-1]
+            nxt = next(it, None)
+            if nxt is None:
+                stack.pop()
+                order.append(node)
+                continue
+            child = nxt[1]
+            if child not in seen and graph.count(child):
+                seen.add(child)
+                stack.append((child, iter(graph.children(child))))
+        order.reverse()
+        ids = {node: idx + 1 for idx, node in enumerate(order)}
+        edges: List[Tuple[Edge, ...]] = [((first_value, 1),)]
+        terminal = [False]
+        keys = [graph.end_key(graph.root)]
+        for node in order:
+            edges.append(tuple((v, ids[child]) for v, child in graph.children(node) if child in ids))
+            terminal.append(graph.is_terminal(node))
+            keys.append(graph.end_key(node))
+        return cls(allow_zero_after_start, edges, terminal, keys)
+
+    def _check_uniform(self) -> bool:
+        depths: List[Optional[Set[int]]] = [None] * len(self._edges)
+        depths[0] = {0}
+        end_depths: Set[int] = set()
+        for node, node_edges in enumerate(self._edges):
+            here = depths[node] or set()
+            if self._terminal[node]:
+                if node_edges:
+                    return False
+                end_depths |= here
+            for _, child in node_edges:
+                bucket = depths[child]
+                if bucket is None:
+                    depths[child] = bucket = set()
+                bucket.update(d + 1 for d in here)
+        return len(end_depths) <= 1
+
+    def _first_width(self) -> int:
+        # Sıradaki ilk boş olmayan dizinin uzunluğu
+        edges = self._edges[0]
+        if not edges:
+            return 0
+        node = edges[0][1]
+        width = 1
+        while not self._terminal[node]:
+            node = self._edges[node][0][1]
+            width += 1
+        return width
+
+    def __len__(self) -> int:
+        return self._counts[0]
+
+    def __iter__(self) -> Iterator[List[int]]:
+        for seq, _ in iter_paths(self, self.root):
+            yield seq
+
+    @property
+    def node_count(self) -> int:
+        return len(self._edges)
+
+    @property
+    def fingerprint(self) -> Hashable:
+        """Önbellek anahtarı: XYZ'den kurulduysa kümeler, değilse yapının özeti."""
+        if self._fingerprint is None:
+            if self.xyz_sets is not None:
+                self._fingerprint = ("xyz", self.xyz_sets, self.allow_zero_after_start)
+            else:
+                digest = hashlib.sha1(repr((self._edges, self._terminal)).encode("ascii")).hexdigest()
+                self._fingerprint = ("dag", digest, self.allow_zero_after_start)
+        return self._fingerprint
+
+    def memo_size(self) -> int:
+        # Düğüm başına durum anahtarı + sayaç, kenar başına bir demet
+        edge_total = sum(len(node_edges) for node_edges in self._edges)
+        return 200 * len(self._edges) + 72 * edge_total
+
+    @property
+    def uniform(self) -> bool:
+        """Tüm dizilerin uzunluğu eşitse True."""
+        return self._uniform
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    def children(self, node: int) -> Tuple[Edge, ...]:
+        return self._edges[node]
+
+    def is_terminal(self, node: int) -> bool:
+        return self._terminal[node]
+
+    def count(self, node: int) -> int:
+        return self._counts[node]
+
+    def end_key(self, node: int) -> StateKey:
+        return self._keys[node]
+
+    def to_json(self) -> Dict[str, object]:
+        return {
+            "allow": self.allow_zero_after_start,
+            "edges": [[list(edge) for edge in node_edges] for node_edges in self._edges],
+            "terminal": self._terminal,
+            "keys": [list(key) for key in self._keys],
+            "xyz": None if self.xyz_sets is None else [list(choices) for choices in self.xyz_sets],
+        }
+
+    @classmethod
+    def from_json(cls, obj: Dict[str, object]) -> "PatternTrie":
+        # Parmak izi `repr` üzerinden alındığından demet yapısı aynen kurulmalı
+        xyz = obj.get("xyz")
+        return cls(
+            bool(obj["allow"]),
+            [tuple((int(v), int(child)) for v, child in node_edges) for node_edges in obj["edges"]],
+            [bool(flag) for flag in obj["terminal"]],
+            [tuple(key) for key in obj["keys"]],
+            xyz_sets=None if xyz is None else tuple(tuple(int(v) for v in choices) for choices in xyz),
+        )
+
+
+def iter_paths(graph, node, first_value: Optional[int] = None) -> Iterator[Tuple[List[int], object]]:
+    """`graph` DAG'ında `node`'dan başlayan tüm tam dizileri sırayla üret.
+
+    `graph`, `children/is_terminal/count` sağlayan herhangi bir yapı olabilir
+    (PatternTrie ya da zincir görünümü). Dönen liste her adımda yeniden
+    kullanılmaz; `(dizi, bitiş düğümü)` çiftleri üretilir.
+    """
+    seq: List[int] = []
+    if graph.is_terminal(node) and first_value is None:
+        yield [], node
+    stack = [iter(graph.children(node))]
+    while stack:
+        nxt = next(stack[-1], None)
+        if nxt is None:
+            stack.pop()
+            if seq:
+                seq.pop()
+            continue
+        v, child = nxt
+        if first_value is not None and len(stack) == 1 and v != first_value:
+            continue
+        if not graph.count(child):
+            continue
+        seq.append(v)
+        if graph.is_terminal(child):
+            yield seq[:], child
+        stack.append(iter(graph.children(child)))
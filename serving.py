@@ -0,0 +1,1146 @@
+"""Tüm web sunucuları için ortak eşzamanlılık modeli.
+
+`make_server` düz `HTTPServer` yerine sınırlı bir iş parçacığı havuzuyla
+çalışan bir sunucu döndürür: yavaş bir IOU analizi favicon ya da GET
+isteklerini bekletmez. Bekleyen + işlenen istek sayısı kuyruk sınırını
+aşarsa istek okunmadan 503 ile geri çevrilir. `CPU_WORKERS > 0` ise
+içe aktarılabilir işleyicilerin POST istekleri ham haliyle süreç havuzuna
+gönderilir; işleyici orada aynen çalışır ve yanıt baytları geri yazılır,
+böylece ağır hesaplar GIL için yarışmaz. Gövde ancak `MAX_UPLOAD_BYTES`
+sınırına uyuyorsa ve kabul denetiminde yer ayrıldıktan sonra okunur.
+
+İşleyiciler HTTP/1.1 konuştuğunda bağlantı kalıcıdır; ancak iş parçacığı
+bağlantıyı değil isteği tutar: yanıt bitince boştaki bağlantı bir seçiciye
+(`selectors`) bırakılır, yeni istek gelince yeniden havuza girer, boşta
+`KEEPALIVE_TIMEOUT` saniye bekleyen bağlantı kapatılır. Kuyruk sınırı da
+bağlantıları değil işlenen + bekleyen istekleri sayar; böylece boştaki
+tarayıcılar havuzu tüketmez. Süreç havuzu etkinken de her istek ayrı ayrı
+havuza ya da iş parçacığına gider.
+
+Uzun süren olay akışları (`hand_off`) istek havuzunda tutulmaz: işleyici
+döndükten sonra gövde, `STREAM_LIMIT` ile sınırlı ayrı bir iş
+parçacığı havuzunda bağlantı kapanışıyla biten yanıt olarak yazılır.
+
+`dispatch_mounted` birleşik sunucunun ayrıştırdığı isteği bir uygulama
+işleyicisine aynı bağlantı üzerinden devreder; uygulamalar bağlantılarını
+`url_for` ile ürettiği için önek (`/app72`) sayfalara doğrudan yazılır.
+`make_wsgi_app` aynı işleyicileri WSGI uygulaması olarak sarar (gunicorn).
+
+Yanıtlar tek yerde, işleyici sınıfı düzeyinde sıkıştırılır: istek
+ayrıştırılınca `wfile` bir `compression.ResponseCompressor` ile sarılır
+(sunucu, süreç havuzu, `run_buffered` ve WSGI yolları aynı sonucu verir).
+
+`serve` sunucuyu SIGTERM'de nazikçe kapatır (dinlemeyi bırakır, işlenen
+istekleri bitirir); `supervisor` modülünün işçi süreçleri `REUSE_PORT`
+ile aynı portu paylaşır.
+"""
+
+import importlib
+import io
+import os
+import queue
+import selectors
+import signal
+import socket
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPMessage
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import StreamRequestHandler
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote
+
+from compression import ResponseCompressor
+
+# Sunucu başına istek işleyen iş parçacığı sayısı
+SERVER_WORKERS = 8
+# Sunucu başına işlenen + bekleyen en fazla istek (boştaki bağlantılar sayılmaz); aşılırsa 503
+SERVER_QUEUE_LIMIT = 32
+# Sunucu başına istek havuzu dışında açık tutulan en fazla olay akışı (SSE);
+# dolunca `hand_off` False döner
+STREAM_LIMIT = 32
+# 0 => POST'lar iş parçacığında işlenir; aksi halde bu kadar işçi süreç
+CPU_WORKERS = 0
+# Süreç havuzuna gönderilen yöntemler
+OFFLOAD_METHODS = (b"POST",)
+# İstemciye önerilen yeniden deneme süresi (saniye)
+RETRY_AFTER_SECONDS = 2
+# Boştaki kalıcı bağlantının seçicide açık tutulduğu en uzun süre; istek
+# okunurken de soket zaman aşımıdır
+KEEPALIVE_TIMEOUT = 5.0
+# True => dinleme soketi SO_REUSEPORT ile açılır (denetlenen işçi süreçler)
+REUSE_PORT = False
+# Süreç havuzuna gönderilecek istek gövdesinin üst sınırı (uygulamalarınkiyle aynı)
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+
+# WSGI işçileri (gunicorn -w N) oturumları bu dizin üzerinden paylaşır
+# (None => geçici dizin altında `iou_sessions`)
+WSGI_SESSION_DIR: Optional[str] = None
+# WSGI yineleyicisinin henüz okumadığı en fazla yanıt parçası; dolarsa
+# işleyici bekler (yavaş istemci belleği şişirmez)
+WSGI_PIPE_CHUNKS = 16
+# WSGI sunucusunun kendisi yazdığı ya da WSGI'da yasak olan başlıklar
+_WSGI_SKIP_HEADERS = frozenset({"connection", "keep-alive", "transfer-encoding", "server", "date"})
+
+_BUSY_BODY = "Sunucu meşgul, lütfen biraz sonra tekrar deneyin.\n".encode("utf-8")
+BUSY_RESPONSE = (
+    b"HTTP/1.0 503 Service Unavailable\r\n"
+    b"Content-Type: text/plain; charset=utf-8\r\n"
+    + f"Retry-After: {RETRY_AFTER_SECONDS}\r\n".encode("ascii")
+    + f"Content-Length: {len(_BUSY_BODY)}\r\n".encode("ascii")
+    + b"Connection: close\r\n\r\n"
+    + _BUSY_BODY
+)
+_TOO_LARGE_BODY = "Yükleme boyutu sınırı aşıldı (50 MB).\n".encode("utf-8")
+_TOO_LARGE_RESPONSE = (
+    b"HTTP/1.0 413 Payload Too Large\r\n"
+    b"Content-Type: text/plain; charset=utf-8\r\n"
+    + f"Content-Length: {len(_TOO_LARGE_BODY)}\r\n".encode("ascii")
+    + b"Connection: close\r\n\r\n"
+    + _TOO_LARGE_BODY
+)
+_ERROR_RESPONSE = (
+    b"HTTP/1.0 500 Internal Server Error\r\n"
+    b"Content-Type: text/plain; charset=utf-8\r\n"
+    b"Content-Length: 6\r\n"
+    b"Connection: close\r\n\r\n"
+    b"Error\n"
+)
+
+# Uygulamanın bağlandığı yol öneki ("" = kökte, tek başına çalışma)
+_URL_PREFIX: ContextVar[str] = ContextVar("url_prefix", default="")
+
+_cpu_pool: Optional["ProcessPoolExecutor"] = None
+# Denetleyicinin beklediği "dinlemeye başladım" olayı (yalnız işçi süreçlerde)
+_ready_event: Optional[Any] = None
+_cpu_lock = threading.Lock()
+_wsgi_ready = False
+
+
+def configure_server(
+    workers: Optional[int] = None,
+    queue_limit: Optional[int] = None,
+    cpu_workers: Optional[int] = None,
+) -> None:
+    """Varsayılan havuz boyutlarını ayarla (CLI bayraklarından çağrılır)."""
+    global SERVER_WORKERS, SERVER_QUEUE_LIMIT, CPU_WORKERS, _cpu_pool
+    if workers is not None:
+        SERVER_WORKERS = max(1, int(workers))
+    if queue_limit is not None:
+        SERVER_QUEUE_LIMIT = max(1, int(queue_limit))
+    if cpu_workers is not None and cpu_workers != CPU_WORKERS:
+        with _cpu_lock:
+            CPU_WORKERS = max(0, int(cpu_workers))
+            if _cpu_pool is not None:
+                _cpu_pool.shutdown(wait=False, cancel_futures=True)
+                _cpu_pool = None
+
+
+def url_for(path: str) -> str:
+    """Uygulama içi mutlak yolu bağlı olunan önekle döndür (`/dc` → `/app72/dc`)."""
+    return _URL_PREFIX.get() + path
+
+
+@contextmanager
+def mount_prefix(prefix: str) -> Iterator[None]:
+    token = _URL_PREFIX.set(prefix.rstrip("/"))
+    try:
+        yield
+    finally:
+        _URL_PREFIX.reset(token)
+
+
+def _worker_settings() -> Dict[str, Any]:
+    """Alt süreçlere taşınacak ayarlar (oturum dizini, örüntü önbelleği ve bütçesi)."""
+    import tempfile
+
+    import admission
+    import iou_session
+    import jobs
+    from patterns import memo, search
+
+    if iou_session.SESSION_STORE.directory is None:
+        # Oturumlar süreçler arasında paylaşılmalı: disk yedeğini zorunlu kıl
+        iou_session.configure_sessions(directory=tempfile.mkdtemp(prefix="iou_sessions_"))
+    if jobs.JOB_STORE.directory is None:
+        # İşi başlatan süreç ile sorgulayan süreç farklı olabilir
+        jobs.configure_jobs(directory=os.path.join(str(iou_session.SESSION_STORE.directory), "jobs"))
+    return {
+        "session_dir": str(iou_session.SESSION_STORE.directory),
+        "session_ttl": iou_session.SESSION_STORE.ttl_seconds,
+        "job_dir": str(jobs.JOB_STORE.directory),
+        "job_ttl": jobs.JOB_STORE.ttl_seconds,
+        "job_workers": jobs.JOB_WORKERS,
+        "admission": admission.admission_settings(),
+        "memo_bytes": memo.PATTERN_MEMO.max_bytes,
+        "pattern_budget": search.PATTERN_BUDGET_SECONDS,
+        "pattern_max_lines": search.PATTERN_MAX_LINES,
+    }
+
+
+def _init_worker(settings: Dict[str, Any]) -> None:
+    import admission
+    import iou_session
+    import jobs
+    from patterns import configure_memo, configure_search
+
+    iou_session.configure_sessions(settings["session_ttl"], settings["session_dir"])
+    jobs.configure_jobs(settings["job_workers"], settings["job_ttl"], settings["job_dir"])
+    admission.configure_admission(**settings["admission"])
+    configure_memo(max_bytes=settings["memo_bytes"])
+    # İç içe süreç havuzu açma; bölümler işçi süreçte sırayla işlenir
+    configure_search(0, settings["pattern_budget"], settings["pattern_max_lines"])
+
+
+def process_settings() -> Dict[str, Any]:
+    """Denetlenen işçi süreçlere taşınacak sunucu + oturum/örüntü ayarları."""
+    settings = _worker_settings()
+    settings.update(workers=SERVER_WORKERS, queue_limit=SERVER_QUEUE_LIMIT, cpu_workers=CPU_WORKERS)
+    return settings
+
+
+def init_process(settings: Dict[str, Any], ready: Any = None) -> None:
+    """`process_settings` çıktısını yeni bir işçi süreçte uygula."""
+    global REUSE_PORT, _ready_event
+    _init_worker(settings)
+    configure_server(settings["workers"], settings["queue_limit"], settings["cpu_workers"])
+    REUSE_PORT = True
+    _ready_event = ready
+
+
+def notify_ready() -> None:
+    if _ready_event is not None:
+        _ready_event.set()
+
+
+def _get_cpu_pool() -> "ProcessPoolExecutor":
+    global _cpu_pool
+    with _cpu_lock:
+        if _cpu_pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            _cpu_pool = ProcessPoolExecutor(
+                max_workers=CPU_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(_worker_settings(),),
+            )
+        return _cpu_pool
+
+
+class _ChainedReader(io.RawIOBase):
+    """İstek başı bellekten, gövde dosyadan okunur."""
+
+    def __init__(self, head: bytes, body: BinaryIO) -> None:
+        self._parts: List[Any] = [io.BytesIO(head), body]
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        while self._parts:
+            count = self._parts[0].readinto(buffer)
+            if count:
+                return count
+            self._parts.pop(0)
+        return 0
+
+
+class _BufferedSocket:
+    """İşleyiciye soket gibi görünen bellek içi istek/yanıt tamponu.
+
+    `sendall` verilirse yanıt baytları tampona değil, yazıldıkça ona gider.
+    `body` verilirse `raw` yalnız istek başıdır; gövde işleyici okudukça
+    dosyadan gelir.
+    """
+
+    def __init__(
+        self,
+        raw: bytes,
+        sendall: Optional[Callable[[bytes], None]] = None,
+        body: Optional[BinaryIO] = None,
+    ) -> None:
+        self._raw = raw
+        self._body = body
+        self.out = io.BytesIO()
+        self.sent = False
+        self._sendall = sendall
+
+    def makefile(self, mode: str, *args: Any, **kwargs: Any) -> BinaryIO:
+        if self._body is not None:
+            return io.BufferedReader(_ChainedReader(self._raw, self._body))
+        return io.BytesIO(self._raw)
+
+    def sendall(self, data: bytes) -> None:
+        if self._sendall is None:
+            self.out.write(data)
+            return
+        self.sent = True
+        self._sendall(data)
+
+    def settimeout(self, value: Optional[float]) -> None:
+        pass
+
+    def setsockopt(self, *args: Any) -> None:
+        pass
+
+
+def _compressing_methods(
+    handler_cls: Type[BaseHTTPRequestHandler],
+    handle_one: Callable[[BaseHTTPRequestHandler], None],
+) -> Dict[str, Callable[..., Any]]:
+    """İstek ayrıştırılınca `wfile`'ı sıkıştırıcıyla saran yöntem çifti."""
+
+    def parse_request(self: BaseHTTPRequestHandler) -> bool:
+        if not handler_cls.parse_request(self):
+            return False
+        if not isinstance(self.wfile, ResponseCompressor):
+            self.wfile = ResponseCompressor(
+                self.wfile.write,
+                self.headers.get("Accept-Encoding"),
+                self.command == "HEAD",
+                chunked=self.request_version != "HTTP/1.0" and self.protocol_version >= "HTTP/1.1",
+            )
+        return True
+
+    def handle_one_request(self: BaseHTTPRequestHandler) -> None:
+        wfile = self.wfile
+        try:
+            handle_one(self)
+        finally:
+            if self.wfile is not wfile:
+                self.wfile.close()
+                if self.wfile.close_delimited:
+                    # Büyük gövde bağlantı kapanışıyla bitti
+                    self.close_connection = True
+                self.wfile = wfile
+
+    return {"parse_request": parse_request, "handle_one_request": handle_one_request}
+
+
+_single_classes: Dict[Tuple[Type[BaseHTTPRequestHandler], Optional[str]], Type[BaseHTTPRequestHandler]] = {}
+
+
+def _single_request_class(
+    handler_cls: Type[BaseHTTPRequestHandler],
+    protocol: Optional[str] = None,
+) -> Type[BaseHTTPRequestHandler]:
+    """Bağlantı döngüsü yerine tek istek işleyen alt sınıf (önbellekli).
+
+    `protocol` verilirse durum satırı o sürümle yazılır (ön sunucunun sürümü).
+    """
+    single = _single_classes.get((handler_cls, protocol))
+    if single is None:
+        methods = _compressing_methods(handler_cls, BaseHTTPRequestHandler.handle_one_request)
+        members = {"parse_request": methods["parse_request"], "handle": methods["handle_one_request"]}
+        if protocol is not None:
+            members["protocol_version"] = protocol
+        single = type(handler_cls.__name__, (handler_cls,), members)
+        _single_classes[(handler_cls, protocol)] = single
+    return single
+
+
+def run_buffered(
+    handler_cls: Type[BaseHTTPRequestHandler],
+    raw: bytes,
+    client_address: Tuple[str, int],
+    prefix: str = "",
+    protocol: Optional[str] = None,
+    body: Optional[BinaryIO] = None,
+) -> Tuple[bytes, bool]:
+    """İşleyiciyi tek ham istekle bellekte çalıştır.
+
+    Yanıt baytlarını ve bağlantının açık kalıp kalamayacağını döndürür.
+    `body` verilirse gövde oradan okunur (`raw` yalnız istek başıdır).
+    """
+    handler_cls = _single_request_class(handler_cls, protocol)
+    conn = _BufferedSocket(raw, body=body)
+    try:
+        with mount_prefix(prefix):
+            handler = handler_cls(conn, client_address, None)
+    except Exception:
+        if not conn.out.tell():
+            return _ERROR_RESPONSE, False
+        return conn.out.getvalue(), False
+    return conn.out.getvalue(), not handler.close_connection
+
+
+def run_streaming(
+    handler_cls: Type[BaseHTTPRequestHandler],
+    raw: bytes,
+    client_address: Tuple[str, int],
+    sendall: Callable[[bytes], None],
+    prefix: str = "",
+    protocol: Optional[str] = None,
+) -> bool:
+    """`run_buffered` gibi, ama yanıt yazıldıkça `sendall` ile gönderilir.
+
+    Akışlı sayfalar, ZIP ve olay akışları tamponlanmaz; `sendall` hata
+    verirse (istemci gitti) işleyici yarıda kalır. Bağlantının açık kalıp
+    kalamayacağını döndürür.
+    """
+    handler_cls = _single_request_class(handler_cls, protocol)
+    conn = _BufferedSocket(raw, sendall)
+    try:
+        with mount_prefix(prefix):
+            handler = handler_cls(conn, client_address, None)
+    except Exception:
+        if not conn.sent:
+            try:
+                sendall(_ERROR_RESPONSE)
+            except Exception:
+                pass
+        return False
+    return not handler.close_connection
+
+
+def handle_buffered(
+    target: str,
+    raw: bytes,
+    client_address: Tuple[str, int],
+    prefix: str = "",
+    protocol: Optional[str] = None,
+) -> Tuple[bytes, bool]:
+    """`modül:Sınıf` işleyicisini içe aktarıp `run_buffered` ile çalıştır (işçi süreçte)."""
+    module_name, _, attr = target.partition(":")
+    return run_buffered(getattr(importlib.import_module(module_name), attr), raw, client_address, prefix, protocol)
+
+
+def _offload_request(
+    target: str,
+    rfile: Any,
+    head: bytes,
+    length: int,
+    client_address: Tuple[str, int],
+    prefix: str = "",
+    protocol: Optional[str] = None,
+) -> Tuple[bytes, bool]:
+    """Ham isteği gövdesiyle süreç havuzunda çalıştır; yanıt ve kalıcılık.
+
+    Gövde sınırı aşıyorsa hiç okunmaz (413). Aksi halde gövde, kabul
+    denetiminde (`offload:<hedef>`, işçi sayısı kadar yuva ve ortak bayt
+    bütçesi) yer ayrıldıktan sonra okunur; yer yoksa okunup atılır ve 503
+    döner. Böylece havuzu bekleyen istekler gövdelerini bellekte biriktirmez.
+    """
+    import admission
+
+    if length > MAX_UPLOAD_BYTES:
+        return _TOO_LARGE_RESPONSE, False
+    with admission.reserve(f"offload:{target}", length, CPU_WORKERS) as admitted:
+        if not admitted:
+            admission.discard_body(rfile, length)
+            return BUSY_RESPONSE, False
+        raw = head + (rfile.read(length) if length else b"")
+        future = _get_cpu_pool().submit(handle_buffered, target, raw, client_address, prefix, protocol)
+        return future.result()
+
+
+def _handler_target(handler_cls: Type[BaseHTTPRequestHandler]) -> Optional[str]:
+    # Fabrika içinde tanımlanan (kapanışlı) sınıflar alt süreçte kurulamaz
+    if "<locals>" in handler_cls.__qualname__:
+        return None
+    return f"{handler_cls.__module__}:{handler_cls.__qualname__}"
+
+
+def dispatch_mounted(
+    handler: BaseHTTPRequestHandler,
+    app_cls: Type[BaseHTTPRequestHandler],
+    prefix: str,
+    sub_path: str,
+) -> None:
+    """Ayrıştırılmış isteği `prefix` altında bağlı uygulama işleyicisine devret.
+
+    İstek yeniden ayrıştırılmaz; uygulama aynı `rfile`/`wfile` üzerinden
+    okuyup yazar. Süreç havuzu etkinse POST gövdesi yer ayrıldıktan sonra
+    okunup ham istek olarak işçi sürece gönderilir (`_offload_request`).
+    """
+    target = _handler_target(app_cls)
+    if CPU_WORKERS > 0 and target and handler.command.encode("ascii") in OFFLOAD_METHODS:
+        head = f"{handler.command} {sub_path} {handler.request_version}\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in handler.headers.items()) + "\r\n"
+        try:
+            length = max(0, int(handler.headers.get("Content-Length", "0") or 0))
+        except ValueError:
+            length = 0
+        response, keep_alive = _offload_request(
+            target, handler.rfile, head.encode("latin-1"), length, handler.client_address, prefix, handler.protocol_version
+        )
+        handler.wfile.write(response)
+        handler.close_connection = handler.close_connection or not keep_alive
+        return
+
+    app = app_cls.__new__(app_cls)
+    app.__dict__.update(handler.__dict__)
+    # Başlık tamponu paylaşılmasın: kalıcı bağlantıda ön sunucunun sonraki
+    # yanıtı uygulamanın başlıklarını yeniden yazardı
+    app.__dict__.pop("_headers_buffer", None)
+    app.path = sub_path
+    # Durum satırı ön sunucunun konuştuğu sürümle yazılsın
+    app.protocol_version = handler.protocol_version
+    method = getattr(app, "do_" + handler.command, None)
+    with mount_prefix(prefix):
+        if method is None:
+            app.send_error(501, f"Unsupported method ({handler.command!r})")
+        else:
+            method()
+    handler.close_connection = handler.close_connection or app.close_connection
+
+
+WsgiApp = Callable[[Dict[str, Any], Callable[..., Any]], Iterable[bytes]]
+
+
+def _prepare_wsgi() -> None:
+    global _wsgi_ready
+    if _wsgi_ready:
+        return
+    import iou_session
+    import jobs
+
+    with _cpu_lock:
+        if not _wsgi_ready:
+            if iou_session.SESSION_STORE.directory is None:
+                import tempfile
+
+                # Her işçi ayrı süreç: oturumlar ortak diskte tutulmalı
+                directory = WSGI_SESSION_DIR or os.path.join(tempfile.gettempdir(), "iou_sessions")
+                os.makedirs(directory, mode=0o700, exist_ok=True)
+                iou_session.configure_sessions(directory=directory)
+            if jobs.JOB_STORE.directory is None:
+                jobs.configure_jobs(directory=os.path.join(str(iou_session.SESSION_STORE.directory), "jobs"))
+            _wsgi_ready = True
+
+
+def _wsgi_handler(handler_cls: Type[BaseHTTPRequestHandler], environ: Dict[str, Any]) -> BaseHTTPRequestHandler:
+    """WSGI ortamından, soket açmadan istek ayrıştırılmış bir işleyici kur."""
+    headers = HTTPMessage()
+    for key, value in environ.items():
+        if key.startswith("HTTP_"):
+            headers[key[5:].replace("_", "-").title()] = value
+    if environ.get("CONTENT_TYPE"):
+        headers["Content-Type"] = environ["CONTENT_TYPE"]
+    if environ.get("CONTENT_LENGTH"):
+        headers["Content-Length"] = environ["CONTENT_LENGTH"]
+    path = quote(environ.get("PATH_INFO", "").encode("latin-1"), safe="/:@!$&'()*+,;=~") or "/"
+    if environ.get("QUERY_STRING"):
+        path = f"{path}?{environ['QUERY_STRING']}"
+
+    handler = handler_cls.__new__(handler_cls)
+    handler.command = environ.get("REQUEST_METHOD", "GET")
+    handler.path = path
+    handler.request_version = environ.get("SERVER_PROTOCOL", "HTTP/1.0")
+    handler.requestline = f"{handler.command} {path} {handler.request_version}"
+    # Çerçeveleme WSGI sunucusunun işi: akışlı yanıtlar chunked yazılmasın
+    handler.protocol_version = "HTTP/1.0"
+    handler.headers = headers
+    handler.rfile = environ["wsgi.input"]
+    handler.client_address = (environ.get("REMOTE_ADDR", ""), int(environ.get("REMOTE_PORT") or 0))
+    handler.server = None
+    handler.request = None
+    handler.close_connection = True
+    return handler
+
+
+def _split_response(raw: bytes) -> Tuple[str, List[Tuple[str, str]], bytes]:
+    head, _, body = raw.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = lines[0].split(" ", 1)[1] if " " in lines[0] else "500 Internal Server Error"
+    headers = []
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name.strip().lower() not in _WSGI_SKIP_HEADERS:
+            headers.append((name.strip(), value.strip()))
+    return status, headers, body
+
+
+class _WsgiPipe:
+    """İşleyici iş parçacığının yazdığı yanıtı WSGI yineleyicisine aktarır.
+
+    Durum satırı ve başlıklar tek parça olarak, gövde yazıldığı gibi
+    parça parça geçer. Sınırlı kuyruk geri basınç sağlar; yineleyici
+    kapatılırsa (istemci gitti) sonraki yazma `BrokenPipeError` verir.
+    """
+
+    def __init__(self) -> None:
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue(WSGI_PIPE_CHUNKS)
+        self._head = bytearray()
+        self._head_sent = False
+        self.abandoned = False
+
+    def _put(self, item: Optional[bytes]) -> None:
+        while not self.abandoned:
+            try:
+                self._queue.put(item, timeout=1.0)
+                return
+            except queue.Full:
+                continue
+        if item is not None:
+            raise BrokenPipeError("WSGI istemcisi yanıtı bıraktı")
+
+    def write(self, data: bytes) -> int:
+        if self.abandoned:
+            raise BrokenPipeError("WSGI istemcisi yanıtı bıraktı")
+        if not data:
+            return 0
+        if self._head_sent:
+            self._put(bytes(data))
+            return len(data)
+        self._head += data
+        end = self._head.find(b"\r\n\r\n")
+        if end >= 0:
+            head, body = bytes(self._head[: end + 4]), bytes(self._head[end + 4 :])
+            self._head_sent = True
+            self._head = bytearray()
+            self._put(head)
+            if body:
+                self._put(body)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def finish(self) -> None:
+        """Yanıt bitti; başlıklar hiç tamamlanmadıysa hata yanıtı gönder."""
+        if not self._head_sent:
+            self._head_sent = True
+            self._put(_ERROR_RESPONSE)
+        self._put(None)
+
+    def get(self) -> Optional[bytes]:
+        return self._queue.get()
+
+    def abandon(self) -> None:
+        self.abandoned = True
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
+
+class _WsgiBody:
+    """Gövde parçalarını işleyici yazdıkça veren WSGI yanıt yineleyicisi."""
+
+    def __init__(self, pipe: _WsgiPipe, first: bytes) -> None:
+        self._pipe = pipe
+        self._first = first
+
+    def __iter__(self) -> Iterator[bytes]:
+        if self._first:
+            yield self._first
+            self._first = b""
+        while True:
+            chunk = self._pipe.get()
+            if chunk is None:
+                return
+            yield chunk
+
+    def close(self) -> None:
+        self._pipe.abandon()
+
+
+def make_wsgi_app(handler_cls: Type[BaseHTTPRequestHandler]) -> WsgiApp:
+    """İşleyici sınıfını WSGI uygulaması olarak sar (`gunicorn modül:wsgi_app`).
+
+    Yönlendirme ve sayfa üretimi işleyicinin `do_*` yöntemlerinde aynen
+    çalışır; işleyici ayrı bir iş parçacığında koşar ve yazdığı yanıt
+    durum + başlık ile gövde parçalarına ayrılarak yazıldıkça iletilir
+    (akışlı sayfalar, `/dc` parçaları ve SSE olayları beklemeden gider).
+    Tek başına sunucu ile WSGI yanıtları bayt bayt aynıdır (Date/Server ve
+    gövde çerçevesini WSGI sunucusu yazar). `SCRIPT_NAME` bağlantı öneki olur.
+    """
+
+    def run(handler: BaseHTTPRequestHandler, pipe: _WsgiPipe, prefix: str) -> None:
+        method = getattr(handler, "do_" + handler.command, None)
+        try:
+            with mount_prefix(prefix):
+                if method is None:
+                    handler.send_error(501, f"Unsupported method ({handler.command!r})")
+                else:
+                    method()
+            handler.wfile.close()
+        except BrokenPipeError:
+            pass
+        except Exception:
+            handler.log_error("WSGI isteği işlenemedi: %r", handler.requestline)
+        finally:
+            try:
+                pipe.finish()
+            except BrokenPipeError:
+                pass
+
+    def wsgi_app(environ: Dict[str, Any], start_response: Callable[..., Any]) -> Iterable[bytes]:
+        _prepare_wsgi()
+        handler = _wsgi_handler(handler_cls, environ)
+        pipe = _WsgiPipe()
+        handler.wfile = ResponseCompressor(pipe.write, environ.get("HTTP_ACCEPT_ENCODING"), handler.command == "HEAD")
+        worker = threading.Thread(
+            target=run, args=(handler, pipe, environ.get("SCRIPT_NAME", "")), name="wsgi-handler", daemon=True
+        )
+        worker.start()
+        status, headers, first = _split_response(pipe.get() or _ERROR_RESPONSE)
+        start_response(status, headers)
+        return _WsgiBody(pipe, first)
+
+    return wsgi_app
+
+
+def _read_request_head(rfile: Any) -> Tuple[bytes, int]:
+    """İstek satırı + başlıkları ve Content-Length değerini oku (gövde okunmaz)."""
+    head = io.BytesIO()
+    length = 0
+    while True:
+        line = rfile.readline(65537)
+        head.write(line)
+        if not line or line in (b"\r\n", b"\n"):
+            break
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            try:
+                length = max(0, int(value.strip()))
+            except ValueError:
+                length = 0
+    return head.getvalue(), length
+
+
+def _peek_method(request: socket.socket) -> bytes:
+    head = b""
+    for _ in range(50):
+        head = request.recv(8, socket.MSG_PEEK)
+        if not head or b" " in head:
+            break
+        time.sleep(0.01)
+    return head.split(b" ", 1)[0]
+
+
+def _server_class(handler_cls: Type[BaseHTTPRequestHandler]) -> Type[BaseHTTPRequestHandler]:
+    """Yanıtları sıkıştıran, kurulunca tek istek işleyen alt sınıf.
+
+    Bağlantı döngüsünü sunucu yürütür (`_Connection`): sıradaki istekler
+    aynı örnekte `handle_one_request` ile işlenir, `finish` bağlantı
+    kapanırken çağrılır. Sunucu kapanırken kalıcı bağlantı mevcut
+    yanıttan sonra bırakılır.
+    """
+    methods = _compressing_methods(handler_cls, handler_cls.handle_one_request)
+    compressed_one = methods["handle_one_request"]
+
+    def handle_one_request(self: BaseHTTPRequestHandler) -> None:
+        compressed_one(self)
+        if self.server.draining:
+            self.close_connection = True
+
+    def handle(self: BaseHTTPRequestHandler) -> None:
+        self.close_connection = True
+        self.handle_one_request()
+
+    def finish(self: BaseHTTPRequestHandler) -> None:
+        pass
+
+    methods.update(handle_one_request=handle_one_request, handle=handle, finish=finish)
+    return type(handler_cls.__name__, (handler_cls,), methods)
+
+
+class _Connection:
+    """Kabul edilmiş bir bağlantı; istekler arasında iş parçacığı tutmaz."""
+
+    __slots__ = ("sock", "address", "handler", "idle_since")
+
+    def __init__(self, sock: socket.socket, address: Tuple[str, int]) -> None:
+        self.sock = sock
+        self.address = address
+        self.handler: Optional[BaseHTTPRequestHandler] = None
+        self.idle_since = 0.0
+
+    def has_buffered(self) -> bool:
+        """İşleyicinin okuma tamponunda sıradaki (pipelined) istek var mı."""
+        if self.handler is None:
+            return False
+        try:
+            self.sock.setblocking(False)
+            return bool(self.handler.rfile.peek(1))
+        except (OSError, ValueError):
+            return False
+        finally:
+            try:
+                self.sock.settimeout(KEEPALIVE_TIMEOUT)
+            except OSError:
+                pass
+
+
+class _IdleConnections:
+    """Boştaki kalıcı bağlantıları tek iş parçacığında bir seçiciyle bekler.
+
+    Okunabilir olan bağlantı `on_ready`'ye verilir (yeniden havuza girer);
+    `KEEPALIVE_TIMEOUT` boyunca sessiz kalan kapatılır.
+    """
+
+    def __init__(self, on_ready: Callable[[_Connection], None], on_close: Callable[[_Connection], None], name: str) -> None:
+        self._on_ready = on_ready
+        self._on_close = on_close
+        self._name = name
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._incoming: List[_Connection] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def park(self, conn: _Connection) -> None:
+        with self._lock:
+            if self._closed:
+                closed = True
+            else:
+                closed = False
+                self._incoming.append(conn)
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                    self._thread.start()
+        if closed:
+            self._on_close(conn)
+            return
+        self._wake()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        self._wake()
+        if thread is not None:
+            thread.join()
+        else:
+            self._shutdown({})
+
+    def _wake(self) -> None:
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            # Tampon dolu: seçici zaten uyanacak
+            pass
+
+    def _run(self) -> None:
+        idle: "OrderedDict[int, _Connection]" = OrderedDict()
+        while True:
+            timeout = None
+            if idle:
+                oldest = next(iter(idle.values()))
+                timeout = max(0.0, oldest.idle_since + KEEPALIVE_TIMEOUT - time.monotonic())
+            events = self._selector.select(timeout)
+            for key, _ in events:
+                conn = key.data
+                if conn is None:
+                    try:
+                        while self._wake_r.recv(512):
+                            pass
+                    except OSError:
+                        pass
+                    continue
+                self._selector.unregister(conn.sock)
+                del idle[id(conn)]
+                self._on_ready(conn)
+            with self._lock:
+                incoming, self._incoming = self._incoming, []
+                closed = self._closed
+            now = time.monotonic()
+            for conn in incoming:
+                conn.idle_since = now
+                try:
+                    self._selector.register(conn.sock, selectors.EVENT_READ, conn)
+                except (OSError, ValueError):
+                    self._on_close(conn)
+                    continue
+                idle[id(conn)] = conn
+            if closed:
+                self._shutdown(idle)
+                return
+            while idle:
+                conn = next(iter(idle.values()))
+                if now - conn.idle_since < KEEPALIVE_TIMEOUT:
+                    break
+                del idle[id(conn)]
+                self._selector.unregister(conn.sock)
+                self._on_close(conn)
+
+    def _shutdown(self, idle: "OrderedDict[int, _Connection]") -> None:
+        for conn in list(idle.values()) + self._incoming:
+            self._on_close(conn)
+        self._incoming = []
+        self._selector.close()
+        self._wake_r.close()
+        self._wake_w.close()
+
+
+class PooledHTTPServer(HTTPServer):
+    """Sınırlı iş parçacığı havuzlu, kuyruk sınırında 503 dönen HTTP sunucusu."""
+
+    def __init__(
+        self,
+        server_address: Tuple[str, int],
+        handler_cls: Type[BaseHTTPRequestHandler],
+        workers: int,
+        queue_limit: int,
+    ) -> None:
+        self.allow_reuse_port = REUSE_PORT
+        super().__init__(server_address, _server_class(handler_cls))
+        self.workers = max(1, workers)
+        self.queue_limit = max(self.workers, queue_limit)
+        self.offload_target = _handler_target(handler_cls)
+        self.app_handler_class = handler_cls
+        # True => kapanıyor; yanıtı biten kalıcı bağlantı kapatılır
+        self.draining = False
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"http-{server_address[1]}")
+        # İşlenen + havuzda bekleyen istek sayısı (boştaki bağlantılar hariç)
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._idle = _IdleConnections(self._resume, self._close_connection, f"http-idle-{server_address[1]}")
+        # `hand_off` ile devredilen bağlantılar: işleyici dönünce akış başlar
+        self._detached: Dict[socket.socket, Iterable[bytes]] = {}
+        self._streams = 0
+        self._stream_pool: Optional[ThreadPoolExecutor] = None
+
+    def _admit(self) -> bool:
+        with self._pending_lock:
+            if self._pending >= self.queue_limit:
+                return False
+            self._pending += 1
+            return True
+
+    def _reject(self, conn: _Connection) -> None:
+        try:
+            conn.sock.sendall(BUSY_RESPONSE)
+        except OSError:
+            pass
+        self._close_connection(conn)
+
+    def process_request(self, request, client_address) -> None:
+        conn = _Connection(request, client_address)
+        if not self._admit():
+            self._reject(conn)
+            return
+        try:
+            request.settimeout(KEEPALIVE_TIMEOUT)
+            # Başlık ve gövde ayrı yazılır; kalıcı bağlantıda Nagle gecikmesini önle
+            request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            pass
+        self._submit(conn)
+
+    def _resume(self, conn: _Connection) -> None:
+        """Seçicide bekleyen bağlantıya yeni istek geldi (seçici iş parçacığı)."""
+        if self.draining:
+            self._close_connection(conn)
+        elif not self._admit():
+            self._reject(conn)
+        else:
+            self._submit(conn)
+
+    def _submit(self, conn: _Connection) -> None:
+        try:
+            self._pool.submit(self._process, conn)
+        except RuntimeError:
+            # Havuz kapandı
+            with self._pending_lock:
+                self._pending -= 1
+            self._close_connection(conn)
+
+    def _process(self, conn: _Connection) -> None:
+        keep_alive = False
+        try:
+            keep_alive = self._serve_one(conn)
+            # Aynı tampona gelmiş sıradaki istekler seçici beklemeden işlenir
+            while keep_alive and not self.draining and conn.has_buffered():
+                keep_alive = self._serve_one(conn)
+        except Exception:
+            self.handle_error(conn.sock, conn.address)
+            keep_alive = False
+        finally:
+            with self._pending_lock:
+                self._pending -= 1
+                chunks = self._detached.pop(conn.sock, None)
+        if chunks is not None:
+            self._start_stream(conn, chunks)
+        elif keep_alive and not self.draining:
+            self._idle.park(conn)
+        else:
+            self._close_connection(conn)
+
+    def _serve_one(self, conn: _Connection) -> bool:
+        """Bağlantıdaki bir isteği işle; bağlantı açık kalabilirse True."""
+        if CPU_WORKERS > 0 and self.offload_target:
+            return self._serve_with_offload(conn)
+        if conn.handler is None:
+            conn.handler = self.RequestHandlerClass(conn.sock, conn.address, self)
+        else:
+            conn.handler.handle_one_request()
+        return not conn.handler.close_connection
+
+    def _serve_with_offload(self, conn: _Connection) -> bool:
+        """POST'u ham haliyle süreç havuzuna, diğer istekleri iş parçacığına ver."""
+        request = conn.sock
+        try:
+            method = _peek_method(request)
+        except OSError:
+            return False
+        if not method:
+            return False
+        if method in OFFLOAD_METHODS:
+            rfile = request.makefile("rb")
+            try:
+                head, length = _read_request_head(rfile)
+                response, keep_alive = _offload_request(self.offload_target, rfile, head, length, conn.address)
+            finally:
+                rfile.close()
+            request.sendall(response)
+            return keep_alive
+        handler = _single_request_class(self.app_handler_class)(request, conn.address, self)
+        return not handler.close_connection
+
+    def detach(self, sock: socket.socket, chunks: Iterable[bytes]) -> bool:
+        """Yanıt gövdesini işleyici döndükten sonra akış havuzunda yazmak üzere ayır."""
+        with self._pending_lock:
+            if self.draining or self._streams >= STREAM_LIMIT:
+                return False
+            self._streams += 1
+            self._detached[sock] = chunks
+            if self._stream_pool is None:
+                self._stream_pool = ThreadPoolExecutor(max_workers=STREAM_LIMIT, thread_name_prefix=f"http-stream-{self.server_port}")
+            return True
+
+    def _start_stream(self, conn: _Connection, chunks: Iterable[bytes]) -> None:
+        if conn.handler is not None:
+            # Dosya nesneleri kapanır, soket akış için açık kalır
+            try:
+                StreamRequestHandler.finish(conn.handler)
+            except Exception:
+                pass
+            conn.handler = None
+        assert self._stream_pool is not None
+        try:
+            self._stream_pool.submit(self._write_stream, conn, chunks)
+        except RuntimeError:
+            self._end_stream(conn, chunks)
+
+    def _write_stream(self, conn: _Connection, chunks: Iterable[bytes]) -> None:
+        try:
+            for chunk in chunks:
+                if self.draining:
+                    break
+                if chunk:
+                    conn.sock.sendall(chunk)
+        except OSError:
+            # İstemci gitti
+            pass
+        except Exception:
+            self.handle_error(conn.sock, conn.address)
+        finally:
+            self._end_stream(conn, chunks)
+
+    def _end_stream(self, conn: _Connection, chunks: Iterable[bytes]) -> None:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+        with self._pending_lock:
+            self._streams -= 1
+        self._close_connection(conn)
+
+    def _close_connection(self, conn: _Connection) -> None:
+        if conn.handler is not None:
+            try:
+                StreamRequestHandler.finish(conn.handler)
+            except Exception:
+                pass
+        self.shutdown_request(conn.sock)
+
+    def server_close(self) -> None:
+        self.draining = True
+        super().server_close()
+        # Kabul edilmiş bağlantılar yarıda kesilmesin; sonra boştakileri kapat
+        self._pool.shutdown(wait=True)
+        self._idle.close()
+        if self._stream_pool is not None:
+            # Açık akışlar bir sonraki parçada kapanır; istemci yeniden bağlanır
+            self._stream_pool.shutdown(wait=False)
+
+
+def hand_off(
+    handler: BaseHTTPRequestHandler,
+    chunks: Iterable[bytes],
+    headers: Iterable[Tuple[str, str]],
+    add_headers: Optional[Callable[[BaseHTTPRequestHandler], None]] = None,
+) -> bool:
+    """Uzun akışı istek havuzunu tutmadan gönder; yapılamıyorsa False (hiçbir şey yazılmaz).
+
+    Yalnız `PooledHTTPServer` bağlantılarında (bağlı kip dahil) ve
+    `STREAM_LIMIT` dolmamışsa çalışır. Başlıklar hemen yazılır; `chunks`
+    işleyici döndükten sonra ayrı havuzda tüketilir ve bağlantı sonunda
+    kapanır.
+    """
+    server = getattr(handler, "server", None)
+    if not isinstance(server, PooledHTTPServer) or handler.command == "HEAD":
+        return False
+    if not server.detach(handler.connection, chunks):
+        return False
+    handler.close_connection = True
+    handler.send_response(200)
+    for name, value in headers:
+        handler.send_header(name, value)
+    if add_headers is not None:
+        add_headers(handler)
+    handler.send_header("Connection", "close")
+    handler.end_headers()
+    handler.wfile.flush()
+    return True
+
+
+def make_server(
+    host: str,
+    port: int,
+    handler_cls: Type[BaseHTTPRequestHandler],
+    workers: Optional[int] = None,
+    queue_limit: Optional[int] = None,
+) -> HTTPServer:
+    """Uygulamaların `run()` fonksiyonlarında kullanılan sunucu fabrikası."""
+    return PooledHTTPServer(
+        (host, port),
+        handler_cls,
+        SERVER_WORKERS if workers is None else workers,
+        SERVER_QUEUE_LIMIT if queue_limit is None else queue_limit,
+    )
+
+
+def serve(server: HTTPServer) -> None:
+    """`serve_forever`; SIGTERM'de yeni bağlantı almayı bırakıp işlenenleri bitirir."""
+    if threading.current_thread() is threading.main_thread():
+        def on_term(*_: Any) -> None:
+            server.draining = True
+            # shutdown() serve_forever dönene kadar bekler; sinyal işleyicisinde çağrılamaz
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, on_term)
+    notify_ready()
+    try:
+        server.serve_forever()
+    finally:
+        _accept_pending(server)
+        server.server_close()
+
+
+def _accept_pending(server: HTTPServer) -> None:
+    """Dinleme kuyruğunda bekleyen bağlantıları da işle; kapanan soketin kuyruğu sıfırlanır."""
+    try:
+        server.socket.setblocking(False)
+        while True:
+            request, client_address = server.socket.accept()
+            request.setblocking(True)
+            server.process_request(request, client_address)
+    except OSError:
+        pass
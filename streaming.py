@@ -0,0 +1,96 @@
+"""Büyük yanıtları tamamı oluşmadan parça parça gönderme.
+
+Uzun tablolar (ör. `/dc` listesi) satır üreten bir üreteçle yazılır:
+sayfa başı hemen gider, satırlar `STREAM_BUFFER_BYTES` dolunca gönderilir,
+böylece ilk bayta kadar geçen süre ve bellek satır sayısıyla büyümez.
+HTTP/1.1 istemcilerine `Transfer-Encoding: chunked`, HTTP/1.0'a bağlantı
+kapanışıyla biten gövde gönderilir. İstemci kabul ediyorsa HTML gövde akış
+halinde gzip'lenir.
+"""
+
+from __future__ import annotations
+
+import zlib
+from http.server import BaseHTTPRequestHandler
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence, Tuple, Union
+
+from compression import COMPRESS_LEVEL, accepts_gzip
+
+# Bu kadar bayt birikince bir parça gönderilir
+STREAM_BUFFER_BYTES = 32 * 1024
+
+HeaderHook = Callable[[BaseHTTPRequestHandler], None]
+
+
+def send_chunks(
+    handler: BaseHTTPRequestHandler,
+    chunks: Iterable[bytes],
+    headers: Sequence[Tuple[str, str]],
+    add_headers: Optional[HeaderHook] = None,
+) -> None:
+    """`chunks` baytlarını uzunluğu bilinmeyen `200` gövdesi olarak gönder.
+
+    Başlıklar gittikten sonra üreteç hata verirse yanıt yarıda kalır ve
+    bağlantı kapatılır (istemci eksik gövde görür).
+    """
+    chunked = handler.request_version != "HTTP/1.0" and handler.protocol_version >= "HTTP/1.1"
+    handler.send_response(200)
+    for name, value in headers:
+        handler.send_header(name, value)
+    if add_headers is not None:
+        add_headers(handler)
+    if chunked:
+        handler.send_header("Transfer-Encoding", "chunked")
+    else:
+        handler.send_header("Connection", "close")
+        handler.close_connection = True
+    handler.end_headers()
+    if handler.command == "HEAD":
+        return
+    try:
+        for data in chunks:
+            if data:
+                handler.wfile.write(b"%x\r\n%s\r\n" % (len(data), data) if chunked else data)
+    except Exception:
+        handler.close_connection = True
+        handler.log_error("Akış yarıda kesildi: %r", handler.path)
+        return
+    if chunked:
+        handler.wfile.write(b"0\r\n\r\n")
+
+
+def _html_chunks(parts: Iterable[Union[str, bytes]], compressor: Optional[Any]) -> Iterator[bytes]:
+    def emit(data: bytes, final: bool = False) -> bytes:
+        if compressor is not None:
+            data = compressor.compress(data) + compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+        return data
+
+    buffer = []
+    size = 0
+    first = True
+    for part in parts:
+        data = part if isinstance(part, bytes) else part.encode("utf-8")
+        buffer.append(data)
+        size += len(data)
+        # Sayfa başı (başlık, stiller) hemen gitsin; sonrası tamponlanır
+        if first or size >= STREAM_BUFFER_BYTES:
+            yield emit(b"".join(buffer))
+            buffer.clear()
+            size = 0
+            first = False
+    yield emit(b"".join(buffer), final=True)
+
+
+def send_stream(
+    handler: BaseHTTPRequestHandler,
+    parts: Iterable[Union[str, bytes]],
+    add_headers: Optional[HeaderHook] = None,
+    content_type: str = "text/html; charset=utf-8",
+) -> None:
+    """Metin `parts` parçalarını `200` yanıtı olarak akıt (gerekirse gzip'le)."""
+    headers = [("Content-Type", content_type), ("Vary", "Accept-Encoding")]
+    compressor = None
+    if accepts_gzip(handler.headers.get("Accept-Encoding")):
+        compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 31)
+        headers.append(("Content-Encoding", "gzip"))
+    send_chunks(handler, _html_chunks(parts, compressor), headers, add_headers)
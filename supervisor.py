@@ -0,0 +1,157 @@
+"""Çok süreçli çalışma için basit süreç denetleyicisi.
+
+Her işçi ayrı bir Python süreci (spawn) olarak başlar ve `serving.REUSE_PORT`
+sayesinde aynı portu diğer işçilerle paylaşır; çekirdek, gelen bağlantıları
+süreçler arasında dağıtır. İşçiler hiçbir şeyi paylaşmaz: örüntü önbelleği
+ve bağlantı havuzları süreç başınadır, yalnız IOU oturumları ve onların
+örüntü zincirleri disk üzerinden ortaktır (`serving.process_settings`).
+
+- SIGHUP: kesintisiz yeniden başlatma; yeni kuşak dinlemeye başlayınca eski
+  işçilere SIGTERM gider, eldeki istekleri bitirip çıkarlar.
+- SIGTERM/SIGINT: tüm işçileri nazikçe durdur.
+- Beklenmedik şekilde ölen işçi yeniden başlatılır; art arda çökmelerde
+  bekleme süresi katlanarak artar.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import signal
+import socket
+import time
+from multiprocessing.connection import wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import serving
+
+# Yeni işçinin dinlemeye başlaması için beklenen en uzun süre
+READY_TIMEOUT = 60.0
+# Durdurulan işçinin eldeki istekleri bitirmesi için süre; sonra öldürülür
+GRACEFUL_TIMEOUT = 30.0
+# Bu süreden kısa yaşayan işçi "çöktü" sayılır ve bekleme süresi artar
+MIN_UPTIME = 5.0
+MAX_BACKOFF = 30.0
+
+# (ad, hedef fonksiyon, argümanlar); hedef içe aktarılabilir olmalı (spawn)
+WorkerSpec = Tuple[str, Callable[..., None], Tuple[Any, ...]]
+
+
+def _child_main(target: Callable[..., None], args: Tuple[Any, ...], settings: Dict[str, Any], ready: Any) -> None:
+    # Ctrl+C tüm süreç grubuna gider; işçiler yalnız denetleyicinin SIGTERM'ünü dinler
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    serving.init_process(settings, ready)
+    target(*args)
+
+
+class _Slot:
+    """Bir işçi tanımı ve onu çalıştıran güncel süreç."""
+
+    def __init__(self, spec: WorkerSpec) -> None:
+        self.name, self.target, self.args = spec
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+        self.ready: Any = None
+        self.started = 0.0
+        self.backoff = 1.0
+        self.respawn_at = 0.0
+
+
+class Supervisor:
+    """İşçi süreçlerini başlatır, izler ve sinyallere göre yeniden başlatır."""
+
+    def __init__(self, specs: List[WorkerSpec]) -> None:
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise RuntimeError("Çok süreçli çalışma SO_REUSEPORT gerektirir (bu platformda yok)")
+        self.slots = [_Slot(spec) for spec in specs]
+        self._ctx = multiprocessing.get_context("spawn")
+        self._settings = serving.process_settings()
+        self._stopping = False
+        self._restart = False
+
+    def _spawn(self, slot: _Slot) -> Tuple[multiprocessing.process.BaseProcess, Any]:
+        ready = self._ctx.Event()
+        process = self._ctx.Process(
+            target=_child_main,
+            args=(slot.target, slot.args, self._settings, ready),
+            name=slot.name,
+        )
+        process.start()
+        return process, ready
+
+    def _start(self, slot: _Slot) -> None:
+        slot.process, slot.ready = self._spawn(slot)
+        slot.started = time.monotonic()
+
+    def _wait_ready(self, pairs: List[Tuple[multiprocessing.process.BaseProcess, Any]]) -> bool:
+        deadline = time.monotonic() + READY_TIMEOUT
+        for process, ready in pairs:
+            while not ready.wait(0.2):
+                if not process.is_alive() or time.monotonic() > deadline:
+                    return False
+        return True
+
+    @staticmethod
+    def _stop(processes: List[multiprocessing.process.BaseProcess]) -> None:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT
+        for process in processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+                process.join()
+
+    def _reload(self) -> None:
+        """Yeni kuşağı başlat; hazır olunca eskileri durdur."""
+        fresh = [self._spawn(slot) for slot in self.slots]
+        if not self._wait_ready(fresh):
+            print("supervisor: yeni işçiler hazır olmadı, eski işçiler korunuyor")
+            self._stop([process for process, _ in fresh])
+            return
+        old = [slot.process for slot in self.slots if slot.process is not None]
+        now = time.monotonic()
+        for slot, (process, ready) in zip(self.slots, fresh):
+            slot.process, slot.ready, slot.started = process, ready, now
+            slot.backoff = 1.0
+        self._stop(old)
+        print(f"supervisor: {len(fresh)} işçi yeniden başlatıldı")
+
+    def _reap(self) -> None:
+        now = time.monotonic()
+        for slot in self.slots:
+            process = slot.process
+            if process is not None and not process.is_alive():
+                process.join()
+                uptime = now - slot.started
+                slot.backoff = 1.0 if uptime >= MIN_UPTIME else min(slot.backoff * 2, MAX_BACKOFF)
+                slot.respawn_at = now + (0.0 if uptime >= MIN_UPTIME else slot.backoff)
+                print(f"supervisor: {slot.name} çıktı (kod {process.exitcode}), yeniden başlatılacak")
+                slot.process = None
+            if slot.process is None and now >= slot.respawn_at:
+                self._start(slot)
+
+    def _on_stop(self, *_: Any) -> None:
+        self._stopping = True
+
+    def _on_hup(self, *_: Any) -> None:
+        self._restart = True
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_hup)
+        for slot in self.slots:
+            self._start(slot)
+        self._wait_ready([(slot.process, slot.ready) for slot in self.slots])
+        try:
+            while not self._stopping:
+                if self._restart:
+                    self._restart = False
+                    self._reload()
+                sentinels = [slot.process.sentinel for slot in self.slots if slot.process is not None]
+                wait(sentinels, timeout=0.5)
+                if not self._stopping:
+                    self._reap()
+        finally:
+            self._stop([slot.process for slot in self.slots if slot.process is not None])
+        return 0
@@ -0,0 +1,87 @@
+"""Belleğe toplanmadan, parça parça üretilen ZIP arşivi.
+
+Her dosya için yerel başlık CRC ve boyutlar olmadan yazılır (bayrak 3),
+sıkıştırılmış veri hemen ardından gelir, CRC ve boyutlar dosya bitince
+veri tanımlayıcısında (`PK\\x07\\x08`) verilir. Merkezi dizin yalnız
+dosya başına birkaç alan tutar ve sonda yazılır. Böylece dönüştürülen
+dosyalar hazır oldukça istemciye gider; arşivin tamamı hiçbir anda
+bellekte durmaz. ZIP64 desteklenmez (4 GB sınırı).
+"""
+
+from __future__ import annotations
+
+import struct
+import time
+import zlib
+from typing import Iterable, Iterator, List, Tuple
+
+# Sıkıştırıcıya bir seferde verilen bayt sayısı
+ZIP_CHUNK_SIZE = 64 * 1024
+
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_DATA_DESCRIPTOR = struct.Struct("<4s3L")
+_CENTRAL_HEADER = struct.Struct("<4s4B4HL2L5H2L")
+_END_RECORD = struct.Struct("<4s4H2LH")
+
+_FLAG_DESCRIPTOR = 0x08
+_FLAG_UTF8 = 0x800
+_DEFLATED = 8
+_VERSION = 20
+# `zipfile.writestr` ile aynı: Unix, -rw-------
+_CREATE_SYSTEM = 3
+_EXTERNAL_ATTR = 0o600 << 16
+_LIMIT = 0xFFFFFFFF
+
+
+def _dos_time(stamp: time.struct_time) -> Tuple[int, int]:
+    dos_date = (stamp.tm_year - 1980) << 9 | stamp.tm_mon << 5 | stamp.tm_mday
+    dos_time = stamp.tm_hour << 11 | stamp.tm_min << 5 | stamp.tm_sec // 2
+    return dos_time, dos_date
+
+
+def zip_stream(files: Iterable[Tuple[str, bytes]]) -> Iterator[bytes]:
+    """`(ad, içerik)` çiftlerinden deflate'li ZIP baytları üret.
+
+    `files` tembel bir üreteç olabilir; her dosya geldikçe yazılır.
+    """
+    central: List[bytes] = []
+    offset = 0
+    for name, data in files:
+        try:
+            encoded = name.encode("ascii")
+            flags = _FLAG_DESCRIPTOR
+        except UnicodeEncodeError:
+            encoded = name.encode("utf-8")
+            flags = _FLAG_DESCRIPTOR | _FLAG_UTF8
+        dos_time, dos_date = _dos_time(time.localtime())
+        header = _LOCAL_HEADER.pack(
+            b"PK\x03\x04", _VERSION, 0, flags, _DEFLATED, dos_time, dos_date, 0, 0, 0, len(encoded), 0
+        )
+        yield header + encoded
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+        crc = 0
+        compressed = 0
+        view = memoryview(data)
+        for start in range(0, len(view), ZIP_CHUNK_SIZE):
+            piece = view[start : start + ZIP_CHUNK_SIZE]
+            crc = zlib.crc32(piece, crc)
+            out = compressor.compress(piece)
+            if out:
+                compressed += len(out)
+                yield out
+        out = compressor.flush()
+        compressed += len(out)
+        if compressed > _LIMIT or len(data) > _LIMIT or offset > _LIMIT:
+            raise ValueError(f"{name}: ZIP64 gerektiren boyut desteklenmiyor")
+        yield out + _DATA_DESCRIPTOR.pack(b"PK\x07\x08", crc, compressed, len(data))
+        central.append(
+            _CENTRAL_HEADER.pack(
+                b"PK\x01\x02", _VERSION, _CREATE_SYSTEM, _VERSION, 0, flags, _DEFLATED,
+                dos_time, dos_date, crc, compressed, len(data), len(encoded), 0, 0, 0, 0,
+                _EXTERNAL_ATTR, offset,
+            )
+            + encoded
+        )
+        offset += len(header) + len(encoded) + compressed + _DATA_DESCRIPTOR.size
+    directory = b"".join(central)
+    yield directory + _END_RECORD.pack(b"PK\x05\x06", 0, 0, len(central), len(central), len(directory), offset, 0)